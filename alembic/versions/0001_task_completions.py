@@ -0,0 +1,61 @@
+"""task_completions вместо JSON-списка tasks.completed_by
+
+Revision ID: 0001_task_completions
+Revises:
+Create Date: 2026-10-19
+
+Отметки о выполнении переносятся в отдельную таблицу с первичным ключом
+(task_id, volunteer_id), чтобы фильтровать и считать задачи в SQL.
+Колонка tasks.completed_by остаётся и после переноса не используется.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_task_completions"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # таблица могла появиться раньше через create_tables()
+    if not sa.inspect(op.get_bind()).has_table("task_completions"):
+        op.create_table(
+            "task_completions",
+            sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("volunteer_id", sa.String(), primary_key=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_task_completions_volunteer_id ON task_completions (volunteer_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tasks_telegram_id ON tasks (telegram_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tasks_assigned_to ON tasks (assigned_to)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tasks_created_by ON tasks (created_by)")
+
+    # перенос старых отметок одним INSERT ... SELECT
+    op.execute(
+        """
+        INSERT INTO task_completions (task_id, volunteer_id, completed_at)
+        SELECT t.id, done.volunteer_id, COALESCE(t.created_at, now())
+        FROM tasks AS t
+        CROSS JOIN LATERAL jsonb_array_elements_text(t.completed_by::jsonb) AS done(volunteer_id)
+        WHERE jsonb_typeof(t.completed_by::jsonb) = 'array'
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE tasks AS t
+        SET completed_by = COALESCE(
+            (SELECT json_agg(c.volunteer_id) FROM task_completions AS c WHERE c.task_id = t.id),
+            '[]'::json
+        )
+        """
+    )
+    op.execute("DROP INDEX IF EXISTS ix_tasks_created_by")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_assigned_to")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_telegram_id")
+    op.drop_table("task_completions")
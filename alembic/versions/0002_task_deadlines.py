@@ -0,0 +1,37 @@
+"""дедлайны и приоритеты задач
+
+Revision ID: 0002_task_deadlines
+Revises: 0001_task_completions
+Create Date: 2026-10-19
+
+reminder_stage — какое напоминание уже отправлено (0 — никакого,
+1 — о приближении дедлайна, 2 — о просрочке). Частичный индекс по deadline
+содержит только задачи, по которым напоминания ещё ждут.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_task_deadlines"
+down_revision = "0001_task_completions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("deadline", sa.DateTime(), nullable=True))
+    op.add_column("tasks", sa.Column("priority", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("tasks", sa.Column("reminder_stage", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index(
+        "ix_tasks_pending_deadline",
+        "tasks",
+        ["deadline"],
+        postgresql_where=sa.text("is_active = true AND deadline IS NOT NULL AND reminder_stage < 2"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_pending_deadline", table_name="tasks")
+    op.drop_column("tasks", "reminder_stage")
+    op.drop_column("tasks", "priority")
+    op.drop_column("tasks", "deadline")
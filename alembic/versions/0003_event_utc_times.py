@@ -0,0 +1,62 @@
+"""время событий в UTC
+
+Revision ID: 0003_event_utc_times
+Revises: 0002_task_deadlines
+Create Date: 2026-10-19
+
+start_time/end_time остаются локальным временем создателя, start_utc/end_utc
+хранят те же моменты в UTC. Существующие строки переводятся так же, как
+services.timezones.to_utc: 'UTC±N[:MM]' — фиксированное смещение, имя IANA —
+через AT TIME ZONE. Если creator_timezone не подходит ни под один формат,
+миграция останавливается со списком таких значений, а не угадывает пояс.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_event_utc_times"
+down_revision = "0002_task_deadlines"
+branch_labels = None
+depends_on = None
+
+
+# 'UTC+3', 'UTC-5', 'UTC+5:30' — как services.timezones._UTC_OFFSET_RE
+FIXED_OFFSET_RE = "^UTC[+-][0-9]{1,2}(:[0-9]{2})?$"
+
+
+def _utc_expr(column: str) -> str:
+    # знак после 'UTC' и часы:минуты; у POSIX-имён вида 'UTC+3' в AT TIME ZONE знак обратный
+    sign = "(CASE WHEN substring(creator_timezone from 4 for 1) = '-' THEN -1 ELSE 1 END)"
+    hours = "split_part(substring(creator_timezone from 5), ':', 1)::int"
+    minutes = "coalesce(nullif(split_part(substring(creator_timezone from 5), ':', 2), ''), '0')::int"
+    return (
+        f"CASE WHEN creator_timezone ~ '{FIXED_OFFSET_RE}' "
+        f"THEN ({column} - {sign} * make_interval(hours => {hours}, mins => {minutes})) AT TIME ZONE 'UTC' "
+        f"ELSE {column} AT TIME ZONE creator_timezone END"
+    )
+
+
+def upgrade() -> None:
+    unknown = op.get_bind().execute(sa.text(
+        "SELECT DISTINCT creator_timezone FROM events "
+        "WHERE creator_timezone !~ :fixed "
+        "AND creator_timezone NOT IN (SELECT name FROM pg_timezone_names)"
+    ), {"fixed": FIXED_OFFSET_RE}).scalars().all()
+    if unknown:
+        raise RuntimeError(
+            f"Неизвестные часовые пояса в events.creator_timezone: {', '.join(map(repr, unknown))}; "
+            "исправьте их перед миграцией"
+        )
+
+    op.add_column("events", sa.Column("start_utc", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("events", sa.Column("end_utc", sa.DateTime(timezone=True), nullable=True))
+    op.execute(f"UPDATE events SET start_utc = {_utc_expr('start_time')}, end_utc = {_utc_expr('end_time')}")
+    op.alter_column("events", "start_utc", nullable=False)
+    op.alter_column("events", "end_utc", nullable=False)
+    op.create_index("ix_events_start_utc", "events", ["start_utc"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_start_utc", table_name="events")
+    op.drop_column("events", "end_utc")
+    op.drop_column("events", "start_utc")
@@ -0,0 +1,35 @@
+"""ежедневная сводка уведомлений
+
+Revision ID: 0004_notification_digest
+Revises: 0003_event_utc_times
+Create Date: 2026-10-19
+
+digest_hour — час отправки в поясе пользователя, digest_sent_on — локальная
+дата последней отправленной сводки (защита от повторной отправки).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_notification_digest"
+down_revision = "0003_event_utc_times"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "notification_settings",
+        sa.Column("digest_enabled", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column(
+        "notification_settings",
+        sa.Column("digest_hour", sa.Integer(), nullable=False, server_default="9"),
+    )
+    op.add_column("notification_settings", sa.Column("digest_sent_on", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("notification_settings", "digest_sent_on")
+    op.drop_column("notification_settings", "digest_hour")
+    op.drop_column("notification_settings", "digest_enabled")
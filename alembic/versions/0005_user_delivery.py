@@ -0,0 +1,35 @@
+"""недоступные для доставки пользователи
+
+Revision ID: 0005_user_delivery
+Revises: 0004_notification_digest
+Create Date: 2026-10-19
+
+undeliverable_at/undeliverable_reason заполняются, когда Telegram отвечает,
+что бот заблокирован, аккаунт удалён или чат не найден. Такие пользователи
+исключаются из рассылок; частичный индекс нужен статистике доставки.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_user_delivery"
+down_revision = "0004_notification_digest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("undeliverable_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("users", sa.Column("undeliverable_reason", sa.String(length=32), nullable=True))
+    op.create_index(
+        "ix_users_undeliverable",
+        "users",
+        ["undeliverable_reason"],
+        postgresql_where=sa.text("undeliverable_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_undeliverable", table_name="users")
+    op.drop_column("users", "undeliverable_reason")
+    op.drop_column("users", "undeliverable_at")
@@ -0,0 +1,34 @@
+"""общее состояние воркеров
+
+Revision ID: 0006_shared_state
+Revises: 0005_user_delivery
+Create Date: 2026-10-19
+
+shared_state — ключ-значение с необязательным сроком жизни для FSM, отметок
+об отправленных напоминаниях и кэшей, общих для всех воркеров бота
+(STATE_BACKEND=postgres).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0006_shared_state"
+down_revision = "0005_user_delivery"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shared_state",
+        sa.Column("key", sa.String(length=255), primary_key=True),
+        sa.Column("value", postgresql.JSONB(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_shared_state_expires_at", "shared_state", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shared_state_expires_at", table_name="shared_state")
+    op.drop_table("shared_state")
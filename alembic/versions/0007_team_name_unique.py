@@ -0,0 +1,32 @@
+"""уникальные названия команд
+
+Revision ID: 0007_team_name_unique
+Revises: 0006_shared_state
+Create Date: 2026-10-19
+
+Проверка названия при создании команды не защищала от двух капитанов,
+одновременно выбравших одно название. Повторы, которые уже есть в базе,
+получают суффикс с id команды (первая по id сохраняет название), затем
+добавляется ограничение uq_teams_name.
+"""
+from alembic import op
+
+
+revision = "0007_team_name_unique"
+down_revision = "0006_shared_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE teams SET name = left(name, 90) || ' #' || id
+        WHERE id NOT IN (SELECT min(id) FROM teams GROUP BY name)
+        """
+    )
+    op.create_unique_constraint("uq_teams_name", "teams", ["name"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_teams_name", "teams", type_="unique")
@@ -3,9 +3,9 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
-from aiogram.enums import ParseMode
 
 from services.user_service import UserService
+from bot.services.sender import RateLimitedSender
 
 router = Router()
 
@@ -32,12 +32,13 @@ def back_to_menu_keyboard():
     return builder.as_markup()
 
 async def send_broadcast(bot, role, text, sender_id):
-    users = await UserService().get_all()
+    # недоступные пользователи в выборку не попадают, новые отмечает RateLimitedSender
+    users = await UserService().get_reachable()
     
     if not users:
         return 0
     
-    sent_count = 0
+    messages = []
     
     for user in users:
         if str(user.telegram_id) == str(sender_id):
@@ -46,18 +47,9 @@ async def send_broadcast(bot, role, text, sender_id):
         if role != "all" and user.role != role:
             continue
         
-        try:
-            await bot.send_message(
-                chat_id=int(user.telegram_id),
-                text=text,
-                parse_mode=ParseMode.HTML
-            )
-            sent_count += 1
-        except Exception as e:
-            print(f"Ошибка отправки пользователю {user.telegram_id}: {e}")
-            continue
+        messages.append((int(user.telegram_id), text))
     
-    return sent_count
+    return await RateLimitedSender(bot).send_many(messages)
 
 
 @router.callback_query(F.data == "admin_broadcast")
@@ -3,7 +3,7 @@
 Обработчики для работы с анкетами участников
 """
 
-from aiogram import Router, F
+from aiogram import Router, F, html
 from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
@@ -34,6 +34,7 @@ def get_profiles_main_menu():
     builder = InlineKeyboardBuilder()
     
     builder.button(text="👀 Смотреть другие анкеты", callback_data="view_profiles")
+    builder.button(text="🎯 Подходящие анкеты", callback_data="matching_profiles")
     builder.button(text="📝 Моя анкета", callback_data="my_profile")
     builder.button(text="🔙 Назад в меню", callback_data="back_to_menu")
     builder.adjust(1)
@@ -143,6 +144,61 @@ async def view_more_profiles(callback: CallbackQuery):
     """Показывает ещё 5 случайных анкет"""
     await view_profiles(callback)
 
+@router.callback_query(F.data == "matching_profiles")
+async def matching_profiles(callback: CallbackQuery):
+    """Анкеты участников, которые дополняют навыки пользователя"""
+    user_id = int(callback.from_user.id)
+    user_service = UserService()
+    user = await user_service.get_by_tg_id(user_id)
+
+    if not user:
+        await callback.answer("❌ Пользователь не найден", show_alert=True)
+        return
+
+    if not user.profile_text or not user.profile_text.strip():
+        await callback.answer("📝 Заполните свою анкету, чтобы мы подобрали тиммейтов", show_alert=True)
+        return
+
+    matches = await user_service.get_matching_profiles(user.id, user.profile_text, limit=5)
+
+    builder = InlineKeyboardBuilder()
+    builder.button(text="👀 Случайные анкеты", callback_data="view_profiles")
+    builder.button(text="🔙 Назад", callback_data="profiles_menu")
+    builder.adjust(1)
+
+    if not matches:
+        await callback.message.edit_text(
+            "🎯 <b>Подходящие анкеты</b>\n\n"
+            "Пока не нашлось анкет, которые дополнили бы ваши навыки.\n\n"
+            "Попробуйте дополнить свою анкету или посмотрите случайные!",
+            reply_markup=builder.as_markup(),
+            parse_mode="HTML"
+        )
+        await callback.answer()
+        return
+
+    profiles_text = []
+    for i, (profile_user, novelty) in enumerate(matches, 1):
+        preview = profile_user.profile_text.strip()
+        if len(preview) > 150:
+            preview = preview[:150] + "..."
+        tg_username = f"@{profile_user.username}" if profile_user.username else "без username"
+        profiles_text.append(
+            f"<b>{i}. {html.quote(profile_user.full_name)}</b> — новых для вас навыков {round(novelty * 100)}%\n"
+            f"📱 Telegram: {tg_username}\n"
+            f"📝 <i>{html.quote(preview)}</i>\n"
+            f"─────────────────"
+        )
+
+    await callback.message.edit_text(
+        "🎯 <b>Подходящие анкеты</b>\n\n"
+        "Участники с общим контекстом и навыками, которых нет в вашей анкете:\n\n"
+        + "\n\n".join(profiles_text),
+        reply_markup=builder.as_markup(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
 @router.callback_query(F.data == "my_profile")
 async def my_profile(callback: CallbackQuery):
     """Моя анкета"""
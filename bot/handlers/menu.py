@@ -1,5 +1,7 @@
+import logging
+
 from aiogram import Router, F, html
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 
@@ -8,8 +10,12 @@ from .start import ROLES
 from .broadcast import BroadcastStates
 from datetime import datetime
 from bot.services.utils import parse_users_to_sheet
+from bot.services.exporters import get_exporter
+from services.delivery import UNDELIVERABLE_REASONS, delivery_stats
+from bot.services.gateway import outbound_gateway
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 def back_to_menu_keyboard():
     builder = InlineKeyboardBuilder()
@@ -41,9 +47,13 @@ def get_organizer_menu():
     builder.button(text="❓ Задать вопрос", callback_data="menu_ask_ai_question")
     builder.button(text="👤 Мой профиль", callback_data="menu_profile")
     builder.button(text="💾 Выгрузить пользователей", callback_data="admin_parse_users")
+    builder.button(text="📁 Выгрузить в файл", callback_data="admin_export_users")
+    builder.button(text="🧩 Сформировать команды", callback_data="admin_form_teams")
+    builder.button(text="🧠 Распределить менторов", callback_data="admin_assign_mentors")
+    builder.button(text="📬 Доставка сообщений", callback_data="admin_delivery_stats")
 
     
-    builder.adjust(2, 2, 2, 2)
+    builder.adjust(2, 2, 2, 2, 2, 2, 1)
     return builder.as_markup()
 
 def get_mentor_menu():
@@ -221,4 +231,106 @@ async def admin_parse_users(callback: CallbackQuery):
             reply_markup=back_to_menu_keyboard(),
             parse_mode="HTML"
         )
-    
\ No newline at end of file
+
+
+def get_export_formats_keyboard():
+    builder = InlineKeyboardBuilder()
+    builder.button(text="📄 CSV", callback_data="admin_export_users:csv")
+    builder.button(text="📊 XLSX", callback_data="admin_export_users:xlsx")
+    builder.button(text="🔙 Назад в меню", callback_data="back_to_menu")
+    builder.adjust(2, 1)
+    return builder.as_markup()
+
+
+@router.callback_query(F.data == "admin_delivery_stats")
+async def admin_delivery_stats(callback: CallbackQuery):
+    user_id = int(callback.from_user.id)
+    user = await UserService().get_by_tg_id(user_id)
+
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Команда доступна только организаторам", show_alert=True)
+        return
+
+    by_reason = await UserService().get_delivery_stats()
+    reachable = by_reason.pop(None, 0)
+    unreachable = sum(by_reason.values())
+    total = reachable + unreachable
+
+    text = (
+        f"📬 <b>Доставка сообщений</b>\n\n"
+        f"👥 Активных пользователей: {total}\n"
+        f"✅ Доступны для рассылок: {reachable}\n"
+        f"🚫 Недоступны: {unreachable}\n"
+    )
+    for reason, count in sorted(by_reason.items(), key=lambda item: -item[1]):
+        text += f"   • {UNDELIVERABLE_REASONS.get(reason, reason)}: {count}\n"
+
+    session = delivery_stats.as_dict()
+    text += (
+        f"\n<b>С момента запуска бота:</b>\n"
+        f"• доставлено: {session['delivered']}\n"
+        f"• временные ошибки: {session['failed']}\n"
+        f"• отмечено недоступными: {session['undeliverable']}\n"
+    )
+
+    methods = outbound_gateway.metrics_snapshot()
+    if methods:
+        text += "\n<b>Запросы к Telegram (вызовы / 429 / среднее время):</b>\n"
+        for name, metrics in sorted(methods.items(), key=lambda item: -item[1]["calls"])[:8]:
+            text += f"• {name}: {metrics['calls']} / {metrics['retry_after']} / {metrics['latency_avg_ms']} мс\n"
+
+    text += "\n<i>Недоступные пользователи исключаются из рассылок, пока снова не напишут боту /start.</i>"
+
+    await callback.message.edit_text(text, reply_markup=back_to_menu_keyboard(), parse_mode="HTML")
+    await callback.answer()
+
+
+@router.callback_query(F.data == "admin_export_users")
+async def admin_export_users_menu(callback: CallbackQuery):
+    user_id = int(callback.from_user.id)
+    user = await UserService().get_by_tg_id(user_id)
+
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Команда доступна только организаторам", show_alert=True)
+        return
+
+    await callback.message.edit_text(
+        "📁 <b>Выгрузка пользователей в файл</b>\n\n"
+        "Выберите формат:",
+        reply_markup=get_export_formats_keyboard(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("admin_export_users:"))
+async def admin_export_users(callback: CallbackQuery):
+    user_id = int(callback.from_user.id)
+    user = await UserService().get_by_tg_id(user_id)
+
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Команда доступна только организаторам", show_alert=True)
+        return
+
+    exporter = get_exporter(callback.data.split(":")[1])
+    if not exporter or not exporter.extension:
+        await callback.answer("❌ Неизвестный формат", show_alert=True)
+        return
+
+    await callback.answer("⏳ Готовим файл...")
+    filename = f"users-{datetime.now().strftime('%Y-%m-%d')}"
+    try:
+        result = await exporter.export(filename)
+    except Exception as e:
+        logger.error(f"Ошибка выгрузки пользователей ({exporter.name}): {e}")
+        await callback.message.edit_text(
+            "❌ Ошибка выгрузки пользователей.",
+            reply_markup=back_to_menu_keyboard(),
+            parse_mode="HTML"
+        )
+        return
+
+    await callback.message.answer_document(
+        document=BufferedInputFile(result["content"], filename=result["filename"]),
+        caption=f"💾 Пользователи ({exporter.name}): {result['rows']}"
+    )
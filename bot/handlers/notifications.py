@@ -29,9 +29,10 @@ def get_notification_settings_keyboard(user_id: int, settings_enabled: bool):
     builder.button(text=enabled_status, callback_data="toggle_notifications")
     builder.button(text="⏰ Время напоминаний", callback_data="edit_reminders")
     builder.button(text="📋 Типы уведомлений", callback_data="edit_types")
+    builder.button(text="📰 Ежедневная сводка", callback_data="edit_digest")
     builder.button(text="🔙 Назад в меню", callback_data="back_to_menu")
     
-    builder.adjust(2, 2)
+    builder.adjust(2, 2, 1)
     return builder.as_markup()
 
 
@@ -86,6 +87,27 @@ def get_notification_types_keyboard(settings):
     return builder.as_markup()
 
 
+DIGEST_HOURS = [7, 8, 9, 10, 11, 12]
+
+
+def get_digest_keyboard(settings):
+    """Создаёт клавиатуру для настройки ежедневной сводки."""
+    builder = InlineKeyboardBuilder()
+    
+    digest_text = "✅ Получать сводку" if settings.digest_enabled else "◻️ Получать сводку"
+    builder.button(text=digest_text, callback_data="toggle_digest")
+    
+    for hour in DIGEST_HOURS:
+        text = f"{hour:02d}:00"
+        text = f"✅ {text}" if hour == settings.digest_hour else text
+        builder.button(text=text, callback_data=f"digest_hour_{hour}")
+    
+    builder.button(text="🔙 Назад", callback_data="notifications_back")
+    
+    builder.adjust(1, 3, 3, 1)
+    return builder.as_markup()
+
+
 @router.callback_query(F.data == "menu_notifications")
 async def notifications_menu(callback: CallbackQuery):
     """Меню управления уведомлениями."""
@@ -96,7 +118,7 @@ async def notifications_menu(callback: CallbackQuery):
         await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start")
         return
     
-    settings = await notification_service.get_or_create_settings(user.id)
+    settings = await notification_service.get_settings(user.id)
     
     status = "✅ Включены" if settings.enabled else "❌ Выключены"
     
@@ -121,11 +143,14 @@ async def notifications_menu(callback: CallbackQuery):
     if settings.event_cancelled_enabled:
         types_active.append("отмена")
     
+    digest_status = f"в {settings.digest_hour:02d}:00" if settings.digest_enabled else "выключена"
+    
     await callback.message.edit_text(
         f"🔔 <b>Управление уведомлениями</b>\n\n"
         f"Статус: {status}\n\n"
         f"⏰ Напоминания за: {', '.join(times_display)}\n"
-        f"📋 Активные уведомления: {', '.join(types_active) if types_active else 'нет'}\n\n"
+        f"📋 Активные уведомления: {', '.join(types_active) if types_active else 'нет'}\n"
+        f"📰 Ежедневная сводка: {digest_status}\n\n"
         f"Здесь вы можете настроить получение уведомлений о событиях хакатона.",
         reply_markup=get_notification_settings_keyboard(user_id, settings.enabled),
         parse_mode="HTML"
@@ -164,11 +189,11 @@ async def edit_reminders(callback: CallbackQuery, state: FSMContext):
         await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start")
         return
     
-    settings = await notification_service.get_or_create_settings(user.id)
+    settings = await notification_service.get_settings(user.id)
     
     await state.set_state(NotificationStates.editing_reminders)
     await state.update_data(
-        selected_minutes=(settings.reminder_minutes or [5, 15, 60]).copy(),
+        selected_minutes=list(settings.reminder_minutes or [5, 15, 60]),
         user_id=user.id
     )
     
@@ -236,7 +261,7 @@ async def edit_notification_types(callback: CallbackQuery, state: FSMContext):
         await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start")
         return
     
-    settings = await notification_service.get_or_create_settings(user.id)
+    settings = await notification_service.get_settings(user.id)
     
     await state.set_state(NotificationStates.editing_types)
     await state.update_data(user_id=user.id)
@@ -316,6 +341,72 @@ async def save_notification_types(callback: CallbackQuery, state: FSMContext):
     await notifications_menu(callback)
 
 
+DIGEST_DESCRIPTION = (
+    "📰 <b>Ежедневная сводка</b>\n\n"
+    "Вместо отдельных сообщений о новых и изменённых событиях и напоминаний "
+    "вы будете получать одно сообщение с расписанием на день в выбранный час "
+    "(по вашему часовому поясу). Об отмене событий мы по-прежнему сообщим сразу."
+)
+
+
+@router.callback_query(F.data == "edit_digest")
+async def edit_digest(callback: CallbackQuery):
+    """Настройка ежедневной сводки."""
+    user = await user_service.get_by_tg_id(callback.from_user.id)
+    
+    if not user:
+        await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start")
+        return
+    
+    settings = await notification_service.get_settings(user.id)
+    
+    await callback.message.edit_text(
+        DIGEST_DESCRIPTION,
+        reply_markup=get_digest_keyboard(settings),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@router.callback_query(F.data == "toggle_digest")
+async def toggle_digest_handler(callback: CallbackQuery):
+    """Включает или выключает ежедневную сводку."""
+    user = await user_service.get_by_tg_id(callback.from_user.id)
+    
+    if not user:
+        await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start")
+        return
+    
+    settings = await notification_service.toggle_digest(user.id)
+    
+    await callback.message.edit_reply_markup(
+        reply_markup=get_digest_keyboard(settings)
+    )
+    await callback.answer("Сводка включена" if settings.digest_enabled else "Сводка выключена")
+
+
+@router.callback_query(F.data.startswith("digest_hour_"))
+async def set_digest_hour_handler(callback: CallbackQuery):
+    """Меняет час отправки ежедневной сводки."""
+    user = await user_service.get_by_tg_id(callback.from_user.id)
+    
+    if not user:
+        await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start")
+        return
+    
+    hour = int(callback.data.removeprefix("digest_hour_"))
+    if hour not in DIGEST_HOURS:
+        await callback.answer("Недопустимое время")
+        return
+    
+    settings = await notification_service.set_digest_hour(user.id, hour)
+    
+    await callback.message.edit_reply_markup(
+        reply_markup=get_digest_keyboard(settings)
+    )
+    await callback.answer(f"Сводка будет приходить в {hour:02d}:00")
+
+
 @router.callback_query(F.data == "notifications_back")
 async def back_to_notifications(callback: CallbackQuery, state: FSMContext):
     """Возврат в меню уведомлений."""
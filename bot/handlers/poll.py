@@ -6,15 +6,14 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from datetime import datetime
-import asyncio
 from typing import Dict, List, Set
 import json, re
 
-from .start import temp_users_storage
 from .menu import back_to_menu_keyboard
 
 from services.user_service import UserService
 from services.poll_service import PollService
+from bot.services.sender import RateLimitedSender
 
 router = Router()
 
@@ -186,35 +185,9 @@ async def send_polls_to_all_users(callback: CallbackQuery, state: FSMContext, bo
         question, user.id, user.full_name, options,
     )
     
-    # Отправляем опрос всем пользователям
-    sent_count = 0
-    failed_count = 0
-    
-    for user in await UserService().get_all():
-        try:
-            # Отправляем нативный опрос Telegram
-            sent_poll = await bot.send_poll(
-                chat_id=user.telegram_id,
-                question=question,
-                options=options,
-                is_anonymous=False,  # Не анонимный, чтобы видеть кто проголосовал
-                type="regular",  # Обычный опрос (не викторина)
-                allows_multiple_answers=False,
-                protect_content=False
-            )
-            
-            # Сохраняем ID сообщения с опросом
-            # DB HERE
-            await PollService().create_poll_message(poll.id, user.id, sent_poll.poll.id)
-            sent_count += 1
-            
-            # Небольшая задержка, чтобы не превысить лимиты Telegram
-            await asyncio.sleep(0.1)
-            
-        except Exception as e:
-            print(f"Не удалось отправить опрос пользователю {user.id}: {e}")
-            failed_count += 1
-    
+    # Отправляем опрос всем пользователям; при остановке бота остаток дошлёт следующий запуск
+    recipients = [(user.id, user.telegram_id) for user in await UserService().get_reachable()]
+    sent_count, failed_count = await RateLimitedSender(bot).send_poll_many(poll, recipients)
     await state.clear()
     
     await callback.message.edit_text(
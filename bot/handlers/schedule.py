@@ -1,16 +1,21 @@
-from aiogram import Router, F, Bot
-from aiogram.types import Message, CallbackQuery
+from aiogram import Router, F, Bot, html
+from aiogram.types import Message, CallbackQuery, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from datetime import datetime, timedelta
+import logging
 
 from .menu import back_to_menu_keyboard
 from bot.services.schedule_service import schedule_service
+from bot.services.sender import RateLimitedSender
 from services.user_service import UserService
 from services.schedule_service import ScheduleService
+from services.schedule_import import MAX_ERRORS, ScheduleImportError, parse_schedule_file
+from services.schedule_calendar import schedule_snapshot
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 class ScheduleStates(StatesGroup):
     waiting_for_title = State()
@@ -20,16 +25,28 @@ class ScheduleStates(StatesGroup):
     waiting_for_location = State()
     waiting_for_visibility = State()
     waiting_for_edit_value = State()
+    waiting_for_import_file = State()
+
+# Максимальный размер файла расписания для импорта
+IMPORT_MAX_FILE_SIZE = 1024 * 1024
 
 def get_admin_schedule_keyboard():
     builder = InlineKeyboardBuilder()
     builder.button(text="📅 Показать все события", callback_data="schedule_admin_view_all")
     builder.button(text="➕ Добавить событие", callback_data="schedule_admin_add")
     builder.button(text="✏️ Редактировать событие", callback_data="schedule_admin_edit")
+    builder.button(text="📥 Импорт из файла", callback_data="schedule_admin_import")
     builder.button(text="🔙 В меню", callback_data="back_to_menu")
     builder.adjust(1)
     return builder.as_markup()
 
+def get_schedule_view_keyboard():
+    builder = InlineKeyboardBuilder()
+    builder.button(text="📆 Добавить в календарь (.ics)", callback_data="schedule_ics")
+    builder.button(text="🔙 Назад в меню", callback_data="back_to_menu")
+    builder.adjust(1)
+    return builder.as_markup()
+
 def get_visibility_keyboard():
     builder = InlineKeyboardBuilder()
     builder.button(text="👥 Для всех", callback_data="visibility_all")
@@ -63,7 +80,7 @@ async def show_schedule(callback: CallbackQuery):
     if not user:
         await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start", show_alert=True)
         return
-    events = await ScheduleService().get_events_for_role(user.role, user.timezone)
+    events = await ScheduleService().get_schedule_snapshot(user.role, user.timezone)
     if not events:
         await callback.message.edit_text(
             "📅 <b>Расписание хакатона</b>\n\nНа данный момент событий нет.\n",
@@ -93,11 +110,38 @@ async def show_schedule(callback: CallbackQuery):
                 text += f"📍 {event.get("location")}\n"
     await callback.message.edit_text(
         text,
-        reply_markup=back_to_menu_keyboard(),
+        reply_markup=get_schedule_view_keyboard(),
         parse_mode="HTML"
     )
     await callback.answer()
 
+@router.callback_query(F.data == "schedule_ics")
+async def export_schedule_ics(callback: CallbackQuery):
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user:
+        await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start", show_alert=True)
+        return
+    role = getattr(user.role, "value", user.role)
+    caption = (
+        "📆 Импортируйте файл в Google Calendar, Apple Calendar или Outlook.\n"
+        "После изменений в расписании скачайте файл заново."
+    )
+    # пока расписание не менялось, повторно отправляем уже загруженный в Telegram файл
+    file_key = ("ics_file", role, user.timezone)
+    file_id = schedule_snapshot.peek(file_key)
+    if file_id:
+        await callback.message.answer_document(document=file_id, caption=caption)
+    else:
+        version = schedule_snapshot.version
+        content = await ScheduleService().get_calendar(role, user.timezone)
+        sent = await callback.message.answer_document(
+            document=BufferedInputFile(content, filename="schedule.ics"),
+            caption=caption
+        )
+        if sent and sent.document and version == schedule_snapshot.version:
+            schedule_snapshot.put(file_key, sent.document.file_id)
+    await callback.answer()
+
 # DONE
 @router.callback_query(F.data == "admin_edit_schedule")
 async def admin_schedule_menu(callback: CallbackQuery):
@@ -326,6 +370,68 @@ async def process_visibility(callback: CallbackQuery, state: FSMContext, bot: Bo
     )
     await callback.answer()
 
+@router.callback_query(F.data == "schedule_admin_import")
+async def start_import_events(callback: CallbackQuery, state: FSMContext):
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Эта функция доступна только организаторам", show_alert=True)
+        return
+    await state.clear()
+    await state.set_state(ScheduleStates.waiting_for_import_file)
+    builder = InlineKeyboardBuilder()
+    builder.button(text="❌ Отмена", callback_data="schedule_cancel")
+    await callback.message.edit_text(
+        "📥 <b>Импорт расписания</b>\n\n"
+        "Отправьте файл <b>.csv</b> или <b>.ics</b>.\n\n"
+        "<b>CSV:</b> первая строка — заголовок с колонками\n"
+        "<code>title,start,duration,location,description,visibility</code>\n"
+        "start — ДД.ММ.ГГГГ ЧЧ:ММ, duration — минуты (или колонка end),\n"
+        "visibility — роли через пробел: all, participant, organizer, mentor, volunteer.\n\n"
+        f"<i>Время без часового пояса считается временем в вашем поясе ({user.timezone}).</i>",
+        reply_markup=builder.as_markup(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+@router.message(ScheduleStates.waiting_for_import_file, F.document)
+async def process_import_file(message: Message, state: FSMContext, bot: Bot):
+    user = await UserService().get_by_tg_id(int(message.from_user.id))
+    if not user or user.role != "organizer":
+        await state.clear()
+        return
+    document = message.document
+    if document.file_size and document.file_size > IMPORT_MAX_FILE_SIZE:
+        await message.answer("❌ Файл слишком большой (максимум 1 МБ).")
+        return
+
+    content = await bot.download(document)
+    try:
+        rows = parse_schedule_file(content.read(), document.file_name or "", user.timezone)
+    except ScheduleImportError as e:
+        errors = [html.quote(error) for error in e.errors[:MAX_ERRORS]]
+        if len(e.errors) > MAX_ERRORS:
+            errors.append(f"… и ещё {len(e.errors) - MAX_ERRORS}")
+        await message.answer(
+            "❌ <b>Файл не импортирован</b>\n\n" + "\n".join(errors) + "\n\nИсправьте файл и отправьте его снова.",
+            parse_mode="HTML"
+        )
+        return
+
+    service = ScheduleService()
+    events = await service.import_events(rows, created_by=str(message.from_user.id), creator_timezone=user.timezone)
+    await state.clear()
+    await message.answer(
+        f"✅ <b>Импортировано событий: {len(events)}</b>\n\nУчастники получат одну сводку об изменениях.",
+        reply_markup=get_admin_schedule_keyboard(),
+        parse_mode="HTML"
+    )
+    sent = await RateLimitedSender(bot).send_many(await service.build_import_digests(events))
+    logger.info(f"Импорт расписания: {len(events)} событий, сводку получили {sent} пользователей")
+
+@router.message(ScheduleStates.waiting_for_import_file)
+async def process_import_not_file(message: Message):
+    await message.answer("📎 Отправьте файл .csv или .ics документом.")
+
 @router.callback_query(F.data == "schedule_cancel")
 async def cancel_schedule_action(callback: CallbackQuery, state: FSMContext):
     await state.clear()
@@ -16,8 +16,6 @@ class RegistrationStates(StatesGroup):
     waiting_for_role = State()
     waiting_for_timezone = State()
 
-temp_users_storage = {} #потом надо к бд подключится
-
 ROLES = {
     "participant": "👤Участник",
     "organizer": "🎪 Организатор", 
@@ -36,6 +34,8 @@ TIMEZONES = {
     "UTC+10": "Владивосток (UTC+10)"
 }
 
+USERS_PAGE_SIZE = 20
+
 def validate_name(name: str) -> Tuple[bool, Optional[str]]:
     name = name.strip()
     
@@ -78,6 +78,9 @@ async def cmd_start_handler(message: Message, state: FSMContext) -> None:
     user = await UserService().get_by_tg_id(user_id)
     
     if user is not None:
+        # написал боту — значит, снова доступен для рассылок
+        if user.undeliverable_at is not None:
+            await UserService().mark_deliverable(user_id)
         await message.answer(
             f"<b>Приветик, {html.quote(user.full_name)}!</b>\n\n"
             f"✅ Ты уже зарегистрирован(а)!",
@@ -203,33 +206,111 @@ async def show_all_users(message: Message):
         )
         return
     
-    participants = await user_serv.get_all()
-    if len(participants) == 0:
-        await message.answer(
-            "📭 <b>Нет зарегистрированных пользователей</b>",
-            parse_mode="HTML"
+    text, keyboard = await render_users_page(user_serv)
+    await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+
+def _users_filter_label(role: Optional[str], tz: Optional[str]) -> str:
+    role_text = ROLES.get(role, "все") if role else "все"
+    tz_text = tz if tz else "все"
+    return f"Роль: {role_text} | Пояс: {tz_text}"
+
+def _users_page_callback(direction: str, cursor: Optional[int], role: Optional[str], tz: Optional[str]) -> str:
+    return f"users_page:{direction}:{cursor or 0}:{role or '-'}:{tz or '-'}"
+
+async def render_users_page(
+    user_serv: UserService,
+    cursor: Optional[int] = None,
+    backward: bool = False,
+    role: Optional[str] = None,
+    tz: Optional[str] = None
+):
+    """Рендерит одну страницу /users и клавиатуру навигации."""
+    users, has_prev, has_next = await user_serv.get_users_page(
+        cursor=cursor, backward=backward, limit=USERS_PAGE_SIZE, role=role, timezone=tz
+    )
+
+    builder = InlineKeyboardBuilder()
+    nav_buttons = 0
+    if not users:
+        text = (
+            "📭 <b>Нет зарегистрированных пользователей</b>\n"
+            f"<i>{_users_filter_label(role, tz)}</i>"
         )
-        return
-    
-    text = "👥 <b>Зарегистрированные пользователи:</b>\n\n"
-    user_cnt = 0
-    
-    for part in participants:
-        user_cnt += 1
-        username = f" @{part.username}" if part.username else ""
-        text += f"{user_cnt}. {part.full_name}{username}\n"
-        text += f"Роль: {ROLES.get(str(part.role.value), 'Неизвестно')}\n"
-        text += f"Часовой пояс: {TIMEZONES.get(part.timezone, 'Неизвестно')}\n"
-        text += f"ID: {part.id}\n\n"
-    
-    text += f"📊 <b>Всего пользователей:</b> {user_cnt}"
-    
-    if len(text) > 4000:
-        parts = [text[i:i+4000] for i in range(0, len(text), 4000)]
-        for part in parts:
-            await message.answer(part, parse_mode="HTML")
     else:
-        await message.answer(text, parse_mode="HTML")
+        text = "👥 <b>Зарегистрированные пользователи:</b>\n"
+        text += f"<i>{_users_filter_label(role, tz)}</i>\n\n"
+        for part in users:
+            username = f" @{html.quote(part.username)}" if part.username else ""
+            text += f"• {html.quote(part.full_name[:64])}{username}\n"
+            text += f"Роль: {ROLES.get(str(part.role.value), 'Неизвестно')}\n"
+            text += f"Часовой пояс: {TIMEZONES.get(part.timezone, 'Неизвестно')}\n"
+            text += f"ID: {part.id}\n\n"
+
+        if has_prev:
+            builder.button(text="⬅️ Назад", callback_data=_users_page_callback("p", users[0].id, role, tz))
+            nav_buttons += 1
+        if has_next:
+            builder.button(text="Вперёд ➡️", callback_data=_users_page_callback("n", users[-1].id, role, tz))
+            nav_buttons += 1
+
+    builder.button(text="🎭 Фильтр по роли", callback_data=f"users_roles:{tz or '-'}")
+    builder.button(text="🌍 Фильтр по поясу", callback_data=f"users_tzs:{role or '-'}")
+    if nav_buttons:
+        builder.adjust(nav_buttons, 2)
+    else:
+        builder.adjust(2)
+    return text, builder.as_markup()
+
+@router.callback_query(F.data.startswith("users_page:"))
+async def users_page(callback: CallbackQuery):
+    user_serv = UserService()
+    user = await user_serv.get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("🚫 Доступ запрещен!", show_alert=True)
+        return
+
+    _, direction, cursor, role, tz = callback.data.split(":", 4)
+    text, keyboard = await render_users_page(
+        user_serv,
+        cursor=int(cursor) or None,
+        backward=direction == "p",
+        role=None if role == "-" else role,
+        tz=None if tz == "-" else tz
+    )
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("users_roles:"))
+async def users_role_filter(callback: CallbackQuery):
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("🚫 Доступ запрещен!", show_alert=True)
+        return
+
+    tz = callback.data.split(":", 1)[1]
+    builder = InlineKeyboardBuilder()
+    builder.button(text="Все роли", callback_data=f"users_page:n:0:-:{tz}")
+    for role_key, role_name in ROLES.items():
+        builder.button(text=role_name, callback_data=f"users_page:n:0:{role_key}:{tz}")
+    builder.adjust(1, 2)
+    await callback.message.edit_text("🎭 <b>Выберите роль:</b>", reply_markup=builder.as_markup(), parse_mode="HTML")
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("users_tzs:"))
+async def users_timezone_filter(callback: CallbackQuery):
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("🚫 Доступ запрещен!", show_alert=True)
+        return
+
+    role = callback.data.split(":", 1)[1]
+    builder = InlineKeyboardBuilder()
+    builder.button(text="Все пояса", callback_data=f"users_page:n:0:{role}:-")
+    for tz_key, tz_name in TIMEZONES.items():
+        builder.button(text=tz_name, callback_data=f"users_page:n:0:{role}:{tz_key}")
+    builder.adjust(1, 2)
+    await callback.message.edit_text("🌍 <b>Выберите часовой пояс:</b>", reply_markup=builder.as_markup(), parse_mode="HTML")
+    await callback.answer()
 
 @router.message(F.text == "/reset")
 async def reset_registration(message: Message, state: FSMContext):
@@ -1,23 +1,32 @@
-from aiogram import Router, F, html
-from aiogram.types import Message, CallbackQuery
+from aiogram import Bot, Router, F, html
+from aiogram.types import Message, CallbackQuery, BufferedInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from aiogram.enums import ParseMode
 from typing import List
 from datetime import datetime
+import logging
 
 
 from services.user_service import UserService
 from services.task_service import TaskService
+from models.task_model import PRIORITY_LABELS, TaskPriority
+from bot.services.sender import RateLimitedSender
+from bot.services.exporters import TaskBoardCsvExporter
+from bot.services.task_reminders import task_reminder_scheduler
+from services.timezones import to_local, to_utc
 
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 
 class TaskStates(StatesGroup):
     waiting_for_title = State()
     waiting_for_description = State()
+    waiting_for_priority = State()
+    waiting_for_deadline = State()
     waiting_for_assignee = State()
     waiting_for_edit_choice = State()
     waiting_for_edit_field = State()
@@ -93,6 +102,69 @@ async def process_task_title(message: Message, state: FSMContext):
 async def process_task_description(message: Message, state: FSMContext):
     await state.update_data(description=message.text)
    
+    builder = InlineKeyboardBuilder()
+    for priority, label in PRIORITY_LABELS.items():
+        builder.button(text=label, callback_data=f"task_priority:{int(priority)}")
+    builder.button(text="🔙 Назад", callback_data="org_create_task")
+    builder.adjust(3, 1)
+   
+    await state.set_state(TaskStates.waiting_for_priority)
+    await message.answer(
+        "⚡ <b>Выберите приоритет задачи:</b>",
+        reply_markup=builder.as_markup(),
+        parse_mode="HTML"
+    )
+
+
+@router.callback_query(F.data.startswith("task_priority:"), TaskStates.waiting_for_priority)
+async def process_task_priority(callback: CallbackQuery, state: FSMContext):
+    await state.update_data(priority=int(callback.data.split(":")[1]))
+   
+    builder = InlineKeyboardBuilder()
+    builder.button(text="⏭ Без дедлайна", callback_data="task_deadline:none")
+    builder.button(text="🔙 Назад", callback_data="org_create_task")
+    builder.adjust(1)
+   
+    await state.set_state(TaskStates.waiting_for_deadline)
+    await callback.message.edit_text(
+        "⏰ Введите дедлайн задачи в вашем часовом поясе:\n\n"
+        "<i>Формат: ДД.ММ.ГГГГ ЧЧ:ММ\nНапример: 15.12.2025 18:00</i>",
+        reply_markup=builder.as_markup(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
+@router.message(TaskStates.waiting_for_deadline)
+async def process_task_deadline(message: Message, state: FSMContext):
+    try:
+        local_deadline = datetime.strptime(message.text.strip(), "%d.%m.%Y %H:%M")
+    except (ValueError, AttributeError):
+        await message.answer(
+            "❌ Неверный формат даты и времени!\n\n"
+            "Пожалуйста, используйте формат: ДД.ММ.ГГГГ ЧЧ:ММ\nНапример: 15.12.2025 18:00"
+        )
+        return
+   
+    organizer = await UserService().get_by_tg_id(message.from_user.id)
+    deadline = to_utc(local_deadline, organizer.timezone if organizer else None).replace(tzinfo=None)
+    if deadline <= datetime.utcnow():
+        await message.answer("❌ Дедлайн должен быть в будущем. Введите другую дату и время.")
+        return
+   
+    # в FSM храним строку, чтобы данные сериализовались любым хранилищем
+    await state.update_data(deadline=deadline.isoformat(), deadline_local=local_deadline.strftime("%d.%m.%Y %H:%M"))
+    await ask_task_assignee(message, state)
+
+
+@router.callback_query(F.data == "task_deadline:none", TaskStates.waiting_for_deadline)
+async def skip_task_deadline(callback: CallbackQuery, state: FSMContext):
+    await state.update_data(deadline=None)
+    await ask_task_assignee(callback.message, state)
+    await callback.answer()
+
+
+async def ask_task_assignee(message: Message, state: FSMContext):
     users = await UserService().get_all()
     volunteers = []
    
@@ -136,17 +208,22 @@ async def process_task_assignee(callback: CallbackQuery, state: FSMContext):
     task_data = await state.get_data()
    
     try:
+        deadline = task_data.get("deadline")
         task = await TaskService().create_task(
             title=task_data["title"],
             description=task_data["description"],
             assigned_to=assignee,
-            created_by=str(callback.from_user.id)
+            created_by=str(callback.from_user.id),
+            deadline=datetime.fromisoformat(deadline) if deadline else None,
+            priority=task_data.get("priority", TaskPriority.NORMAL)
         )
     except Exception as e:
         await callback.answer(f"❌ Ошибка при создании задачи: {e}", show_alert=True)
         return
    
     await state.clear()
+    if task.deadline:
+        await task_reminder_scheduler.wake()
    
     users = await UserService().get_all()
     volunteers_count = sum(1 for user in users if user.role == "volunteer")
@@ -165,6 +242,8 @@ async def process_task_assignee(callback: CallbackQuery, state: FSMContext):
         f"✅ <b>Задача создана!</b>\n\n"
         f"📌 <b>Название:</b> {task.title}\n"
         f"📝 <b>Описание:</b> {task.description}\n"
+        f"⚡ <b>Приоритет:</b> {PRIORITY_LABELS[TaskPriority(task.priority)]}\n"
+        f"⏰ <b>Дедлайн:</b> {task_data.get('deadline_local') or 'нет'}\n"
         f"👥 <b>Назначена:</b> {assign_text}",
         reply_markup=get_organizer_tasks_menu(),
         parse_mode="HTML"
@@ -189,13 +268,46 @@ def get_tasks_list_keyboard(action: str, tasks: List):
 
 #СТАТИСТИКА
 
+TASKS_STATS_PAGE_SIZE = 10
+BOARD_TASKS_PER_PAGE = 5
+BOARD_VOLUNTEERS_PER_PAGE = 15
+BOARD_NAME_WIDTH = 14
+TASK_CARD_MAX_VOLUNTEERS = 30
+
+
+def task_status_icon(task: dict) -> str:
+    """✅ — выполнили все назначенные, 🟡 — часть, ❌ — никто"""
+    if task["assigned"] and task["done"] >= task["assigned"]:
+        return "✅"
+    if task["done"]:
+        return "🟡"
+    return "❌"
+
+
+def task_assignee_text(task: dict) -> str:
+    if task["assigned_to"] == "all":
+        return "👥 Всем"
+    name = task["assignee_name"] or f"Волонтер {task['assigned_to']}"
+    return f"👤 {html.quote(name)}"
+
+
+def pages_count(total: int, per_page: int) -> int:
+    return max(1, -(-total // per_page))
+
+
 @router.callback_query(F.data == "org_tasks_stats")
+@router.callback_query(F.data.startswith("org_tasks_stats_page:"))
 async def show_tasks_stats(callback: CallbackQuery):
     organizer_id = str(callback.from_user.id)
-    stats = await TaskService().get_tasks_statistics(organizer_id)
-    tasks = await TaskService().get_organizer_tasks(organizer_id)
+    page = int(callback.data.split(":")[1]) if ":" in callback.data else 0
    
-    if not tasks:
+    task_service = TaskService()
+    stats = await task_service.get_tasks_statistics(organizer_id)
+    board = await task_service.get_task_board(
+        organizer_id, task_page=page, tasks_per_page=TASKS_STATS_PAGE_SIZE, volunteers_per_page=0
+    )
+   
+    if not board["tasks"]:
         await callback.message.edit_text(
             "📭 <b>Нет созданных задач</b>",
             reply_markup=get_organizer_tasks_menu(),
@@ -205,40 +317,32 @@ async def show_tasks_stats(callback: CallbackQuery):
         return
    
     tasks_list_text = ""
-    for task in tasks:
-        if task.assigned_to == "all":
-            assigned = "👥 Всем"
-        else:
-            volunteer = await UserService().get_by_tg_id(int(task.assigned_to))
-            volunteer_name = volunteer.full_name if volunteer else f"Волонтер {task.assigned_to}"
-            assigned = f"👤 {volunteer_name}"
-       
-        if task.assigned_to == "all":
-            users = await UserService().get_all()
-            all_volunteers = [str(user.telegram_id) for user in users if user.role == "volunteer"]
-            completed_count = len(set(task.completed_by) & set(all_volunteers))
-           
-            if completed_count == len(all_volunteers) and all_volunteers:
-                status = "✅"
-            elif completed_count > 0:
-                status = "🟡"
-            else:
-                status = "❌"
-        else:
-            status = "✅" if task.assigned_to in task.completed_by else "❌"
-       
-        tasks_list_text += f"{status} {task.title} ({assigned})\n"
+    for task in board["tasks"]:
+        tasks_list_text += (
+            f"{task_status_icon(task)} {html.quote(task['title'])} "
+            f"({task_assignee_text(task)}, {task['done']}/{task['assigned']})\n"
+        )
    
     builder = InlineKeyboardBuilder()
-    for task in tasks:
-        if len(task.title) > 25:
-            display_title = task.title[:22] + "..."
+    for task in board["tasks"]:
+        if len(task["title"]) > 25:
+            display_title = task["title"][:22] + "..."
         else:
-            display_title = task.title
-        builder.button(text=f"📄 {display_title}", callback_data=f"view_task:{task.telegram_id}")
-   
+            display_title = task["title"]
+        builder.button(text=f"📄 {display_title}", callback_data=f"view_task:{task['telegram_id']}")
+   
+    total_pages = pages_count(board["total_tasks"], TASKS_STATS_PAGE_SIZE)
+    nav_buttons = 0
+    if page > 0:
+        builder.button(text="◀️", callback_data=f"org_tasks_stats_page:{page - 1}")
+        nav_buttons += 1
+    if page + 1 < total_pages:
+        builder.button(text="▶️", callback_data=f"org_tasks_stats_page:{page + 1}")
+        nav_buttons += 1
+    builder.button(text="🗂 Матрица выполнения", callback_data="task_board:0:0")
+    builder.button(text="💾 Выгрузить CSV", callback_data="task_board_csv")
     builder.button(text="🔙 Назад", callback_data="admin_manage_tasks")
-    builder.adjust(1)
+    builder.adjust(*([1] * len(board["tasks"])), *([nav_buttons] if nav_buttons else []), 1)
    
     await callback.message.edit_text(
         f"📊 <b>Статистика задач</b>\n\n"
@@ -248,7 +352,7 @@ async def show_tasks_stats(callback: CallbackQuery):
         f"📊 <b>Процент выполнения:</b> {stats['completion_rate']}%\n"
         f"👤 <b>Персональных задач:</b> {stats['personal_tasks']}\n"
         f"👥 <b>Групповых задач:</b> {stats['group_tasks']}\n\n"
-        f"<b>Список задач:</b>\n{tasks_list_text}\n"
+        f"<b>Список задач</b> (стр. {page + 1}/{total_pages}):\n{tasks_list_text}\n"
         f"<i>Выберите задачу для просмотра деталей:</i>",
         reply_markup=builder.as_markup(),
         parse_mode="HTML"
@@ -256,56 +360,148 @@ async def show_tasks_stats(callback: CallbackQuery):
     await callback.answer()
 
 
+def render_task_board(board: dict, task_page: int, volunteer_page: int):
+    """Текст и клавиатура матрицы: строки — волонтёры, столбцы — задачи страницы"""
+    tasks = board["tasks"]
+    legend = "\n".join(
+        f"<b>{index}.</b> {html.quote(task['title'])} — {task['done']}/{task['assigned']}"
+        for index, task in enumerate(tasks, start=1)
+    )
+   
+    lines = [" " * BOARD_NAME_WIDTH + "".join(f"{index:>3}" for index in range(1, len(tasks) + 1))]
+    for volunteer_id, full_name in board["volunteers"]:
+        name = (full_name or volunteer_id)[:BOARD_NAME_WIDTH - 1].ljust(BOARD_NAME_WIDTH)
+        cells = ""
+        for task in tasks:
+            if task["assigned_to"] not in ("all", volunteer_id):
+                cell = "·"
+            elif (task["telegram_id"], volunteer_id) in board["completed"]:
+                cell = "+"
+            else:
+                cell = "-"
+            cells += f"{cell:>3}"
+        lines.append(html.quote(name) + cells)
+    if not board["volunteers"]:
+        lines.append("нет волонтёров")
+   
+    task_pages = pages_count(board["total_tasks"], BOARD_TASKS_PER_PAGE)
+    volunteer_pages = pages_count(board["total_volunteers"], BOARD_VOLUNTEERS_PER_PAGE)
+    text = (
+        f"🗂 <b>Матрица выполнения</b>\n"
+        f"Задачи {task_page + 1}/{task_pages}, волонтёры {volunteer_page + 1}/{volunteer_pages}\n\n"
+        f"{legend}\n\n"
+        f"<pre>{chr(10).join(lines)}</pre>\n"
+        f"<i>+ выполнено, - не выполнено, · не назначена</i>"
+    )
+   
+    builder = InlineKeyboardBuilder()
+    rows = []
+    for current, pages, previous, following in (
+        (task_page, task_pages, ("⬅️ Задачи", f"task_board:{task_page - 1}:{volunteer_page}"),
+         ("Задачи ➡️", f"task_board:{task_page + 1}:{volunteer_page}")),
+        (volunteer_page, volunteer_pages, ("⬆️ Волонтёры", f"task_board:{task_page}:{volunteer_page - 1}"),
+         ("Волонтёры ⬇️", f"task_board:{task_page}:{volunteer_page + 1}")),
+    ):
+        buttons = 0
+        if current > 0:
+            builder.button(text=previous[0], callback_data=previous[1])
+            buttons += 1
+        if current + 1 < pages:
+            builder.button(text=following[0], callback_data=following[1])
+            buttons += 1
+        if buttons:
+            rows.append(buttons)
+    builder.button(text="💾 Выгрузить CSV", callback_data="task_board_csv")
+    builder.button(text="🔙 Назад к статистике", callback_data="org_tasks_stats")
+    builder.adjust(*rows, 1, 1)
+    return text, builder.as_markup()
+
+
+@router.callback_query(F.data.startswith("task_board:"))
+async def show_task_board(callback: CallbackQuery):
+    _, task_page, volunteer_page = callback.data.split(":")
+    task_page, volunteer_page = int(task_page), int(volunteer_page)
+   
+    board = await TaskService().get_task_board(
+        str(callback.from_user.id),
+        task_page=task_page,
+        tasks_per_page=BOARD_TASKS_PER_PAGE,
+        volunteer_page=volunteer_page,
+        volunteers_per_page=BOARD_VOLUNTEERS_PER_PAGE
+    )
+    if not board["tasks"]:
+        await callback.answer("📭 Нет созданных задач", show_alert=True)
+        return
+   
+    text, keyboard = render_task_board(board, task_page, volunteer_page)
+    await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer()
+
+
+@router.callback_query(F.data == "task_board_csv")
+async def export_task_board(callback: CallbackQuery):
+    await callback.answer("⏳ Готовим файл...")
+    filename = f"tasks-{datetime.now().strftime('%Y-%m-%d')}"
+    try:
+        result = await TaskBoardCsvExporter().export(str(callback.from_user.id), filename)
+    except Exception as e:
+        logger.error(f"Ошибка выгрузки доски задач: {e}")
+        await callback.message.answer("❌ Ошибка выгрузки задач.")
+        return
+   
+    await callback.message.answer_document(
+        document=BufferedInputFile(result["content"], filename=result["filename"]),
+        caption=f"💾 Задачи × волонтёры: {result['rows']}"
+    )
+
+
 @router.callback_query(F.data.startswith("view_task:"))
 async def view_task_details(callback: CallbackQuery):
     task_telegram_id = callback.data.split(":")[1]
-    task = await TaskService().get_task_by_telegram_id(task_telegram_id)
+    card = await TaskService().get_task_card(task_telegram_id)
     
-    if not task:
+    if not card:
         await callback.answer("❌ Задача не найдена", show_alert=True)
         return
     
-    if task.assigned_to == "all":
+    task = card["tasks"][0]
+    volunteers = card["volunteers"]
+    
+    if task["assigned_to"] == "all":
         assign_text = "👥 <b>Назначена:</b> всем волонтёрам\n\n"
-        users = await UserService().get_all()
-        assigned_volunteers = [user.full_name for user in users if user.role == "volunteer"]
-        if assigned_volunteers:
-            assign_text += f"<b>Волонтёры:</b> {', '.join(assigned_volunteers)}\n\n"
+        if volunteers:
+            marks = [
+                f"{'✅' if (task['telegram_id'], volunteer_id) in card['completed'] else '❌'} {html.quote(name)}"
+                for volunteer_id, name in volunteers[:TASK_CARD_MAX_VOLUNTEERS]
+            ]
+            if len(volunteers) > TASK_CARD_MAX_VOLUNTEERS:
+                marks.append(f"… и ещё {len(volunteers) - TASK_CARD_MAX_VOLUNTEERS}")
+            assign_text += "<b>Волонтёры:</b>\n" + "\n".join(marks) + "\n\n"
         else:
             assign_text += "<b>Волонтёры:</b> пока нет зарегистрированных\n\n"
-    else:
-        volunteer_id = int(task.assigned_to)
-        volunteer = await UserService().get_by_tg_id(volunteer_id)
-        volunteer_name = volunteer.full_name if volunteer else f"Волонтер {task.assigned_to}"
-        assign_text = f"👤 <b>Назначена:</b> {volunteer_name}\n"
-    
-    if task.assigned_to == "all":
-        users = await UserService().get_all()
-        all_volunteers = [str(user.telegram_id) for user in users if user.role == "volunteer"]
-        completed_count = len(set(task.completed_by) & set(all_volunteers))
-        if all_volunteers:
-            status_text = f"🟡 <b>Статус:</b> выполнено {completed_count}/{len(all_volunteers)} волонтёрами"
-            if completed_count == len(all_volunteers):
+        
+        if task["assigned"]:
+            status_text = f"🟡 <b>Статус:</b> выполнено {task['done']}/{task['assigned']} волонтёрами"
+            if task["done"] >= task["assigned"]:
                 status_text = "✅ <b>Статус:</b> выполнено всеми волонтёрами"
-            elif completed_count == 0:
+            elif task["done"] == 0:
                 status_text = "❌ <b>Статус:</b> не выполнено"
         else:
             status_text = "⏳ <b>Статус:</b> ожидание волонтёров"
     else:
-        assigned_str = str(task.assigned_to)
-        completed_str_list = [str(item) for item in task.completed_by]
-        
-        if assigned_str in completed_str_list:
+        volunteer_name = task["assignee_name"] or f"Волонтер {task['assigned_to']}"
+        assign_text = f"👤 <b>Назначена:</b> {html.quote(volunteer_name)}\n"
+        if task["done"]:
             status_text = "✅ <b>Статус:</b> выполнено"
         else:
             status_text = "❌ <b>Статус:</b> не выполнено"
     
-    created_at = datetime.fromisoformat(task.created_at) if isinstance(task.created_at, str) else task.created_at
+    created_at = task["created_at"]
     
     await callback.message.edit_text(
         f"📄 <b>Детали задачи</b>\n\n"
-        f"📌 <b>Название:</b> {task.title}\n"
-        f"📝 <b>Описание:</b> {task.description}\n"
+        f"📌 <b>Название:</b> {task['title']}\n"
+        f"📝 <b>Описание:</b> {task['description']}\n"
         f"{assign_text}"
         f"{status_text}\n"
         f"📅 <b>Создана:</b> {created_at.strftime('%d.%m.%Y %H:%M')}",
@@ -341,6 +537,18 @@ async def volunteer_tasks_menu(callback: CallbackQuery):
     await callback.answer()
 
 
+def volunteer_task_line(task, timezone: str) -> str:
+    """Название с отметкой приоритета и дедлайном в часовом поясе волонтёра"""
+    line = html.quote(task.title)
+    if task.priority == TaskPriority.HIGH:
+        line = f"{PRIORITY_LABELS[TaskPriority.HIGH].split()[0]} {line}"
+    if task.deadline:
+        local_deadline = to_local(task.deadline, timezone)
+        mark = "🔥" if task.is_overdue() else "⏰"
+        line += f" ({mark} до {local_deadline.strftime('%d.%m %H:%M')})"
+    return line
+
+
 @router.callback_query(F.data == "volunteer_current_tasks")
 async def show_volunteer_current_tasks(callback: CallbackQuery):
     user_id = int(callback.from_user.id)
@@ -374,7 +582,7 @@ async def show_volunteer_current_tasks(callback: CallbackQuery):
                 status = "✔️"
             else:
                 status = "❌"
-            tasks_text += f"{status} {task.title}\n"
+            tasks_text += f"{status} {volunteer_task_line(task, user.timezone)}\n"
    
     if group_tasks:
         tasks_text += "\n👥 <b>Задачи для всех волонтёров:</b>\n"
@@ -383,7 +591,7 @@ async def show_volunteer_current_tasks(callback: CallbackQuery):
                 status = "✔️"
             else:
                 status = "❌"
-            tasks_text += f"{status} {task.title}\n"
+            tasks_text += f"{status} {volunteer_task_line(task, user.timezone)}\n"
    
     builder = InlineKeyboardBuilder()
    
@@ -427,7 +635,7 @@ async def mark_task_complete_menu(callback: CallbackQuery):
 
 
 @router.callback_query(F.data.startswith("complete_task:"))
-async def complete_task(callback: CallbackQuery):
+async def complete_task(callback: CallbackQuery, bot: Bot):
     user_id = str(callback.from_user.id)
     task_telegram_id = callback.data.split(":")[1]
    
@@ -436,24 +644,26 @@ async def complete_task(callback: CallbackQuery):
         await callback.answer("❌ Задача не найдена", show_alert=True)
         return
    
-    if not await TaskService().is_task_assigned_to(task_telegram_id, user_id):
+    if not task.is_assigned_to(user_id):
         await callback.answer("❌ Эта задача не назначена вам", show_alert=True)
         return
    
-    if await TaskService().is_task_completed_by(task_telegram_id, user_id):
+    # True только у первой отметки: повторное нажатие ничего не меняет
+    first_completion = await TaskService().mark_task_completed(task_telegram_id, user_id)
+    if not first_completion:
         await callback.answer("✅ Вы уже выполнили эту задачу", show_alert=True)
         return
    
-    success = await TaskService().mark_task_completed(task_telegram_id, user_id)
-   
-    if success:
-        await callback.message.edit_text(
-            f"✅ <b>Задача отмечена как выполненная!</b>\n\n"
-            f"📌 <b>Название:</b> {task.title}",
-            reply_markup=get_volunteer_tasks_menu(),
-            parse_mode="HTML"
-        )
-    else:
-        await callback.answer("❌ Ошибка при отметке задачи", show_alert=True)
+    await callback.message.edit_text(
+        f"✅ <b>Задача отмечена как выполненная!</b>\n\n"
+        f"📌 <b>Название:</b> {task.title}",
+        reply_markup=get_volunteer_tasks_menu(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
    
-    await callback.answer()
\ No newline at end of file
+    volunteer_name = html.quote(callback.from_user.full_name)
+    await RateLimitedSender(bot).send(
+        int(task.created_by),
+        f"✅ {volunteer_name} выполнил(а) задачу «{html.quote(task.title)}»"
+    )
@@ -3,7 +3,10 @@
 Обработчики для работы с командами
 """
 
-from aiogram import Router, F
+import logging
+from collections import Counter
+
+from aiogram import Bot, Router, F, html
 from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
@@ -11,10 +14,12 @@ from aiogram.fsm.state import StatesGroup, State
 
 from services.user_service import UserService
 from services.team_service import TeamService
+from bot.services.sender import RateLimitedSender
 from models.user import UserRole
 
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 class AddMemberState(StatesGroup):
     username = State()
@@ -62,10 +67,6 @@ async def team_search_main(callback: CallbackQuery):
         await callback.answer("❌ Сначала зарегистрируйтесь с помощью /start", show_alert=True)
         return
     
-    team_service = TeamService()
-    team = await team_service.get_user_team(user_id)
-    is_captain = await team_service.is_user_captain(user_id) if team else False
-    
     builder = InlineKeyboardBuilder()
     builder.button(text="📝 Анкеты", callback_data="team_profiles_stub")
     builder.button(text="👥 Мои команды", callback_data="team_menu")
@@ -86,24 +87,20 @@ async def team_menu(callback: CallbackQuery):
     user_id = int(callback.from_user.id)
     user = await UserService().get_by_tg_id(user_id)
     
-    team_service = TeamService()
-    team = await team_service.get_user_team(user.id)
-    is_captain = await team_service.is_user_captain(user.id) if team else False
+    team = await TeamService().get_team_details(user.id)
+    is_captain = bool(team) and team.captain_id == user.id
     
     if team:
         if is_captain:
-            members = await team_service.team_repo.get_team_members(team.id)
             text = (
                 f"👥 <b>Управление командой</b>\n\n"
                 f"Название: <b>{team.name}</b>\n"
-                f"Участников: {len(members)}\n\n"
+                f"Участников: {team.member_count}\n\n"
                 f"Вы являетесь капитаном команды."
             )
         else:
-            members = await team_service.team_repo.get_team_members(team.id)
-            
             members_list = []
-            for member in members:
+            for member in team.members:
                 role = "👑 Капитан" if member.id == team.captain_id else "👤 Участник"
                 tg_username = f"@{member.username}" if member.username else "без username"
                 members_list.append(f"• {member.full_name} ({role})\n   {tg_username}")
@@ -276,22 +273,18 @@ async def team_view(callback: CallbackQuery):
     """Просмотр информации о команде (для участника)"""
     user_id = int(callback.from_user.id)
     user = await UserService().get_by_tg_id(user_id)
-    team_service = TeamService()
-    team = await team_service.get_user_team(user.id)
+    # Команда сразу с участниками, капитаном и ментором
+    team = await TeamService().get_team_details(user.id)
     
     if not team:
         await callback.answer("❌ У вас нет команды!", show_alert=True)
         return
     
-    # Получаем участников команды
-    members = await team_service.team_repo.get_team_members(team.id)
-    
-    # Формируем подробную информацию о команде
-    captain = await team_service.user_repo.get_by_id(team.captain_id)
+    captain = team.captain
     captain_tg = f"@{captain.username}" if captain.username else "без username"
     
     members_list = []
-    for member in members:
+    for member in team.members:
         role = "👑 Капитан" if member.id == team.captain_id else "👤 Участник"
         tg_username = f"@{member.username}" if member.username else "без username"
         members_list.append(f"• {member.full_name} ({role})\n   Telegram: {tg_username}")
@@ -301,7 +294,7 @@ async def team_view(callback: CallbackQuery):
     # Информация о менторе, если есть
     mentor_info = ""
     if team.mentor_id:
-        mentor = await team_service.user_repo.get_by_id(team.mentor_id)
+        mentor = team.mentor
         if mentor:
             mentor_tg = f"@{mentor.username}" if mentor.username else "без username"
             mentor_info = f"\n\n🧠 <b>Ментор:</b>\n{mentor.full_name}\nTelegram: {mentor_tg}"
@@ -358,18 +351,14 @@ async def team_manage_members(callback: CallbackQuery):
     user = await UserService().get_by_tg_id(user_id)
     
     # Проверяем, является ли пользователь капитаном
-    team_service = TeamService()
-    team = await team_service.team_repo.get_team_by_captain(user.id)
+    team = await TeamService().get_captain_team_details(user.id)
     
     if not team:
         await callback.answer("❌ Вы не являетесь капитаном команды!", show_alert=True)
         return
     
-    # Получаем участников команды
-    members = await team_service.team_repo.get_team_members(team.id)
-    
     members_list = []
-    for member in members:
+    for member in team.members:
         if member.id == team.captain_id:
             members_list.append(f"👑 {member.full_name} (Капитан)")
         else:
@@ -457,6 +446,132 @@ async def team_delete_confirm(callback: CallbackQuery):
     )
     await callback.answer()
 
+@router.callback_query(F.data == "admin_form_teams")
+async def admin_form_teams(callback: CallbackQuery, state: FSMContext):
+    """Предпросмотр автоматического формирования команд (для организатора)"""
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Команда доступна только организаторам", show_alert=True)
+        return
+
+    teams, left = await TeamService().propose_teams()
+    # при подтверждении создаются именно показанные команды, а не новое разбиение
+    await state.update_data(
+        proposed_teams=[[member.id for member in team] for team in teams],
+        proposed_left=left
+    )
+
+    builder = InlineKeyboardBuilder()
+    if teams:
+        builder.button(text="✅ Создать команды", callback_data="admin_form_teams_confirm")
+    builder.button(text="🔙 Назад в меню", callback_data="back_to_menu")
+    builder.adjust(1)
+
+    if not teams:
+        text = (
+            "🧩 <b>Формирование команд</b>\n\n"
+            "Недостаточно участников без команды, чтобы собрать хотя бы одну команду."
+        )
+    else:
+        sizes = ", ".join(f"{size} чел. — {count}" for size, count in sorted(Counter(map(len, teams)).items()))
+        examples = []
+        for i, team in enumerate(teams[:3], 1):
+            names = ", ".join(html.quote(member.full_name) for member in team)
+            examples.append(f"{i}. {names} ({html.quote(team[0].timezone or '')})")
+        text = (
+            "🧩 <b>Формирование команд</b>\n\n"
+            f"Будет создано команд: <b>{len(teams)}</b>\n"
+            f"Размеры: {sizes}\n"
+            f"Останутся без команды: {left}\n\n"
+            "<b>Примеры:</b>\n" + "\n".join(examples) + "\n\n"
+            "Первый участник в каждой команде станет капитаном."
+        )
+
+    await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+    await callback.answer()
+
+@router.callback_query(F.data == "admin_form_teams_confirm")
+async def admin_form_teams_confirm(callback: CallbackQuery, state: FSMContext):
+    """Создание показанных в предпросмотре команд одной транзакцией"""
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Команда доступна только организаторам", show_alert=True)
+        return
+
+    data = await state.get_data()
+    groups = data.get("proposed_teams")
+    if not groups:
+        await callback.answer("❌ Предпросмотр устарел, откройте формирование команд заново", show_alert=True)
+        return
+    await state.update_data(proposed_teams=None, proposed_left=None)
+
+    try:
+        teams, left = await TeamService().create_proposed_teams(groups, data.get("proposed_left", 0))
+        text = (
+            f"✅ Создано команд: <b>{len(teams)}</b>\n"
+            f"Без команды осталось: {left}"
+        )
+    except Exception as e:
+        logger.error(f"Ошибка автоматического формирования команд: {e}")
+        text = "❌ Не удалось сформировать команды, попробуйте ещё раз."
+
+    await callback.message.edit_text(
+        text,
+        reply_markup=back_to_main_menu_keyboard(),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+@router.callback_query(F.data == "admin_assign_mentors")
+async def admin_assign_mentors(callback: CallbackQuery, bot: Bot):
+    """Распределение менторов по всем командам без ментора"""
+    user = await UserService().get_by_tg_id(int(callback.from_user.id))
+    if not user or user.role != "organizer":
+        await callback.answer("❌ Команда доступна только организаторам", show_alert=True)
+        return
+
+    assigned = await TeamService().auto_assign_mentors()
+    if not assigned:
+        await callback.message.edit_text(
+            "🧠 <b>Распределение менторов</b>\n\n"
+            "Нет команд без ментора или нет доступных менторов.",
+            reply_markup=back_to_main_menu_keyboard(),
+            parse_mode="HTML"
+        )
+        await callback.answer()
+        return
+
+    teams_by_mentor = {}
+    for team, mentor in assigned:
+        teams_by_mentor.setdefault(mentor.id, (mentor, []))[1].append(team)
+
+    # одно сообщение ментору со всеми его командами и по одному капитанам
+    notifications = []
+    for mentor, teams in teams_by_mentor.values():
+        team_names = "\n".join(f"• {html.quote(team.name)}" for team in teams)
+        notifications.append((mentor.telegram_id, f"🧠 <b>Вам назначены команды:</b>\n{team_names}"))
+        for team in teams:
+            notifications.append((
+                team.telegram_id,
+                f"🧠 <b>У команды '{html.quote(team.name)}' появился ментор:</b> {html.quote(mentor.full_name)}"
+            ))
+
+    await callback.answer()
+    sent = await RateLimitedSender(bot).send_many(notifications)
+
+    summary = "\n".join(
+        f"• {html.quote(mentor.full_name)}: +{len(teams)} (всего {mentor.load + len(teams)})"
+        for mentor, teams in teams_by_mentor.values()
+    )
+    await callback.message.edit_text(
+        "🧠 <b>Распределение менторов</b>\n\n"
+        f"Назначено команд: <b>{len(assigned)}</b>\n"
+        f"Уведомлений отправлено: {sent}/{len(notifications)}\n\n"
+        f"{summary}",
+        reply_markup=back_to_main_menu_keyboard(),
+        parse_mode="HTML"
+    )
+
 # @router.callback_query(F.data == "team_profiles_stub")
 # async def profile_menu_view(callback: CallbackQuery):
 #     builder = InlineKeyboardBuilder()
@@ -2,7 +2,6 @@ import asyncio
 import logging
 import sys
 import os
-import signal
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -12,12 +11,31 @@ from aiogram.enums import ParseMode
 
 from bot.handlers import router
 from bot.services.notifications import schedule_reminder_checker
+from bot.services.task_reminders import task_reminder_scheduler
+from bot.services.schedule_changes import schedule_change_notifier
+from bot.services.daily_digest import daily_digest_scheduler
+from bot.services.gateway import outbound_gateway
+from bot.services.fsm_storage import create_fsm_storage
+from bot.services.leader import LeaderElection
+from bot.services.lifecycle import lifecycle
+from bot.services.sender import RateLimitedSender, resume_fanouts
+from bot.webhook import run_webhook
+from config.database import engine
+from services.poll_service import PollService
+from services.schedule_service import ScheduleService
+from services.shared_state import state_backend
 
 from bot.handlers.ai_assistant import initialize_assistant
 
 TOKEN = '8124039418:AAFiD-jK-NTtiJqYL868akQAg1u_zMwnpbQ'
+# polling — getUpdates, webhook — aiohttp-сервер из bot/webhook.py
+BOT_MODE = os.getenv("BOT_MODE", "polling")
 
-dp = Dispatcher()
+# Как часто закрывать опросы с истёкшим сроком (секунды)
+POLL_EXPIRY_INTERVAL = 60
+
+# FSM в общем хранилище, если воркеров несколько (STATE_BACKEND=postgres)
+dp = Dispatcher(storage=create_fsm_storage())
 dp.include_router(router)
 
 async def on_startup():
@@ -32,9 +50,29 @@ async def on_startup():
     except Exception as e:
         logging.error(f"❌ Ошибка инициализации AI ассистента: {e}")
 
+async def poll_expiry_checker():
+    while True:
+        try:
+            closed = await PollService().close_expired_polls()
+            if closed:
+                logging.info(f"Закрыто опросов с истёкшим сроком: {len(closed)}")
+        except Exception as e:
+            logging.error(f"Ошибка закрытия опросов: {e}")
+        await asyncio.sleep(POLL_EXPIRY_INTERVAL)
+
 async def on_shutdown():
     logging.info("Остановка бота...")
 
+async def run_polling(bot: Bot) -> None:
+    """Long polling до сигнала остановки; сессию бота закрывает lifecycle."""
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, close_bot_session=False))
+    stopping = asyncio.create_task(lifecycle.stopping.wait())
+    await asyncio.wait({polling, stopping}, return_when=asyncio.FIRST_COMPLETED)
+    stopping.cancel()
+    if not polling.done():
+        await dp.stop_polling()
+    await polling
+
 async def main() -> None:
     logging.basicConfig(
         level=logging.INFO,
@@ -46,20 +84,44 @@ async def main() -> None:
     
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
+    ScheduleService.change_notifier = schedule_change_notifier
+    ScheduleService.sender = RateLimitedSender
     
     bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    asyncio.create_task(schedule_reminder_checker(bot))
+    # все исходящие запросы идут через общий лимит и учёт 429
+    outbound_gateway.install(bot)
+
+    # SIGTERM/SIGINT запускают остановку: рассылки сохраняют остаток, буферы сбрасываются
+    lifecycle.install_signal_handlers()
+    lifecycle.on_cleanup("изменения расписания", lambda: schedule_change_notifier.flush_all(bot))
+    lifecycle.on_cleanup("сессия бота", lambda: bot.session.close())
+    lifecycle.on_cleanup("соединения с БД", engine.dispose)
+
+    # фоновые циклы работают на одном воркере из всех запущенных
+    background_loops = {
+        "schedule_reminders": lambda: schedule_reminder_checker(bot),
+        "task_reminders": lambda: task_reminder_scheduler.run(bot),
+        "daily_digest": lambda: daily_digest_scheduler.run(bot),
+        "poll_expiry": poll_expiry_checker,
+        "schedule_changes": lambda: schedule_change_notifier.run(bot),
+        "shared_state_cleanup": state_backend.run_cleanup,
+    }
+    for name, job in background_loops.items():
+        lifecycle.spawn(LeaderElection(name).run(job), name=f"leader:{name}")
+    lifecycle.spawn(resume_fanouts(bot), name="resume_fanouts")
+
     logger.info("✅ Бот запущен и готов к работе")
     logger.info("📋 Для меню используйте /menu")
-    await dp.start_polling(bot)
-
-def signal_handler(signum, frame):
-    logging.info(f"Получен сигнал {signum}, завершаем работу...")
-    sys.exit(0)
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot, lifecycle.stopping)
+        else:
+            await run_polling(bot)
+    finally:
+        await lifecycle.shutdown()
+        lifecycle.remove_signal_handlers()
 
 if __name__ == "__main__":
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -9,9 +9,14 @@ import hashlib
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from services.shared_state import state_backend
+
 # Настройка логгера
 logger = logging.getLogger(__name__)
 
+# Сколько ответ живёт в общем кэше воркеров (секунды)
+SHARED_CACHE_TTL = int(os.getenv('OLLAMA_CACHE_TTL', 6 * 3600))
+
 class OllamaHandler:
     def __init__(self):
         self.model_name = os.getenv('OLLAMA_MODEL', 'hackathon-assistant:latest')
@@ -68,6 +73,11 @@ class OllamaHandler:
             cached = self._response_cache[cache_key]
             logger.info(f"🔄 Используем кэшированный ответ")
             return cached
+        cached = await self._get_shared(cache_key)
+        if cached:
+            self._response_cache[cache_key] = cached
+            logger.info(f"🔄 Используем ответ из общего кэша")
+            return cached
         try:
             logger.info(f"📤 Отправка запроса: '{question[:50]}...'")
             async with aiohttp.ClientSession() as session:
@@ -104,6 +114,7 @@ class OllamaHandler:
                         # Кэшируем частые вопросы
                         if self._should_cache(question):
                             self._response_cache[cache_key] = result
+                            await self._put_shared(cache_key, result)
                         return result
                     else:
                         error_text = await response.text()
@@ -138,6 +149,24 @@ class OllamaHandler:
         normalized = question.lower().strip()
         return hashlib.md5(normalized.encode()).hexdigest()[:16]
     
+    async def _get_shared(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        # Общий кэш нужен, только когда воркеров несколько; в памяти хватает _response_cache
+        if not state_backend.shared:
+            return None
+        try:
+            return await state_backend.get(f"ollama:{self.model_name}:{cache_key}")
+        except Exception as e:
+            logger.warning(f"Общий кэш недоступен: {e}")
+            return None
+    
+    async def _put_shared(self, cache_key: str, result: Dict[str, Any]):
+        if not state_backend.shared:
+            return
+        try:
+            await state_backend.set(f"ollama:{self.model_name}:{cache_key}", result, ttl=SHARED_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить ответ в общий кэш: {e}")
+    
     def _should_cache(self, question: str) -> bool:
         question_lower = question.lower()
         cache_keywords = [
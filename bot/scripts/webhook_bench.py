@@ -0,0 +1,170 @@
+"""
+Нагрузочная проверка webhook-режима без Telegram.
+
+Скрипт отправляет синтетические обновления (текстовые сообщения от --chats
+пользователей) POST-запросами и считает, сколько обновлений в секунду сервер
+принимает и обрабатывает.
+
+Без --url поднимается локальный WebhookServer с эхо-обработчиком, а запросы к
+Bot API подменяются задержкой --api-latency, так что измеряется сам приём и
+параллельная обработка. С --url нагрузка идёт на запущенного бота
+(BOT_MODE=webhook), прогресс обработки берётся из его /health.
+
+    python bot/scripts/webhook_bench.py --updates 5000 --chats 500
+    python bot/scripts/webhook_bench.py --url http://localhost:8080 --secret ...
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.types import Chat, Message
+from aiohttp import ClientSession, web
+
+from bot.webhook import HEALTH_PATH, SECRET_HEADER, WEBHOOK_PATH, WebhookServer
+
+BENCH_TOKEN = "42:BENCH"
+
+
+class BenchSession(BaseSession):
+    """Сессия бота без сети: каждый запрос к API «занимает» latency секунд."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.requests = 0
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=self.requests,
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=method.text,
+            )
+        return True
+
+    async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        if False:
+            yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def echo_dispatcher() -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message) -> None:
+        await message.answer(message.text or "")
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    return dispatcher
+
+
+def synthetic_update(update_id: int, chat_id: int) -> Dict[str, Any]:
+    user = {"id": chat_id, "is_bot": False, "first_name": f"Bench {chat_id}"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private", "first_name": user["first_name"]},
+            "from": user,
+            "text": f"bench {update_id}",
+        },
+    }
+
+
+async def post_updates(url: str, total: int, chats: int, parallel: int, secret: str) -> Dict[str, int]:
+    """Отправляет total обновлений не больше parallel запросов одновременно; возвращает коды ответов."""
+    statuses: Dict[int, int] = {}
+    headers = {SECRET_HEADER: secret} if secret else {}
+    queue = iter(range(1, total + 1))
+
+    async def worker(session: ClientSession) -> None:
+        for update_id in queue:
+            update = synthetic_update(update_id, 100_000 + update_id % chats)
+            async with session.post(url, json=update, headers=headers) as response:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    async with ClientSession() as session:
+        await asyncio.gather(*(worker(session) for _ in range(parallel)))
+    return statuses
+
+
+async def remote_processed(base_url: str) -> int:
+    async with ClientSession() as session:
+        async with session.get(base_url + HEALTH_PATH) as response:
+            updates = (await response.json())["updates"]
+            return updates["processed"] + updates["failed"]
+
+
+async def bench(args: argparse.Namespace) -> None:
+    server: Optional[WebhookServer] = None
+    runner: Optional[web.AppRunner] = None
+    base_url = args.url.rstrip("/") if args.url else ""
+    if not base_url:
+        bot = Bot(BENCH_TOKEN, session=BenchSession(args.api_latency / 1000))
+        server = WebhookServer(
+            echo_dispatcher(), bot, secret=args.secret, concurrency=args.server_concurrency,
+            max_pending=args.updates,
+        )
+        runner = web.AppRunner(server.build_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}"
+
+    processed_before = server.processed + server.failed if server else await remote_processed(base_url)
+    started = time.perf_counter()
+    statuses = await post_updates(base_url + args.path, args.updates, args.chats, args.parallel, args.secret)
+    accepted_in = time.perf_counter() - started
+
+    accepted = statuses.get(200, 0)
+    while True:
+        processed = server.processed + server.failed if server else await remote_processed(base_url)
+        if processed - processed_before >= accepted or time.perf_counter() - started > args.timeout:
+            break
+        await asyncio.sleep(0.05)
+    processed_in = time.perf_counter() - started
+
+    print(f"Отправлено:  {args.updates} обновлений от {args.chats} чатов, ответы {statuses}")
+    print(f"Приём:       {accepted_in:.2f} с, {args.updates / accepted_in:.0f} обновлений/с")
+    print(f"Обработка:   {processed - processed_before} за {processed_in:.2f} с, "
+          f"{(processed - processed_before) / processed_in:.0f} обновлений/с")
+    if server:
+        print(f"Запросов к API: {server.bot.session.requests}, ошибок обработки: {server.failed}")
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочная проверка webhook-режима без Telegram")
+    parser.add_argument("--url", default="", help="адрес запущенного бота; без него поднимается локальный сервер")
+    parser.add_argument("--path", default=WEBHOOK_PATH)
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--parallel", type=int, default=50, help="одновременных POST-запросов")
+    parser.add_argument("--server-concurrency", type=int, default=32)
+    parser.add_argument("--api-latency", type=float, default=50.0, help="задержка ответа Bot API, мс")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
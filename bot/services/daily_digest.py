@@ -0,0 +1,108 @@
+"""
+Ежедневная сводка расписания.
+
+Пользователи в режиме сводки не получают отдельных сообщений о новых,
+изменённых событиях и напоминаний — вместо этого в выбранный час (в своём
+часовом поясе) приходит одно сообщение с событиями на день. Текст строится
+один раз на (роль, пояс, дату) из общего снимка расписания, а все сводки,
+созревшие к очередной проверке, уходят одной пачкой через RateLimitedSender.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import Bot, html
+
+from bot.services.sender import RateLimitedSender
+from services.notification_service import NotificationService
+from services.schedule_service import ScheduleService
+from services.timezones import to_local
+
+logger = logging.getLogger(__name__)
+
+# Как часто проверять, не наступил ли час сводки (секунды)
+CHECK_INTERVAL = 15 * 60
+
+# Пауза после ошибки БД или отправки (секунды)
+RETRY_DELAY = 60
+
+DIGEST_LIMIT = 30
+
+
+def digest_text(events: Sequence[Dict[str, Any]], day: date, user_timezone: str) -> Optional[str]:
+    """Сводка на день из событий снимка (start_time_local в поясе пользователя); None, если событий нет."""
+    todays = [event for event in events if event["start_time_local"].date() == day]
+    if not todays:
+        return None
+    todays.sort(key=lambda event: event["start_time_local"])
+    shown = todays[:DIGEST_LIMIT]
+    lines = []
+    for event in shown:
+        line = (
+            f"• {event['start_time_local'].strftime('%H:%M')}–{event['end_time_local'].strftime('%H:%M')} "
+            f"<b>{html.quote(event['title'])}</b>"
+        )
+        if event.get("location"):
+            line += f"\n   📍 {html.quote(event['location'])}"
+        lines.append(line)
+    if len(todays) > len(shown):
+        lines.append(f"… и ещё {len(todays) - len(shown)}")
+    return (
+        f"📰 <b>Расписание на {day.strftime('%d.%m')}</b>\n"
+        f"<i>Время в вашем часовом поясе ({user_timezone})</i>\n\n" + "\n".join(lines)
+    )
+
+
+class DailyDigestScheduler:
+    """Раз в CHECK_INTERVAL отправляет сводки тем, у кого наступил выбранный час."""
+
+    async def tick(self, sender: RateLimitedSender, now: Optional[datetime] = None) -> int:
+        """Одна проверка; возвращает число доставленных сводок."""
+        now = now or datetime.now(timezone.utc)
+        notification_service = NotificationService()
+        recipients = await notification_service.get_digest_recipients()
+
+        # (роль, пояс, дата) -> получатели; местный час считается по поясу пользователя
+        groups: Dict[Tuple[str, str, date], List[Any]] = {}
+        for row in recipients:
+            timezone_name = row.timezone or "UTC+3"
+            local_now = to_local(now, timezone_name)
+            if local_now.hour != row.digest_hour or row.digest_sent_on == local_now.date():
+                continue
+            role = getattr(row.role, "value", row.role)
+            groups.setdefault((role, timezone_name, local_now.date()), []).append(row)
+        if not groups:
+            return 0
+
+        schedule_service = ScheduleService()
+        messages: List[Tuple[int, str]] = []
+        handled: Dict[date, List[int]] = {}
+        for (role, timezone_name, day), rows in groups.items():
+            events = await schedule_service.get_schedule_snapshot(role, timezone_name)
+            text = digest_text(events, day, timezone_name)
+            if text:
+                messages += [(int(row.telegram_id), text) for row in rows]
+            # пустой день тоже считается обработанным, чтобы не проверять его снова
+            handled.setdefault(day, []).extend(row.id for row in rows)
+
+        sent = await sender.send_many(messages) if messages else 0
+        for day, user_ids in handled.items():
+            await notification_service.mark_digest_sent(user_ids, day)
+        logger.info(f"Ежедневная сводка: доставлено {sent} из {len(messages)}")
+        return sent
+
+    async def run(self, bot: Bot) -> None:
+        sender = RateLimitedSender(bot)
+        while True:
+            try:
+                await self.tick(sender)
+                delay = CHECK_INTERVAL
+            except Exception as e:
+                logger.error(f"Ошибка отправки ежедневной сводки: {e}")
+                delay = RETRY_DELAY
+            await asyncio.sleep(delay)
+
+
+# Общий планировщик процесса
+daily_digest_scheduler = DailyDigestScheduler()
@@ -0,0 +1,172 @@
+"""
+Выгрузка пользователей и доски задач в разные форматы.
+
+Каждый экспортёр получает строки из UserService.iter_rows (серверный курсор)
+и возвращает словарь: либо готовый файл (filename, content) для отправки
+документом, либо ссылку (url) на внешнюю таблицу.
+"""
+import asyncio
+import csv
+import io
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type
+
+from models.user import User
+from services.user_service import UserService
+from services.task_service import TaskService
+from bot.services.utils import cell_value, parse_users_to_sheet
+
+
+class UserExporter(ABC):
+    """Базовый экспортёр: наследники реализуют export()."""
+
+    name = ""
+    extension = ""
+
+    def __init__(self, user_service: Optional[UserService] = None, batch_size: int = 1000):
+        self.user_service = user_service or UserService()
+        self.batch_size = batch_size
+
+    @staticmethod
+    def columns() -> List[str]:
+        return [col.name for col in User.__table__.columns]
+
+    async def _iter_rows(self):
+        async for row in self.user_service.iter_rows(self.columns(), self.batch_size):
+            yield [cell_value(value) for value in row]
+
+    @abstractmethod
+    async def export(self, filename: str) -> Dict[str, Any]:
+        """Выгружает пользователей: {filename, content, rows} или {url}."""
+
+
+class CsvUserExporter(UserExporter):
+    name = "CSV"
+    extension = "csv"
+
+    async def export(self, filename: str) -> Dict[str, Any]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns())
+        count = 0
+        async for row in self._iter_rows():
+            writer.writerow(row)
+            count += 1
+        # utf-8-sig, чтобы Excel корректно открывал кириллицу
+        return {
+            "filename": f"{filename}.{self.extension}",
+            "content": buffer.getvalue().encode("utf-8-sig"),
+            "rows": count
+        }
+
+
+class XlsxUserExporter(UserExporter):
+    name = "XLSX"
+    extension = "xlsx"
+
+    async def export(self, filename: str) -> Dict[str, Any]:
+        from openpyxl import Workbook
+
+        # write_only режим не держит в памяти объекты ячеек
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title="users")
+        sheet.append(self.columns())
+        count = 0
+        async for row in self._iter_rows():
+            sheet.append(row)
+            count += 1
+
+        buffer = io.BytesIO()
+        await asyncio.to_thread(workbook.save, buffer)
+        return {
+            "filename": f"{filename}.{self.extension}",
+            "content": buffer.getvalue(),
+            "rows": count
+        }
+
+
+class SheetsUserExporter(UserExporter):
+    name = "Google Sheets"
+    extension = ""
+
+    async def export(self, filename: str) -> Dict[str, Any]:
+        url = await parse_users_to_sheet(filename)
+        return {"url": url}
+
+
+EXPORTERS: Dict[str, Type[UserExporter]] = {
+    "csv": CsvUserExporter,
+    "xlsx": XlsxUserExporter,
+    "sheets": SheetsUserExporter,
+}
+
+
+def get_exporter(export_format: str, **kwargs) -> Optional[UserExporter]:
+    """Возвращает экспортёр по ключу формата или None."""
+    exporter_cls = EXPORTERS.get(export_format)
+    return exporter_cls(**kwargs) if exporter_cls else None
+
+
+class TaskBoardCsvExporter:
+    """Матрица задачи × волонтёры организатора в CSV.
+
+    Ячейки приходят из TaskService.iter_board_rows упорядоченными по задаче,
+    внутри — по волонтёру, поэтому строка CSV собирается из соседних ячеек,
+    а заголовок — из ячеек первой задачи.
+    """
+
+    name = "CSV"
+    extension = "csv"
+
+    DONE = "выполнено"
+    PENDING = "не выполнено"
+    NOT_ASSIGNED = ""
+
+    def __init__(self, task_service: Optional[TaskService] = None, batch_size: int = 1000):
+        self.task_service = task_service or TaskService()
+        self.batch_size = batch_size
+
+    def _cell(self, row) -> str:
+        if row.assigned_to not in ("all", row.volunteer_id):
+            return self.NOT_ASSIGNED
+        return self.DONE if row.completed else self.PENDING
+
+    async def export(self, creator_id: str, filename: str) -> Dict[str, Any]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        names: List[str] = []
+        header_written = False
+        count = 0
+
+        def write_task(task_row, cells: List[str]):
+            nonlocal header_written, count
+            if not header_written:
+                writer.writerow(["Задача", "Назначена", "Выполнено", *names])
+                header_written = True
+            assignee = task_row.assignee_name or ("Всем" if task_row.assigned_to == "all" else task_row.assigned_to)
+            writer.writerow([task_row.title, assignee, f"{task_row.done}/{task_row.assigned}", *cells])
+            count += 1
+
+        current = None
+        cells: List[str] = []
+        async for row in self.task_service.iter_board_rows(creator_id, self.batch_size):
+            if current is None or row.telegram_id != current.telegram_id:
+                if current is not None:
+                    write_task(current, cells)
+                current, cells = row, []
+            if row.volunteer_id is not None:
+                if not header_written:
+                    names.append(row.full_name)
+                cells.append(self._cell(row))
+
+        if current is not None:
+            write_task(current, cells)
+        elif not header_written:
+            writer.writerow(["Задача", "Назначена", "Выполнено"])
+
+        # utf-8-sig, чтобы Excel корректно открывал кириллицу
+        return {
+            "filename": f"{filename}.{self.extension}",
+            "content": buffer.getvalue().encode("utf-8-sig"),
+            "rows": count
+        }
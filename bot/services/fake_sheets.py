@@ -0,0 +1,112 @@
+"""
+Локальная заглушка Google Sheets для офлайн-выгрузки и бенчмарков.
+
+Повторяет ту часть API gspread, которую использует parse_users_to_sheet,
+хранит данные в памяти и считает "HTTP-запросы" к таблице.
+Включается переменной окружения SHEETS_BACKEND=fake.
+"""
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+
+def _row_from_range(range_name: Optional[str]) -> int:
+    """Возвращает номер строки (с 1) из диапазона вида 'A5' или 'A5:K10'."""
+    if not range_name:
+        return 1
+    match = re.match(r"[A-Z]+(\d+)", range_name.split("!")[-1])
+    return int(match.group(1)) if match else 1
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: "FakeSpreadsheet", rows: int = 1000, cols: int = 26):
+        self.spreadsheet = spreadsheet
+        self.row_count = rows
+        self.col_count = cols
+        self.values: List[List[Any]] = []
+
+    def _request(self):
+        self.spreadsheet.client._request()
+
+    def clear(self):
+        self._request()
+        self.values = []
+
+    def resize(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        self._request()
+        if rows is not None:
+            self.row_count = rows
+            del self.values[rows:]
+        if cols is not None:
+            self.col_count = cols
+
+    def update(self, values, range_name: Optional[str] = None, **kwargs):
+        self._request()
+        self._write(values, range_name)
+
+    def batch_update(self, data, **kwargs):
+        self._request()
+        for item in data:
+            self._write(item["values"], item.get("range"))
+
+    def append_row(self, values, **kwargs):
+        self._request()
+        self.values.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self._request()
+        self.values.extend(list(row) for row in values)
+
+    def get_all_values(self) -> List[List[Any]]:
+        return [list(row) for row in self.values]
+
+    def _write(self, values, range_name: Optional[str]):
+        start = _row_from_range(range_name) - 1
+        rows = [list(row) for row in values]
+        if start + len(rows) > self.row_count:
+            raise ValueError(
+                f"Range exceeds grid limits: {start + len(rows)} > {self.row_count}"
+            )
+        if len(self.values) < start:
+            self.values.extend([] for _ in range(start - len(self.values)))
+        self.values[start:start + len(rows)] = rows
+
+
+class FakeSpreadsheet:
+    def __init__(self, client: "FakeSheetsClient", key: str):
+        self.client = client
+        self.id = key
+        self.title = key
+        self.url = f"fake://sheets/{key}"
+        self.sheet1 = FakeWorksheet(self)
+        self.permissions: List[Dict[str, Any]] = []
+
+    def update_title(self, title: str):
+        self.client._request()
+        self.title = title
+
+    def share(self, email_address, perm_type: str, role: str, **kwargs):
+        self.client._request()
+        self.permissions.append({"email": email_address, "type": perm_type, "role": role})
+
+
+class FakeSheetsClient:
+    """In-memory клиент, совместимый с gspread.Client по используемым методам."""
+
+    def __init__(self, latency: float = 0.0):
+        # latency — искусственная задержка на каждый запрос (сек), чтобы
+        # сравнивать количество round trip'ов с реальным API
+        self.latency = latency
+        self.request_count = 0
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+
+    def _request(self):
+        self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        self._request()
+        if key not in self.spreadsheets:
+            self.spreadsheets[key] = FakeSpreadsheet(self, key)
+        return self.spreadsheets[key]
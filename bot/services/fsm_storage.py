@@ -0,0 +1,60 @@
+"""
+Хранилище FSM для нескольких воркеров.
+
+Обновления одного пользователя могут попасть на разные воркеры, поэтому
+шаги диалогов (регистрация, создание события, задачи) должны храниться не в
+памяти процесса. SharedStateStorage кладёт состояние и данные FSM в общее
+хранилище services.shared_state; в однопроцессном режиме используется
+обычный MemoryStorage aiogram.
+"""
+import os
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from services.shared_state import state_backend
+
+# Сколько живёт незавершённый диалог без действий пользователя (секунды)
+FSM_TTL = int(os.getenv("FSM_TTL", str(7 * 24 * 3600)))
+
+
+class SharedStateStorage(BaseStorage):
+    """FSM aiogram поверх общего хранилища (ключи fsm:<чат>:<пользователь>:...)."""
+
+    def __init__(self, backend=None, ttl: Optional[float] = FSM_TTL):
+        self.backend = backend or state_backend
+        self.ttl = ttl
+        self.key_builder = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self.key_builder.build(key, "state")
+        state = state.state if isinstance(state, State) else state
+        if state is None:
+            await self.backend.delete(storage_key)
+        else:
+            await self.backend.set(storage_key, state, self.ttl)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await self.backend.get(self.key_builder.build(key, "state"))
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        storage_key = self.key_builder.build(key, "data")
+        if not data:
+            await self.backend.delete(storage_key)
+        else:
+            await self.backend.set(storage_key, dict(data), self.ttl)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return await self.backend.get(self.key_builder.build(key, "data")) or {}
+
+    async def close(self) -> None:
+        pass
+
+
+def create_fsm_storage() -> BaseStorage:
+    """FSM в общем хранилище, если оно общее для воркеров, иначе в памяти."""
+    if state_backend.shared:
+        return SharedStateStorage(state_backend)
+    return MemoryStorage()
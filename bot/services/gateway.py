@@ -0,0 +1,221 @@
+"""
+Единая точка исходящих запросов к Telegram Bot API.
+
+OutboundGateway подключается к сессии бота как request-middleware, поэтому
+через него проходят все вызовы — send_message, send_poll, edit_message_text,
+send_chat_action и остальные, откуда бы они ни были сделаны:
+
+* общий token bucket на бота (TELEGRAM_GLOBAL_RATE запросов в секунду) и
+  отдельный на каждый чат (1 в секунду в личке, 20 в минуту в группах);
+* интерактивные ответы важнее рассылок: массовая отправка (внутри
+  bulk_priority(), например RateLimitedSender) не берёт последние
+  INTERACTIVE_RESERVE токенов и ждёт, пока есть ожидающие ответы;
+* TelegramRetryAfter обрабатывается централизованно: все запросы ставятся
+  на паузу на retry_after секунд, затем запрос повторяется;
+* по каждому методу считаются вызовы, ошибки, 429 и время ответа.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+logger = logging.getLogger(__name__)
+
+# Запросов в секунду на бота, с запасом до лимита Telegram (~30)
+GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "28"))
+# Токены, которые рассылки оставляют интерактивным ответам
+INTERACTIVE_RESERVE = 5
+# Лимиты на один чат: личный и групповой
+PRIVATE_CHAT_RATE = 1.0
+GROUP_CHAT_RATE = 20 / 60
+CHAT_BURST = 3
+# Сколько раз повторять запрос после TelegramRetryAfter
+MAX_RETRIES = 3
+# При таком числе чатов неактивные корзины удаляются
+MAX_CHAT_BUCKETS = 10_000
+
+INTERACTIVE, BULK = 0, 1
+
+# Приоритет текущей задачи: рассылки выставляют BULK через bulk_priority()
+_priority: ContextVar[int] = ContextVar("outbound_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_priority() -> Iterator[None]:
+    """Запросы внутри блока считаются массовой рассылкой и уступают интерактивным."""
+    token = _priority.set(BULK)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Корзина токенов: rate в секунду, не больше capacity подряд."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, reserve: float = 0.0) -> float:
+        """Берёт токен и возвращает 0 или сообщает, сколько секунд подождать.
+
+        reserve — сколько токенов должно остаться после взятия.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1 + reserve:
+            self.tokens -= 1
+            return 0.0
+        return (1 + reserve - self.tokens) / self.rate
+
+    @property
+    def idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class MethodMetrics:
+    """Счётчики одного метода API."""
+
+    __slots__ = ("calls", "errors", "retry_after", "latency_total", "latency_max", "wait_total")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retry_after = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.wait_total = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retry_after": self.retry_after,
+            "latency_avg_ms": round(self.latency_total / self.calls * 1000, 1) if self.calls else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 1),
+            "wait_total_s": round(self.wait_total, 2),
+        }
+
+
+class OutboundGateway(BaseRequestMiddleware):
+    """Request-middleware сессии бота: ограничение скорости, приоритеты, 429 и метрики."""
+
+    def __init__(
+        self,
+        rate: float = GLOBAL_RATE,
+        reserve: float = INTERACTIVE_RESERVE,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.global_bucket = TokenBucket(rate, max(rate, reserve + 1))
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.metrics: Dict[str, MethodMetrics] = {}
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._waiting_interactive = 0
+        self._paused_until = 0.0
+
+    def install(self, bot: Bot) -> None:
+        bot.session.middleware(self)
+
+    def metrics_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metrics.as_dict() for name, metrics in sorted(self.metrics.items())}
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= MAX_CHAT_BUCKETS:
+                self._chat_buckets = {key: value for key, value in self._chat_buckets.items() if not value.idle}
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(GROUP_CHAT_RATE if is_group else PRIVATE_CHAT_RATE, CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def _wait_pause(self) -> None:
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, chat_id: Optional[Any], priority: int) -> None:
+        if chat_id is not None:
+            bucket = self._chat_bucket(chat_id)
+            # после ожидания токен нужно взять заново: его могли забрать другие запросы в этот чат
+            while True:
+                delay = bucket.take()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+        if priority == INTERACTIVE:
+            self._waiting_interactive += 1
+        try:
+            while True:
+                await self._wait_pause()
+                if priority == BULK and self._waiting_interactive:
+                    delay = 1 / self.global_bucket.rate
+                else:
+                    delay = self.global_bucket.take(self.reserve if priority == BULK else 0.0)
+                if delay <= 0:
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            if priority == INTERACTIVE:
+                self._waiting_interactive -= 1
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        # long polling не расходует лимит отправки
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+
+        name = method.__api_method__
+        metrics = self.metrics.setdefault(name, MethodMetrics())
+        chat_id = getattr(method, "chat_id", None)
+        priority = _priority.get()
+
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            await self._acquire(chat_id, priority)
+            sent_at = time.monotonic()
+            metrics.wait_total += sent_at - started
+            metrics.calls += 1
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                metrics.retry_after += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                logger.warning(f"Flood control на {name}: пауза {e.retry_after} с")
+                if attempt == self.max_retries:
+                    metrics.errors += 1
+                    raise
+            except Exception:
+                metrics.errors += 1
+                raise
+            finally:
+                latency = time.monotonic() - sent_at
+                metrics.latency_total += latency
+                metrics.latency_max = max(metrics.latency_max, latency)
+
+
+# Общий шлюз процесса; подключается к боту в bot/main.py
+outbound_gateway = OutboundGateway()
@@ -0,0 +1,96 @@
+"""
+Выбор ведущего воркера для фоновых циклов.
+
+Напоминания, ежедневная сводка, закрытие опросов и очистка общего состояния
+должны работать в одном экземпляре, сколько бы воркеров ни было запущено.
+LeaderElection держит advisory lock Postgres на отдельном соединении: кто
+взял блокировку, тот и выполняет цикл, остальные раз в LEADER_RETRY секунд
+пробуют её взять. Если соединение ведущего оборвётся, Postgres снимет
+блокировку, а цикл на этом воркере будет остановлен — его подхватит другой.
+
+Без общего хранилища (STATE_BACKEND=memory) воркер один и циклы запускаются
+сразу, без блокировки.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from config.database import engine
+from services.shared_state import state_backend
+
+logger = logging.getLogger(__name__)
+
+# Как часто резервный воркер пробует стать ведущим (секунды)
+LEADER_RETRY = 15
+# Как часто ведущий проверяет, что соединение с блокировкой живо (секунды)
+LEADER_CHECK = 15
+
+
+def lock_key(name: str) -> int:
+    """Ключ advisory lock (bigint) по имени цикла."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class LeaderElection:
+    """Запускает job() только на воркере, который держит блокировку name."""
+
+    def __init__(
+        self,
+        name: str,
+        enabled: Optional[bool] = None,
+        retry_interval: float = LEADER_RETRY,
+        check_interval: float = LEADER_CHECK,
+    ):
+        self.name = name
+        self.key = lock_key(name)
+        self.enabled = state_backend.shared if enabled is None else enabled
+        self.retry_interval = retry_interval
+        self.check_interval = check_interval
+        self.is_leader = False
+
+    async def run(self, job: Callable[[], Awaitable[None]]) -> None:
+        if not self.enabled:
+            self.is_leader = True
+            await job()
+            return
+        while True:
+            try:
+                await self._try_lead(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Выбор ведущего для «{self.name}»: {e}")
+            await asyncio.sleep(self.retry_interval)
+
+    async def _try_lead(self, job: Callable[[], Awaitable[None]]) -> None:
+        async with engine.connect() as connection:
+            # блокировка живёт, пока открыто соединение, транзакцию держать не нужно
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            result = await connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+            if not result.scalar():
+                return
+            logger.info(f"Воркер стал ведущим для «{self.name}»")
+            self.is_leader = True
+            task = asyncio.create_task(job())
+            try:
+                while not task.done():
+                    await asyncio.wait({task}, timeout=self.check_interval)
+                    if not task.done():
+                        await connection.execute(text("SELECT 1"))
+                if not task.cancelled() and task.exception():
+                    logger.error(f"Цикл «{self.name}» завершился с ошибкой: {task.exception()}")
+            finally:
+                self.is_leader = False
+                if not task.done():
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                try:
+                    await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                except Exception:
+                    # соединение оборвалось — сервер уже снял блокировку, в пул его не возвращаем
+                    await connection.invalidate()
+                logger.info(f"Воркер больше не ведущий для «{self.name}»")
+
@@ -0,0 +1,149 @@
+"""
+Жизненный цикл процесса бота: фоновые задачи и аккуратная остановка.
+
+Раньше по SIGTERM процесс завершался через sys.exit прямо в обработчике
+сигнала: рассылка обрывалась на середине, а накопленные изменения
+расписания терялись. Теперь сигнал только запускает остановку, и Lifecycle
+укладывает её в SHUTDOWN_TIMEOUT секунд:
+
+1. новые фоновые задачи и рассылки больше не запускаются — рассылка,
+   начатая после сигнала, сразу сохраняет получателей на потом;
+2. идущие рассылки (внутри job()) дожидаются отправки текущего сообщения и
+   сохраняют остаток в services.fanout_jobs — его дошлёт следующий процесс;
+3. фоновые циклы (spawn()) отменяются;
+4. по порядку выполняются действия из on_cleanup(): сброс буферов, закрытие
+   HTTP-сессии бота и соединений с БД.
+
+Каждый шаг ограничен оставшимся временем; не уложившийся шаг прерывается,
+и остановка продолжается со следующего.
+"""
+import asyncio
+import logging
+import os
+import signal
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Coroutine, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# За сколько секунд после сигнала процесс должен завершиться
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+
+# Сколько получает шаг остановки, даже если общее время вышло (секунды)
+MIN_STEP_TIMEOUT = 1.0
+
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+class Lifecycle:
+    """Учёт фоновых задач и рассылок процесса и их остановка по сигналу."""
+
+    def __init__(self, timeout: float = SHUTDOWN_TIMEOUT):
+        self.timeout = timeout
+        self.stopping = asyncio.Event()
+        self._deadline: Optional[float] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._cleanups: List[Tuple[str, Callable[[], Awaitable[None]]]] = []
+        self._active_jobs = 0
+        self._jobs_done = asyncio.Event()
+        self._jobs_done.set()
+
+    @property
+    def accepting(self) -> bool:
+        return not self.stopping.is_set()
+
+    @property
+    def active_jobs(self) -> int:
+        return self._active_jobs
+
+    def remaining(self) -> float:
+        if self._deadline is None:
+            return self.timeout
+        return self._deadline - time.monotonic()
+
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> Optional[asyncio.Task]:
+        """Запускает фоновую задачу; после сигнала остановки новые задачи не запускаются."""
+        if not self.accepting:
+            coro.close()
+            logger.warning(f"Бот останавливается, задача {name or coro.__qualname__} не запущена")
+            return None
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Фоновая задача {task.get_name()} завершилась с ошибкой: {task.exception()}")
+
+    @contextmanager
+    def job(self) -> Iterator[None]:
+        """Рассылка или другая работа, которую остановка дожидается, а не прерывает."""
+        self._active_jobs += 1
+        self._jobs_done.clear()
+        try:
+            yield
+        finally:
+            self._active_jobs -= 1
+            if not self._active_jobs:
+                self._jobs_done.set()
+
+    def on_cleanup(self, name: str, callback: Callable[[], Awaitable[None]]) -> None:
+        """Добавляет действие, которое выполнится при остановке (в порядке добавления)."""
+        self._cleanups.append((name, callback))
+
+    def request_stop(self, signum: Optional[int] = None) -> None:
+        if self.stopping.is_set():
+            return
+        if signum is not None:
+            logger.info(f"Получен сигнал {signal.Signals(signum).name}, бот останавливается...")
+        self._deadline = time.monotonic() + self.timeout
+        self.stopping.set()
+
+    def install_signal_handlers(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in STOP_SIGNALS:
+            try:
+                loop.add_signal_handler(sig, self.request_stop, sig)
+            except NotImplementedError:
+                # Windows: обработчик сигнала вызывается вне цикла событий
+                signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(self.request_stop, signum))
+
+    def remove_signal_handlers(self) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in STOP_SIGNALS:
+            try:
+                loop.remove_signal_handler(sig)
+            except NotImplementedError:
+                signal.signal(sig, signal.SIG_DFL)
+
+    async def _step(self, name: str, callback: Callable[[], Awaitable]) -> None:
+        try:
+            await asyncio.wait_for(callback(), timeout=max(self.remaining(), MIN_STEP_TIMEOUT))
+        except asyncio.TimeoutError:
+            logger.warning(f"Остановка: не дождались шага «{name}»")
+        except Exception as e:
+            logger.error(f"Остановка: ошибка на шаге «{name}»: {e}")
+
+    async def shutdown(self) -> None:
+        """Останавливает задачи и выполняет on_cleanup, укладываясь в timeout секунд."""
+        self.request_stop()
+        if self._active_jobs:
+            logger.info(f"Ожидание рассылок: {self._active_jobs}")
+            await self._step("рассылки", self._jobs_done.wait)
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await self._step("фоновые задачи", lambda: asyncio.gather(*tasks, return_exceptions=True))
+
+        for name, callback in self._cleanups:
+            await self._step(name, callback)
+        logger.info("Бот остановлен")
+
+
+# Жизненный цикл процесса; управляется из bot/main.py
+lifecycle = Lifecycle()
@@ -1,5 +1,5 @@
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Set
 from enum import Enum
 from aiogram import Bot, Router, F
@@ -8,15 +8,17 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from ..services.schedule_service import schedule_service, TIMEZONE_OFFSETS
+from ..services.schedule_service import schedule_service
 from services.user_service import UserService
 from services.notification_service import NotificationService
 from services.schedule_service import ScheduleService
+from services.delivery import DeliveryReport
+from services.shared_state import state_backend
+from bot.services.gateway import bulk_priority
+from bot.services.lifecycle import lifecycle
 
-notifications_storage = {
-    "settings": {},
-    "sent_reminders": {}
-}
+# Сколько помнить отправленное напоминание: окно отправки короче минуты
+SENT_REMINDER_TTL = 3600
 
 def get_default_notification_settings(role: str = "participant"):
     default_settings = {
@@ -48,21 +50,19 @@ async def send_notification(
     title: str,
     message: str,
     notification_type: NotificationType = NotificationType.SCHEDULE_REMINDER,
-    user_role: str = "participant"
+    user_role: str = "participant",
+    check_settings: bool = True
 ):
     # try:
     # settings = notifications_storage["settings"].get(user_id, get_default_notification_settings(user_role))
-    settings = await NotificationService().get_or_create_settings(user_id)
-
+    if not check_settings:
+        # аудитория уже отобрана по настройкам (NotificationService.get_audience)
+        await bot.send_message(user_id, f"<b>{title}</b>\n\n{message}", parse_mode="HTML")
+        return True
     
-    if not settings.get("enabled", True):
-        return False
+    settings = await NotificationService().get_settings(user_id)
     
-    if notification_type == NotificationType.NEW_EVENT and not settings.get("new_event_enabled", True):
-        return False
-    elif notification_type == NotificationType.EVENT_UPDATED and not settings.get("event_updated_enabled", True):
-        return False
-    elif notification_type == NotificationType.EVENT_CANCELLED and not settings.get("event_cancelled_enabled", True):
+    if not settings.is_enabled_for_type(notification_type.value):
         return False
     
     await bot.send_message(
@@ -76,76 +76,92 @@ async def send_notification(
     #     return False
 
 async def check_and_send_reminders(bot: Bot):
-    current_time_utc = datetime.utcnow()
-    all_users = await UserService().get_all()
+    current_time_utc = datetime.now(timezone.utc)
+    all_users = await UserService().get_reachable()
+    report = DeliveryReport()
+    # сохранённые настройки одним запросом, остальным — значения по умолчанию без записи в БД
+    settings_by_user = await NotificationService().get_settings_bulk([user.id for user in all_users])
     
-    for user in all_users:
-        settings = await NotificationService().get_or_create_settings(user.telegram_id)
+    # остановка бота дожидается конца проверки, чтобы отметки и недоступные сохранились
+    with lifecycle.job():
+        for user in all_users:
+            if not lifecycle.accepting:
+                # не отмеченные напоминания проверит следующий запущенный процесс
+                break
+            settings = settings_by_user[user.id]
         
-        if not settings.enabled:
-            continue
+            if not settings.enabled:
+                continue
+            if settings.digest_enabled:
+                # события дня пользователь получит в ежедневной сводке
+                continue
             
-        events = await ScheduleService().get_events_for_role(
-            user.role, 
-            user.timezone if user.timezone else "UTC+3"
-        )
+            # снимок общий для роли и пояса и пересобирается только после изменений расписания
+            events = await ScheduleService().get_schedule_snapshot(
+                user.role,
+                user.timezone if user.timezone else "UTC+3"
+            )
         
-        for event in events:
-            creator_tz = event.get('creator_timezone', 'UTC+3')
-            creator_offset = TIMEZONE_OFFSETS.get(creator_tz, 3)
-            
-            event_time_utc = event['start_time'] - timedelta(hours=creator_offset)
-            
-            time_diff_seconds = (event_time_utc - current_time_utc).total_seconds()
+            for event in events:
+                time_diff_seconds = (event['start_utc'] - current_time_utc).total_seconds()
             
-            if time_diff_seconds <= 0:
-                continue
+                if time_diff_seconds <= 0:
+                    continue
             
-            reminder_minutes = settings.get("reminder_minutes", get_default_notification_settings()["reminder_minutes"])
+                reminder_minutes = settings.reminder_minutes or get_default_notification_settings()["reminder_minutes"]
             
-            for reminder_mins in reminder_minutes:
-                reminder_seconds = reminder_mins * 60
+                for reminder_mins in reminder_minutes:
+                    reminder_seconds = reminder_mins * 60
                 
-                seconds_from_reminder = time_diff_seconds - reminder_seconds
+                    seconds_from_reminder = time_diff_seconds - reminder_seconds
                 
-                if -30 <= seconds_from_reminder <= 0:
-                    sent_key = f"{event['id']}:{reminder_mins}"
-                    user_sent = notifications_storage["sent_reminders"].setdefault(user.telegram_id, set())
+                    if -30 <= seconds_from_reminder <= 0:
+                        # отметка ставится до отправки: из нескольких воркеров напоминание отправит один
+                        sent_key = f"reminder:{user.telegram_id}:{event['id']}:{reminder_mins}"
                     
-                    if sent_key not in user_sent:
-                        start_str = event['start_time'].strftime("%d.%m.%Y %H:%M")
-                        message = f"<b>{event['title']}</b>\n🕒 Начало: {start_str}\n"
+                        if await state_backend.add(sent_key, ttl=SENT_REMINDER_TTL):
+                            start_str = event['start_time_local'].strftime("%d.%m.%Y %H:%M")
+                            message = f"<b>{event['title']}</b>\n🕒 Начало: {start_str}\n"
                         
-                        if event.get("location"):
-                            message += f"📍 Место: {event['location']}\n"
+                            if event.get("location"):
+                                message += f"📍 Место: {event['location']}\n"
                         
-                        if event.get("description"):
-                            desc = event['description'][:200]
-                            if len(event['description']) > 200:
-                                desc += "..."
-                            message += f"\n{desc}\n"
+                            if event.get("description"):
+                                desc = event['description'][:200]
+                                if len(event['description']) > 200:
+                                    desc += "..."
+                                message += f"\n{desc}\n"
                         
-                        try:
-                            await bot.send_message(
-                                user.telegram_id,
-                                f"🔔 <b>Напоминание: через {reminder_mins} минут</b>\n\n{message}",
-                                parse_mode="HTML"
-                            )
-                            user_sent.add(sent_key)
-                        except Exception:
-                            pass
+                            try:
+                                await bot.send_message(
+                                    user.telegram_id,
+                                    f"🔔 <b>Напоминание: через {reminder_mins} минут</b>\n\n{message}",
+                                    parse_mode="HTML"
+                                )
+                                report.success()
+                            except Exception as e:
+                                if not report.failure(user.telegram_id, e):
+                                    # временная ошибка — повторим при следующей проверке
+                                    await state_backend.delete(sent_key)
+    
+        await report.save()
 
 async def schedule_reminder_checker(bot: Bot):
     while True:
         try:
-            await check_and_send_reminders(bot)
+            with bulk_priority():
+                await check_and_send_reminders(bot)
         except Exception as e:
             print(f"Error in reminder checker: {e}")
         
         await asyncio.sleep(20)
 
+async def _audience_users(notification_type: NotificationType, visibility: List[str]):
+    """Получатели (telegram_id, role, timezone), которым по настройкам положено уведомление, — один запрос на рассылку."""
+    return await NotificationService().get_audience(notification_type.value, visibility)
+
 async def notify_new_event(bot: Bot, event: Dict):
-    all_users = await UserService().get_all()
+    all_users = await _audience_users(NotificationType.NEW_EVENT, event["visibility"])
     for user in all_users:
         if "all" in event["visibility"] or user.role in event["visibility"]:
             start_local = schedule_service._convert_time_for_user(
@@ -173,11 +189,12 @@ async def notify_new_event(bot: Bot, event: Dict):
                 "📢 Добавлено новое событие",
                 message,
                 NotificationType.NEW_EVENT,
-                user_role=role
+                user_role=user.role,
+                check_settings=False
             )
 
 async def notify_event_updated(bot: Bot, event: Dict, changes: Dict):
-    all_users = await UserService().get_all()
+    all_users = await _audience_users(NotificationType.EVENT_UPDATED, event["visibility"])
     for user in all_users:
         if "all" in event["visibility"] or user.role in event["visibility"]:
             changes_details = []
@@ -224,11 +241,12 @@ async def notify_event_updated(bot: Bot, event: Dict, changes: Dict):
                 "✏️ Изменение в расписании",
                 message,
                 NotificationType.EVENT_UPDATED,
-                user_role=role
+                user_role=user.role,
+                check_settings=False
             )
 
 async def notify_event_cancelled(bot: Bot, event: Dict):
-    all_users = await UserService().get_all()
+    all_users = await _audience_users(NotificationType.EVENT_CANCELLED, event["visibility"])
     for user in all_users:
         if "all" in event["visibility"] or user.role in event["visibility"]:
             message = (
@@ -242,5 +260,6 @@ async def notify_event_cancelled(bot: Bot, event: Dict):
                 "❌ Отмена события",
                 message,
                 NotificationType.EVENT_CANCELLED,
-                user_role=role
+                user_role=user.role,
+                check_settings=False
             )
\ No newline at end of file
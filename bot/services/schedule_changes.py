@@ -0,0 +1,132 @@
+"""
+Сводные уведомления об изменениях в расписании.
+
+Организатор обычно правит событие в несколько шагов (название, время, место),
+и раньше каждая правка рассылалась всем отдельно. ScheduleChangeNotifier
+копит изменения по событию и, когда правки затихают на window секунд,
+отправляет одно сообщение на пользователя через RateLimitedSender. Чтобы
+непрерывные правки не откладывали рассылку бесконечно, она уходит не позже
+max_delay после первой правки.
+
+Правки хранятся в общем состоянии (services.shared_state), по записи на
+правку, поэтому правки одного события, пришедшие на разные воркеры,
+попадают в одно сообщение. Рассылает их цикл run(), который работает на
+ведущем воркере (bot/services/leader.py).
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from aiogram import Bot
+
+from bot.services.sender import RateLimitedSender
+from services.schedule_service import ScheduleService
+from services.shared_state import state_backend
+
+logger = logging.getLogger(__name__)
+
+# Пауза в правках (секунды), после которой уходит уведомление
+CHANGE_WINDOW = float(os.getenv("SCHEDULE_CHANGE_WINDOW", "60"))
+# Самая поздняя отправка после первой правки
+CHANGE_MAX_DELAY = CHANGE_WINDOW * 5
+# Как часто ведущий воркер проверяет накопленные правки (секунды)
+CHANGE_POLL_INTERVAL = 1.0
+# Сколько хранить неразосланные правки, если рассылать их некому (секунды)
+CHANGE_TTL = 6 * 3600
+
+CHANGE_PREFIX = "schedule:change:"
+
+
+def _event_prefix(event_id: int) -> str:
+    return f"{CHANGE_PREFIX}{event_id}:"
+
+
+class ScheduleChangeNotifier:
+    """Копит правки событий и рассылает их одним сообщением (debounce по событию)."""
+
+    def __init__(
+        self,
+        window: float = CHANGE_WINDOW,
+        max_delay: float = CHANGE_MAX_DELAY,
+        backend=None,
+        poll_interval: float = CHANGE_POLL_INTERVAL,
+    ):
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self.backend = backend if backend is not None else state_backend
+        self.poll_interval = poll_interval
+
+    async def add(self, event_id: int, changes: Dict[str, Any]) -> None:
+        """Добавляет правки события; отправка переносится на window секунд после последней."""
+        entry = {"changes": changes, "at": time.time()}
+        await self.backend.set(f"{_event_prefix(event_id)}{uuid4().hex}", entry, ttl=CHANGE_TTL)
+
+    async def discard(self, event_id: int) -> None:
+        """Забывает накопленные правки (например, событие отменено)."""
+        await self.backend.take(_event_prefix(event_id))
+
+    async def pending(self) -> Dict[int, List[Dict[str, Any]]]:
+        """Накопленные правки по событиям: {event_id: [{"changes", "at"}]}."""
+        grouped: Dict[int, List[Dict[str, Any]]] = {}
+        for key, entry in (await self.backend.items(CHANGE_PREFIX)).items():
+            event_id = int(key[len(CHANGE_PREFIX):].split(":", 1)[0])
+            grouped.setdefault(event_id, []).append(entry)
+        return grouped
+
+    def _is_due(self, entries: List[Dict[str, Any]], now: float) -> bool:
+        moments = [entry["at"] for entry in entries]
+        return now - max(moments) >= self.window or now - min(moments) >= self.max_delay
+
+    async def flush_due(self, bot: Bot) -> int:
+        """Рассылает события, правки которых затихли или ждут дольше max_delay."""
+        now = time.time()
+        sent = 0
+        for event_id, entries in (await self.pending()).items():
+            if self._is_due(entries, now):
+                sent += await self.flush(bot, event_id)
+        return sent
+
+    async def flush(self, bot: Bot, event_id: int) -> int:
+        """Сразу отправляет накопленное по событию; возвращает число доставленных."""
+        # забранные правки другой воркер уже не получит
+        entries = await self.backend.take(_event_prefix(event_id))
+        changes: Dict[str, Any] = {}
+        for entry in sorted(entries, key=lambda entry: entry["at"]):
+            changes.update(entry["changes"])
+        if not changes:
+            return 0
+        try:
+            messages = await ScheduleService().build_change_messages(event_id, changes)
+            sent = await RateLimitedSender(bot).send_many(messages)
+        except Exception as e:
+            logger.error(f"Не удалось разослать изменения события {event_id}: {e}")
+            return 0
+        logger.info(f"Изменения события {event_id} ({', '.join(changes)}) получили {sent} пользователей")
+        return sent
+
+    async def flush_all(self, bot: Bot) -> None:
+        """Отправляет всё накопленное, не дожидаясь паузы (при остановке бота).
+
+        Правки в общем хранилище не пропадут с процессом: их разошлёт
+        следующий ведущий воркер, поэтому тогда ничего не делается.
+        """
+        if self.backend.shared:
+            return
+        for event_id in await self.pending():
+            await self.flush(bot, event_id)
+
+    async def run(self, bot: Bot) -> None:
+        """Цикл рассылки накопленных правок; запускается на ведущем воркере."""
+        while True:
+            try:
+                await self.flush_due(bot)
+            except Exception as e:
+                logger.error(f"Ошибка рассылки изменений расписания: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+# Общий экземпляр; подключается к ScheduleService в bot/main.py
+schedule_change_notifier = ScheduleChangeNotifier()
@@ -3,6 +3,8 @@ from typing import Dict, List, Optional, Any
 from enum import Enum
 from aiogram import Bot
 
+from services.timezones import convert
+
 class EventVisibility(Enum):
     ALL = "all"
     PARTICIPANT = "participant"
@@ -10,17 +12,6 @@ class EventVisibility(Enum):
     MENTOR = "mentor"
     VOLUNTEER = "volunteer"
 
-TIMEZONE_OFFSETS = {
-    "UTC+3": 3,
-    "UTC+4": 4,
-    "UTC+5": 5,
-    "UTC+6": 6,
-    "UTC+7": 7,
-    "UTC+8": 8,
-    "UTC+9": 9,
-    "UTC+10": 10,
-}
-
 schedule_storage = {
     "events": [],
     "last_event_id": 0
@@ -111,12 +102,7 @@ class ScheduleService:
         event_timezone: str, 
         user_timezone: str
     ) -> datetime:
-    
-        event_offset = TIMEZONE_OFFSETS.get(event_timezone, 3)
-        user_offset = TIMEZONE_OFFSETS.get(user_timezone, 3)
-    
-        time_diff = user_offset - event_offset
-        return event_time + timedelta(hours=time_diff)
+        return convert(event_time, event_timezone, user_timezone)
     
     def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
         for event in self.events:
@@ -0,0 +1,144 @@
+"""
+Массовая отправка сообщений.
+
+Рассылки идут через RateLimitedSender: сообщения отправляются с приоритетом
+рассылки, а ограничение скорости, очерёдность с интерактивными ответами и
+повтор после TelegramRetryAfter обеспечивает общий шлюз
+(bot/services/gateway.py). Получатели, которые заблокировали бота или
+удалили чат, помечаются недоступными после отправки (см. services/delivery.py).
+
+При остановке бота send_many и send_poll_many дожидаются текущей отправки и
+сохраняют оставшихся получателей в services.fanout_jobs; resume_fanouts()
+досылает их после запуска.
+"""
+import asyncio
+import logging
+from typing import Any, Iterable, List, Tuple
+
+from aiogram import Bot
+
+from bot.services.gateway import bulk_priority
+from bot.services.lifecycle import lifecycle
+from services.delivery import DeliveryReport
+from services.fanout_jobs import fanout_jobs
+from services.poll_service import PollService
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedSender:
+    """Последовательно отправляет сообщения через общий лимит шлюза с приоритетом рассылки."""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+
+    async def send(self, chat_id: int, text: str, **kwargs) -> bool:
+        """Отправляет одно сообщение; возвращает False, если доставить не удалось."""
+        report = DeliveryReport()
+        delivered = await self._send(chat_id, text, report, **kwargs)
+        await report.save()
+        return delivered
+
+    async def _send(self, chat_id: int, text: str, report: DeliveryReport, **kwargs) -> bool:
+        kwargs.setdefault("parse_mode", "HTML")
+        try:
+            with bulk_priority():
+                await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        except Exception as e:
+            # TelegramRetryAfter сюда доходит, только когда шлюз исчерпал повторы
+            if report.failure(chat_id, e):
+                logger.info(f"Пользователь {chat_id} недоступен: {e}")
+            else:
+                logger.error(f"Ошибка отправки пользователю {chat_id}: {e}")
+            return False
+        report.success()
+        return True
+
+    async def send_many(self, messages: Iterable[Tuple[int, str]]) -> int:
+        """Отправляет пары (chat_id, text); возвращает число доставленных.
+
+        Если бот останавливается, неотправленные пары сохраняются на потом.
+        """
+        messages: List[Tuple[int, str]] = list(messages)
+        report = DeliveryReport()
+        done = 0
+        with lifecycle.job():
+            try:
+                for chat_id, text in messages:
+                    if not lifecycle.accepting:
+                        break
+                    await self._send(chat_id, text, report)
+                    done += 1
+            finally:
+                if done < len(messages):
+                    # при отмене задачи остаток всё равно должен сохраниться
+                    await asyncio.shield(fanout_jobs.checkpoint(messages[done:]))
+                await report.save()
+        return report.delivered
+
+    async def send_poll_many(self, poll: Any, recipients: Iterable[Tuple[int, int]]) -> Tuple[int, int]:
+        """Рассылает опрос парам (user_id, chat_id); возвращает (доставлено, не удалось).
+
+        Отправленные опросы запоминаются, чтобы засчитывать ответы. Если бот
+        останавливается, оставшиеся получатели сохраняются на потом.
+        """
+        recipients: List[Tuple[int, int]] = list(recipients)
+        report = DeliveryReport()
+        poll_service = PollService()
+        done = 0
+        with lifecycle.job():
+            try:
+                for user_id, chat_id in recipients:
+                    if not lifecycle.accepting:
+                        break
+                    await self._send_poll(poll, user_id, chat_id, report, poll_service)
+                    done += 1
+            finally:
+                if done < len(recipients):
+                    await asyncio.shield(fanout_jobs.checkpoint_poll(poll.id, recipients[done:]))
+                await report.save()
+        return report.delivered, done - report.delivered
+
+    async def _send_poll(
+        self, poll: Any, user_id: int, chat_id: int, report: DeliveryReport, poll_service: PollService
+    ) -> bool:
+        try:
+            with bulk_priority():
+                sent_poll = await self.bot.send_poll(
+                    chat_id=chat_id,
+                    question=poll.question,
+                    options=poll.options,
+                    is_anonymous=False,  # не анонимный, чтобы видеть, кто проголосовал
+                    type="regular",
+                    allows_multiple_answers=False,
+                    protect_content=False,
+                )
+            await poll_service.create_poll_message(poll.id, user_id, sent_poll.poll.id)
+        except Exception as e:
+            if report.failure(chat_id, e):
+                logger.info(f"Пользователь {chat_id} недоступен: {e}")
+            else:
+                logger.error(f"Не удалось отправить опрос пользователю {chat_id}: {e}")
+            return False
+        report.success()
+        return True
+
+
+async def resume_fanouts(bot: Bot) -> int:
+    """Досылает рассылки и опросы, прерванные остановкой предыдущего процесса."""
+    sender = RateLimitedSender(bot)
+    delivered = total = 0
+    for messages in await fanout_jobs.take_all():
+        delivered += await sender.send_many(messages)
+        total += len(messages)
+    for poll_id, recipients in await fanout_jobs.take_polls():
+        poll = await PollService().get_poll(poll_id)
+        if not poll or not poll.is_active:
+            logger.info(f"Опрос {poll_id} уже закрыт, рассылка не досылается")
+            continue
+        sent, _ = await sender.send_poll_many(poll, recipients)
+        delivered += sent
+        total += len(recipients)
+    if total:
+        logger.info(f"Досланы прерванные рассылки: {delivered} из {total}")
+    return delivered
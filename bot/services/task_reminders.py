@@ -0,0 +1,187 @@
+"""
+Напоминания волонтёрам о дедлайнах задач.
+
+Планировщик держит кучу ближайших моментов напоминаний (за REMIND_BEFORE
+до дедлайна и в момент дедлайна) и спит до её вершины, а не опрашивает все
+задачи. Когда момент наступил, один запрос по индексу дедлайнов забирает
+созревшие задачи вместе с получателями, и каждый волонтёр получает одно
+сообщение со всеми своими задачами через RateLimitedSender.
+
+Дедлайны перечитываются из БД только после wake() или раз в
+REFRESH_INTERVAL, между перечитываниями куча обновляется по результатам
+рассылки. Планировщик работает на ведущем воркере, поэтому wake() с любого
+воркера меняет версию дедлайнов в общем состоянии (services.shared_state),
+а ведущий проверяет её каждые WAKE_POLL_INTERVAL секунд.
+"""
+import asyncio
+import heapq
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from aiogram import Bot, html
+
+from bot.services.sender import RateLimitedSender
+from models.task_model import PRIORITY_LABELS, ReminderStage, TaskPriority
+from services.shared_state import state_backend
+from services.task_service import TaskService
+from services.timezones import to_local
+
+logger = logging.getLogger(__name__)
+
+# За сколько до дедлайна напоминать
+REMIND_BEFORE = timedelta(minutes=int(os.getenv("TASK_REMINDER_MINUTES", "60")))
+
+# Как часто перечитывать дедлайны, даже если планировщик никто не будил (секунды)
+REFRESH_INTERVAL = 300
+
+# Как часто ведущий воркер проверяет, не будили ли планировщик на другом воркере (секунды)
+WAKE_POLL_INTERVAL = 5
+
+# Пауза после ошибки БД или отправки (секунды)
+RETRY_DELAY = 30
+
+SCHEDULE_LIMIT = 500
+CLAIM_BATCH = 200
+
+DEADLINES_VERSION_KEY = "tasks:deadlines:version"
+
+
+def reminder_time(deadline: datetime, stage: int, remind_before: timedelta = REMIND_BEFORE) -> datetime:
+    """Когда отправлять следующее напоминание по задаче"""
+    if stage < ReminderStage.UPCOMING:
+        return deadline - remind_before
+    return deadline
+
+
+def build_reminder_messages(rows: Sequence) -> List[Tuple[int, str]]:
+    """Группирует строки (задача, получатель) в одно сообщение на получателя"""
+    by_user: Dict[int, Dict[int, List[str]]] = {}
+    for row in rows:
+        local_deadline = to_local(row.deadline, row.timezone).strftime("%d.%m %H:%M")
+        marker = PRIORITY_LABELS[TaskPriority(row.priority)].split()[0]
+        line = f"{marker} {html.quote(row.title)} — до {local_deadline}"
+        stages = by_user.setdefault(row.telegram_id, {})
+        stages.setdefault(row.reminder_stage, []).append(line)
+
+    messages = []
+    for telegram_id, stages in by_user.items():
+        text = "⏰ <b>Напоминание о задачах</b>\n"
+        if stages.get(ReminderStage.OVERDUE):
+            text += "\n🔥 <b>Дедлайн прошёл:</b>\n" + "\n".join(stages[ReminderStage.OVERDUE]) + "\n"
+        if stages.get(ReminderStage.UPCOMING):
+            text += "\n⏳ <b>Скоро дедлайн:</b>\n" + "\n".join(stages[ReminderStage.UPCOMING]) + "\n"
+        text += "\nОтметить выполнение: меню → 📋 Мои задачи"
+        messages.append((telegram_id, text))
+    return messages
+
+
+class TaskReminderScheduler:
+    """Спит до ближайшего напоминания; wake() — перечитать дедлайны на ведущем воркере"""
+
+    def __init__(
+        self,
+        task_service: Optional[TaskService] = None,
+        remind_before: timedelta = REMIND_BEFORE,
+        refresh_interval: float = REFRESH_INTERVAL,
+        backend=None,
+        poll_interval: float = WAKE_POLL_INTERVAL
+    ):
+        self.task_service = task_service or TaskService()
+        self.remind_before = remind_before
+        self.refresh_interval = refresh_interval
+        self.backend = backend if backend is not None else state_backend
+        self.poll_interval = poll_interval
+        self._heap: List[Tuple[datetime, int]] = []
+        self._wakeup = asyncio.Event()
+        self._version = None
+        self._refresh_at: Optional[datetime] = None
+
+    async def wake(self) -> None:
+        """Сообщить, что дедлайны изменились; ведущий воркер перечитает их"""
+        await self.backend.set(DEADLINES_VERSION_KEY, uuid4().hex)
+        self._wakeup.set()
+
+    async def _changed(self) -> bool:
+        """Менялись ли дедлайны (на любом воркере) с прошлой проверки"""
+        version = await self.backend.get(DEADLINES_VERSION_KEY)
+        if version == self._version:
+            return False
+        self._version = version
+        return True
+
+    def needs_refresh(self, now: datetime) -> bool:
+        return self._refresh_at is None or now >= self._refresh_at
+
+    async def refresh(self, now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        schedule = await self.task_service.get_deadline_schedule(SCHEDULE_LIMIT)
+        self._heap = [
+            (reminder_time(deadline, stage, self.remind_before), task_id)
+            for task_id, deadline, stage in schedule
+        ]
+        heapq.heapify(self._heap)
+        self._refresh_at = now + timedelta(seconds=self.refresh_interval)
+        if len(schedule) >= SCHEDULE_LIMIT:
+            # дальние дедлайны в кучу не попали: перечитать, не дожидаясь их напоминаний
+            self._refresh_at = min(self._refresh_at, reminder_time(schedule[-1][1], 0, self.remind_before))
+
+    def next_delay(self, now: datetime) -> float:
+        """Сколько спать до вершины кучи, но не дольше refresh_interval"""
+        if not self._heap:
+            return self.refresh_interval
+        until_next = (self._heap[0][0] - now).total_seconds()
+        return max(0.0, min(self.refresh_interval, until_next))
+
+    def is_due(self, now: datetime) -> bool:
+        return bool(self._heap) and self._heap[0][0] <= now
+
+    async def tick(self, sender: RateLimitedSender, now: datetime) -> int:
+        """Отправляет созревшие напоминания; возвращает число доставленных сообщений"""
+        # больше CLAIM_BATCH созревших задач разойдутся следующими вызовами
+        popped = 0
+        while self.is_due(now) and popped < CLAIM_BATCH:
+            heapq.heappop(self._heap)
+            popped += 1
+        rows = await self.task_service.claim_due_reminders(now, self.remind_before, CLAIM_BATCH)
+        # после напоминания "скоро дедлайн" следующее — в момент дедлайна
+        upcoming = {row.id: row.deadline for row in rows if row.reminder_stage == ReminderStage.UPCOMING}
+        for task_id, deadline in upcoming.items():
+            heapq.heappush(self._heap, (deadline, task_id))
+        messages = build_reminder_messages(rows)
+        if not messages:
+            return 0
+        sent = await sender.send_many(messages)
+        logger.info(f"Напоминания о дедлайнах: {sent}/{len(messages)}")
+        return sent
+
+    async def _sleep(self, delay: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def run(self, bot: Bot) -> None:
+        sender = RateLimitedSender(bot)
+        while True:
+            now = datetime.utcnow()
+            try:
+                if await self._changed() or self.needs_refresh(now):
+                    await self.refresh(now)
+                if self.is_due(now):
+                    await self.tick(sender, now)
+                    continue
+                delay = min(self.next_delay(now), self.poll_interval)
+            except Exception as e:
+                logger.error(f"Ошибка планировщика напоминаний о задачах: {e}")
+                # после ошибки куча могла разойтись с БД
+                self._refresh_at = None
+                delay = RETRY_DELAY
+            await self._sleep(delay)
+
+
+# Общий планировщик процесса
+task_reminder_scheduler = TaskReminderScheduler()
@@ -3,9 +3,18 @@ from models.user import User
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
+import asyncio
+import enum
 import os
 
+from bot.services.fake_sheets import FakeSheetsClient
+
+# Сколько строк отправлять в одном запросе к Sheets API
+SHEETS_BATCH_ROWS = int(os.getenv("SHEETS_BATCH_ROWS", "5000"))
+
 def setupGC():
+    if os.getenv("SHEETS_BACKEND") == "fake":
+        return FakeSheetsClient()
     return gspread.service_account("./google_auth.json")
     credentials = Credentials.from_service_account_file(
         "./google_auth.json",
@@ -16,32 +25,43 @@ def setupGC():
     )
     return gspread.authorize(credentials)
 
-async def parse_users_to_sheet(filename: str) -> bool:
+def cell_value(value):
+    """Приводит значение атрибута пользователя к виду, пригодному для таблицы."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def build_user_rows(users, columns) -> list:
+    """Собирает строки таблицы за один проход по пользователям."""
+    return [[cell_value(getattr(user, col)) for col in columns] for user in users]
+
+def _write_rows(wsheet, rows: list, batch_size: int) -> None:
+    """Записывает строки пачками: один запрос на batch_size строк."""
+    wsheet.clear()
+    wsheet.resize(rows=max(len(rows), 1), cols=max(len(rows[0]), 1))
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        wsheet.update(values=chunk, range_name=f"A{start + 1}")
+
+async def parse_users_to_sheet(filename: str, client=None, batch_size: int = SHEETS_BATCH_ROWS) -> bool:
     FILE_KEY="1cxSorMRLJ7toj0TK3Cdp77_79lN15cfzXGne0qSApu8"
-    gc = setupGC()
+    # gspread блокирующий, поэтому все обращения к нему идут в пуле потоков
+    gc = client or await asyncio.to_thread(setupGC)
     #sheet = gc.create(filename)
-    sheet = gc.open_by_key(FILE_KEY)
+    sheet = await asyncio.to_thread(gc.open_by_key, FILE_KEY)
     wsheet = sheet.sheet1
 
-    sheet.update_title(filename)
+    await asyncio.to_thread(sheet.update_title, filename)
+
+    await asyncio.to_thread(sheet.share, None, perm_type="anyone", role="writer")
 
-    sheet.share(None, perm_type="anyone", role="writer")
-    
     columns = [col.name for col in User.__table__.columns]
-    # print(columns)
     # columns = [col.name for col in User.__table__.columns if col.name not in ["team_id"]]
 
-    wsheet.clear()
-    wsheet.append_row(columns)
-
     users = await UserService().get_all()
-    for user in users:
-        row = []
-        for col in columns:
-            value = getattr(user, col)
-            if isinstance(value, datetime):
-                value = value.isoformat()
-            row.append(value)
-        wsheet.append_row(row)
-    return sheet.url
+    rows = [columns] + build_user_rows(users, columns)
 
+    await asyncio.to_thread(_write_rows, wsheet, rows, batch_size)
+    return sheet.url
@@ -0,0 +1,216 @@
+"""
+Приём обновлений через webhook вместо long polling.
+
+В режиме BOT_MODE=webhook Telegram сам присылает обновления POST-запросами
+на aiohttp-сервер, поэтому нет цикла getUpdates и задержки опроса:
+
+* запрос подтверждается сразу, обновление обрабатывается в фоне; одновременно
+  обрабатывается не больше WEBHOOK_CONCURRENCY обновлений, а обновления одного
+  чата — строго по очереди, чтобы не путались шаги FSM;
+* если в очереди больше WEBHOOK_MAX_PENDING обновлений, сервер отвечает 503 и
+  Telegram повторит доставку позже;
+* по SIGTERM/SIGINT сервер перестаёт принимать обновления (503 — Telegram их
+  придержит), дожидается начатых до WEBHOOK_DRAIN_TIMEOUT секунд и
+  останавливается; webhook при этом не удаляется;
+* GET /health — состояние сервера, счётчики обработки, доставки и исходящих
+  запросов (200, пока сервер принимает обновления, иначе 503).
+"""
+import asyncio
+import hmac
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from bot.services.gateway import outbound_gateway
+from services.delivery import delivery_stats
+
+logger = logging.getLogger(__name__)
+
+# Публичный адрес сервера; если задан, webhook регистрируется при запуске
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Секрет из заголовка X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Сколько обновлений обрабатывается одновременно
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "32"))
+# Сколько принятых обновлений может ждать обработки
+WEBHOOK_MAX_PENDING = int(os.getenv("WEBHOOK_MAX_PENDING", "1000"))
+# Сколько секунд при остановке ждать начатые обновления
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "20"))
+
+HEALTH_PATH = "/health"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Telegram держит не больше 100 одновременных соединений с webhook
+TELEGRAM_MAX_CONNECTIONS = 100
+
+
+def update_chat_key(update: Dict[str, Any]) -> Optional[int]:
+    """Чат (или пользователь), к которому относится обновление; None — порядок не важен."""
+    for key, event in update.items():
+        if key == "update_id" or not isinstance(event, dict):
+            continue
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat and "id" in chat:
+            return chat["id"]
+        sender = event.get("from") or event.get("user")
+        if sender and "id" in sender:
+            return sender["id"]
+        return None
+    return None
+
+
+class WebhookServer:
+    """aiohttp-приложение с приёмом обновлений, ограничением параллелизма и /health."""
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        path: str = WEBHOOK_PATH,
+        secret: str = WEBHOOK_SECRET,
+        concurrency: int = WEBHOOK_CONCURRENCY,
+        max_pending: int = WEBHOOK_MAX_PENDING,
+    ):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.path = path
+        self.secret = secret
+        self.concurrency = max(concurrency, 1)
+        self.max_pending = max_pending
+        self.draining = False
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._chat_locks: Dict[Any, asyncio.Lock] = {}
+        self._chat_waiters: Dict[Any, int] = {}
+        self._started = time.monotonic()
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get(HEALTH_PATH, self.handle_health)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if self.secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret):
+            return web.Response(status=401)
+        if self.draining or self.pending >= self.max_pending:
+            self.rejected += 1
+            return web.Response(status=503)
+        try:
+            update = await request.json(loads=self.bot.session.json_loads)
+        except ValueError:
+            return web.Response(status=400)
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.health(), status=503 if self.draining else 200)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "draining" if self.draining else "ok",
+            "mode": "webhook",
+            "uptime_s": round(time.monotonic() - self._started),
+            "updates": {
+                "in_flight": self.in_flight,
+                "pending": self.pending,
+                "processed": self.processed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "concurrency": self.concurrency,
+            },
+            "delivery": delivery_stats.as_dict(),
+            "outbound": outbound_gateway.metrics_snapshot(),
+        }
+
+    async def _process(self, update: Dict[str, Any]) -> None:
+        chat_key = update_chat_key(update)
+        if chat_key is None:
+            await self._feed(update)
+            return
+        lock = self._chat_locks.setdefault(chat_key, asyncio.Lock())
+        self._chat_waiters[chat_key] = self._chat_waiters.get(chat_key, 0) + 1
+        try:
+            async with lock:
+                await self._feed(update)
+        finally:
+            self._chat_waiters[chat_key] -= 1
+            if not self._chat_waiters[chat_key]:
+                del self._chat_waiters[chat_key]
+                del self._chat_locks[chat_key]
+
+    async def _feed(self, update: Dict[str, Any]) -> None:
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                await self.dispatcher.feed_raw_update(self.bot, update)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Ошибка обработки обновления {update.get('update_id')}: {e}")
+            finally:
+                self.in_flight -= 1
+
+    async def drain(self, timeout: float = WEBHOOK_DRAIN_TIMEOUT) -> None:
+        """Перестаёт принимать обновления и ждёт начатые не дольше timeout секунд."""
+        self.draining = True
+        if not self._tasks:
+            return
+        logger.info(f"Ожидание {len(self._tasks)} обновлений перед остановкой...")
+        _, unfinished = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            logger.warning(f"Не дождались {len(unfinished)} обновлений, они прерваны")
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    stopping: asyncio.Event,
+    host: str = WEBHOOK_HOST,
+    port: int = WEBHOOK_PORT,
+    url: str = WEBHOOK_URL,
+    **kwargs: Any,
+) -> None:
+    """Запускает webhook-сервер и работает, пока не выставлен stopping (SIGTERM/SIGINT,
+    см. bot/services/lifecycle.py), затем дожидается начатых обновлений."""
+    server = WebhookServer(dispatcher, bot, **kwargs)
+    await dispatcher.emit_startup(bot=bot)
+    if url:
+        await bot.set_webhook(
+            url.rstrip("/") + server.path,
+            secret_token=server.secret or None,
+            allowed_updates=dispatcher.resolve_used_update_types(),
+            max_connections=min(server.concurrency, TELEGRAM_MAX_CONNECTIONS),
+        )
+        logger.info(f"Webhook зарегистрирован: {url.rstrip('/')}{server.path}")
+
+    runner = web.AppRunner(server.build_app(), handle_signals=False)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Webhook-сервер слушает {host}:{port}, параллельно до {server.concurrency} обновлений")
+    try:
+        await stopping.wait()
+    finally:
+        await server.drain()
+        await runner.cleanup()
+        await dispatcher.emit_shutdown(bot=bot)
+        logger.info("Webhook-сервер остановлен")
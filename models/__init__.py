@@ -1,7 +1,8 @@
 from models.poll import Poll, PollMessage
-from models.task_model import TaskModel
+from models.task_model import TaskModel, TaskCompletion
 from models.team import Team
 from models.user import User, UserRole
 from models.poll_vote import PollVote
 from models.schedule import EventChangeType, EventVisibilityEnum, Event, EventLog, EventNotification
 from models.notification_settings import NotificationSettings
+from models.shared_state import SharedState
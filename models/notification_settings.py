@@ -1,15 +1,23 @@
 """
 Модель для хранения настроек уведомлений пользователей.
 """
-from sqlalchemy import Boolean, ARRAY, Integer
+from dataclasses import dataclass
+from datetime import date
+from sqlalchemy import Boolean, ARRAY, Date, Integer, false
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import JSONB
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import json
 
 from config.database import Base
 
 
+# Час (в поясе пользователя), в который по умолчанию приходит ежедневная сводка
+DEFAULT_DIGEST_HOUR = 9
+
+DEFAULT_REMINDER_MINUTES = (5, 15, 60)
+
+
 class NotificationSettings(Base):
     
     __tablename__ = "notification_settings"
@@ -23,13 +31,19 @@ class NotificationSettings(Base):
     # Время напоминаний в минутах
     reminder_minutes: Mapped[Optional[List[int]]] = mapped_column(
         ARRAY(Integer),
-        default=[5, 15, 60]
+        default=list(DEFAULT_REMINDER_MINUTES)
     )
     
     # Типы уведомлений
     new_event_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     event_updated_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     event_cancelled_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    # Режим сводки: одно сообщение утром вместо уведомлений о каждом событии
+    digest_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
+    digest_hour: Mapped[int] = mapped_column(Integer, default=DEFAULT_DIGEST_HOUR, server_default=str(DEFAULT_DIGEST_HOUR))
+    # Локальная дата последней отправленной сводки, чтобы не отправить её дважды
+    digest_sent_on: Mapped[Optional[date]] = mapped_column(Date)
     
     def __repr__(self) -> str:
         return f"<NotificationSettings(user_id={self.user_id}, enabled={self.enabled})>"
@@ -38,6 +52,11 @@ class NotificationSettings(Base):
         """Проверяет, включен ли конкретный тип уведомлений"""
         if not self.enabled:
             return False
+        if notification_type == "daily_digest":
+            return bool(self.digest_enabled)
+        if self.digest_enabled and notification_type != "event_cancelled":
+            # события и напоминания попадают в сводку, об отмене сообщаем сразу
+            return False
             
         type_mapping = {
             "new_event": self.new_event_enabled,
@@ -46,4 +65,27 @@ class NotificationSettings(Base):
             "schedule_reminder": True
         }
         
-        return type_mapping.get(notification_type, False)
\ No newline at end of file
+        return type_mapping.get(notification_type, False)
+
+
+@dataclass(frozen=True)
+class DefaultNotificationSettings:
+    """Настройки пользователя, который ничего не менял.
+    
+    Строка в notification_settings создаётся только при первом изменении,
+    а до этого чтение возвращает общий неизменяемый объект с теми же полями.
+    """
+    user_id: Optional[int] = None
+    enabled: bool = True
+    reminder_minutes: Tuple[int, ...] = DEFAULT_REMINDER_MINUTES
+    new_event_enabled: bool = True
+    event_updated_enabled: bool = True
+    event_cancelled_enabled: bool = True
+    digest_enabled: bool = False
+    digest_hour: int = DEFAULT_DIGEST_HOUR
+    digest_sent_on: Optional[date] = None
+    
+    is_enabled_for_type = NotificationSettings.is_enabled_for_type
+
+
+DEFAULT_NOTIFICATION_SETTINGS = DefaultNotificationSettings()
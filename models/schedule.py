@@ -37,6 +37,9 @@ class Event(Base):
     description: Mapped[Optional[str]] = mapped_column(Text)
     start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Те же моменты в UTC: по ним идут сравнения с текущим временем и перевод в пояс пользователя
+    start_utc: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    end_utc: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     location: Mapped[Optional[str]] = mapped_column(String(200))
 
     visibility: Mapped[List[str]] = mapped_column(
@@ -92,6 +95,8 @@ class Event(Base):
             "description": self.description,
             "start_time": self.start_time.strftime("%Y-%m-%d %H:%M:%S") if convert_datetimes else self.start_time,
             "end_time": self.end_time.strftime("%Y-%m-%d %H:%M:%S") if convert_datetimes else self.end_time,
+            "start_utc": self.start_utc.isoformat() if convert_datetimes else self.start_utc,
+            "end_utc": self.end_utc.isoformat() if convert_datetimes else self.end_utc,
             "location": self.location,
             "visibility": self.visibility,
             "created_by": self.created_by,
@@ -0,0 +1,24 @@
+"""
+Общее состояние воркеров бота: FSM, отметки об отправке, кэши.
+
+Значение хранится в JSONB по строковому ключу; expires_at — когда запись
+перестаёт действовать (NULL — бессрочно). Просроченные строки не читаются и
+удаляются периодически (SharedStateRepository.purge_expired).
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.database import Base
+
+
+class SharedState(Base):
+
+    __tablename__ = "shared_state"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    value: Mapped[Any] = mapped_column(JSONB, nullable=True)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), index=True)
@@ -1,23 +1,71 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, ForeignKey, Index, text
+from sqlalchemy.orm import relationship, deferred
 from config.database import Base
 from datetime import datetime
 from typing import List, Optional
+import enum
+
+
+class TaskPriority(enum.IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+PRIORITY_LABELS = {
+    TaskPriority.HIGH: "🔴 Высокий",
+    TaskPriority.NORMAL: "🟡 Обычный",
+    TaskPriority.LOW: "🟢 Низкий",
+}
+
+
+class ReminderStage(enum.IntEnum):
+    """Какое напоминание о дедлайне уже отправлено"""
+    NONE = 0
+    UPCOMING = 1
+    OVERDUE = 2
 
 
 class TaskModel(Base):
    
     __tablename__ = "tasks"
    
+    __table_args__ = (
+        # задачи, по которым ещё ждут напоминания: планировщик выбирает их по дедлайну
+        Index(
+            "ix_tasks_pending_deadline",
+            "deadline",
+            postgresql_where=text("is_active = true AND deadline IS NOT NULL AND reminder_stage < 2")
+        ),
+    )
+   
     id = Column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = Column(String, nullable=False)
+    telegram_id = Column(String, nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
-    assigned_to = Column(String, nullable=False)
-    created_by = Column(String, nullable=False)
+    assigned_to = Column(String, nullable=False, index=True)
+    created_by = Column(String, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    completed_by = Column(JSON, default=list)
+    # Устаревший JSON-список исполнителей: отметки хранятся в task_completions,
+    # колонка оставлена только для переноса старых данных миграцией
+    legacy_completed_by = deferred(Column("completed_by", JSON, default=list))
     is_active = Column(Boolean, default=True)
+    # Дедлайн в UTC
+    deadline = Column(DateTime, nullable=True)
+    priority = Column(Integer, nullable=False, default=TaskPriority.NORMAL, server_default="1")
+    reminder_stage = Column(Integer, nullable=False, default=ReminderStage.NONE, server_default="0")
+   
+    completions = relationship(
+        "TaskCompletion",
+        back_populates="task",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="selectin"
+    )
+   
+    @property
+    def completed_by(self) -> List[str]:
+        return [completion.volunteer_id for completion in self.completions]
    
     def __repr__(self):
         return f"Task(id={self.id}, title={self.title}, assigned_to={self.assigned_to})"
@@ -32,11 +80,32 @@ class TaskModel(Base):
             "assigned_to": self.assigned_to,
             "created_by": self.created_by,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "completed_by": self.completed_by or [],
-            "is_active": self.is_active
+            "completed_by": self.completed_by,
+            "is_active": self.is_active,
+            "deadline": self.deadline.isoformat() if self.deadline else None,
+            "priority": self.priority
         }
 
 
+class TaskCompletion(Base):
+    """Отметка о выполнении задачи волонтёром: одна строка на пару (задача, волонтёр)"""
+   
+    __tablename__ = "task_completions"
+   
+    __table_args__ = (
+        Index("ix_task_completions_volunteer_id", "volunteer_id"),
+    )
+   
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    volunteer_id = Column(String, primary_key=True)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+   
+    task = relationship("TaskModel", back_populates="completions")
+   
+    def __repr__(self):
+        return f"TaskCompletion(task_id={self.task_id}, volunteer_id={self.volunteer_id})"
+
+
 class Task:
    
     def __init__(
@@ -48,7 +117,9 @@ class Task:
         created_by: str,
         created_at: Optional[datetime] = None,
         completed_by: Optional[List[str]] = None,
-        is_active: bool = True
+        is_active: bool = True,
+        deadline: Optional[datetime] = None,
+        priority: int = TaskPriority.NORMAL
     ):
         self.telegram_id = telegram_id
         self.title = title
@@ -58,6 +129,8 @@ class Task:
         self.created_at = created_at or datetime.utcnow()
         self.completed_by = completed_by or []
         self.is_active = is_active
+        self.deadline = deadline
+        self.priority = priority
    
     @classmethod
     def from_model(cls, model: TaskModel) -> 'Task':
@@ -70,7 +143,9 @@ class Task:
             created_by=model.created_by,
             created_at=model.created_at,
             completed_by=model.completed_by,
-            is_active=model.is_active
+            is_active=model.is_active,
+            deadline=model.deadline,
+            priority=model.priority if model.priority is not None else TaskPriority.NORMAL
         )
    
     def to_model(self) -> TaskModel:
@@ -82,8 +157,10 @@ class Task:
             assigned_to=self.assigned_to,
             created_by=self.created_by,
             created_at=self.created_at,
-            completed_by=self.completed_by,
-            is_active=self.is_active
+            completions=[TaskCompletion(volunteer_id=v) for v in self.completed_by],
+            is_active=self.is_active,
+            deadline=self.deadline,
+            priority=self.priority
         )
    
     def to_dict(self) -> dict:
@@ -96,9 +173,15 @@ class Task:
             "created_by": self.created_by,
             "created_at": self.created_at.isoformat(),
             "completed_by": self.completed_by,
-            "is_active": self.is_active
+            "is_active": self.is_active,
+            "deadline": self.deadline.isoformat() if self.deadline else None,
+            "priority": int(self.priority)
         }
    
+    def is_overdue(self, now: Optional[datetime] = None) -> bool:
+        """Дедлайн прошёл"""
+        return self.deadline is not None and self.deadline <= (now or datetime.utcnow())
+   
     def mark_completed(self, volunteer_id: str) -> bool:
         """Пометить задачу как выполненную волонтером"""
         if volunteer_id not in self.completed_by:
@@ -1,14 +1,21 @@
-from sqlalchemy import String, Integer, ForeignKey, DateTime
+from sqlalchemy import String, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import Optional, List
 
 from config.database import Base
 
+# Максимальный размер команды вместе с капитаном
+MAX_TEAM_SIZE = 5
+
 
 class Team(Base):
     
     __tablename__ = "teams"
+    # названия уникальны: параллельное создание команд с одним названием отсекает БД
+    __table_args__ = (
+        UniqueConstraint("name", name="uq_teams_name"),
+    )
     
     #ОСНОВНОЕ
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -50,8 +57,8 @@ class Team(Base):
     
     @property
     def is_full(self) -> bool:
-        """Проверяет, полная ли команда (макс 5 человек)."""
-        return self.member_count >= 5
+        """Проверяет, полная ли команда (макс MAX_TEAM_SIZE человек)."""
+        return self.member_count >= MAX_TEAM_SIZE
     
     def add_member(self, user: "User") -> bool:
         """Добавляет участника в команду."""
@@ -1,6 +1,7 @@
 from sqlalchemy import String, Boolean, DateTime, Enum as SQLEnum, Text, ARRAY, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
+from datetime import datetime
 from typing import Optional, List
 
 from config.database import Base
@@ -32,6 +33,11 @@ class User(Base):
     timezone: Mapped[str] = mapped_column(String(50), default="UTC+3")
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Когда и почему сообщения перестали доставляться (см. services/delivery.py);
+    # NULL — пользователь доступен
+    undeliverable_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    undeliverable_reason: Mapped[Optional[str]] = mapped_column(String(32))
+
     participant_status: Mapped[Optional[ParticipantStatus]] = mapped_column(
         SQLEnum(ParticipantStatus),
         default=ParticipantStatus.LOOKING_FOR_TEAM  # По умолчанию ищет команду
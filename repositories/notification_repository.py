@@ -1,11 +1,17 @@
 """
 Репозиторий для работы с настройками уведомлений.
 """
-from sqlalchemy import select
+from sqlalchemy import Select, false, func, not_, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from datetime import date
+from typing import Dict, Optional, List, Sequence, Union
 
-from models.notification_settings import NotificationSettings
+from models.notification_settings import (
+    DEFAULT_NOTIFICATION_SETTINGS,
+    DefaultNotificationSettings,
+    NotificationSettings,
+)
+from models.user import User, UserRole
 from config.database import get_db
 
 
@@ -21,20 +27,50 @@ class NotificationSettingsRepository:
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
     
+    async def get_settings(self, user_id: int) -> Union[NotificationSettings, DefaultNotificationSettings]:
+        """Настройки пользователя для чтения; без строки в БД — общие значения по умолчанию."""
+        settings = await self.get_by_user_id(user_id)
+        return settings if settings is not None else DEFAULT_NOTIFICATION_SETTINGS
+    
+    async def get_settings_bulk(
+        self, user_ids: Sequence[int]
+    ) -> Dict[int, Union[NotificationSettings, DefaultNotificationSettings]]:
+        """Настройки сразу для многих пользователей: одним запросом читаются только
+        сохранённые строки, остальным достаются значения по умолчанию."""
+        settings = dict.fromkeys(user_ids, DEFAULT_NOTIFICATION_SETTINGS)
+        if not settings:
+            return settings
+        stmt = select(NotificationSettings).where(NotificationSettings.user_id.in_(list(settings)))
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            for stored in result.scalars().all():
+                settings[stored.user_id] = stored
+        return settings
+    
+    def _from_defaults(self, user_id: int) -> NotificationSettings:
+        defaults = DEFAULT_NOTIFICATION_SETTINGS
+        return NotificationSettings(
+            user_id=user_id,
+            enabled=defaults.enabled,
+            reminder_minutes=list(defaults.reminder_minutes),
+            new_event_enabled=defaults.new_event_enabled,
+            event_updated_enabled=defaults.event_updated_enabled,
+            event_cancelled_enabled=defaults.event_cancelled_enabled,
+            digest_enabled=defaults.digest_enabled,
+            digest_hour=defaults.digest_hour
+        )
+    
+    async def _for_update(self, user_id: int) -> NotificationSettings:
+        """Строка настроек для изменения; новая создаётся вместе с первым сохранением."""
+        settings = await self.get_by_user_id(user_id)
+        return settings if settings is not None else self._from_defaults(user_id)
+    
     async def get_or_create_settings(self, user_id: int) -> NotificationSettings:
         """Получает или создаёт настройки пользователя."""
         settings = await self.get_by_user_id(user_id)
         
         if not settings:
-            settings = NotificationSettings(
-                user_id=user_id,
-                enabled=True,
-                reminder_minutes=[5, 15, 60],
-                new_event_enabled=True,
-                event_updated_enabled=True,
-                event_cancelled_enabled=True
-            )
-            await self.save(settings)
+            settings = await self.save(self._from_defaults(user_id))
         
         return settings
     
@@ -48,30 +84,136 @@ class NotificationSettingsRepository:
     
     async def toggle_enabled(self, user_id: int) -> NotificationSettings:
         """Переключает общую доступность уведомлений."""
-        settings = await self.get_or_create_settings(user_id)
+        settings = await self._for_update(user_id)
         settings.enabled = not settings.enabled
         return await self.save(settings)
     
     async def update_reminder_times(self, user_id: int, reminder_minutes: List[int]) -> NotificationSettings:
         """Обновляет время напоминаний."""
-        settings = await self.get_or_create_settings(user_id)
+        settings = await self._for_update(user_id)
         settings.reminder_minutes = sorted(reminder_minutes)
         return await self.save(settings)
     
     async def toggle_new_events(self, user_id: int) -> NotificationSettings:
         """Переключает уведомления о новых событиях."""
-        settings = await self.get_or_create_settings(user_id)
+        settings = await self._for_update(user_id)
         settings.new_event_enabled = not settings.new_event_enabled
         return await self.save(settings)
     
     async def toggle_event_updates(self, user_id: int) -> NotificationSettings:
         """Переключает уведомления об изменениях событий."""
-        settings = await self.get_or_create_settings(user_id)
+        settings = await self._for_update(user_id)
         settings.event_updated_enabled = not settings.event_updated_enabled
         return await self.save(settings)
     
     async def toggle_event_cancelled(self, user_id: int) -> NotificationSettings:
         """Переключает уведомления об отмене событий."""
-        settings = await self.get_or_create_settings(user_id)
+        settings = await self._for_update(user_id)
         settings.event_cancelled_enabled = not settings.event_cancelled_enabled
-        return await self.save(settings)
\ No newline at end of file
+        return await self.save(settings)
+    
+    async def toggle_digest(self, user_id: int) -> NotificationSettings:
+        """Переключает режим ежедневной сводки."""
+        settings = await self._for_update(user_id)
+        settings.digest_enabled = not settings.digest_enabled
+        return await self.save(settings)
+    
+    async def set_digest_hour(self, user_id: int, hour: int) -> NotificationSettings:
+        """Меняет час отправки сводки (в поясе пользователя)."""
+        settings = await self._for_update(user_id)
+        settings.digest_hour = hour
+        return await self.save(settings)
+    
+    # Флаг настроек для каждого типа уведомлений; у напоминаний своего флага нет
+    _TYPE_FLAGS = {
+        "new_event": NotificationSettings.new_event_enabled,
+        "event_updated": NotificationSettings.event_updated_enabled,
+        "event_cancelled": NotificationSettings.event_cancelled_enabled,
+    }
+    
+    def _audience_query(self, notification_type: str, visibility: Optional[Sequence[str]] = None) -> Select:
+        """Получатели уведомления notification_type: (telegram_id, role, timezone).
+        
+        users LEFT JOIN notification_settings: у пользователя без строки настроек
+        действуют значения по умолчанию, они подставляются через COALESCE прямо в SQL.
+        Логика совпадает с NotificationSettings.is_enabled_for_type.
+        """
+        digest = func.coalesce(NotificationSettings.digest_enabled, false())
+        conditions = [
+            User.is_active == True,
+            User.undeliverable_at.is_(None),
+            func.coalesce(NotificationSettings.enabled, true())
+        ]
+        if notification_type == "daily_digest":
+            conditions.append(digest)
+        else:
+            if notification_type in self._TYPE_FLAGS:
+                conditions.append(func.coalesce(self._TYPE_FLAGS[notification_type], true()))
+            elif notification_type != "schedule_reminder":
+                conditions.append(false())
+            if notification_type != "event_cancelled":
+                conditions.append(not_(digest))
+        if visibility is not None and "all" not in visibility:
+            roles = [role for role in UserRole if role.value in visibility]
+            conditions.append(User.role.in_(roles) if roles else false())
+        
+        return (
+            select(User.telegram_id, User.role, User.timezone)
+            .outerjoin(NotificationSettings, NotificationSettings.user_id == User.id)
+            .where(*conditions)
+        )
+    
+    async def get_audience(self, notification_type: str, visibility: Optional[Sequence[str]] = None) -> list:
+        """Получатели уведомления одним запросом: строки (telegram_id, role, timezone); visibility — роли события."""
+        async with get_db() as session:
+            result = await session.execute(self._audience_query(notification_type, visibility))
+            return list(result.all())
+    
+    async def filter_user_ids(self, notification_type: str, user_ids: Sequence[int]) -> List[int]:
+        """Оставляет из user_ids тех, кому положено уведомление, одним запросом."""
+        if not user_ids:
+            return []
+        stmt = (
+            self._audience_query(notification_type)
+            .with_only_columns(User.id)
+            .where(User.id.in_(user_ids))
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+    
+    async def get_digest_recipients(self) -> list:
+        """Активные пользователи со сводкой: (id, telegram_id, role, timezone, digest_hour, digest_sent_on)."""
+        stmt = (
+            select(
+                User.id,
+                User.telegram_id,
+                User.role,
+                User.timezone,
+                NotificationSettings.digest_hour,
+                NotificationSettings.digest_sent_on
+            )
+            .join(NotificationSettings, NotificationSettings.user_id == User.id)
+            .where(
+                User.is_active == True,
+                User.undeliverable_at.is_(None),
+                NotificationSettings.enabled == True,
+                NotificationSettings.digest_enabled == True
+            )
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return result.all()
+    
+    async def mark_digest_sent(self, user_ids: List[int], day: date) -> None:
+        """Запоминает, что сводка за day отправлена, одним UPDATE."""
+        if not user_ids:
+            return
+        stmt = (
+            update(NotificationSettings)
+            .where(NotificationSettings.user_id.in_(user_ids))
+            .values(digest_sent_on=day)
+        )
+        async with get_db() as session:
+            await session.execute(stmt)
+            await session.commit()
@@ -4,9 +4,9 @@
 Содержит низкоуровневые операции с БД для событий, логов и уведомлений.
 """
 
-from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy import select, update, delete, insert, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any
 
 from models.schedule import Event, EventLog, EventNotification, EventChangeType
@@ -29,6 +29,33 @@ class ScheduleRepository:
             await session.refresh(event)
             return event
 
+    async def create_events_bulk(
+        self,
+        rows: List[Dict[str, Any]],
+        changed_by: Optional[int] = None
+    ) -> List[Event]:
+        """Создаёт события одним executemany и пишет логи создания одной пачкой."""
+        async with get_db() as session:
+            result = await session.scalars(
+                insert(Event).returning(Event),
+                [{**row, "created_by": changed_by} for row in rows]
+            )
+            events = result.all()
+            await session.execute(
+                insert(EventLog),
+                [
+                    {
+                        "event_id": event.id,
+                        "changed_by": changed_by,
+                        "change_type": EventChangeType.CREATED,
+                        "changes": event.to_dict(convert_datetimes=True),
+                    }
+                    for event in events
+                ]
+            )
+            await session.commit()
+            return sorted(events, key=lambda event: event.start_utc)
+
     async def get_event_by_id(self, event_id: int) -> Optional[Event]:
         """Находит событие по ID."""
         stmt = select(Event).where(Event.id == event_id)
@@ -62,7 +89,7 @@ class ScheduleRepository:
 
     async def get_all_events(self, include_inactive: bool = False) -> List[Event]:
         """Возвращает все события."""
-        stmt = select(Event).order_by(Event.start_time)
+        stmt = select(Event).order_by(Event.start_utc)
         if not include_inactive:
             stmt = stmt.where(Event.is_active == True)
         async with get_db() as session:
@@ -77,7 +104,7 @@ class ScheduleRepository:
     ) -> List[Event]:
         """Возвращает события, видимые для указанной роли."""
         # Базовый запрос для активных событий
-        stmt = select(Event).where(Event.is_active == True).order_by(Event.start_time)
+        stmt = select(Event).where(Event.is_active == True).order_by(Event.start_utc)
         
         async with get_db() as session:
             result = await session.execute(stmt)
@@ -99,16 +126,16 @@ class ScheduleRepository:
         role: Optional[str] = None
     ) -> List[Event]:
         """Возвращает ближайшие события."""
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         time_threshold = now + timedelta(hours=hours_ahead)
         
         stmt = select(Event).where(
             and_(
                 Event.is_active == True,
-                Event.start_time >= now,
-                Event.start_time <= time_threshold
+                Event.start_utc >= now,
+                Event.start_utc <= time_threshold
             )
-        ).order_by(Event.start_time)
+        ).order_by(Event.start_utc)
         
         async with get_db() as session:
             result = await session.execute(stmt)
@@ -122,14 +149,14 @@ class ScheduleRepository:
 
     async def get_active_events_now(self) -> List[Event]:
         """Возвращает события, которые идут прямо сейчас."""
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         stmt = select(Event).where(
             and_(
                 Event.is_active == True,
-                Event.start_time <= now,
-                Event.end_time >= now
+                Event.start_utc <= now,
+                Event.end_utc >= now
             )
-        ).order_by(Event.start_time)
+        ).order_by(Event.start_utc)
         
         async with get_db() as session:
             result = await session.execute(stmt)
@@ -142,7 +169,7 @@ class ScheduleRepository:
                 Event.created_by == user_id,
                 Event.is_active == True
             )
-        ).order_by(Event.start_time.desc())
+        ).order_by(Event.start_utc.desc())
         
         async with get_db() as session:
             result = await session.execute(stmt)
@@ -164,7 +191,7 @@ class ScheduleRepository:
                     Event.location.ilike(search_term)
                 )
             )
-        ).order_by(Event.start_time)
+        ).order_by(Event.start_utc)
         
         async with get_db() as session:
             result = await session.execute(stmt)
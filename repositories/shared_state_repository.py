@@ -0,0 +1,98 @@
+"""
+Репозиторий общего состояния воркеров (таблица shared_state).
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from config.database import get_db
+from models.shared_state import SharedState
+
+
+def _alive(now: datetime):
+    return or_(SharedState.expires_at.is_(None), SharedState.expires_at > now)
+
+
+class SharedStateRepository:
+    """Ключ-значение с необязательным сроком жизни; просроченные записи считаются отсутствующими."""
+
+    async def get(self, key: str) -> Any:
+        now = datetime.now(timezone.utc)
+        stmt = select(SharedState.value).where(SharedState.key == key, _alive(now))
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+    async def set(self, key: str, value: Any, expires_at: Optional[datetime] = None) -> None:
+        stmt = insert(SharedState).values(key=key, value=value, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SharedState.key],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+        )
+        async with get_db() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def add(self, key: str, value: Any, expires_at: Optional[datetime] = None) -> bool:
+        """Записывает значение, только если ключа нет или он просрочен.
+
+        Один INSERT ... ON CONFLICT DO UPDATE WHERE: из одновременных вызовов
+        разных воркеров True получает ровно один.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = insert(SharedState).values(key=key, value=value, expires_at=expires_at)
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[SharedState.key],
+                set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+                where=SharedState.expires_at <= now,
+            )
+            .returning(SharedState.key)
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.first() is not None
+
+    async def delete(self, key: str) -> None:
+        async with get_db() as session:
+            await session.execute(delete(SharedState).where(SharedState.key == key))
+            await session.commit()
+
+    async def get_prefix(self, prefix: str) -> Dict[str, Any]:
+        """Действующие значения с ключами prefix*: {key: value}."""
+        now = datetime.now(timezone.utc)
+        stmt = select(SharedState.key, SharedState.value).where(
+            SharedState.key.startswith(prefix, autoescape=True), _alive(now)
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return {row.key: row.value for row in result.all()}
+
+    async def take_prefix(self, prefix: str) -> List[Any]:
+        """Забирает (удаляет и возвращает) действующие значения с ключами prefix*.
+
+        Один DELETE ... RETURNING: одновременно вызвавшие воркеры получают
+        каждое значение не больше одного раза.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            delete(SharedState)
+            .where(SharedState.key.startswith(prefix, autoescape=True))
+            .returning(SharedState.value, SharedState.expires_at)
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            rows = result.all()
+            await session.commit()
+        return [row.value for row in rows if row.expires_at is None or row.expires_at > now]
+
+    async def purge_expired(self) -> int:
+        """Удаляет просроченные записи; возвращает их число."""
+        stmt = delete(SharedState).where(SharedState.expires_at <= datetime.now(timezone.utc))
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.rowcount
@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func, literal, literal_column, case, cast, and_, or_, true, String, BigInteger
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, AsyncIterator
+from datetime import datetime, timedelta
 
 
-from models.task_model import TaskModel, Task
+from models.task_model import TaskModel, TaskCompletion, Task, ReminderStage
+from models.user import User, UserRole
 from config.database import get_db
 
 
@@ -57,8 +59,14 @@ class TaskRepository:
                     title=task.title,
                     description=task.description,
                     assigned_to=task.assigned_to,
-                    completed_by=task.completed_by,
-                    is_active=task.is_active
+                    is_active=task.is_active,
+                    deadline=task.deadline,
+                    priority=task.priority,
+                    # новый дедлайн — напоминания отправляются заново
+                    reminder_stage=case(
+                        (TaskModel.deadline.is_distinct_from(task.deadline), ReminderStage.NONE),
+                        else_=TaskModel.reminder_stage
+                    )
                 )
             )
             await session.execute(stmt)
@@ -118,80 +126,340 @@ class TaskRepository:
            
             return [Task.from_model(model) for model in task_models]
    
+    def _volunteer_tasks_stmt(self, assignee_id: str, completed: bool):
+        """Активные задачи волонтёра, отфильтрованные по отметке в task_completions.
+
+        В completed_by подгружается только отметка самого волонтёра.
+        """
+        done = TaskModel.completions.any(TaskCompletion.volunteer_id == assignee_id)
+        return (
+            select(TaskModel)
+            .where(
+                ((TaskModel.assigned_to == assignee_id) | (TaskModel.assigned_to == "all")) &
+                (TaskModel.is_active == True) &
+                (done if completed else ~done)
+            )
+            .options(selectinload(
+                TaskModel.completions.and_(TaskCompletion.volunteer_id == assignee_id)
+            ))
+            .order_by(
+                TaskModel.priority.desc(),
+                TaskModel.deadline.asc().nulls_last(),
+                TaskModel.created_at.desc()
+            )
+        )
+   
     async def get_active_by_assignee(self, assignee_id: str) -> List[Task]:
         """Получить активные задачи по исполнителю"""
         async with get_db() as session:
-            stmt = select(TaskModel).where(
-                ((TaskModel.assigned_to == str(assignee_id)) | (TaskModel.assigned_to == "all")) &
-                (TaskModel.is_active == True)
-            ).order_by(TaskModel.created_at.desc())
-           
+            stmt = self._volunteer_tasks_stmt(str(assignee_id), completed=False)
             result = await session.execute(stmt)
-            task_models = result.scalars().all()
-           
-            tasks = [Task.from_model(model) for model in task_models]
-            return [task for task in tasks if assignee_id not in task.completed_by]
+            return [Task.from_model(model) for model in result.scalars().all()]
    
     async def get_completed_by_assignee(self, assignee_id: str) -> List[Task]:
         """Получить выполненные задачи по исполнителю"""
         async with get_db() as session:
-            stmt = select(TaskModel).where(
-                ((TaskModel.assigned_to == str(assignee_id)) | (TaskModel.assigned_to == "all")) &
-                (TaskModel.is_active == True)
-            ).order_by(TaskModel.created_at.desc())
-           
+            stmt = self._volunteer_tasks_stmt(str(assignee_id), completed=True)
             result = await session.execute(stmt)
-            task_models = result.scalars().all()
-           
-            tasks = [Task.from_model(model) for model in task_models]
-            return [task for task in tasks if assignee_id in task.completed_by]
+            return [Task.from_model(model) for model in result.scalars().all()]
    
     async def get_statistics(self, creator_id: Optional[str] = None) -> Dict[str, Any]:
-        """Получить статистику по задачам"""
+        """Получить статистику по задачам (одним агрегирующим запросом)"""
         async with get_db() as session:
-            stmt = select(TaskModel).where(TaskModel.is_active == True)
+            has_completions = TaskModel.completions.any()
+            is_group = TaskModel.assigned_to == "all"
+            stmt = select(
+                func.count(TaskModel.id),
+                func.count(TaskModel.id).filter(has_completions),
+                func.count(TaskModel.id).filter(is_group)
+            ).where(TaskModel.is_active == True)
             if creator_id:
                 stmt = stmt.where(TaskModel.created_by == creator_id)
            
             result = await session.execute(stmt)
-            all_tasks = [Task.from_model(model) for model in result.scalars().all()]
-           
-            total_tasks = len(all_tasks)
-            completed_tasks = sum(1 for task in all_tasks if task.completed_by)
-            personal_tasks = [task for task in all_tasks if task.assigned_to != "all"]
-            group_tasks = [task for task in all_tasks if task.assigned_to == "all"]
+            total_tasks, completed_tasks, group_tasks = result.one()
            
             return {
                 "total_tasks": total_tasks,
                 "completed_tasks": completed_tasks,
                 "not_completed_tasks": total_tasks - completed_tasks,
-                "personal_tasks": len(personal_tasks),
-                "group_tasks": len(group_tasks),
+                "personal_tasks": total_tasks - group_tasks,
+                "group_tasks": group_tasks,
                 "completion_rate": round(completed_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0
             }
    
-    async def mark_completed(self, task_telegram_id: str, volunteer_id: str) -> bool:
-        """Пометить задачу как выполненную волонтером"""
+    def _board_stmt(
+        self,
+        creator_id: Optional[str] = None,
+        task_telegram_id: Optional[str] = None,
+        task_offset: int = 0,
+        task_limit: Optional[int] = None,
+        volunteer_offset: int = 0,
+        volunteer_limit: Optional[int] = None,
+        assigned_only: bool = False
+    ):
+        """Матрица задачи × волонтёры одним запросом.
+
+        Страница задач и страница волонтёров — два CTE, соединённые без условия
+        (или только с назначенными, если assigned_only), плюс LEFT JOIN отметок.
+        Каждая строка — ячейка; в ней же счётчики по задаче и общее число
+        задач (count() OVER ()) и волонтёров для пагинации.
+        """
+        volunteer_filter = and_(User.role == UserRole.VOLUNTEER, User.is_active == True)
+        volunteers_total = select(func.count(User.id)).where(volunteer_filter).scalar_subquery()
+        done_count = (
+            select(func.count())
+            .select_from(TaskCompletion)
+            .where(TaskCompletion.task_id == TaskModel.id)
+            .scalar_subquery()
+        )
+        assignee_name = (
+            select(User.full_name)
+            .where(User.telegram_id == cast(func.nullif(TaskModel.assigned_to, "all"), BigInteger))
+            .scalar_subquery()
+        )
+
+        tasks = select(
+            TaskModel.id,
+            TaskModel.telegram_id,
+            TaskModel.title,
+            TaskModel.description,
+            TaskModel.assigned_to,
+            TaskModel.created_at,
+            assignee_name.label("assignee_name"),
+            done_count.label("done"),
+            case((TaskModel.assigned_to == "all", volunteers_total), else_=1).label("assigned"),
+            func.count().over().label("total_tasks")
+        ).where(TaskModel.is_active == True)
+        if creator_id:
+            tasks = tasks.where(TaskModel.created_by == creator_id)
+        if task_telegram_id:
+            tasks = tasks.where(TaskModel.telegram_id == task_telegram_id)
+        tasks = tasks.order_by(TaskModel.created_at.desc(), TaskModel.id.desc()).offset(task_offset)
+        if task_limit is not None:
+            tasks = tasks.limit(task_limit)
+        tasks = tasks.cte("board_tasks")
+
+        volunteers = (
+            select(cast(User.telegram_id, String).label("volunteer_id"), User.full_name)
+            .where(volunteer_filter)
+            .order_by(User.full_name, User.id)
+            .offset(volunteer_offset)
+        )
+        if volunteer_limit is not None:
+            volunteers = volunteers.limit(volunteer_limit)
+        volunteers = volunteers.cte("board_volunteers")
+
+        volunteer_join = true()
+        if assigned_only:
+            volunteer_join = or_(tasks.c.assigned_to == "all", tasks.c.assigned_to == volunteers.c.volunteer_id)
+
+        return (
+            select(
+                tasks.c.telegram_id,
+                tasks.c.title,
+                tasks.c.description,
+                tasks.c.assigned_to,
+                tasks.c.created_at,
+                tasks.c.assignee_name,
+                tasks.c.done,
+                tasks.c.assigned,
+                tasks.c.total_tasks,
+                volunteers_total.label("total_volunteers"),
+                volunteers.c.volunteer_id,
+                volunteers.c.full_name,
+                TaskCompletion.volunteer_id.is_not(None).label("completed")
+            )
+            .select_from(
+                tasks
+                .outerjoin(volunteers, volunteer_join)
+                .outerjoin(TaskCompletion, and_(
+                    TaskCompletion.task_id == tasks.c.id,
+                    TaskCompletion.volunteer_id == volunteers.c.volunteer_id
+                ))
+            )
+            .order_by(
+                tasks.c.created_at.desc(), tasks.c.id.desc(),
+                volunteers.c.full_name, volunteers.c.volunteer_id
+            )
+        )
+
+    @staticmethod
+    def _collect_board(rows) -> Dict[str, Any]:
+        """Собирает строки-ячейки в словарь доски"""
+        board = {"tasks": [], "volunteers": [], "completed": set(), "total_tasks": 0, "total_volunteers": 0}
+        seen_tasks = set()
+        seen_volunteers = set()
+        for row in rows:
+            board["total_tasks"] = row.total_tasks
+            board["total_volunteers"] = row.total_volunteers
+            if row.telegram_id not in seen_tasks:
+                seen_tasks.add(row.telegram_id)
+                board["tasks"].append({
+                    "telegram_id": row.telegram_id,
+                    "title": row.title,
+                    "description": row.description,
+                    "assigned_to": row.assigned_to,
+                    "created_at": row.created_at,
+                    "assignee_name": row.assignee_name,
+                    "done": row.done,
+                    "assigned": row.assigned
+                })
+            if row.volunteer_id is None:
+                continue
+            if row.volunteer_id not in seen_volunteers:
+                seen_volunteers.add(row.volunteer_id)
+                board["volunteers"].append((row.volunteer_id, row.full_name))
+            if row.completed:
+                board["completed"].add((row.telegram_id, row.volunteer_id))
+        return board
+
+    async def get_board(
+        self,
+        creator_id: str,
+        task_offset: int = 0,
+        task_limit: int = 10,
+        volunteer_offset: int = 0,
+        volunteer_limit: int = 10
+    ) -> Dict[str, Any]:
+        """Страница доски задач организатора: задачи, волонтёры и отметки.
+
+        completed — множество пар (task_telegram_id, volunteer_id).
+        """
         async with get_db() as session:
-            stmt = select(TaskModel).where(TaskModel.telegram_id == task_telegram_id)
+            stmt = self._board_stmt(
+                creator_id=creator_id,
+                task_offset=task_offset,
+                task_limit=task_limit,
+                volunteer_offset=volunteer_offset,
+                volunteer_limit=volunteer_limit
+            )
             result = await session.execute(stmt)
-            task_model = result.scalar_one_or_none()
-           
-            if not task_model:
-                return False
-           
-            completed_by = task_model.completed_by or []
-            if volunteer_id not in completed_by:
-                completed_by.append(volunteer_id)
-               
-                update_stmt = (
-                    update(TaskModel)
-                    .where(TaskModel.telegram_id == task_telegram_id)
-                    .values(completed_by=completed_by)
+            return self._collect_board(result.all())
+
+    async def get_task_card(self, task_telegram_id: str) -> Optional[Dict[str, Any]]:
+        """Задача с назначенными волонтёрами и их отметками одним запросом"""
+        async with get_db() as session:
+            stmt = self._board_stmt(task_telegram_id=task_telegram_id, assigned_only=True)
+            result = await session.execute(stmt)
+            board = self._collect_board(result.all())
+            if not board["tasks"]:
+                return None
+            return board
+
+    async def iter_board_rows(self, creator_id: str, batch_size: int = 1000) -> AsyncIterator[tuple]:
+        """Все ячейки доски организатора через серверный курсор (для выгрузки)"""
+        stmt = self._board_stmt(creator_id=creator_id).execution_options(yield_per=batch_size)
+        async with get_db() as session:
+            result = await session.stream(stmt)
+            async for partition in result.partitions(batch_size):
+                for row in partition:
+                    yield row
+   
+    @staticmethod
+    def _pending_deadline_filter():
+        """Условие частичного индекса ix_tasks_pending_deadline"""
+        return and_(
+            TaskModel.is_active == True,
+            TaskModel.deadline.is_not(None),
+            # литерал, а не параметр: иначе планировщик не сопоставит условие с индексом
+            TaskModel.reminder_stage < literal_column(str(int(ReminderStage.OVERDUE)))
+        )
+
+    async def get_deadline_schedule(self, limit: int = 500) -> List[tuple]:
+        """Ближайшие дедлайны без отправленных напоминаний: [(id, deadline, reminder_stage)]"""
+        async with get_db() as session:
+            stmt = (
+                select(TaskModel.id, TaskModel.deadline, TaskModel.reminder_stage)
+                .where(self._pending_deadline_filter())
+                .order_by(TaskModel.deadline)
+                .limit(limit)
+            )
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+
+    def _due_reminders_stmt(self, now: datetime, remind_before: timedelta, limit: int):
+        """UPDATE ... RETURNING в CTE переводит reminder_stage (UPCOMING до дедлайна,
+        OVERDUE после) у не более чем limit задач, выбранных по частичному индексу
+        с FOR UPDATE SKIP LOCKED; к ним присоединяются волонтёры, ещё не
+        отметившие задачу.
+        """
+        stage = case((TaskModel.deadline <= now, ReminderStage.OVERDUE), else_=ReminderStage.UPCOMING)
+        due_ids = (
+            select(TaskModel.id)
+            .where(
+                self._pending_deadline_filter(),
+                TaskModel.deadline <= now + remind_before,
+                TaskModel.reminder_stage < stage
+            )
+            .order_by(TaskModel.deadline)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        # Core-таблица: ORM-UPDATE с RETURNING нельзя вложить в CTE
+        tasks = TaskModel.__table__
+        claimed = (
+            update(tasks)
+            .where(tasks.c.id.in_(due_ids))
+            .values(reminder_stage=stage)
+            .returning(
+                tasks.c.id, tasks.c.title, tasks.c.assigned_to,
+                tasks.c.deadline, tasks.c.priority, tasks.c.reminder_stage
+            )
+            .cte("claimed")
+        )
+        recipient_id = cast(User.telegram_id, String)
+        return (
+            select(
+                claimed.c.id, claimed.c.title, claimed.c.deadline, claimed.c.priority,
+                claimed.c.reminder_stage, User.telegram_id, User.timezone
+            )
+            .select_from(claimed)
+            .join(User, and_(
+                User.is_active == True,
+                User.undeliverable_at.is_(None),
+                or_(
+                    and_(claimed.c.assigned_to == "all", User.role == UserRole.VOLUNTEER),
+                    claimed.c.assigned_to == recipient_id
                 )
-                await session.execute(update_stmt)
-                await session.commit()
-                return True
-           
-            return False
+            ))
+            .where(~select(TaskCompletion.task_id).where(
+                TaskCompletion.task_id == claimed.c.id,
+                TaskCompletion.volunteer_id == recipient_id
+            ).exists())
+            .order_by(User.telegram_id, claimed.c.deadline)
+        )
+
+    async def claim_due_reminders(self, now: datetime, remind_before: timedelta, limit: int = 200) -> List[Any]:
+        """Забирает задачи, по которым пора напомнить, вместе с получателями одним запросом.
+
+        Строки: id, title, deadline, priority, reminder_stage задачи
+        и telegram_id, timezone получателя.
+        """
+        async with get_db() as session:
+            result = await session.execute(self._due_reminders_stmt(now, remind_before, limit))
+            rows = result.all()
+            await session.commit()
+            return rows
+   
+    async def mark_completed(self, task_telegram_id: str, volunteer_id: str) -> bool:
+        """Пометить задачу как выполненную волонтером.
 
+        Один INSERT ... SELECT ... ON CONFLICT DO NOTHING: одновременные и повторные
+        отметки не теряются и не дублируются. True — отметку поставил именно этот вызов.
+        """
+        async with get_db() as session:
+            source = select(
+                TaskModel.id,
+                literal(volunteer_id),
+                literal(datetime.utcnow())
+            ).where(TaskModel.telegram_id == task_telegram_id)
+            stmt = (
+                insert(TaskCompletion)
+                .from_select(["task_id", "volunteer_id", "completed_at"], source)
+                .on_conflict_do_nothing(index_elements=["task_id", "volunteer_id"])
+                .returning(TaskCompletion.task_id)
+            )
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.first() is not None
@@ -1,12 +1,19 @@
-from sqlalchemy import select, update, delete, or_, and_
+from sqlalchemy import select, update, delete, or_, and_, func, case
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List, Tuple
+from sqlalchemy.orm import selectinload, joinedload
+from typing import Optional, List, Tuple, Dict
 
-from models.team import Team
-from models.user import User
+from models.team import Team, MAX_TEAM_SIZE
+from models.user import User, UserRole, ParticipantStatus
 from config.database import get_db
 
 
+def is_name_conflict(error: IntegrityError) -> bool:
+    """Ошибка вызвана уникальностью названия команды (uq_teams_name)."""
+    return "uq_teams_name" in str(error.orig)
+
+
 class TeamRepository:
     
     def __init__(self): ...
@@ -43,6 +50,26 @@ class TeamRepository:
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
     
+    async def get_team_details(self, user_id: Optional[int] = None, captain_id: Optional[int] = None) -> Optional[Team]:
+        """Находит команду пользователя (или капитана) сразу с участниками, капитаном и ментором.
+
+        Связи загружаются в той же сессии, поэтому members/captain/mentor
+        и member_count доступны после её закрытия.
+        """
+        stmt = select(Team).options(
+            selectinload(Team.members),
+            joinedload(Team.captain),
+            joinedload(Team.mentor)
+        )
+        if captain_id is not None:
+            stmt = stmt.where(Team.captain_id == captain_id)
+        else:
+            stmt = stmt.join(User, User.team_id == Team.id).where(User.id == user_id)
+
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+    
     async def create_team(self, captain_id: int, name: str) -> Team:
         """Создаёт новую команду."""
         team = Team(
@@ -65,7 +92,7 @@ class TeamRepository:
             return team
     
     async def update_team_name(self, team_id: int, name: str) -> Optional[Team]:
-        """Обновляет название команды."""
+        """Обновляет название команды; IntegrityError, если название уже занято."""
         stmt = update(Team).where(Team.id == team_id).values(name=name)
         
         async with get_db() as session:
@@ -164,7 +191,6 @@ class TeamRepository:
     
     async def get_available_participants(self, exclude_team_id: Optional[int] = None) -> List[User]:
         """Возвращает участников без команды."""
-        from models.user import UserRole
         
         stmt = select(User).where(
             and_(
@@ -178,4 +204,209 @@ class TeamRepository:
         
         async with get_db() as session:
             result = await session.execute(stmt)
-            return result.scalars().all()
\ No newline at end of file
+            return result.scalars().all()
+
+    # АТОМАРНЫЕ ОПЕРАЦИИ С СОСТАВОМ
+    # Проверки и запись выполняются в одной транзакции; строки, от которых
+    # зависит решение, блокируются SELECT ... FOR UPDATE. Возвращают код
+    # результата, тексты сообщений формирует сервис.
+
+    async def create_team_atomic(self, captain_id: int, name: str) -> Tuple[str, Optional[Team]]:
+        """Создаёт команду и делает пользователя её капитаном."""
+        async with get_db() as session:
+            try:
+                async with session.begin():
+                    captain = (await session.execute(
+                        select(User).where(User.id == captain_id).with_for_update()
+                    )).scalar_one_or_none()
+                    if not captain:
+                        return "user_not_found", None
+                    if captain.role != UserRole.PARTICIPANT:
+                        return "not_participant", None
+                    if captain.team_id is not None:
+                        return "in_team", None
+
+                    existing = (await session.execute(
+                        select(Team.captain_id, Team.name).where(
+                            or_(Team.captain_id == captain_id, Team.name == name)
+                        )
+                    )).first()
+                    if existing:
+                        return ("already_captain" if existing.captain_id == captain_id else "name_taken"), None
+
+                    team = Team(name=name, captain_id=captain_id)
+                    session.add(team)
+                    await session.flush()
+                    captain.team_id = team.id
+            except IntegrityError as e:
+                # команду с тем же названием создали параллельно, после проверки выше
+                if not is_name_conflict(e):
+                    raise
+                return "name_taken", None
+            return "ok", team
+
+    async def add_member_atomic(self, user_id: int, team_id: int, max_members: int = MAX_TEAM_SIZE) -> Tuple[str, Optional[Team]]:
+        """Добавляет пользователя в команду, если в ней есть место."""
+        async with get_db() as session:
+            async with session.begin():
+                # блокировка строки команды выстраивает параллельные вступления в очередь
+                team = (await session.execute(
+                    select(Team).where(Team.id == team_id).with_for_update()
+                )).scalar_one_or_none()
+                if not team:
+                    return "team_not_found", None
+
+                members = await session.scalar(
+                    select(func.count(User.id)).where(User.team_id == team_id)
+                )
+                if members >= max_members:
+                    return "team_full", team
+
+                result = await session.execute(
+                    update(User)
+                    .where(User.id == user_id, User.team_id == None)
+                    .values(team_id=team_id)
+                )
+                if result.rowcount == 0:
+                    return "in_team", team
+            return "ok", team
+
+    async def remove_member_atomic(self, user_id: int) -> Tuple[str, Optional[Team]]:
+        """Убирает пользователя из его команды (кроме капитана)."""
+        async with get_db() as session:
+            async with session.begin():
+                team = (await session.execute(
+                    select(Team)
+                    .join(User, User.team_id == Team.id)
+                    .where(User.id == user_id)
+                    .with_for_update(of=User)
+                )).scalar_one_or_none()
+                if not team:
+                    return "not_in_team", None
+                if team.captain_id == user_id:
+                    return "captain", team
+
+                result = await session.execute(
+                    update(User)
+                    .where(User.id == user_id, User.team_id == team.id)
+                    .values(team_id=None)
+                )
+                if result.rowcount == 0:
+                    return "not_in_team", team
+            return "ok", team
+
+    async def dissolve_team_atomic(self, captain_id: int) -> Tuple[str, Optional[Team]]:
+        """Распускает команду капитана: освобождает участников и удаляет команду."""
+        async with get_db() as session:
+            async with session.begin():
+                team = (await session.execute(
+                    select(Team).where(Team.captain_id == captain_id).with_for_update()
+                )).scalar_one_or_none()
+                if not team:
+                    return "not_captain", None
+
+                await session.execute(
+                    update(User).where(User.team_id == team.id).values(team_id=None)
+                )
+                await session.execute(delete(Team).where(Team.id == team.id))
+            return "ok", team
+
+    async def bulk_create_teams(self, groups: List[List[int]], min_members: int = 1) -> Tuple[List[Team], int]:
+        """Создаёт команды из групп id участников в одной транзакции: (команды, сколько распределено).
+
+        Первый участник группы становится капитаном. Участники, которые успели
+        попасть в команду, пропускаются; группа меньше min_members не создаётся.
+        """
+        all_ids = [user_id for group in groups for user_id in group]
+        if not all_ids:
+            return [], 0
+
+        async with get_db() as session:
+            async with session.begin():
+                free_ids = set((await session.execute(
+                    select(User.id)
+                    .where(User.id.in_(all_ids), User.team_id == None)
+                    .with_for_update()
+                )).scalars().all())
+
+                groups = [[user_id for user_id in group if user_id in free_ids] for group in groups]
+                groups = [group for group in groups if len(group) >= min_members]
+                if not groups:
+                    return [], 0
+                # временные уникальные имена, после flush заменяются на "Команда №<id>"
+                teams = [
+                    Team(name=f"auto-{group[0]}", captain_id=group[0])
+                    for group in groups
+                ]
+                session.add_all(teams)
+                await session.flush()
+
+                names = {team.id: f"Команда №{team.id}" for team in teams}
+                # такое название мог вручную выбрать капитан другой команды (uq_teams_name)
+                taken = set((await session.execute(
+                    select(Team.name).where(Team.name.in_(names.values()))
+                )).scalars().all())
+                for team in teams:
+                    name = names[team.id]
+                    team.name = f"{name} (авто)" if name in taken else name
+                await session.execute(
+                    update(User),
+                    [
+                        {"id": user_id, "team_id": team.id, "participant_status": ParticipantStatus.IN_TEAM}
+                        for team, group in zip(teams, groups)
+                        for user_id in group
+                    ]
+                )
+            return teams, sum(len(group) for group in groups)
+
+    async def get_mentor_assignment_snapshot(self) -> Tuple[List, List]:
+        """Снимок для распределения менторов: (команды без ментора, менторы с загрузкой).
+
+        Оба запроса читаются в одной транзакции REPEATABLE READ, поэтому видят
+        одно и то же состояние базы. Команды — (id, name, timezone, telegram_id капитана),
+        менторы — (id, full_name, timezone, telegram_id, load).
+        """
+        teams_stmt = (
+            select(Team.id, Team.name, User.timezone, User.telegram_id)
+            .join(User, User.id == Team.captain_id)
+            .where(Team.mentor_id == None)
+            .order_by(Team.id)
+        )
+        mentors_stmt = (
+            select(
+                User.id, User.full_name, User.timezone, User.telegram_id,
+                func.count(Team.id).label("load")
+            )
+            .outerjoin(Team, Team.mentor_id == User.id)
+            .where(User.role == UserRole.MENTOR, User.is_active == True)
+            .group_by(User.id)
+            .order_by(User.id)
+        )
+
+        async with get_db() as session:
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            teams = (await session.execute(teams_stmt)).all()
+            mentors = (await session.execute(mentors_stmt)).all()
+            return teams, mentors
+
+    async def bulk_assign_mentors(self, assignment: Dict[int, int]) -> List[int]:
+        """Назначает менторов командам одним UPDATE и возвращает id обновлённых команд.
+
+        Команды, которые успели получить ментора после снимка, не перезаписываются.
+        """
+        if not assignment:
+            return []
+
+        stmt = (
+            update(Team)
+            .where(Team.id.in_(list(assignment)), Team.mentor_id == None)
+            .values(mentor_id=case(assignment, value=Team.id))
+            .returning(Team.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            updated = list(result.scalars().all())
+            await session.commit()
+            return updated
@@ -1,6 +1,7 @@
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Optional, List, AsyncIterator, Dict
 
 from models.user import User, UserRole, ParticipantStatus
 from config.database import get_db
@@ -69,6 +70,105 @@ class UserRepository:
             result = await session.execute(stmt)
             return result.scalars().all()
 
+    async def get_reachable(self) -> List[User]:
+        """Активные пользователи, которым доставляются сообщения (для рассылок)."""
+        stmt = select(User).where(User.is_active == True, User.undeliverable_at.is_(None))
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
+    async def mark_undeliverable(self, reasons: Dict[int, str]) -> int:
+        """Помечает недоступными пользователей {telegram_id: причина}; один UPDATE на причину."""
+        by_reason: Dict[str, List[int]] = {}
+        for telegram_id, reason in reasons.items():
+            by_reason.setdefault(reason, []).append(telegram_id)
+        now = datetime.now(timezone.utc)
+        marked = 0
+        async with get_db() as session:
+            for reason, telegram_ids in by_reason.items():
+                stmt = (
+                    update(User)
+                    .where(User.telegram_id.in_(telegram_ids), User.undeliverable_at.is_(None))
+                    .values(undeliverable_at=now, undeliverable_reason=reason)
+                )
+                result = await session.execute(stmt)
+                marked += result.rowcount
+            await session.commit()
+        return marked
+
+    async def mark_deliverable(self, telegram_id: int) -> bool:
+        """Снимает отметку о недоступности (пользователь снова написал боту)."""
+        stmt = (
+            update(User)
+            .where(User.telegram_id == telegram_id, User.undeliverable_at.is_not(None))
+            .values(undeliverable_at=None, undeliverable_reason=None)
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.rowcount > 0
+
+    async def get_delivery_stats(self) -> Dict[Optional[str], int]:
+        """Число активных пользователей по причине недоступности (None — доступны)."""
+        stmt = (
+            select(User.undeliverable_reason, func.count())
+            .where(User.is_active == True)
+            .group_by(User.undeliverable_reason)
+        )
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return dict(result.all())
+
+    async def get_page(
+        self,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = 20,
+        role: Optional[UserRole] = None,
+        timezone: Optional[str] = None
+    ) -> List[User]:
+        """Возвращает страницу активных пользователей по ключу id (keyset-пагинация).
+
+        Запрашивает limit + 1 строку, чтобы вызывающий код понял, есть ли ещё страница.
+        При before_id страница читается в обратном порядке и разворачивается.
+        """
+        stmt = select(User).where(User.is_active == True)
+        if role:
+            stmt = stmt.where(User.role == role)
+        if timezone:
+            stmt = stmt.where(User.timezone == timezone)
+
+        if before_id is not None:
+            stmt = stmt.where(User.id < before_id).order_by(User.id.desc())
+        else:
+            if after_id is not None:
+                stmt = stmt.where(User.id > after_id)
+            stmt = stmt.order_by(User.id)
+        stmt = stmt.limit(limit + 1)
+
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            users = list(result.scalars().all())
+
+        if before_id is not None:
+            # лишняя (limit + 1) строка — самая ранняя, её отбрасывает сервис
+            users.reverse()
+        return users
+
+    async def iter_rows(self, columns: List[str], batch_size: int = 1000) -> AsyncIterator[tuple]:
+        """Построчно отдаёт значения колонок активных пользователей через серверный курсор."""
+        stmt = (
+            select(*[User.__table__.c[name] for name in columns])
+            .where(User.is_active == True)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async with get_db() as session:
+            result = await session.stream(stmt)
+            async for partition in result.partitions(batch_size):
+                for row in partition:
+                    yield tuple(row)
+
     async def get_all_participants(self) -> List[User]:
         """Возвращает всех участников."""
         stmt = select(User).where(
@@ -156,22 +256,47 @@ class UserRepository:
             result = await session.execute(stmt)
             return result.scalars().all()
     
-    async def get_random_active_profiles(self, limit: int = 5, exclude_user_id: Optional[int] = None) -> List[User]:
-        """Возвращает случайные активные анкеты."""
-        from sqlalchemy import func
-        
-        stmt = select(User).where(
+    async def get_profile_texts(self) -> List[tuple]:
+        """Возвращает пары (id, profile_text) для всех непустых анкет."""
+        stmt = select(User.id, User.profile_text).where(
+            User.profile_text != None,
+            User.profile_text != ""
+        )
+
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+
+    def _active_profiles_filter(self):
+        return (
             User.role == UserRole.PARTICIPANT,
             User.profile_active == True,
             User.is_active == True,
             User.team_id == None
         )
-        
+
+    async def get_active_profile_ids(self, exclude_user_id: Optional[int] = None) -> List[int]:
+        """Возвращает только id активных анкет (без загрузки самих анкет)."""
+        stmt = select(User.id).where(*self._active_profiles_filter())
+
         if exclude_user_id:
             stmt = stmt.where(User.id != exclude_user_id)
-        
-        stmt = stmt.order_by(func.random()).limit(limit)
-        
+
+        async with get_db() as session:
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+    async def get_active_profiles_by_ids(self, ids: List[int]) -> List[User]:
+        """Возвращает активные анкеты по списку id в том же порядке.
+
+        Анкеты, которые успели стать неактивными, в результат не попадают.
+        """
+        if not ids:
+            return []
+
+        stmt = select(User).where(User.id.in_(ids), *self._active_profiles_filter())
+
         async with get_db() as session:
             result = await session.execute(stmt)
-            return result.scalars().all()
\ No newline at end of file
+            by_id = {user.id: user for user in result.scalars().all()}
+        return [by_id[user_id] for user_id in ids if user_id in by_id]
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Учёт результатов доставки сообщений.
+
+Если пользователь заблокировал бота, удалил аккаунт или чат не найден,
+повторять отправку бессмысленно: каждая попытка стоит запроса к Telegram.
+Такие пользователи помечаются недоступными (users.undeliverable_at) и
+исключаются из всех рассылок, пока снова не напишут боту /start.
+"""
+from typing import Dict, Optional
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from .user_service import UserService
+
+
+# Причины недоступности и их подписи в статистике для организаторов
+UNDELIVERABLE_REASONS = {
+    "blocked": "заблокировали бота",
+    "deactivated": "удалили аккаунт",
+    "chat_not_found": "чат не найден",
+}
+
+
+def undeliverable_reason(error: Exception) -> Optional[str]:
+    """Причина, по которой пользователю больше не стоит писать; None — ошибка временная."""
+    message = str(error).lower()
+    if isinstance(error, TelegramForbiddenError):
+        return "deactivated" if "deactivated" in message else "blocked"
+    if isinstance(error, TelegramBadRequest) and "chat not found" in message:
+        return "chat_not_found"
+    return None
+
+
+class DeliveryStats:
+    """Счётчики доставки с момента запуска процесса."""
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.undeliverable = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"delivered": self.delivered, "failed": self.failed, "undeliverable": self.undeliverable}
+
+
+# Общие счётчики процесса, их пополняют все рассылки
+delivery_stats = DeliveryStats()
+
+
+class DeliveryReport:
+    """Итог одной рассылки: сколько доставлено и кого больше не достать.
+
+    save() помечает недоступных одним запросом после рассылки.
+    """
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.undeliverable: Dict[int, str] = {}
+
+    def success(self) -> None:
+        self.delivered += 1
+        delivery_stats.delivered += 1
+
+    def failure(self, chat_id: int, error: Exception) -> Optional[str]:
+        """Учитывает ошибку отправки; возвращает причину недоступности, если она постоянная."""
+        reason = undeliverable_reason(error)
+        if reason:
+            self.undeliverable[int(chat_id)] = reason
+            delivery_stats.undeliverable += 1
+        else:
+            self.failed += 1
+            delivery_stats.failed += 1
+        return reason
+
+    async def save(self) -> None:
+        if self.undeliverable:
+            undeliverable, self.undeliverable = self.undeliverable, {}
+            await UserService().mark_undeliverable(undeliverable)
@@ -0,0 +1,75 @@
+"""
+Недоставленный остаток рассылок.
+
+Если бот останавливается посреди рассылки, RateLimitedSender не бросает
+оставшихся получателей: пары (chat_id, text) сохраняются в shared_state,
+а следующий запущенный процесс забирает их и досылает. Для рассылки опроса
+сохраняются id опроса и пары (user_id, chat_id) оставшихся получателей. Остаток хранится в
+БД независимо от STATE_BACKEND — иначе он не пережил бы перезапуск.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from repositories.shared_state_repository import SharedStateRepository
+
+logger = logging.getLogger(__name__)
+
+FANOUT_PREFIX = "fanout:"
+POLL_FANOUT_PREFIX = "fanout-poll:"
+
+# Рассылку старше суток досылать уже незачем
+FANOUT_TTL = timedelta(hours=24)
+
+
+class FanoutJobStore:
+    """Сохраняет и выдаёт остатки прерванных рассылок."""
+
+    def __init__(self, repository: Optional[SharedStateRepository] = None):
+        self.repo = repository or SharedStateRepository()
+
+    async def _save(self, prefix: str, value: dict, count: int) -> bool:
+        now = datetime.now(timezone.utc)
+        value["saved_at"] = now.isoformat()
+        try:
+            await self.repo.set(prefix + uuid4().hex, value, now + FANOUT_TTL)
+        except Exception as e:
+            logger.error(f"Не удалось сохранить остаток рассылки ({count} получателей): {e}")
+            return False
+        logger.info(f"Остаток рассылки сохранён: {count} получателей")
+        return True
+
+    async def checkpoint(self, messages: Sequence[Tuple[int, str]]) -> bool:
+        """Сохраняет неотправленные сообщения; False — сохранить не удалось (ошибка в логе)."""
+        if not messages:
+            return True
+        value = {"messages": [[int(chat_id), text] for chat_id, text in messages]}
+        return await self._save(FANOUT_PREFIX, value, len(messages))
+
+    async def checkpoint_poll(self, poll_id: int, recipients: Sequence[Tuple[int, int]]) -> bool:
+        """Сохраняет получателей опроса poll_id, которым он ещё не отправлен."""
+        if not recipients:
+            return True
+        value = {
+            "poll_id": poll_id,
+            "recipients": [[int(user_id), int(chat_id)] for user_id, chat_id in recipients],
+        }
+        return await self._save(POLL_FANOUT_PREFIX, value, len(recipients))
+
+    async def take_all(self) -> List[List[Tuple[int, str]]]:
+        """Забирает все сохранённые остатки; другой воркер их уже не получит."""
+        values = await self.repo.take_prefix(FANOUT_PREFIX)
+        return [[(int(chat_id), text) for chat_id, text in value["messages"]] for value in values]
+
+    async def take_polls(self) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """Забирает сохранённые рассылки опросов: пары (poll_id, получатели)."""
+        values = await self.repo.take_prefix(POLL_FANOUT_PREFIX)
+        return [
+            (value["poll_id"], [(int(user_id), int(chat_id)) for user_id, chat_id in value["recipients"]])
+            for value in values
+        ]
+
+
+# Общее хранилище остатков рассылок
+fanout_jobs = FanoutJobStore()
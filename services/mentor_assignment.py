@@ -0,0 +1,75 @@
+"""
+Распределение команд без ментора между менторами.
+
+Сначала считается наименьшая достижимая максимальная загрузка — больше
+неё ни один ментор команд не получит. Команды обрабатываются начиная с тех,
+у кого меньше всего подходящих по часовому поясу менторов; каждой достаётся
+наименее загруженный из подходящих, при равной загрузке — ближайший по
+поясу. Если все подходящие уже набрали предел, команда достаётся наименее
+загруженному ментору из всех: совпадение поясов желательно, а ограничение
+загрузки обязательно.
+"""
+from typing import Dict, List, Sequence
+
+from services.timezones import utc_offset_hours
+
+
+# Максимальная разница поясов (часы), при которой ментор и команда пересекаются по рабочему времени
+MAX_TZ_GAP = 4
+
+
+def assign_mentors(
+    teams: Sequence,
+    mentors: Sequence,
+    loads: Dict[int, int],
+    max_tz_gap: int = MAX_TZ_GAP
+) -> Dict[int, int]:
+    """Возвращает {team_id: mentor_id}.
+
+    teams и mentors — объекты с полями id и timezone,
+    loads — текущее число команд у каждого ментора.
+    Если подходящих по поясу менторов нет или все они набрали предельную
+    загрузку, команда достаётся наименее загруженному ментору из всех.
+    """
+    if not mentors:
+        return {}
+
+    loads = {mentor.id: loads.get(mentor.id, 0) for mentor in mentors}
+    mentor_offsets = {mentor.id: utc_offset_hours(mentor.timezone) for mentor in mentors}
+
+    def compatible(team_offset: float) -> List[int]:
+        return [
+            mentor_id for mentor_id, offset in mentor_offsets.items()
+            if abs(offset - team_offset) <= max_tz_gap
+        ]
+
+    cap = max_load_bound(loads, len(teams))
+
+    prepared = []
+    for team in teams:
+        offset = utc_offset_hours(team.timezone)
+        prepared.append((team.id, offset, compatible(offset)))
+    prepared.sort(key=lambda item: (len(item[2]) or len(mentor_offsets), item[0]))
+
+    assignment: Dict[int, int] = {}
+    for team_id, offset, compatible_ids in prepared:
+        candidates = [m for m in compatible_ids if loads[m] < cap] or list(mentor_offsets)
+        mentor_id = min(
+            candidates,
+            key=lambda m: (loads[m], abs(mentor_offsets[m] - offset), m)
+        )
+        assignment[team_id] = mentor_id
+        loads[mentor_id] += 1
+    return assignment
+
+
+def max_load_bound(loads: Dict[int, int], teams_count: int) -> int:
+    """Наименьшая максимальная загрузка, при которой все новые команды помещаются.
+
+    Команды, уже закреплённые за менторами, не перераспределяются: ментор с
+    загрузкой выше предела просто новых не получает.
+    """
+    cap = 0
+    while sum(max(0, cap - load) for load in loads.values()) < teams_count:
+        cap += 1
+    return cap
@@ -1,11 +1,11 @@
 """
 Сервис для работы с уведомлениями.
 """
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+from datetime import date, datetime
 
 from repositories.notification_repository import NotificationSettingsRepository
-from models.notification_settings import NotificationSettings
+from models.notification_settings import DefaultNotificationSettings, NotificationSettings
 
 
 class NotificationType:
@@ -13,6 +13,7 @@ class NotificationType:
     NEW_EVENT = "new_event"
     EVENT_UPDATED = "event_updated"
     EVENT_CANCELLED = "event_cancelled"
+    DAILY_DIGEST = "daily_digest"
 
 
 class NotificationService:
@@ -25,6 +26,16 @@ class NotificationService:
         """Получает или создаёт настройки уведомлений пользователя."""
         return await self.notification_repo.get_or_create_settings(user_id)
     
+    async def get_settings(self, user_id: int) -> Union[NotificationSettings, DefaultNotificationSettings]:
+        """Настройки для чтения: сохранённые или значения по умолчанию, без записи в БД."""
+        return await self.notification_repo.get_settings(user_id)
+    
+    async def get_settings_bulk(
+        self, user_ids: Sequence[int]
+    ) -> Dict[int, Union[NotificationSettings, DefaultNotificationSettings]]:
+        """Настройки многих пользователей одним запросом (см. get_settings)."""
+        return await self.notification_repo.get_settings_bulk(user_ids)
+    
     async def toggle_enabled(self, user_id: int) -> NotificationSettings:
         """Переключает общую доступность уведомлений."""
         return await self.notification_repo.toggle_enabled(user_id)
@@ -45,9 +56,25 @@ class NotificationService:
         """Переключает уведомления об отмене событий."""
         return await self.notification_repo.toggle_event_cancelled(user_id)
     
+    async def toggle_digest(self, user_id: int) -> NotificationSettings:
+        """Переключает режим ежедневной сводки."""
+        return await self.notification_repo.toggle_digest(user_id)
+    
+    async def set_digest_hour(self, user_id: int, hour: int) -> NotificationSettings:
+        """Меняет час отправки ежедневной сводки."""
+        return await self.notification_repo.set_digest_hour(user_id, hour)
+    
+    async def get_digest_recipients(self) -> list:
+        """Получатели ежедневной сводки вместе с ролью, поясом и часом отправки."""
+        return await self.notification_repo.get_digest_recipients()
+    
+    async def mark_digest_sent(self, user_ids: List[int], day: date) -> None:
+        """Отмечает отправку сводки за день."""
+        await self.notification_repo.mark_digest_sent(user_ids, day)
+    
     async def should_send_notification(self, user_id: int, notification_type: str) -> bool:
         """Проверяет, нужно ли отправлять уведомление пользователю."""
-        settings = await self.get_or_create_settings(user_id)
+        settings = await self.get_settings(user_id)
         return settings.is_enabled_for_type(notification_type)
     
     def add_sent_reminder(self, user_id: int, event_id: int, reminder_minutes: int) -> None:
@@ -62,15 +89,15 @@ class NotificationService:
         key = f"{event_id}:{reminder_minutes}"
         return user_id in self.sent_reminders and key in self.sent_reminders[user_id]
     
+    async def get_audience(self, notification_type: str,
+                           visibility: Optional[Sequence[str]] = None) -> list:
+        """Все, кому нужно отправить уведомление (с учётом ролей события): строки (telegram_id, role, timezone)."""
+        return await self.notification_repo.get_audience(notification_type, visibility)
+    
     async def get_users_for_notification(self, notification_type: str, 
                                        users: List["User"]) -> List["User"]:
         """Фильтрует пользователей, которым нужно отправить уведомление."""
-        from models.user import User
-        
-        filtered_users = []
-        
-        for user in users:
-            if await self.should_send_notification(user.id, notification_type):
-                filtered_users.append(user)
-        
-        return filtered_users
\ No newline at end of file
+        allowed = set(await self.notification_repo.filter_user_ids(
+            notification_type, [user.id for user in users]
+        ))
+        return [user for user in users if user.id in allowed]
\ No newline at end of file
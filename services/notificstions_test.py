@@ -1,9 +1,10 @@
 import pytest
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import bot.services.notifications as notif
+from models.notification_settings import DEFAULT_NOTIFICATION_SETTINGS, DefaultNotificationSettings
 
 
 # ---------- FAKES ----------
@@ -16,7 +17,8 @@ class FakeBot:
 
 
 class FakeUser:
-    def __init__(self, telegram_id="1", role="participant", timezone="UTC+3"):
+    def __init__(self, telegram_id="1", role="participant", timezone="UTC+3", id=1):
+        self.id = id
         self.telegram_id = telegram_id
         self.role = role
         self.timezone = timezone
@@ -24,9 +26,9 @@ class FakeUser:
 
 @pytest.fixture(autouse=True)
 def clear_storage():
-    notif.notifications_storage["sent_reminders"].clear()
+    notif.state_backend.clear()
     yield
-    notif.notifications_storage["sent_reminders"].clear()
+    notif.state_backend.clear()
 
 
 # ---------- BASIC ----------
@@ -44,12 +46,12 @@ async def test_send_notification_disabled(monkeypatch):
     bot = FakeBot()
 
     async def fake_settings(_):
-        return {"enabled": False}
+        return DefaultNotificationSettings(enabled=False)
 
     monkeypatch.setattr(
         notif,
         "NotificationService",
-        lambda: SimpleNamespace(get_or_create_settings=fake_settings),
+        lambda: SimpleNamespace(get_settings=fake_settings),
     )
 
     res = await notif.send_notification(bot, "1", "T", "M")
@@ -62,12 +64,12 @@ async def test_send_notification_success(monkeypatch):
     bot = FakeBot()
 
     async def fake_settings(_):
-        return {"enabled": True}
+        return DEFAULT_NOTIFICATION_SETTINGS
 
     monkeypatch.setattr(
         notif,
         "NotificationService",
-        lambda: SimpleNamespace(get_or_create_settings=fake_settings),
+        lambda: SimpleNamespace(get_settings=fake_settings),
     )
 
     res = await notif.send_notification(bot, "1", "Hello", "World")
@@ -88,17 +90,17 @@ async def test_check_and_send_reminders(monkeypatch):
         return [{
             "id": "e1",
             "title": "Meet",
-            "start_time": datetime.utcnow() + timedelta(minutes=5),
-            "creator_timezone": "UTC+0"
+            # чуть меньше 5 минут: снимок читается позже, чем проверка берёт текущее время
+            "start_utc": datetime.now(timezone.utc) + timedelta(minutes=5, seconds=-10),
+            "start_time_local": datetime.utcnow() + timedelta(minutes=5),
         }]
 
-    async def fake_settings(_):
-        return {"enabled": True, "reminder_minutes": [5]}
+    async def fake_settings(user_ids):
+        return {user_id: DefaultNotificationSettings(reminder_minutes=(5,)) for user_id in user_ids}
 
-    monkeypatch.setattr(notif, "UserService", lambda: SimpleNamespace(get_all=fake_users))
-    monkeypatch.setattr(notif, "ScheduleService", lambda: SimpleNamespace(get_events_for_role=fake_events))
-    monkeypatch.setattr(notif, "NotificationService", lambda: SimpleNamespace(get_or_create_settings=fake_settings))
-    monkeypatch.setitem(notif.TIMEZONE_OFFSETS, "UTC+0", 0)
+    monkeypatch.setattr(notif, "UserService", lambda: SimpleNamespace(get_reachable=fake_users))
+    monkeypatch.setattr(notif, "ScheduleService", lambda: SimpleNamespace(get_schedule_snapshot=fake_events))
+    monkeypatch.setattr(notif, "NotificationService", lambda: SimpleNamespace(get_settings_bulk=fake_settings))
 
     await notif.check_and_send_reminders(bot)
     assert len(bot.sent) == 1
@@ -109,7 +111,7 @@ async def test_check_and_send_reminders(monkeypatch):
 async def test_notify_new_event(monkeypatch):
     user = FakeUser()
 
-    async def fake_users():
+    async def fake_audience(notification_type, visibility):
         return [user]
 
     called = []
@@ -118,7 +120,7 @@ async def test_notify_new_event(monkeypatch):
         called.append(kwargs["user_role"])
         return True
 
-    monkeypatch.setattr(notif, "UserService", lambda: SimpleNamespace(get_all=fake_users))
+    monkeypatch.setattr(notif, "NotificationService", lambda: SimpleNamespace(get_audience=fake_audience))
     monkeypatch.setattr(notif, "send_notification", fake_send)
     monkeypatch.setattr(
         notif,
@@ -139,10 +141,10 @@ async def test_notify_new_event(monkeypatch):
 async def test_notify_event_updated(monkeypatch):
     user = FakeUser()
 
-    async def fake_users():
+    async def fake_audience(notification_type, visibility):
         return [user]
 
-    monkeypatch.setattr(notif, "UserService", lambda: SimpleNamespace(get_all=fake_users))
+    monkeypatch.setattr(notif, "NotificationService", lambda: SimpleNamespace(get_audience=fake_audience))
     monkeypatch.setattr(notif, "send_notification", lambda *a, **k: asyncio.sleep(0))
 
     await notif.notify_event_updated(
@@ -161,10 +163,10 @@ async def test_notify_event_updated(monkeypatch):
 async def test_notify_event_cancelled(monkeypatch):
     user = FakeUser()
 
-    async def fake_users():
+    async def fake_audience(notification_type, visibility):
         return [user]
 
-    monkeypatch.setattr(notif, "UserService", lambda: SimpleNamespace(get_all=fake_users))
+    monkeypatch.setattr(notif, "NotificationService", lambda: SimpleNamespace(get_audience=fake_audience))
     monkeypatch.setattr(notif, "send_notification", lambda *a, **k: asyncio.sleep(0))
 
     await notif.notify_event_cancelled(
@@ -0,0 +1,239 @@
+"""
+Индекс для подбора тиммейтов по тексту анкеты.
+
+TF-IDF по токенам из profile_text и косинусная близость. Векторы анкет
+хранятся разреженно (term -> вес) вместе с обратным индексом term -> user_id,
+поэтому запрос проходит только по анкетам с общими навыками.
+
+Тиммейта ищут не двойника, а того, кто дополнит команду: top_complementary()
+берёт анкеты с близостью не ниже MIN_SIMILARITY (есть общий контекст) и
+ранжирует их по доле навыков кандидата, которых нет в анкете пользователя.
+
+Индекс живёт в памяти процесса и обновляется по одной анкете: пересчитывается
+только её вектор и частоты её терминов. Веса остальных анкет считаются по
+чуть устаревшему idf и пересчитываются целиком, когда правок с последнего
+пересчёта набирается больше IDF_REFRESH_RATIO от числа анкет. Если воркеров
+несколько, правка анкеты публикует новую версию в общем хранилище, и
+остальные воркеры перестраивают индекс не позже чем через
+SHARED_SYNC_INTERVAL секунд.
+"""
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from services.shared_state import state_backend
+
+
+TOKEN_RE = re.compile(r"[a-zа-яё0-9][a-zа-яё0-9+#.]*")
+
+# Служебные слова, которые встречаются почти в каждой анкете
+STOP_WORDS = {
+    "и", "в", "во", "на", "с", "со", "по", "к", "у", "о", "об", "от", "до", "за",
+    "из", "для", "не", "но", "а", "или", "что", "как", "это", "я", "мы", "мне",
+    "меня", "мой", "моя", "есть", "быть", "хочу", "ищу", "умею", "опыт", "год",
+    "лет", "the", "and", "or", "in", "of", "to", "with", "a", "an", "i", "am",
+}
+
+# Ключ общей версии анкет и как часто воркер её сверяет (секунды)
+SHARED_VERSION_KEY = "profiles:version"
+SHARED_SYNC_INTERVAL = 5
+
+# Минимальная близость, при которой анкета считается относящейся к делу
+MIN_SIMILARITY = 0.05
+
+# Доля изменённых анкет, после которой векторы всех анкет пересчитываются по новому idf
+IDF_REFRESH_RATIO = 0.1
+IDF_REFRESH_MIN = 50
+
+# Русские слова обрезаются до основы, чтобы "бэкенд" и "бэкендом" совпадали
+STEM_LENGTH = 6
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Разбивает текст анкеты на нормализованные токены-навыки."""
+    if not text:
+        return []
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower().replace("ё", "е")):
+        token = token.rstrip(".")
+        if len(token) < 2 or token in STOP_WORDS:
+            continue
+        if re.search(r"[а-я]", token):
+            token = token[:STEM_LENGTH]
+        tokens.append(token)
+    return tokens
+
+
+class ProfileMatchingIndex:
+    """In-memory TF-IDF индекс анкет с инкрементальным обновлением."""
+
+    def __init__(self, backend=None):
+        self.ready = False
+        self._backend = backend
+        self._shared_version: Optional[str] = None
+        self._synced_at = 0.0
+        self._term_counts: Dict[int, Counter] = {}
+        self._doc_freq: Counter = Counter()
+        self._postings: Dict[str, Set[int]] = {}
+        # Нормированные векторы, посчитанные по idf на момент расчёта
+        self._vectors: Dict[int, Dict[str, float]] = {}
+        self._vectors_ready = False
+        # Правки анкет с последнего полного пересчёта векторов
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._term_counts)
+
+    def build(self, profiles: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """Строит индекс с нуля по парам (user_id, profile_text)."""
+        self._term_counts.clear()
+        self._doc_freq.clear()
+        self._postings.clear()
+        self._vectors.clear()
+        self._vectors_ready = False
+        for user_id, text in profiles:
+            self._add(user_id, text)
+        self.ready = True
+
+    def update(self, user_id: int, text: Optional[str]) -> None:
+        """Заменяет анкету пользователя в индексе."""
+        self._remove(user_id)
+        self._add(user_id, text)
+        self._refresh_row(user_id)
+
+    def remove(self, user_id: int) -> None:
+        """Убирает анкету пользователя из индекса."""
+        self._remove(user_id)
+        self._refresh_row(user_id)
+
+    def _refresh_row(self, user_id: int) -> None:
+        if not self._vectors_ready:
+            return
+        self._stale += 1
+        if self._stale > max(IDF_REFRESH_MIN, len(self._term_counts) * IDF_REFRESH_RATIO):
+            # idf заметно сдвинулся — векторы всех анкет пересчитаются при следующем запросе
+            self._vectors.clear()
+            self._vectors_ready = False
+            return
+        counts = self._term_counts.get(user_id)
+        if counts:
+            self._vectors[user_id] = self._vectorize(counts)
+        else:
+            self._vectors.pop(user_id, None)
+
+    @property
+    def _shared(self) -> bool:
+        return self._backend is not None and self._backend.shared
+
+    async def publish(self) -> None:
+        """Сообщает остальным воркерам, что анкеты изменились."""
+        if self._shared:
+            self._shared_version = uuid4().hex
+            self._synced_at = time.monotonic()
+            await self._backend.set(SHARED_VERSION_KEY, self._shared_version)
+
+    async def sync(self) -> None:
+        """Помечает индекс к перестройке, если анкеты меняли на другом воркере."""
+        if not self._shared or time.monotonic() - self._synced_at < SHARED_SYNC_INTERVAL:
+            return
+        self._synced_at = time.monotonic()
+        shared_version = await self._backend.get(SHARED_VERSION_KEY)
+        if shared_version != self._shared_version:
+            self._shared_version = shared_version
+            self.ready = False
+
+    def top_k(self, text: Optional[str], k: int = 5, exclude: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """Возвращает k анкет, наиболее близких к тексту: [(user_id, score)]."""
+        scores = {user_id: similarity for user_id, (similarity, _) in self._score(text, exclude).items()}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+    def top_complementary(
+        self, text: Optional[str], k: int = 5, exclude: Optional[Set[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """Возвращает k анкет, лучше всего дополняющих текст: [(user_id, доля новых навыков)].
+
+        Учитываются анкеты с близостью не ниже MIN_SIMILARITY; при равной доле
+        новых навыков выше та, что ближе.
+        """
+        ranked = sorted(
+            (
+                (user_id, similarity, novelty)
+                for user_id, (similarity, novelty) in self._score(text, exclude).items()
+                if similarity >= MIN_SIMILARITY and novelty > 0
+            ),
+            key=lambda item: (-item[2], -item[1], item[0]),
+        )
+        return [(user_id, novelty) for user_id, _, novelty in ranked[:k]]
+
+    def _score(self, text: Optional[str], exclude: Optional[Set[int]]) -> Dict[int, Tuple[float, float]]:
+        """{user_id: (косинусная близость, доля веса анкеты вне текста)} по анкетам с общими терминами."""
+        query = self._vectorize(Counter(tokenize(text)))
+        if not query:
+            return {}
+        if not self._vectors_ready:
+            self._precompute()
+
+        exclude = exclude or set()
+        similarity: Dict[int, float] = {}
+        shared_mass: Dict[int, float] = {}
+        for term, weight in query.items():
+            for user_id in self._postings.get(term, ()):
+                if user_id in exclude:
+                    continue
+                profile_weight = self._vectors[user_id][term]
+                similarity[user_id] = similarity.get(user_id, 0.0) + weight * profile_weight
+                shared_mass[user_id] = shared_mass.get(user_id, 0.0) + profile_weight * profile_weight
+        return {
+            user_id: (value, max(0.0, 1.0 - shared_mass[user_id]))
+            for user_id, value in similarity.items()
+        }
+
+    def _add(self, user_id: int, text: Optional[str]) -> None:
+        counts = Counter(tokenize(text))
+        if not counts:
+            return
+        self._term_counts[user_id] = counts
+        for term in counts:
+            self._doc_freq[term] += 1
+            self._postings.setdefault(term, set()).add(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        counts = self._term_counts.pop(user_id, None)
+        if not counts:
+            return
+        for term in counts:
+            self._doc_freq[term] -= 1
+            if self._doc_freq[term] <= 0:
+                del self._doc_freq[term]
+            postings = self._postings.get(term)
+            if postings:
+                postings.discard(user_id)
+                if not postings:
+                    del self._postings[term]
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._term_counts)) / (1 + self._doc_freq.get(term, 0))) + 1
+
+    def _vectorize(self, counts: Counter) -> Dict[str, float]:
+        vector = {
+            term: (1 + math.log(count)) * self._idf(term)
+            for term, count in counts.items()
+            if term in self._doc_freq
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            return {}
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def _precompute(self) -> None:
+        self._vectors = {user_id: self._vectorize(counts) for user_id, counts in self._term_counts.items()}
+        self._vectors_ready = True
+        self._stale = 0
+
+
+# Общий индекс процесса; сверяется с другими воркерами через общее хранилище
+profile_index = ProfileMatchingIndex(state_backend)
@@ -0,0 +1,159 @@
+"""
+Снимки расписания по ролям и их выгрузка в iCalendar.
+
+ScheduleSnapshotCache хранит то, что одинаково для всех пользователей с
+одной ролью и часовым поясом: список событий с локальным временем, готовый
+.ics и file_id уже отправленного файла. Любое изменение событий увеличивает
+версию кэша, и снимки пересобираются при следующем обращении. Если воркеров
+несколько, изменение публикуется в общем хранилище, и остальные воркеры
+сбрасывают свои снимки не позже чем через SHARED_SYNC_INTERVAL секунд.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from uuid import uuid4
+
+from services.shared_state import state_backend
+from services.timezones import iana_name
+
+
+PRODID = "-//Hackathon Bot//Schedule//RU"
+CALENDAR_NAME = "Расписание хакатона"
+
+# Как часто календарные приложения перечитывают подписку
+REFRESH_INTERVAL = "PT1H"
+
+# Ключ общей версии расписания и как часто воркер её сверяет (секунды)
+SHARED_VERSION_KEY = "schedule:version"
+SHARED_SYNC_INTERVAL = 5
+
+
+class ScheduleSnapshotCache:
+    """Кэш значений по ключу, сбрасываемый целиком через invalidate()."""
+
+    def __init__(self, backend=None):
+        self.version = 0
+        self._values: Dict[Hashable, Tuple[int, Any]] = {}
+        self._backend = backend
+        self._shared_version: Optional[str] = None
+        self._synced_at = 0.0
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._values.clear()
+
+    @property
+    def _shared(self) -> bool:
+        return self._backend is not None and self._backend.shared
+
+    async def invalidate_everywhere(self) -> None:
+        """Сбрасывает кэш в этом процессе и сообщает об изменении остальным воркерам."""
+        self.invalidate()
+        if self._shared:
+            self._shared_version = uuid4().hex
+            self._synced_at = time.monotonic()
+            await self._backend.set(SHARED_VERSION_KEY, self._shared_version)
+
+    async def _sync(self) -> None:
+        if not self._shared or time.monotonic() - self._synced_at < SHARED_SYNC_INTERVAL:
+            return
+        self._synced_at = time.monotonic()
+        shared_version = await self._backend.get(SHARED_VERSION_KEY)
+        if shared_version != self._shared_version:
+            self._shared_version = shared_version
+            self.invalidate()
+
+    def peek(self, key: Hashable) -> Any:
+        entry = self._values.get(key)
+        return entry[1] if entry and entry[0] == self.version else None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._values[key] = (self.version, value)
+
+    async def get(self, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Any:
+        """Значение из кэша; если его нет или версия устарела — build()."""
+        await self._sync()
+        entry = self._values.get(key)
+        if entry and entry[0] == self.version:
+            return entry[1]
+        version = self.version
+        value = await build()
+        # пока строили, расписание могли изменить — такой снимок не сохраняем
+        if version == self.version:
+            self._values[key] = (version, value)
+        return value
+
+
+# Общий кэш процесса; сбрасывается сервисом расписания при изменениях
+schedule_snapshot = ScheduleSnapshotCache(state_backend)
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Переносит строку длиннее 75 байт (RFC 5545, 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, chunk, size, limit = [], "", 0, 75
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append(chunk)
+            chunk, size, limit = "", 0, 74
+        chunk += char
+        size += char_size
+    parts.append(chunk)
+    return "\r\n ".join(parts)
+
+
+def _utc_stamp(moment: datetime) -> str:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_ics(events: Iterable[Dict[str, Any]], user_timezone: str) -> bytes:
+    """Собирает календарь из словарей событий (Event.to_dict()).
+
+    Время пишется в UTC, поэтому файл одинаково корректен в любом поясе;
+    X-WR-TIMEZONE подсказывает приложению пояс пользователя для показа.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(CALENDAR_NAME)}",
+        f"X-PUBLISHED-TTL:{REFRESH_INTERVAL}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{REFRESH_INTERVAL}",
+    ]
+    zone_name = iana_name(user_timezone)
+    if zone_name:
+        lines.append(f"X-WR-TIMEZONE:{zone_name}")
+
+    for event in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:event-{event['id']}@hackathon-bot",
+            f"DTSTAMP:{_utc_stamp(event.get('updated_at') or event['start_utc'])}",
+            f"DTSTART:{_utc_stamp(event['start_utc'])}",
+            f"DTEND:{_utc_stamp(event['end_utc'])}",
+            f"SUMMARY:{_escape(event['title'])}",
+        ]
+        if event.get("description"):
+            lines.append(f"DESCRIPTION:{_escape(event['description'])}")
+        if event.get("location"):
+            lines.append(f"LOCATION:{_escape(event['location'])}")
+        if event.get("visibility"):
+            lines.append(f"CATEGORIES:{','.join(_escape(role) for role in event['visibility'])}")
+        lines.append("END:VEVENT")
+
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode("utf-8")
@@ -0,0 +1,282 @@
+"""
+Разбор файла расписания (CSV или iCalendar) для массового импорта событий.
+
+Файл проверяется целиком: если хотя бы одна строка некорректна, импорт не
+выполняется, а организатор получает список ошибок с номерами строк.
+Время без явного пояса считается временем в поясе организатора.
+
+CSV — заголовок и строки с колонками title, start, duration (минуты) или end,
+необязательные description, location и visibility (роли через запятую или
+пробел; по умолчанию all). Разделитель — запятая или точка с запятой.
+
+ICS — компоненты VEVENT: SUMMARY, DTSTART, DTEND или DURATION, DESCRIPTION,
+LOCATION и CATEGORIES (роли).
+"""
+import csv
+import io
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.schedule import EventVisibilityEnum
+from services.timezones import find_zone, to_local, to_utc
+
+
+MAX_EVENTS = 500
+MAX_ERRORS = 10
+
+VISIBILITY_VALUES = {item.value for item in EventVisibilityEnum}
+
+DATETIME_FORMATS = ("%d.%m.%Y %H:%M", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S")
+
+CSV_ALIASES = {
+    "title": ("title", "название"),
+    "description": ("description", "описание"),
+    "start": ("start", "start_time", "начало"),
+    "end": ("end", "end_time", "окончание"),
+    "duration": ("duration", "продолжительность"),
+    "location": ("location", "место"),
+    "visibility": ("visibility", "видимость"),
+}
+
+_ICS_DURATION_RE = re.compile(r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+
+class ScheduleImportError(ValueError):
+    """Файл не удалось разобрать; errors — сообщения по строкам."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def parse_schedule_file(content: bytes, filename: str, creator_timezone: str) -> List[Dict[str, Any]]:
+    """Возвращает события для ScheduleService.import_events или бросает ScheduleImportError."""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ScheduleImportError(["Файл должен быть в кодировке UTF-8"])
+
+    name = filename.lower()
+    if name.endswith(".csv"):
+        events, errors = parse_csv(text, creator_timezone)
+    elif name.endswith(".ics"):
+        events, errors = parse_ics(text, creator_timezone)
+    else:
+        raise ScheduleImportError(["Поддерживаются только файлы .csv и .ics"])
+
+    if not errors and not events:
+        errors.append("В файле нет событий")
+    if len(events) > MAX_EVENTS:
+        errors.append(f"Слишком много событий: {len(events)}, максимум {MAX_EVENTS}")
+    errors.extend(_duplicates(events))
+    if errors:
+        raise ScheduleImportError(errors)
+    return [event for _, event in events]
+
+
+def parse_datetime(value: str) -> datetime:
+    value = value.strip()
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"неверная дата «{value}», ожидается ДД.ММ.ГГГГ ЧЧ:ММ")
+
+
+def parse_visibility(value: Optional[str]) -> List[str]:
+    roles = [role for role in re.split(r"[\s,;]+", (value or "").strip().lower()) if role]
+    if not roles:
+        return [EventVisibilityEnum.ALL.value]
+    unknown = [role for role in roles if role not in VISIBILITY_VALUES]
+    if unknown:
+        raise ValueError(f"неизвестные роли: {', '.join(unknown)}")
+    if EventVisibilityEnum.ALL.value in roles:
+        return [EventVisibilityEnum.ALL.value]
+    return list(dict.fromkeys(roles))
+
+
+def build_event(
+    title: Optional[str],
+    start_utc: datetime,
+    end_utc: datetime,
+    creator_timezone: str,
+    description: Optional[str] = None,
+    location: Optional[str] = None,
+    visibility: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Проверяет поля и возвращает словарь события (локальное время — в поясе создателя)."""
+    title = (title or "").strip()
+    if not title:
+        raise ValueError("не указано название")
+    if len(title) > 200:
+        raise ValueError("название длиннее 200 символов")
+    if end_utc <= start_utc:
+        raise ValueError("окончание должно быть позже начала")
+    location = (location or "").strip()
+    if len(location) > 200:
+        raise ValueError("место длиннее 200 символов")
+    return {
+        "title": title,
+        "description": (description or "").strip(),
+        "start_time": to_local(start_utc, creator_timezone),
+        "end_time": to_local(end_utc, creator_timezone),
+        "start_utc": start_utc,
+        "end_utc": end_utc,
+        "location": location,
+        "visibility": visibility or [EventVisibilityEnum.ALL.value],
+    }
+
+
+def parse_csv(text: str, creator_timezone: str) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[str]]:
+    """Возвращает ([(номер строки, событие)], ошибки)."""
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+    header = next(reader, None)
+    if not header:
+        return [], ["Файл пустой"]
+
+    columns = {}
+    for index, name in enumerate(header):
+        name = name.strip().lower()
+        for field, aliases in CSV_ALIASES.items():
+            if name in aliases:
+                columns[field] = index
+    missing = [field for field in ("title", "start") if field not in columns]
+    if "end" not in columns and "duration" not in columns:
+        missing.append("duration или end")
+    if missing:
+        return [], [f"Нет колонок: {', '.join(missing)}"]
+
+    events, errors = [], []
+    for line, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+
+        def cell(field: str) -> str:
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        try:
+            start = to_utc(parse_datetime(cell("start")), creator_timezone)
+            if cell("end"):
+                end = to_utc(parse_datetime(cell("end")), creator_timezone)
+            else:
+                try:
+                    duration = int(cell("duration"))
+                except ValueError:
+                    raise ValueError(f"неверная продолжительность «{cell('duration')}»")
+                end = start + timedelta(minutes=duration)
+            events.append((line, build_event(
+                cell("title"), start, end, creator_timezone,
+                description=cell("description"),
+                location=cell("location"),
+                visibility=parse_visibility(cell("visibility")),
+            )))
+        except ValueError as e:
+            errors.append(f"Строка {line}: {e}")
+    return events, errors
+
+
+def _unfold_ics(text: str) -> List[Tuple[int, str]]:
+    """Склеивает перенесённые строки (RFC 5545, 3.1); возвращает (номер строки, строка)."""
+    lines: List[Tuple[int, str]] = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] = (lines[-1][0], lines[-1][1] + raw[1:])
+        elif raw:
+            lines.append((number, raw))
+    return lines
+
+
+def _ics_text(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _ics_datetime(value: str, params: Dict[str, str], creator_timezone: str) -> datetime:
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        raise ValueError("события на весь день не поддерживаются, укажите время")
+    moment = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return moment.replace(tzinfo=timezone.utc)
+    tz_name = params.get("TZID")
+    if tz_name and find_zone(tz_name) is None:
+        raise ValueError(f"неизвестный часовой пояс «{tz_name}»")
+    return to_utc(moment, tz_name or creator_timezone)
+
+
+def _ics_duration(value: str) -> timedelta:
+    match = _ICS_DURATION_RE.fullmatch(value.strip())
+    if not match or not any(match.groups()):
+        raise ValueError(f"неверная продолжительность «{value}»")
+    weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def parse_ics(text: str, creator_timezone: str) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[str]]:
+    """Возвращает ([(номер строки BEGIN:VEVENT, событие)], ошибки)."""
+    events, errors = [], []
+    current: Optional[Dict[str, Tuple[str, Dict[str, str]]]] = None
+    start_line = 0
+
+    for number, line in _unfold_ics(text):
+        name_part, _, value = line.partition(":")
+        name, *raw_params = name_part.split(";")
+        name = name.upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            current, start_line = {}, number
+            continue
+        if current is None:
+            continue
+        if name == "END" and value.upper() == "VEVENT":
+            try:
+                events.append((start_line, _build_ics_event(current, creator_timezone)))
+            except ValueError as e:
+                errors.append(f"Событие в строке {start_line}: {e}")
+            current = None
+            continue
+        params = dict(param.split("=", 1) for param in raw_params if "=" in param)
+        current.setdefault(name, (value, {key.upper(): val.strip('"') for key, val in params.items()}))
+
+    if not events and not errors and "BEGIN:VCALENDAR" not in text.upper():
+        errors.append("Файл не похож на iCalendar")
+    return events, errors
+
+
+def _build_ics_event(fields: Dict[str, Tuple[str, Dict[str, str]]], creator_timezone: str) -> Dict[str, Any]:
+    if "DTSTART" not in fields:
+        raise ValueError("нет DTSTART")
+    start = _ics_datetime(*fields["DTSTART"], creator_timezone)
+    if "DTEND" in fields:
+        end = _ics_datetime(*fields["DTEND"], creator_timezone)
+    elif "DURATION" in fields:
+        end = start + _ics_duration(fields["DURATION"][0])
+    else:
+        raise ValueError("нет DTEND или DURATION")
+
+    def text(name: str) -> str:
+        return _ics_text(fields[name][0]) if name in fields else ""
+
+    return build_event(
+        text("SUMMARY"), start, end, creator_timezone,
+        description=text("DESCRIPTION"),
+        location=text("LOCATION"),
+        visibility=parse_visibility(text("CATEGORIES")),
+    )
+
+
+def _duplicates(events: List[Tuple[int, Dict[str, Any]]]) -> List[str]:
+    seen: Dict[Tuple[str, datetime], int] = {}
+    errors = []
+    for line, event in events:
+        key = (event["title"].lower(), event["start_utc"])
+        if key in seen:
+            errors.append(f"Строка {line}: повторяет событие из строки {seen[key]}")
+        else:
+            seen[key] = line
+    return errors
@@ -5,9 +5,10 @@
 Соответствует оригинальному ScheduleService из кода.
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from aiogram import Bot
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from aiogram import Bot, html
 from aiogram.types import Message
 
 from repositories.schedule_repository import ScheduleRepository
@@ -15,17 +16,29 @@ from repositories.user_repository import UserRepository
 from models.schedule import Event, EventLog, EventNotification, EventChangeType
 from models.user import User, UserRole
 
+from services.schedule_calendar import render_ics, schedule_snapshot
+from services.timezones import convert, to_local_many, to_utc
+from services.delivery import DeliveryReport
+
+from .notification_service import NotificationService, NotificationType
 from .user_service import UserService
 
-TIMEZONE_OFFSETS = {
-    "UTC+3": 3, "UTC+4": 4, "UTC+5": 5, "UTC+6": 6,
-    "UTC+7": 7, "UTC+8": 8, "UTC+9": 9, "UTC+10": 10,
-}
+logger = logging.getLogger(__name__)
+
+# Сколько событий перечислять в сводке об импорте
+IMPORT_DIGEST_LIMIT = 30
 
 
 class ScheduleService:
     """Сервис для работы с расписанием."""
 
+    # Если задан (bot.services.schedule_changes), уведомления об изменениях
+    # событий копятся и рассылаются одним сообщением после паузы в правках
+    change_notifier = None
+    # Если задан (bot.services.sender.RateLimitedSender), уведомления рассылаются
+    # через него: с приоритетом рассылки и сохранением остатка при остановке бота
+    sender = None
+
     def __init__(
         self, 
         schedule_repository: ScheduleRepository | None = None,
@@ -67,6 +80,8 @@ class ScheduleService:
             description=description,
             start_time=start_time,
             end_time=end_time,
+            start_utc=to_utc(start_time, creator_timezone),
+            end_utc=to_utc(end_time, creator_timezone),
             location=location,
             visibility=visibility,
             created_by=user_id,
@@ -75,6 +90,7 @@ class ScheduleService:
         
         # Сохраняем в БД
         saved_event = await self.schedule_repo.create_event(event)
+        await schedule_snapshot.invalidate_everywhere()
         
         return saved_event.to_dict()
 
@@ -86,24 +102,40 @@ class ScheduleService:
     ) -> List[Dict[str, Any]]:
         """Возвращает события для указанной роли."""
         events = await self.schedule_repo.get_events_for_role(role, user_timezone, include_all)
-        
+        return self._localize(events, user_timezone)
+
+    async def get_schedule_snapshot(self, role: str, user_timezone: str = "UTC+3") -> List[Dict[str, Any]]:
+        """То же, что get_events_for_role, но из общего снимка для (роль, пояс).
+
+        Снимок пересобирается только после изменения событий; список общий
+        для всех вызывающих, менять его нельзя.
+        """
+        role = getattr(role, "value", role)
+        return await schedule_snapshot.get(
+            ("events", role, user_timezone),
+            lambda: self.get_events_for_role(role, user_timezone)
+        )
+
+    async def get_calendar(self, role: str, user_timezone: str = "UTC+3") -> bytes:
+        """Расписание роли в формате iCalendar (из того же снимка)."""
+        role = getattr(role, "value", role)
+
+        async def build() -> bytes:
+            return render_ics(await self.get_schedule_snapshot(role, user_timezone), user_timezone)
+
+        return await schedule_snapshot.get(("ics", role, user_timezone), build)
+
+    def _localize(self, events: List[Event], user_timezone: str) -> List[Dict[str, Any]]:
+        """Словари событий с start_time_local/end_time_local в поясе пользователя."""
+        starts = to_local_many((event.start_utc for event in events), user_timezone)
+        ends = to_local_many((event.end_utc for event in events), user_timezone)
+
         result = []
-        for event in events:
+        for event, start_local, end_local in zip(events, starts, ends):
             event_dict = event.to_dict(user_timezone)
-            start_local = self._convert_time_for_user(
-                event.start_time,
-                event.creator_timezone,
-                user_timezone
-            )
-            end_local = self._convert_time_for_user(
-                event.end_time,
-                event.creator_timezone,
-                user_timezone
-            )
             event_dict["start_time_local"] = start_local
             event_dict["end_time_local"] = end_local
             result.append(event_dict)
-        
         return result
 
     def _convert_time_for_user(
@@ -113,11 +145,7 @@ class ScheduleService:
         user_timezone: str
     ) -> datetime:
         """Конвертирует время в часовой пояс пользователя."""
-        event_offset = TIMEZONE_OFFSETS.get(event_timezone, 3)
-        user_offset = TIMEZONE_OFFSETS.get(user_timezone, 3)
-        
-        time_diff = user_offset - event_offset
-        return event_time + timedelta(hours=time_diff)
+        return convert(event_time, event_timezone, user_timezone)
 
     async def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
         """Находит событие по ID."""
@@ -167,13 +195,23 @@ class ScheduleService:
         return text
 
     async def update_event(self, event_id: int, **kwargs) -> bool:
-        """Обновляет данные события."""
+        """Обновляет данные события.
+
+        start_time/end_time задаются в поясе создателя события; UTC-копии
+        пересчитываются вместе с ними.
+        """
+        if "start_time" in kwargs or "end_time" in kwargs:
+            current = await self.schedule_repo.get_event_by_id(event_id)
+            if current is None:
+                return False
+            kwargs.update(self._utc_times(current.creator_timezone, **kwargs))
         success = await self.schedule_repo.update_event(event_id, **kwargs)
         
         if success:
+            await schedule_snapshot.invalidate_everywhere()
             # Логируем изменения
             event = await self.schedule_repo.get_event_by_id(event_id)
-            changes = kwargs
+            changes = {key: value for key, value in kwargs.items() if key not in ("start_utc", "end_utc")}
             if "start_time" in changes and isinstance(changes["start_time"], datetime):
                 changes["start_time"] = changes["start_time"].strftime("%Y-%m-%d %H:%M:%S")
             if "end_time" in changes and isinstance(changes["end_time"], datetime):
@@ -190,6 +228,15 @@ class ScheduleService:
         
         return success
 
+    @staticmethod
+    def _utc_times(creator_timezone: str, **kwargs) -> Dict[str, datetime]:
+        utc = {}
+        if kwargs.get("start_time") is not None:
+            utc["start_utc"] = to_utc(kwargs["start_time"], creator_timezone)
+        if kwargs.get("end_time") is not None:
+            utc["end_utc"] = to_utc(kwargs["end_time"], creator_timezone)
+        return utc
+
     async def delete_event(self, event_id: int) -> bool:
         """Удаляет событие."""
         event = await self.schedule_repo.get_event_by_id(event_id)
@@ -206,6 +253,7 @@ class ScheduleService:
             )
         )
         await self.schedule_repo.delete_event_hard(event_id)
+        await schedule_snapshot.invalidate_everywhere()
         
         return True
 
@@ -221,16 +269,19 @@ class ScheduleService:
     ) -> str:
         """Форматирует событие для отображения."""
         # Конвертируем время
-        start_local = self._convert_time_for_user(
-            event["start_time"],
-            event.get("creator_timezone", "UTC+3"),
-            user_timezone
-        )
-        end_local = self._convert_time_for_user(
-            event["end_time"],
-            event.get("creator_timezone", "UTC+3"),
-            user_timezone
-        )
+        if event.get("start_utc"):
+            start_local, end_local = to_local_many((event["start_utc"], event["end_utc"]), user_timezone)
+        else:
+            start_local = self._convert_time_for_user(
+                event["start_time"],
+                event.get("creator_timezone", "UTC+3"),
+                user_timezone
+            )
+            end_local = self._convert_time_for_user(
+                event["end_time"],
+                event.get("creator_timezone", "UTC+3"),
+                user_timezone
+            )
         
         start = start_local.strftime("%d.%m %H:%M")
         end = end_local.strftime("%H:%M")
@@ -317,8 +368,11 @@ class ScheduleService:
         success = await self.update_event(event_id, **kwargs)
         
         if success and changes and bot and old_event:
-            new_event = await self.schedule_repo.get_event_by_id(event_id)
-            await self._notify_event_updated(bot, new_event, changes)
+            if self.change_notifier is not None:
+                await self.change_notifier.add(event_id, changes)
+            else:
+                new_event = await self.schedule_repo.get_event_by_id(event_id)
+                await self._notify_event_updated(bot, new_event, changes)
         
         return success
 
@@ -335,6 +389,9 @@ class ScheduleService:
         
         # Сохраняем данные для уведомления
         event_data = event.to_dict()
+        if self.change_notifier is not None:
+            # об отмене сообщаем сразу, накопленные правки уже не нужны
+            await self.change_notifier.discard(event_id)
         
         success = await self.delete_event(event_id)
         
@@ -343,29 +400,145 @@ class ScheduleService:
         
         return success
 
+    # ==================== МАССОВЫЙ ИМПОРТ ====================
+
+    async def import_events(
+        self,
+        rows: List[Dict[str, Any]],
+        created_by: str = "",
+        creator_timezone: str = "UTC+3"
+    ) -> List[Event]:
+        """Создаёт проверенные события из файла (см. services.schedule_import) одной пачкой."""
+        user_id = None
+        if created_by:
+            user = await self.user_repo.get_by_telegram_id(int(created_by))
+            user_id = user.id if user else None
+        rows = [{**row, "creator_timezone": creator_timezone} for row in rows]
+        events = await self.schedule_repo.create_events_bulk(rows, changed_by=user_id)
+        await schedule_snapshot.invalidate_everywhere()
+        return events
+
+    async def build_import_digests(self, events: List[Event]) -> List[tuple]:
+        """Одна сводка на пользователя вместо уведомления о каждом событии.
+
+        Возвращает пары (chat_id, text); текст собирается один раз на пару
+        (роль, часовой пояс).
+        """
+        rendered: Dict[tuple, Optional[str]] = {}
+        messages = []
+        for user in await self._recipients(NotificationType.NEW_EVENT):
+            timezone_name = user.timezone or "UTC+3"
+            key = (user.role, timezone_name)
+            if key not in rendered:
+                visible = [
+                    event for event in events
+                    if "all" in event.visibility or user.role in event.visibility
+                ]
+                rendered[key] = self._import_digest_text(visible, timezone_name) if visible else None
+            if rendered[key]:
+                messages.append((int(user.telegram_id), rendered[key]))
+        return messages
+
+    def _import_digest_text(self, events: List[Event], user_timezone: str) -> str:
+        shown = events[:IMPORT_DIGEST_LIMIT]
+        starts = to_local_many((event.start_utc for event in shown), user_timezone)
+        lines = [
+            f"• {start.strftime('%d.%m %H:%M')} — {html.quote(event.title)}"
+            for event, start in zip(shown, starts)
+        ]
+        if len(events) > len(shown):
+            lines.append(f"… и ещё {len(events) - len(shown)}")
+        return (
+            f"📅 <b>В расписание добавлено событий: {len(events)}</b>\n"
+            f"<i>Время в вашем часовом поясе ({user_timezone})</i>\n\n" + "\n".join(lines)
+        )
+
+    # ==================== СВОДНЫЕ УВЕДОМЛЕНИЯ ОБ ИЗМЕНЕНИЯХ ====================
+
+    @staticmethod
+    def describe_changes(changes: Dict[str, Any]) -> List[str]:
+        """Подписи изменённых полей для уведомления."""
+        change_messages = []
+        if "title" in changes:
+            change_messages.append(f"Название: {html.quote(str(changes['title']))}")
+        if "start_time" in changes:
+            change_messages.append("Время начала")
+        elif "end_time" in changes:
+            change_messages.append("Продолжительность")
+        if "location" in changes:
+            change_messages.append("Место проведения")
+        if "description" in changes:
+            change_messages.append("Описание")
+        return change_messages
+
+    async def build_change_messages(self, event_id: int, changes: Dict[str, Any]) -> List[tuple]:
+        """Одно сообщение «✏️ Изменение в расписании» на пользователя по всем правкам события.
+
+        Возвращает пары (chat_id, text); текст собирается один раз на часовой
+        пояс. Пусто, если событие удалено или значимых правок нет.
+        """
+        change_messages = self.describe_changes(changes)
+        event = await self.schedule_repo.get_event_by_id(event_id)
+        if not change_messages or not event or not event.is_active:
+            return []
+        event_dict = event.to_dict()
+
+        rendered: Dict[str, str] = {}
+        messages = []
+        for user in await self._recipients(NotificationType.EVENT_UPDATED, event.visibility):
+            if not ("all" in event.visibility or user.role in event.visibility):
+                continue
+            timezone_name = user.timezone or "UTC+3"
+            if timezone_name not in rendered:
+                rendered[timezone_name] = (
+                    "✏️ <b>Изменение в расписании</b>\n\n"
+                    f"Изменения: {', '.join(change_messages)}\n\n"
+                    f"{self.format_event_for_display(event_dict, timezone_name)}"
+                )
+            messages.append((int(user.telegram_id), rendered[timezone_name]))
+        return messages
+
+    async def _recipients(self, notification_type: str, visibility: Optional[List[str]] = None) -> list:
+        """Получатели, которым по их настройкам положено уведомление notification_type.
+
+        Аудитория (с учётом ролей, выключенных типов и режима сводки) считается
+        одним запросом, он же возвращает telegram_id, роль и часовой пояс.
+        """
+        return await NotificationService().get_audience(notification_type, visibility)
+
     # ==================== ПРИВАТНЫЕ МЕТОДЫ ДЛЯ УВЕДОМЛЕНИЙ ====================
 
+    async def _deliver(self, bot: Bot, messages: Iterable[Tuple[int, str]]) -> int:
+        """Рассылает пары (chat_id, text); возвращает число доставленных."""
+        if self.sender is not None:
+            return await self.sender(bot).send_many(messages)
+        report = DeliveryReport()
+        for chat_id, text in messages:
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, parse_mode="HTML")
+                report.success()
+            except Exception as e:
+                if not report.failure(chat_id, e):
+                    logger.error(f"Ошибка отправки уведомления пользователю {chat_id}: {e}")
+        await report.save()
+        return report.delivered
+
     async def _notify_new_event(
         self, 
         bot: Bot, 
         event: Event
     ):
         """Отправляет уведомления о новом событии."""
-        # Получаем пользователей, которым нужно отправить уведомление
-        # if "all" in event.visibility:
-        #     print(event.visibility)
-            # Временно: используем temp_users_storage
-        users = await UserService().get_all()
-        for user in users:
-            try:
-                if user.role in event.visibility or "all" in event.visibility:
-                    await bot.send_message(
-                        chat_id=int(user.telegram_id),
-                        text=f"📅 <b>Новое событие!</b>\n\n{self.format_event_for_display(event.to_dict(), user.timezone if user.timezone else 'UTC+3')}",
-                        parse_mode="HTML"
-                    )
-            except Exception as e:
-                print(f"Error sending notification to {user.telegram_id}: {e}")
+        event_dict = event.to_dict()
+        messages = [
+            (
+                int(user.telegram_id),
+                f"📅 <b>Новое событие!</b>\n\n{self.format_event_for_display(event_dict, user.timezone if user.timezone else 'UTC+3')}",
+            )
+            for user in await self._recipients(NotificationType.NEW_EVENT, event.visibility)
+            if user.role in event.visibility or "all" in event.visibility
+        ]
+        await self._deliver(bot, messages)
 
     async def _notify_event_updated(
         self,
@@ -375,33 +548,23 @@ class ScheduleService:
     ):
         """Отправляет уведомления об изменении события."""
         # Определяем, что изменилось
-        change_messages = []
-        if "title" in changes:
-            change_messages.append(f"Название: {changes['title']}")
-        if "start_time" in changes:
-            change_messages.append(f"Время начала")
-        if "location" in changes:
-            change_messages.append(f"Место проведения")
-        if "description" in changes:
-            change_messages.append(f"Описание")
+        change_messages = self.describe_changes(changes)
         
         if not change_messages:
             return
         
-        # Отправляем уведомления
-        users = await UserService().get_all()
-        for user in users:
-            try:
-                if user.role in event.visibility or "all" in event.visibility:
-                    await bot.send_message(
-                        chat_id=int(user.telegram_id),
-                        text=f"📅 <b>Событие обновлено!</b>\n\n"
-                             f"Изменения: {', '.join(change_messages)}\n\n"
-                             f"{self.format_event_for_display(event.to_dict(), user.timezone if user.timezone else 'UTC+3')}",
-                        parse_mode="HTML"
-                    )
-            except Exception as e:
-                print(f"Error sending update notification to {user.telegram_id}: {e}")
+        event_dict = event.to_dict()
+        messages = [
+            (
+                int(user.telegram_id),
+                f"📅 <b>Событие обновлено!</b>\n\n"
+                f"Изменения: {', '.join(change_messages)}\n\n"
+                f"{self.format_event_for_display(event_dict, user.timezone if user.timezone else 'UTC+3')}",
+            )
+            for user in await self._recipients(NotificationType.EVENT_UPDATED, event.visibility)
+            if user.role in event.visibility or "all" in event.visibility
+        ]
+        await self._deliver(bot, messages)
 
     async def _notify_event_cancelled(
         self,
@@ -409,22 +572,18 @@ class ScheduleService:
         event_data: Dict[str, Any]
     ):
         """Отправляет уведомления об отмене события."""
-        users = await UserService().get_all()
-        for user in users:
-            try:
-                # Проверяем видимость события для пользователя
-                visibility = event_data.get("visibility", [])
-                
-                if "all" in visibility or user.role in visibility:
-                    await bot.send_message(
-                        chat_id=int(user.telegram_id),
-                        text=f"❌ <b>Событие отменено!</b>\n\n"
-                             f"<b>{event_data['title']}</b>\n"
-                             f"🕒 {event_data['start_time'].strftime('%d.%m %H:%M')}",
-                        parse_mode="HTML"
-                    )
-            except Exception as e:
-                print(f"Error sending cancellation notification to {user.telegram_id}: {e}")
+        visibility = event_data.get("visibility", [])
+        text = (
+            f"❌ <b>Событие отменено!</b>\n\n"
+            f"<b>{event_data['title']}</b>\n"
+            f"🕒 {event_data['start_time'].strftime('%d.%m %H:%M')}"
+        )
+        messages = [
+            (int(user.telegram_id), text)
+            for user in await self._recipients(NotificationType.EVENT_CANCELLED, visibility)
+            if "all" in visibility or user.role in visibility
+        ]
+        await self._deliver(bot, messages)
 
     # ==================== ДОПОЛНИТЕЛЬНЫЕ МЕТОДЫ ====================
 
@@ -436,45 +595,25 @@ class ScheduleService:
     ) -> List[Dict[str, Any]]:
         """Возвращает ближайшие события для роли."""
         events = await self.schedule_repo.get_upcoming_events(hours_ahead, role)
-        
-        result = []
-        for event in events:
-            event_dict = event.to_dict(user_timezone)
-            start_local = self._convert_time_for_user(
-                event.start_time,
-                event.creator_timezone,
-                user_timezone
-            )
-            end_local = self._convert_time_for_user(
-                event.end_time,
-                event.creator_timezone,
-                user_timezone
-            )
-            event_dict["start_time_local"] = start_local
-            event_dict["end_time_local"] = end_local
-            result.append(event_dict)
-        
-        return result
+        return self._localize(events, user_timezone)
 
     async def send_event_reminders(self, bot: Bot, temp_users_storage: Dict):
         """Отправляет напоминания о ближайших событиях."""
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         events = await self.schedule_repo.get_upcoming_events(1)  # События в ближайший час
+        messages = []
         
         for event in events:
             # Проверяем, что событие начнется в ближайшие 15-60 минут
-            time_until = (event.start_time - now).total_seconds() / 60
+            time_until = (event.start_utc - now).total_seconds() / 60
             if 15 <= time_until <= 60:
-                # Отправляем напоминания
-                for user in await UserService().get_all():
+                text = (
+                    f"🔔 <b>Напоминание о событии!</b>\n\n"
+                    f"Событие <b>{event.title}</b> начнется через {int(time_until)} минут\n"
+                    f"📍 {event.location if event.location else 'Место не указано'}"
+                )
+                for user in await self._recipients(NotificationType.SCHEDULE_REMINDER, event.visibility):
                     if user.role in event.visibility or "all" in event.visibility:
-                        try:
-                            await bot.send_message(
-                                chat_id=int(user.telegram_id),
-                                text=f"🔔 <b>Напоминание о событии!</b>\n\n"
-                                     f"Событие <b>{event.title}</b> начнется через {int(time_until)} минут\n"
-                                     f"📍 {event.location if event.location else 'Место не указано'}",
-                                parse_mode="HTML"
-                            )
-                        except Exception as e:
-                            print(f"Error sending reminder to {user.telegram_id}: {e}")
+                        messages.append((int(user.telegram_id), text))
+        
+        await self._deliver(bot, messages)
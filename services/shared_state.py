@@ -0,0 +1,174 @@
+"""
+Состояние, общее для всех воркеров бота.
+
+Пока бот работает одним процессом, FSM, отметки об отправленных напоминаниях
+и кэши можно держать в памяти (STATE_BACKEND=memory, по умолчанию). Чтобы
+запустить несколько воркеров, задайте STATE_BACKEND=postgres: тогда состояние
+хранится в таблице shared_state, и любой воркер видит то же, что остальные.
+
+Оба хранилища — ключ-значение с необязательным сроком жизни (ttl в секундах).
+add() записывает значение, только если ключа ещё нет, — так воркеры
+договариваются, кто из них отправляет конкретное напоминание. take()
+забирает записи по префиксу: каждую получит только один воркер.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from repositories.shared_state_repository import SharedStateRepository
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+
+# Как часто удалять просроченные записи из shared_state (секунды)
+PURGE_INTERVAL = 600
+
+# При таком числе записей в памяти просроченные удаляются
+MEMORY_PURGE_SIZE = 10_000
+
+_DATETIME_TAG = "__datetime__"
+_DATE_TAG = "__date__"
+
+
+def to_json(value: Any) -> Any:
+    """Значение для JSONB: datetime и date сохраняются с пометкой типа."""
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {_DATE_TAG: value.isoformat()}
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def from_json(value: Any) -> Any:
+    """Обратное к to_json."""
+    if isinstance(value, dict):
+        if len(value) == 1 and _DATETIME_TAG in value:
+            return datetime.fromisoformat(value[_DATETIME_TAG])
+        if len(value) == 1 and _DATE_TAG in value:
+            return date.fromisoformat(value[_DATE_TAG])
+        return {key: from_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_json(item) for item in value]
+    return value
+
+
+class MemoryStateBackend:
+    """Состояние в памяти процесса: для одного воркера и тестов."""
+
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def _get_entry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._values.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def _put(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if len(self._values) >= MEMORY_PURGE_SIZE:
+            now = time.monotonic()
+            self._values = {
+                k: entry for k, entry in self._values.items() if entry[1] is None or entry[1] > now
+            }
+        self._values[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    async def get(self, key: str) -> Any:
+        entry = self._get_entry(key)
+        return entry[0] if entry else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._put(key, value, ttl)
+
+    async def add(self, key: str, value: Any = True, ttl: Optional[float] = None) -> bool:
+        if self._get_entry(key):
+            return False
+        self._put(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def items(self, prefix: str) -> Dict[str, Any]:
+        found = {}
+        for key in [key for key in self._values if key.startswith(prefix)]:
+            entry = self._get_entry(key)
+            if entry:
+                found[key] = entry[0]
+        return found
+
+    async def take(self, prefix: str) -> List[Any]:
+        taken = await self.items(prefix)
+        for key in taken:
+            del self._values[key]
+        return list(taken.values())
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    async def run_cleanup(self) -> None:
+        """В памяти просроченное удаляется при обращении — чистить нечего."""
+
+
+class PostgresStateBackend:
+    """Состояние в таблице shared_state, общее для всех воркеров."""
+
+    shared = True
+
+    def __init__(self, repository: Optional[SharedStateRepository] = None):
+        self.repo = repository or SharedStateRepository()
+
+    @staticmethod
+    def _expires_at(ttl: Optional[float]) -> Optional[datetime]:
+        return datetime.now(timezone.utc) + timedelta(seconds=ttl) if ttl else None
+
+    async def get(self, key: str) -> Any:
+        return from_json(await self.repo.get(key))
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.repo.set(key, to_json(value), self._expires_at(ttl))
+
+    async def add(self, key: str, value: Any = True, ttl: Optional[float] = None) -> bool:
+        return await self.repo.add(key, to_json(value), self._expires_at(ttl))
+
+    async def delete(self, key: str) -> None:
+        await self.repo.delete(key)
+
+    async def items(self, prefix: str) -> Dict[str, Any]:
+        return {key: from_json(value) for key, value in (await self.repo.get_prefix(prefix)).items()}
+
+    async def take(self, prefix: str) -> List[Any]:
+        return [from_json(value) for value in await self.repo.take_prefix(prefix)]
+
+    async def run_cleanup(self) -> None:
+        """Периодически удаляет просроченные записи (запускается на ведущем воркере)."""
+        while True:
+            try:
+                purged = await self.repo.purge_expired()
+                if purged:
+                    logger.info(f"Удалено просроченных записей общего состояния: {purged}")
+            except Exception as e:
+                logger.error(f"Ошибка очистки общего состояния: {e}")
+            await asyncio.sleep(PURGE_INTERVAL)
+
+
+def create_state_backend(name: str = STATE_BACKEND):
+    if name == "postgres":
+        return PostgresStateBackend()
+    if name != "memory":
+        logger.warning(f"Неизвестный STATE_BACKEND={name!r}, состояние хранится в памяти")
+    return MemoryStateBackend()
+
+
+# Общее хранилище процесса
+state_backend = create_state_backend()
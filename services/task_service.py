@@ -1,9 +1,9 @@
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 
-from models.task_model import Task
+from models.task_model import Task, TaskPriority
 from repositories.task_repository import TaskRepository
 
 
@@ -17,9 +17,11 @@ class TaskService:
         title: str,
         description: str,
         assigned_to: str,
-        created_by: str
+        created_by: str,
+        deadline: Optional[datetime] = None,
+        priority: int = TaskPriority.NORMAL
     ) -> Task:
-        """Создать новую задачу"""
+        """Создать новую задачу (deadline — в UTC)"""
         task_telegram_id = f"task_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}"
        
         task = Task(
@@ -27,7 +29,9 @@ class TaskService:
             title=title,
             description=description,
             assigned_to=assigned_to,
-            created_by=created_by
+            created_by=created_by,
+            deadline=deadline,
+            priority=priority
         )
        
         return await self.task_repo.create(task)
@@ -89,8 +93,41 @@ class TaskService:
         """Получить статистику по задачам"""
         return await self.task_repo.get_statistics(organizer_id)
    
+    async def get_task_board(
+        self,
+        organizer_id: str,
+        task_page: int = 0,
+        tasks_per_page: int = 10,
+        volunteer_page: int = 0,
+        volunteers_per_page: int = 10
+    ) -> Dict[str, Any]:
+        """Получить страницу доски задач организатора (задачи × волонтёры)"""
+        return await self.task_repo.get_board(
+            organizer_id,
+            task_offset=task_page * tasks_per_page,
+            task_limit=tasks_per_page,
+            volunteer_offset=volunteer_page * volunteers_per_page,
+            volunteer_limit=volunteers_per_page
+        )
+   
+    async def get_task_card(self, task_telegram_id: str) -> Optional[Dict[str, Any]]:
+        """Получить задачу с назначенными волонтёрами и их отметками"""
+        return await self.task_repo.get_task_card(task_telegram_id)
+   
+    def iter_board_rows(self, organizer_id: str, batch_size: int = 1000):
+        """Потоково отдаёт ячейки доски организатора для выгрузки"""
+        return self.task_repo.iter_board_rows(organizer_id, batch_size)
+   
+    async def get_deadline_schedule(self, limit: int = 500) -> List[tuple]:
+        """Ближайшие дедлайны, по которым ещё не всё напомнено"""
+        return await self.task_repo.get_deadline_schedule(limit)
+   
+    async def claim_due_reminders(self, now: datetime, remind_before: timedelta, limit: int = 200) -> List[Any]:
+        """Забрать созревшие напоминания вместе с получателями"""
+        return await self.task_repo.claim_due_reminders(now, remind_before, limit)
+   
     async def mark_task_completed(self, task_telegram_id: str, volunteer_id: str) -> bool:
-        """Пометить задачу как выполненную волонтером"""
+        """Пометить задачу как выполненную волонтером; True — только при первой отметке"""
         return await self.task_repo.mark_completed(task_telegram_id, volunteer_id)
    
     async def is_task_assigned_to(self, task_telegram_id: str, volunteer_id: str) -> bool:
@@ -0,0 +1,176 @@
+"""
+Автоматическое распределение участников без команды по командам.
+
+Участники сортируются по часовому поясу и режутся на соседние блоки,
+поэтому в одну команду попадают люди с близким временем. Внутри блока
+жадный алгоритм раскладывает участников так, чтобы навыки (backend,
+frontend, ML, дизайн...) не повторялись, а затем локальный поиск обменами
+увеличивает разнообразие навыков в командах. Сложность ~O(n log n).
+"""
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set
+
+from models.team import MAX_TEAM_SIZE
+from services.profile_matching import tokenize
+from services.timezones import utc_offset_hours
+
+
+# Нижняя граница размера команды из правил хакатона (rules.md), верхняя — в models.team
+MIN_TEAM_SIZE = 3
+
+# Сколько соседних команд балансируются между собой
+BLOCK_TEAMS = 8
+
+# Категории навыков и токены (после tokenize), по которым они узнаются
+SKILL_KEYWORDS: Dict[str, Set[str]] = {
+    "backend": {
+        "backend", "бэкенд", "бекенд", "python", "java", "go", "golang", "c#", "php",
+        "django", "fastapi", "flask", "spring", "node.js", "sql", "postgresql", "сервер",
+    },
+    "frontend": {
+        "frontend", "фронте", "javascript", "typescript", "js", "ts", "react",
+        "vue", "angular", "html", "css", "верстк",
+    },
+    "ml": {
+        "ml", "ai", "pytorch", "tensorflow", "pandas", "numpy", "cv", "nlp", "llm",
+        "машинн", "нейрос", "datasc", "data",
+    },
+    "design": {"figma", "ux", "ui", "дизайн", "иллюст"},
+    "mobile": {"android", "ios", "kotlin", "swift", "flutter", "мобиль"},
+    "devops": {"devops", "docker", "kubernetes", "k8s", "linux", "ci", "cd", "инфрас"},
+    "management": {"pm", "product", "менедж", "аналит", "analyst", "тимлид", "lead"},
+}
+
+OTHER_SKILL = "other"
+
+_TOKEN_TO_SKILL = {
+    token: skill for skill, tokens in SKILL_KEYWORDS.items() for token in tokens
+}
+
+
+def extract_skills(profile_text: Optional[str]) -> List[str]:
+    """Возвращает категории навыков из анкеты в порядке первого упоминания."""
+    skills: List[str] = []
+    for token in tokenize(profile_text):
+        skill = _TOKEN_TO_SKILL.get(token)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills or [OTHER_SKILL]
+
+
+def team_sizes(count: int, min_size: int = MIN_TEAM_SIZE, max_size: int = MAX_TEAM_SIZE) -> List[int]:
+    """Делит count человек на минимальное число команд с размерами в [min_size, max_size].
+
+    Если всех разложить нельзя (например, 2 человека), лишние не попадают в команды.
+    """
+    if count < min_size:
+        return []
+    teams = math.ceil(count / max_size)
+    while teams and count // teams < min_size:
+        teams -= 1
+    if not teams:
+        return []
+    placed = min(count, teams * max_size)
+    base, extra = divmod(placed, teams)
+    return [base + 1] * extra + [base] * (teams - extra)
+
+
+class _Candidate:
+    __slots__ = ("user", "offset", "skills", "primary")
+
+    def __init__(self, user):
+        self.user = user
+        self.offset = utc_offset_hours(getattr(user, "timezone", None))
+        self.skills = extract_skills(getattr(user, "profile_text", None))
+        self.primary = self.skills[0]
+
+
+def _diversity(team: List[_Candidate]) -> int:
+    """Число разных навыков в команде минус штраф за одинаковые основные роли."""
+    covered = set()
+    for member in team:
+        covered.update(member.skills)
+    covered.discard(OTHER_SKILL)
+    duplicates = len(team) - len({member.primary for member in team})
+    return 2 * len(covered) - duplicates
+
+
+def _improve(teams: List[List[_Candidate]]) -> bool:
+    """Один проход локального поиска: убирает повторы основной роли обменами."""
+    improved = False
+    for team in teams:
+        primaries = Counter(member.primary for member in team)
+        for i, member in enumerate(team):
+            if primaries[member.primary] < 2:
+                continue
+            for other in teams:
+                if other is team:
+                    continue
+                other_primaries = Counter(m.primary for m in other)
+                for j, candidate in enumerate(other):
+                    # кандидат закрывает недостающую роль и не создаёт повтор у соседей
+                    if primaries[candidate.primary] or (
+                        other_primaries[member.primary] and other_primaries[candidate.primary] < 2
+                    ):
+                        continue
+                    before = _diversity(team) + _diversity(other)
+                    team[i], other[j] = candidate, member
+                    if _diversity(team) + _diversity(other) > before:
+                        improved = True
+                        break
+                    team[i], other[j] = member, candidate
+                else:
+                    continue
+                primaries = Counter(m.primary for m in team)
+                break
+    return improved
+
+
+def _balance_block(block: List[_Candidate], sizes: List[int], max_passes: int = 2) -> List[List[_Candidate]]:
+    teams: List[List[_Candidate]] = [[] for _ in sizes]
+    primary_counts = [Counter() for _ in sizes]
+
+    # редкие роли раскладываются первыми, чтобы досталось как можно большему числу команд
+    frequency = Counter(member.primary for member in block)
+    for member in sorted(block, key=lambda m: (frequency[m.primary], m.offset)):
+        best = min(
+            (i for i in range(len(teams)) if len(teams[i]) < sizes[i]),
+            key=lambda i: (primary_counts[i][member.primary], len(teams[i]) - sizes[i], i)
+        )
+        teams[best].append(member)
+        primary_counts[best][member.primary] += 1
+
+    for _ in range(max_passes):
+        if not _improve(teams):
+            break
+    return teams
+
+
+def form_teams(
+    participants: Sequence,
+    min_size: int = MIN_TEAM_SIZE,
+    max_size: int = MAX_TEAM_SIZE,
+    block_teams: int = BLOCK_TEAMS
+) -> List[List]:
+    """Разбивает участников на команды.
+
+    participants — объекты с полями id, timezone и profile_text.
+    Возвращает списки участников; первый в каждом списке — предлагаемый капитан.
+    """
+    candidates = sorted(
+        (_Candidate(user) for user in participants),
+        key=lambda c: (c.offset, c.user.id)
+    )
+    sizes = team_sizes(len(candidates), min_size, max_size)
+
+    result: List[List] = []
+    position = 0
+    for start in range(0, len(sizes), block_teams):
+        block_sizes = sizes[start:start + block_teams]
+        block_len = sum(block_sizes)
+        block = candidates[position:position + block_len]
+        position += block_len
+        for team in _balance_block(block, block_sizes):
+            result.append([member.user for member in team])
+    return result
@@ -1,10 +1,23 @@
 from typing import Optional, List, Tuple
 from datetime import datetime
 
-from repositories.team_repository import TeamRepository
+from sqlalchemy.exc import IntegrityError
+
+from repositories.team_repository import TeamRepository, is_name_conflict
 from repositories.user_repository import UserRepository
-from models.team import Team
+from models.team import Team, MAX_TEAM_SIZE
 from models.user import User, UserRole
+from services.team_formation import form_teams, MIN_TEAM_SIZE
+from services.mentor_assignment import assign_mentors
+
+
+CREATE_TEAM_ERRORS = {
+    "user_not_found": "❌Пользователь не найден, для регистрации нажмите /start",
+    "not_participant": "Только участники могут создавать команды",
+    "in_team": "Вы уже состоите в команде",
+    "already_captain": "Вы уже являетесь капитаном команды",
+    "name_taken": "Команда с таким названием уже существует",
+}
 
 
 class TeamService:
@@ -16,29 +29,15 @@ class TeamService:
     
     async def create_team(self, captain_id: int, name: str) -> Tuple[bool, Optional[Team], str]:
         """Создаёт новую команду."""
-        user = await self.user_repo.get_by_id(captain_id)
-        if not user:
-            return False, None, "❌Пользователь не найден, для регистрации нажмите /start"
-        
-        if user.role != UserRole.PARTICIPANT:
-            return False, None, "Только участники могут создавать команды"
-        
-        if await self.team_repo.is_user_in_team(captain_id):
-            return False, None, "Вы уже состоите в команде"
-        
-        if await self.team_repo.is_user_captain(captain_id):
-            return False, None, "Вы уже являетесь капитаном команды"
-        
-        existing_team = await self.team_repo.get_team_by_name(name)
-        if existing_team:
-            return False, None, "Команда с таким названием уже существует"
-        
         try:
-            team = await self.team_repo.create_team(captain_id, name)
-            return True, team, f"Команда '{name}' создана!"
+            status, team = await self.team_repo.create_team_atomic(captain_id, name)
         except Exception as e:
             return False, None, f"Ошибка при создании команды: {str(e)}"
 
+        if status == "ok":
+            return True, team, f"Команда '{name}' создана!"
+        return False, None, CREATE_TEAM_ERRORS.get(status, "Не удалось создать команду")
+
     async def get_team_by_id(self, team_id: int) -> Optional[Team]:
         return await self.team_repo.get_team_by_id(team_id)
 
@@ -46,6 +45,14 @@ class TeamService:
         """Возвращает команду пользователя."""
         return await self.team_repo.get_user_team(user_id)
 
+    async def get_team_details(self, user_id: int) -> Optional[Team]:
+        """Команда пользователя с участниками, капитаном и ментором."""
+        return await self.team_repo.get_team_details(user_id=user_id)
+
+    async def get_captain_team_details(self, captain_id: int) -> Optional[Team]:
+        """Команда капитана с участниками, капитаном и ментором."""
+        return await self.team_repo.get_team_details(captain_id=captain_id)
+
     async def get_team_by_captain(self, user_id: int) -> Optional[Team]:
         return await self.team_repo.get_team_by_captain(user_id)
     
@@ -60,7 +67,13 @@ class TeamService:
         if existing_team and existing_team.id != team.id:
             return False, None, "Команда с таким названием уже существует"
         
-        updated_team = await self.team_repo.update_team_name(team.id, new_name)
+        try:
+            updated_team = await self.team_repo.update_team_name(team.id, new_name)
+        except IntegrityError as e:
+            if not is_name_conflict(e):
+                raise
+            # название заняли параллельно, после проверки выше
+            return False, None, CREATE_TEAM_ERRORS["name_taken"]
         if updated_team:
             return True, updated_team, f"Название команды изменено на '{new_name}'"
         return False, None, "Ошибка при изменении названия"
@@ -100,47 +113,30 @@ class TeamService:
     
     async def leave_team(self, user_id: int) -> Tuple[bool, str]:
         """Покидает команду."""
-        user = await self.user_repo.get_by_id(user_id)
-        if not user or not user.team_id:
-            return False, "Вы не состоите в команде"
-        
-        team = await self.team_repo.get_team_by_id(user.team_id)
-        if not team:
-            return False, "Команда не найдена"
-        
-        if team.captain_id == user_id:
-            return False, "Капитан не может покинуть команду. Распустите команду или передайте капитанство"
-        
-        success = await self.team_repo.remove_user_from_team(user_id)
-        if success:
+        status, team = await self.team_repo.remove_member_atomic(user_id)
+        if status == "ok":
             return True, f"Вы покинули команду '{team.name}'"
-        return False, "Не удалось покинуть команду"
+        if status == "captain":
+            return False, "Капитан не может покинуть команду. Распустите команду или передайте капитанство"
+        return False, "Вы не состоите в команде"
 
     async def join_team(self, user_id: int, team_id: int) -> Tuple[bool, str]:
-        """Покидает команду."""
-        user = await self.user_repo.get_by_id(user_id)
-        if not user or user.team_id:
-            return False, "Вы уже состоите в команде"
-        
-        team = await self.team_repo.get_team_by_id(team_id)
-        if not team:
-            return False, "Команда не найдена"
-        
-        success = await self.team_repo.add_user_to_team(user_id, team_id)
-        if success:
+        """Добавляет пользователя в команду."""
+        status, team = await self.team_repo.add_member_atomic(user_id, team_id, MAX_TEAM_SIZE)
+        if status == "ok":
             return True, f"Вы в команде '{team.name}'"
-        return False, "Не удалось добавиться в команду"
+        if status == "team_not_found":
+            return False, "Команда не найдена"
+        if status == "team_full":
+            return False, f"В команде '{team.name}' уже {MAX_TEAM_SIZE} участников"
+        return False, "Вы уже состоите в команде"
     
     async def dissolve_team(self, captain_id: int) -> Tuple[bool, str]:
         """Распускает команду."""
-        team = await self.team_repo.get_team_by_captain(captain_id)
-        if not team:
-            return False, "Вы не являетесь капитаном команды"
-        
-        success = await self.team_repo.delete_team(team.id)
-        if success:
+        status, team = await self.team_repo.dissolve_team_atomic(captain_id)
+        if status == "ok":
             return True, f"Команда '{team.name}' распущена"
-        return False, "Не удалось распустить команду"
+        return False, "Вы не являетесь капитаном команды"
     
     async def is_user_captain(self, user_id: int) -> bool:
         """Проверяет, является ли пользователь капитаном."""
@@ -148,4 +144,46 @@ class TeamService:
     
     async def is_user_in_team(self, user_id: int) -> bool:
         """Проверяет, состоит ли пользователь в команде."""
-        return await self.team_repo.is_user_in_team(user_id)
\ No newline at end of file
+        return await self.team_repo.is_user_in_team(user_id)
+
+    async def propose_teams(self) -> Tuple[List[List[User]], int]:
+        """Предлагает разбиение ищущих команду участников: (команды, сколько осталось без команды)."""
+        participants = [
+            user for user in await self.user_repo.get_users_looking_for_team()
+            if user.team_id is None
+        ]
+        teams = form_teams(participants)
+        placed = sum(len(team) for team in teams)
+        return teams, len(participants) - placed
+
+    async def auto_form_teams(self) -> Tuple[List[Team], int]:
+        """Формирует и сохраняет команды одной транзакцией: (созданные команды, сколько осталось)."""
+        proposal, left = await self.propose_teams()
+        return await self.create_proposed_teams([[user.id for user in team] for team in proposal], left)
+
+    async def create_proposed_teams(self, groups: List[List[int]], left: int) -> Tuple[List[Team], int]:
+        """Сохраняет ранее предложенные группы id участников: (созданные команды, сколько осталось).
+
+        Участники, которые с момента предложения уже попали в команду, пропускаются.
+        """
+        teams, placed = await self.team_repo.bulk_create_teams(groups, min_members=MIN_TEAM_SIZE)
+        return teams, left + sum(len(group) for group in groups) - placed
+
+    async def auto_assign_mentors(self) -> List[Tuple]:
+        """Распределяет все команды без ментора между менторами.
+
+        Возвращает пары (команда, ментор) из снимка для фактически обновлённых команд.
+        """
+        teams, mentors = await self.team_repo.get_mentor_assignment_snapshot()
+        if not teams or not mentors:
+            return []
+
+        assignment = assign_mentors(teams, mentors, {mentor.id: mentor.load for mentor in mentors})
+        updated = set(await self.team_repo.bulk_assign_mentors(assignment))
+
+        mentors_by_id = {mentor.id: mentor for mentor in mentors}
+        return [
+            (team, mentors_by_id[assignment[team.id]])
+            for team in teams
+            if team.id in updated
+        ]
@@ -0,0 +1,114 @@
+"""
+Часовые пояса пользователей и событий.
+
+Пояс хранится строкой: 'UTC+3' (так его выбирают при регистрации) или имя
+IANA ('Europe/Moscow'). Строка разбирается один раз, объекты tzinfo кэшируются.
+Моменты времени в БД хранятся в UTC и переводятся в локальное время только
+при показе; для пачки значений одного пояса смещение вычисляется один раз.
+"""
+import logging
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEZONE = "UTC+3"
+
+_UTC_OFFSET_RE = re.compile(r"UTC([+-])(\d{1,2})(?::(\d{2}))?")
+
+
+@lru_cache(maxsize=None)
+def find_zone(name: Optional[str]) -> Optional[tzinfo]:
+    """'UTC+3' -> фиксированное смещение, 'Europe/Moscow' -> ZoneInfo, иначе None."""
+    match = _UTC_OFFSET_RE.fullmatch(name or "")
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        if offset > timedelta(hours=14):
+            return None
+        return timezone(-offset if sign == "-" else offset, name)
+    try:
+        return ZoneInfo(name) if name else None
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: Optional[str]) -> tzinfo:
+    """Как find_zone, но неизвестный пояс заменяется DEFAULT_TIMEZONE.
+
+    Предупреждение в лог пишется один раз на строку благодаря кэшу.
+    """
+    zone = find_zone(name or DEFAULT_TIMEZONE)
+    if zone is None:
+        logger.warning(f"Неизвестный часовой пояс {name!r}, используется {DEFAULT_TIMEZONE}")
+        zone = _default_zone()
+    return zone
+
+
+def utc_offset_hours(tz_name: Optional[str], moment: Optional[datetime] = None) -> float:
+    """Смещение пояса tz_name от UTC в часах на момент moment (по умолчанию — сейчас)."""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(get_zone(tz_name)).utcoffset() / timedelta(hours=1)
+
+
+def _default_zone() -> tzinfo:
+    return find_zone(DEFAULT_TIMEZONE)
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment
+    return (moment - moment.utcoffset()).replace(tzinfo=None)
+
+
+def to_utc(local: datetime, tz_name: Optional[str]) -> datetime:
+    """Локальное время в поясе tz_name -> aware datetime в UTC."""
+    if local.tzinfo is None:
+        local = local.replace(tzinfo=get_zone(tz_name))
+    return local.astimezone(timezone.utc)
+
+
+def to_local(moment: datetime, tz_name: Optional[str]) -> datetime:
+    """Момент в UTC (naive считается UTC) -> naive локальное время в поясе tz_name."""
+    zone = get_zone(tz_name)
+    if isinstance(zone, timezone):
+        return _naive_utc(moment) + zone.utcoffset(None)
+    return moment.replace(tzinfo=moment.tzinfo or timezone.utc).astimezone(zone).replace(tzinfo=None)
+
+
+def to_local_many(moments: Iterable[datetime], tz_name: Optional[str]) -> List[datetime]:
+    """Переводит пачку моментов UTC в один пояс.
+
+    Для фиксированного смещения (все пояса 'UTC±N') пояс разбирается один раз
+    и к каждому значению прибавляется одно и то же смещение.
+    """
+    zone = get_zone(tz_name)
+    if isinstance(zone, timezone):
+        delta = zone.utcoffset(None)
+        return [_naive_utc(moment) + delta for moment in moments]
+    return [to_local(moment, tz_name) for moment in moments]
+
+
+def convert(local: datetime, from_tz: Optional[str], to_tz: Optional[str]) -> datetime:
+    """Переводит локальное время из пояса from_tz в пояс to_tz."""
+    if from_tz == to_tz:
+        return local
+    return to_local(to_utc(local, from_tz), to_tz)
+
+
+def iana_name(tz_name: Optional[str]) -> Optional[str]:
+    """Имя пояса в базе IANA для календарей: 'UTC+3' -> 'Etc/GMT-3' (знак в Etc/ обратный)."""
+    zone = find_zone(tz_name)
+    if isinstance(zone, ZoneInfo):
+        return zone.key
+    if zone is None:
+        return None
+    offset = zone.utcoffset(None)
+    if offset % timedelta(hours=1):
+        return None
+    hours = offset // timedelta(hours=1)
+    return "Etc/UTC" if hours == 0 else f"Etc/GMT{-hours:+d}"
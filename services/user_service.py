@@ -1,8 +1,17 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
+import random
+import time
 
 from repositories.user_repository import UserRepository
 from models.user import User, UserRole
+from services.profile_matching import profile_index
+
+# Сколько секунд живёт перемешанная колода анкет пользователя
+PROFILE_DECK_TTL = 600
+
+# user_id -> (момент создания колоды, оставшиеся id анкет)
+_profile_decks: Dict[Optional[int], Tuple[float, List[int]]] = {}
 
 
 class UserService:
@@ -35,6 +44,45 @@ class UserService:
         """Получить всех пользователей"""
         return await self.user_repo.get_all()
 
+    async def get_reachable(self):
+        """Пользователи для рассылок: активные и без отметки о недоступности."""
+        return await self.user_repo.get_reachable()
+
+    async def mark_undeliverable(self, reasons: Dict[int, str]) -> int:
+        """Помечает недоступными пользователей {telegram_id: причина}."""
+        return await self.user_repo.mark_undeliverable(reasons)
+
+    async def mark_deliverable(self, tg_id: int) -> bool:
+        """Возвращает пользователя в рассылки."""
+        return await self.user_repo.mark_deliverable(tg_id)
+
+    async def get_delivery_stats(self) -> Dict[Optional[str], int]:
+        """Сколько активных пользователей доступно и сколько нет, по причинам."""
+        return await self.user_repo.get_delivery_stats()
+
+    async def get_users_page(
+        self,
+        cursor: Optional[int] = None,
+        backward: bool = False,
+        limit: int = 20,
+        role: Optional[str] = None,
+        timezone: Optional[str] = None
+    ) -> Tuple[List[User], bool, bool]:
+        """Страница пользователей: (пользователи, есть_предыдущая, есть_следующая)."""
+        role = UserRole(role) if role else None
+        if backward:
+            users = await self.user_repo.get_page(before_id=cursor, limit=limit, role=role, timezone=timezone)
+            has_prev = len(users) > limit
+            return users[-limit:], has_prev, True
+
+        users = await self.user_repo.get_page(after_id=cursor, limit=limit, role=role, timezone=timezone)
+        has_next = len(users) > limit
+        return users[:limit], cursor is not None, has_next
+
+    def iter_rows(self, columns: List[str], batch_size: int = 1000):
+        """Потоково отдаёт строки пользователей для выгрузки"""
+        return self.user_repo.iter_rows(columns, batch_size)
+
     async def get_all_participants(self):
         """Получить всех участников"""
         return await self.user_repo.get_all_participants()
@@ -58,12 +106,73 @@ class UserService:
         return await self.user_repo.get_active_profiles(exclude_user_id)
     
     async def get_random_active_profiles(self, limit: int = 5, exclude_user_id: Optional[int] = None) -> List[User]:
-        """Возвращает случайные активные анкеты."""
-        return await self.user_repo.get_random_active_profiles(limit, exclude_user_id)
+        """Возвращает следующие анкеты из перемешанной колоды пользователя.
+
+        Колода — id всех подходящих анкет, перемешанные один раз и закэшированные
+        на PROFILE_DECK_TTL секунд. Повторы появляются только после того, как
+        колода закончилась и была собрана заново.
+        """
+        profiles: List[User] = []
+        rebuilt = False
+        while len(profiles) < limit:
+            deck = self._get_profile_deck(exclude_user_id)
+            if not deck:
+                if rebuilt:
+                    break
+                deck = await self._build_profile_deck(exclude_user_id)
+                rebuilt = True
+                if not deck:
+                    break
+                # уже показанные на этой странице анкеты уходят в конец новой колоды
+                shown = {profile.id for profile in profiles}
+                deck.sort(key=lambda profile_id: profile_id in shown)
+            page_ids = deck[:limit - len(profiles)]
+            del deck[:len(page_ids)]
+            # анкеты, ставшие неактивными с момента сборки колоды, просто пропускаются
+            profiles.extend(await self.user_repo.get_active_profiles_by_ids(page_ids))
+        return profiles
+
+    def _get_profile_deck(self, user_id: Optional[int]) -> List[int]:
+        cached = _profile_decks.get(user_id)
+        if not cached or time.monotonic() - cached[0] > PROFILE_DECK_TTL:
+            return []
+        return cached[1]
+
+    async def _build_profile_deck(self, user_id: Optional[int]) -> List[int]:
+        ids = await self.user_repo.get_active_profile_ids(user_id)
+        random.shuffle(ids)
+        now = time.monotonic()
+        for key in [k for k, (created, _) in _profile_decks.items() if now - created > PROFILE_DECK_TTL]:
+            del _profile_decks[key]
+        _profile_decks[user_id] = (now, ids)
+        return ids
     
+    async def get_matching_profiles(self, user_id: int, profile_text: Optional[str], limit: int = 5) -> List[Tuple[User, float]]:
+        """Возвращает анкеты, которые лучше всего дополняют навыки пользователя.
+
+        [(пользователь, доля навыков кандидата, которых нет в анкете пользователя)]
+        """
+        await profile_index.sync()
+        if not profile_index.ready:
+            profile_index.build(await self.user_repo.get_profile_texts())
+
+        # берём с запасом: часть кандидатов могла уже найти команду
+        candidates = profile_index.top_complementary(profile_text, k=limit * 3, exclude={user_id})
+        if not candidates:
+            return []
+
+        scores = dict(candidates)
+        profiles = await self.user_repo.get_active_profiles_by_ids([candidate_id for candidate_id, _ in candidates])
+        return [(profile, scores[profile.id]) for profile in profiles[:limit]]
+
     async def update_user_profile(self, user_id: int, profile_text: str) -> bool:
         """Обновляет анкету пользователя."""
-        return await self.user_repo.update_profile(user_id, profile_text)
+        success = await self.user_repo.update_profile(user_id, profile_text)
+        if success:
+            if profile_index.ready:
+                profile_index.update(user_id, profile_text)
+            await profile_index.publish()
+        return success
     
     async def set_profile_active(self, user_id: int, active: bool) -> bool:
         """Устанавливает активность анкеты."""
@@ -66,6 +66,7 @@ class FakeUserService:
         self.updated_profile = None
         self.active_calls = []
         self.random_profiles = []
+        self.matching = []
 
     async def get_by_tg_id(self, tg_id):
         return self.users.get(tg_id)
@@ -74,6 +75,9 @@ class FakeUserService:
         # возвращаем заранее подготовленный список
         return self.random_profiles
 
+    async def get_matching_profiles(self, user_id, profile_text, limit=5):
+        return self.matching
+
     async def set_profile_active(self, user_id, active):
         self.active_calls.append((user_id, active))
         return True
@@ -175,3 +179,33 @@ async def test_process_profile_text_success(patch_services):
     assert "Анкета сохранена" in incoming.last_answer_text
     assert fake_state.cleared is True
     assert fake_user_service.active_calls[-1] == (user.id, False)
+
+@pytest.mark.asyncio
+async def test_matching_profiles_requires_own_profile(patch_services):
+    fake_user_service, _ = patch_services
+    fake_user_service.users[12345] = FakeUser(id=1, profile_text=None)
+
+    callback = FakeCallbackQuery()
+
+    await form.matching_profiles(callback)
+
+    args, kwargs = callback.answer_args
+    assert kwargs.get('show_alert') is True
+    assert callback.message.last_edited_text is None
+
+@pytest.mark.asyncio
+async def test_matching_profiles_shows_scores(patch_services):
+    fake_user_service, _ = patch_services
+    fake_user_service.users[12345] = FakeUser(id=1, profile_text="Python backend, FastAPI")
+    fake_user_service.matching = [
+        (FakeUser(id=2, profile_text="ML на Python, PyTorch", full_name="Анна <dev>", username="anna"), 0.87)
+    ]
+
+    callback = FakeCallbackQuery()
+
+    await form.matching_profiles(callback)
+
+    text = callback.message.last_edited_text
+    assert "Анна &lt;dev&gt;" in text
+    assert "новых для вас навыков 87%" in text
+    assert "@anna" in text
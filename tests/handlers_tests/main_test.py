@@ -1,8 +1,9 @@
 import pytest
 import asyncio
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import bot.main as main
+from bot.services.lifecycle import Lifecycle
 
 @pytest.mark.asyncio
 async def test_on_startup():
@@ -18,5 +19,17 @@ async def test_main_startup(monkeypatch):
     monkeypatch.setattr(main, "Bot", lambda *a, **k: None)
     monkeypatch.setattr(main.dp, "start_polling", AsyncMock())
     monkeypatch.setattr(main, "schedule_reminder_checker", AsyncMock())
+    monkeypatch.setattr(main, "outbound_gateway", Mock())
+    monkeypatch.setattr(main, "engine", Mock(dispose=AsyncMock()))
+    monkeypatch.setattr(main, "lifecycle", Lifecycle(timeout=0.05))
+    # main() подключает рассылку к ScheduleService; в других тестах её быть не должно
+    monkeypatch.setattr(main.ScheduleService, "change_notifier", None)
+    monkeypatch.setattr(main.ScheduleService, "sender", None)
 
-    await asyncio.wait_for(main.main(), timeout=0.1)
\ No newline at end of file
+    await asyncio.wait_for(main.main(), timeout=1)
+
+    # после остановки фоновые циклы отменены, а соединения с БД закрыты
+    assert main.lifecycle.stopping.is_set()
+    assert not main.lifecycle._tasks
+    main.engine.dispose.assert_awaited_once()
+    assert main.ScheduleService.sender is main.RateLimitedSender
\ No newline at end of file
@@ -41,7 +41,7 @@ class TestScheduleSimpleHandlers:
             MockUserService.return_value.get_by_tg_id = AsyncMock(return_value=mock_user)
 
             # Мокаем отсутствие событий
-            MockScheduleService.return_value.get_events_for_role = AsyncMock(return_value=[])
+            MockScheduleService.return_value.get_schedule_snapshot = AsyncMock(return_value=[])
 
             await show_schedule(mock_callback)
 
@@ -66,7 +66,7 @@ class TestScheduleSimpleHandlers:
                 "end_time_local": datetime.now() + timedelta(hours=2),
                 "location": "Тестовая локация"
             }
-            MockScheduleService.return_value.get_events_for_role = AsyncMock(return_value=[mock_event])
+            MockScheduleService.return_value.get_schedule_snapshot = AsyncMock(return_value=[mock_event])
 
             await show_schedule(mock_callback)
 
@@ -123,4 +123,35 @@ class TestScheduleIntegration:
         state.set_state.assert_called_once()
 
         message.answer.assert_called_once()
-        assert "описание" in message.answer.call_args[0][0].lower()
\ No newline at end of file
+        assert "описание" in message.answer.call_args[0][0].lower()
+
+class TestScheduleIcsExport:
+
+    @pytest.mark.asyncio
+    async def test_reuses_uploaded_file_until_schedule_changes(self):
+        from bot.handlers.schedule import export_schedule_ics
+        from services.schedule_calendar import schedule_snapshot
+
+        schedule_snapshot.invalidate()
+        callback = AsyncMock(spec=CallbackQuery)
+        callback.from_user = Mock(id=123)
+        callback.message = AsyncMock()
+        callback.answer = AsyncMock()
+        callback.message.answer_document = AsyncMock(return_value=Mock(document=Mock(file_id="file-1")))
+
+        with patch('bot.handlers.schedule.UserService') as MockUserService, \
+                patch('bot.handlers.schedule.ScheduleService') as MockScheduleService:
+            MockUserService.return_value.get_by_tg_id = AsyncMock(
+                return_value=Mock(role="participant", timezone="UTC+3")
+            )
+            MockScheduleService.return_value.get_calendar = AsyncMock(return_value=b"BEGIN:VCALENDAR")
+
+            await export_schedule_ics(callback)
+            await export_schedule_ics(callback)
+
+            MockScheduleService.return_value.get_calendar.assert_called_once_with("participant", "UTC+3")
+            assert callback.message.answer_document.call_args.kwargs["document"] == "file-1"
+
+            schedule_snapshot.invalidate()
+            await export_schedule_ics(callback)
+            assert MockScheduleService.return_value.get_calendar.call_count == 2
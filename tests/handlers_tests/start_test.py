@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+from datetime import datetime, timezone
 from types import SimpleNamespace
 
 import bot.handlers.start as start_mod
@@ -59,6 +60,7 @@ class FakeUser:
         self.timezone = timezone
         self.username = username
         self.id = 1
+        self.undeliverable_at = None
 
 
 # =========================
@@ -93,6 +95,30 @@ async def test_cmd_start_existing_user(monkeypatch):
     assert "Ты уже зарегистрирован" in msg.answers[0]
 
 
+@pytest.mark.asyncio
+async def test_cmd_start_returns_user_to_broadcasts(monkeypatch):
+    user = FakeUser()
+    user.undeliverable_at = datetime(2025, 12, 15, tzinfo=timezone.utc)
+    restored = []
+
+    async def fake_get(_):
+        return user
+
+    async def fake_mark(tg_id):
+        restored.append(tg_id)
+        return True
+
+    monkeypatch.setattr(
+        start_mod, "UserService",
+        lambda: SimpleNamespace(get_by_tg_id=fake_get, mark_deliverable=fake_mark)
+    )
+
+    msg = FakeMessage()
+    await start_mod.cmd_start_handler(msg, FakeFSM())
+
+    assert restored == [msg.from_user.id]
+
+
 @pytest.mark.asyncio
 async def test_cmd_start_new_user(monkeypatch):
     async def fake_get(_):
@@ -196,6 +222,78 @@ async def test_show_all_users_not_organizer(monkeypatch):
     assert "Доступ запрещен" in msg.answers[0]
 
 
+@pytest.mark.asyncio
+async def test_show_all_users_first_page(monkeypatch):
+    calls = []
+
+    async def fake_get(_):
+        return FakeUser(role="organizer")
+
+    async def fake_page(**kwargs):
+        calls.append(kwargs)
+        page_user = FakeUser(full_name="<Иван>")
+        page_user.role = SimpleNamespace(value="participant")
+        return [page_user], False, True
+
+    monkeypatch.setattr(
+        start_mod, "UserService",
+        lambda: SimpleNamespace(get_by_tg_id=fake_get, get_users_page=fake_page)
+    )
+
+    msg = FakeMessage(text="/users")
+
+    await start_mod.show_all_users(msg)
+
+    assert "&lt;Иван&gt;" in msg.answers[0]
+    assert calls[0]["cursor"] is None
+    assert calls[0]["limit"] == start_mod.USERS_PAGE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_users_page_callback_passes_cursor_and_filters(monkeypatch):
+    calls = []
+
+    async def fake_get(_):
+        return FakeUser(role="organizer")
+
+    async def fake_page(**kwargs):
+        calls.append(kwargs)
+        return [], True, False
+
+    monkeypatch.setattr(
+        start_mod, "UserService",
+        lambda: SimpleNamespace(get_by_tg_id=fake_get, get_users_page=fake_page)
+    )
+
+    cb = FakeCallback("users_page:p:40:mentor:UTC+5")
+
+    await start_mod.users_page(cb)
+
+    assert calls[0] == {
+        "cursor": 40, "backward": True, "limit": start_mod.USERS_PAGE_SIZE,
+        "role": "mentor", "timezone": "UTC+5"
+    }
+    assert "Нет зарегистрированных пользователей" in cb.answers[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("handler, data", [
+    ("users_role_filter", "users_roles:-"),
+    ("users_timezone_filter", "users_tzs:-"),
+])
+async def test_users_filters_require_organizer(monkeypatch, handler, data):
+    async def fake_get(_):
+        return FakeUser(role="participant")
+
+    monkeypatch.setattr(start_mod, "UserService", lambda: SimpleNamespace(get_by_tg_id=fake_get))
+
+    cb = FakeCallback(data)
+
+    await getattr(start_mod, handler)(cb)
+
+    assert cb.answers == ["🚫 Доступ запрещен!"]
+
+
 # =========================
 # /reset
 # =========================
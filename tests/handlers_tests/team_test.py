@@ -210,3 +210,72 @@ async def test_process_team_name_create_success(monkeypatch):
     texts = [c["text"] for c in message.answer_calls if c["text"]]
     assert any("Команда создана" in t or "✅" in t for t in texts)
 
+
+
+@pytest.mark.asyncio
+async def test_team_view_renders_from_single_details_call(monkeypatch):
+    captain = SimpleNamespace(id=7, full_name="Капитан", username="cap")
+    member = SimpleNamespace(id=8, full_name="Участник", username=None)
+    mentor = SimpleNamespace(id=9, full_name="Ментор", username="mentor")
+    team = SimpleNamespace(
+        id=1, name="Team", captain_id=7, mentor_id=9,
+        captain=captain, mentor=mentor, members=[captain, member], member_count=2
+    )
+    calls = []
+
+    async def fake_get_by_tg_id(_):
+        return SimpleNamespace(id=8)
+    async def fake_get_team_details(user_id):
+        calls.append(user_id)
+        return team
+    monkeypatch.setattr(team_module, "UserService", lambda: SimpleNamespace(get_by_tg_id=fake_get_by_tg_id))
+    monkeypatch.setattr(team_module, "TeamService", lambda: SimpleNamespace(get_team_details=fake_get_team_details))
+
+    cb = DummyCallback("team_view", user_id=8)
+    await team_module.team_view(cb)
+
+    text = cb.message.edited_text[0]
+    assert calls == [8]
+    assert "Участники (2/5)" in text
+    assert "Ментор" in text and "@mentor" in text
+    assert "@cap" in text
+
+
+@pytest.mark.asyncio
+async def test_form_teams_confirm_creates_previewed_groups(monkeypatch):
+    organizer = SimpleNamespace(id=1, role="organizer")
+    proposal = [[SimpleNamespace(id=i, full_name=f"<i>{i}</i> & co", timezone="UTC+3") for i in (1, 2, 3)]]
+    created = []
+
+    async def fake_get_by_tg_id(_):
+        return organizer
+
+    async def fake_propose():
+        return proposal, 1
+
+    async def fake_create(groups, left):
+        created.append((groups, left))
+        return [SimpleNamespace(id=10)], left
+
+    monkeypatch.setattr(team_module, "UserService", lambda: SimpleNamespace(get_by_tg_id=fake_get_by_tg_id))
+    monkeypatch.setattr(team_module, "TeamService", lambda: SimpleNamespace(
+        propose_teams=fake_propose, create_proposed_teams=fake_create
+    ))
+    state = DummyState()
+
+    preview = DummyCallback(data="admin_form_teams")
+    await team_module.admin_form_teams(preview, state)
+    text = preview.message.edited_text[0]
+    assert "&lt;i&gt;1&lt;/i&gt; &amp; co" in text
+    assert "<i>" not in text
+
+    # состав участников изменился, но создаются показанные команды
+    proposal[:] = []
+    await team_module.admin_form_teams_confirm(DummyCallback(data="admin_form_teams_confirm"), state)
+    assert created == [([[1, 2, 3]], 1)]
+
+    # повторное подтверждение без нового предпросмотра ничего не создаёт
+    again = DummyCallback(data="admin_form_teams_confirm")
+    await team_module.admin_form_teams_confirm(again, state)
+    assert len(created) == 1
+    assert again.answer_calls[0]["show_alert"] is True
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.webhook import SECRET_HEADER, WebhookServer, update_chat_key
+
+
+def message_update(update_id, chat_id):
+    return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": chat_id}}}
+
+
+class FakeDispatcher:
+    """Записывает порядок обработки и держит обновление, пока не открыт gate."""
+
+    def __init__(self):
+        self.started = []
+        self.active = 0
+        self.max_active = 0
+        self.gate = asyncio.Event()
+
+    async def feed_raw_update(self, bot, update):
+        self.started.append(update["update_id"])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.gate.wait()
+        finally:
+            self.active -= 1
+
+
+def make_server(**kwargs):
+    bot = MagicMock()
+    bot.session.json_loads = json.loads
+    dispatcher = FakeDispatcher()
+    return WebhookServer(dispatcher, bot, **kwargs), dispatcher
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_update_chat_key():
+    assert update_chat_key(message_update(1, 42)) == 42
+    assert update_chat_key({"update_id": 2, "callback_query": {"from": {"id": 7}, "message": {"chat": {"id": 8}}}}) == 8
+    assert update_chat_key({"update_id": 3, "poll_answer": {"user": {"id": 9}}}) == 9
+    assert update_chat_key({"update_id": 4, "poll": {"id": "p"}}) is None
+
+
+@pytest.mark.asyncio
+async def test_rejects_wrong_secret():
+    server, dispatcher = make_server(secret="s3cret")
+    async with TestClient(TestServer(server.build_app())) as client:
+        response = await client.post(server.path, json=message_update(1, 1), headers={SECRET_HEADER: "wrong"})
+        assert response.status == 401
+        response = await client.post(server.path, json=message_update(2, 1), headers={SECRET_HEADER: "s3cret"})
+        assert response.status == 200
+    dispatcher.gate.set()
+    await server.drain()
+    assert dispatcher.started == [2]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_chat_order():
+    server, dispatcher = make_server(concurrency=2)
+    async with TestClient(TestServer(server.build_app())) as client:
+        for update_id, chat_id in [(1, 10), (2, 10), (3, 20), (4, 30)]:
+            response = await client.post(server.path, json=message_update(update_id, chat_id))
+            assert response.status == 200
+        await settle()
+
+        # второе обновление чата 10 ждёт первое, четвёртое — свободного слота
+        assert sorted(dispatcher.started) == [1, 3]
+        assert server.health()["updates"]["in_flight"] == 2
+
+        dispatcher.gate.set()
+        await server.drain()
+
+    assert dispatcher.max_active == 2
+    assert dispatcher.started.index(1) < dispatcher.started.index(2)
+    assert server.processed == 4
+
+
+@pytest.mark.asyncio
+async def test_drain_rejects_new_updates_and_waits():
+    server, dispatcher = make_server()
+    async with TestClient(TestServer(server.build_app())) as client:
+        await client.post(server.path, json=message_update(1, 1))
+        await settle()
+
+        drain = asyncio.create_task(server.drain(timeout=5))
+        await settle()
+        assert not drain.done()
+
+        response = await client.post(server.path, json=message_update(2, 2))
+        assert response.status == 503
+        health = await client.get("/health")
+        assert health.status == 503
+        assert (await health.json())["status"] == "draining"
+
+        dispatcher.gate.set()
+        await drain
+
+    assert server.processed == 1
+    assert server.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_cancels_unfinished():
+    server, dispatcher = make_server()
+    async with TestClient(TestServer(server.build_app())) as client:
+        await client.post(server.path, json=message_update(1, 1))
+        await settle()
+        await server.drain(timeout=0.01)
+
+    assert server.pending == 0
+    assert server.processed == 0
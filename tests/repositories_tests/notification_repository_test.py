@@ -0,0 +1,100 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
+
+from models.notification_settings import DEFAULT_NOTIFICATION_SETTINGS, NotificationSettings
+from repositories.notification_repository import NotificationSettingsRepository
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class TestAudienceQuery:
+    """Аудитория уведомления собирается одним запросом с умолчаниями в SQL"""
+
+    @pytest.fixture
+    def repository(self):
+        return NotificationSettingsRepository()
+
+    def test_left_join_with_defaults(self, repository):
+        sql = compile_sql(repository._audience_query("new_event"))
+
+        assert sql.startswith("SELECT users.telegram_id, users.role, users.timezone")
+        assert "FROM users LEFT OUTER JOIN notification_settings" in sql
+        assert "users.undeliverable_at IS NULL" in sql
+        assert "coalesce(notification_settings.enabled, true)" in sql
+        assert "coalesce(notification_settings.new_event_enabled, true)" in sql
+        assert "NOT coalesce(notification_settings.digest_enabled, false)" in sql
+        assert "users.role IN" not in sql
+
+    def test_visibility_filters_roles(self, repository):
+        sql = compile_sql(repository._audience_query("event_updated", ["participant", "mentor"]))
+
+        assert "users.role IN ('PARTICIPANT', 'MENTOR')" in sql
+
+    def test_cancellation_reaches_digest_users(self, repository):
+        sql = compile_sql(repository._audience_query("event_cancelled", ["all"]))
+
+        assert "digest_enabled" not in sql
+
+    def test_unknown_type_matches_nobody(self, repository):
+        sql = compile_sql(repository._audience_query("unknown"))
+
+        assert sql.endswith("WHERE false")
+
+
+class TestLazyDefaults:
+    """Чтение настроек не создаёт строк, они появляются только при изменении"""
+
+    @pytest.fixture
+    def repository(self):
+        return NotificationSettingsRepository()
+
+    @pytest.fixture
+    def session(self):
+        session = AsyncMock()
+        session.add = MagicMock()
+
+        @asynccontextmanager
+        async def fake_db():
+            yield session
+
+        with patch('repositories.notification_repository.get_db', fake_db):
+            yield session
+
+    @pytest.mark.asyncio
+    async def test_get_settings_falls_back_to_defaults(self, repository, session):
+        session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        settings = await repository.get_settings(1)
+
+        assert settings is DEFAULT_NOTIFICATION_SETTINGS
+        session.add.assert_not_called()
+        session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_merges_stored_overrides(self, repository, session):
+        stored = NotificationSettings(user_id=2, enabled=False)
+        session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[stored])))
+        )
+
+        settings = await repository.get_settings_bulk([1, 2, 3])
+
+        assert settings == {1: DEFAULT_NOTIFICATION_SETTINGS, 2: stored, 3: DEFAULT_NOTIFICATION_SETTINGS}
+        session.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_first_toggle_materializes_row(self, repository, session):
+        session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        settings = await repository.toggle_new_events(7)
+
+        added = session.add.call_args[0][0]
+        assert added is settings
+        assert settings.user_id == 7
+        assert settings.new_event_enabled is False
+        assert settings.reminder_minutes == [5, 15, 60]
+        session.commit.assert_called_once()
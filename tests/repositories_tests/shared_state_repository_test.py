@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import postgresql
+
+from repositories.shared_state_repository import SharedStateRepository
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestSharedStateRepository:
+    """Запись «если ключа нет» — один INSERT ... ON CONFLICT, просроченные ключи переписываются"""
+
+    @pytest.fixture
+    def session(self):
+        session = AsyncMock()
+
+        @asynccontextmanager
+        async def fake_db():
+            yield session
+
+        with patch('repositories.shared_state_repository.get_db', fake_db):
+            yield session
+
+    @pytest.mark.asyncio
+    async def test_add_claims_only_missing_or_expired_keys(self, session):
+        session.execute.return_value = MagicMock(first=MagicMock(return_value=("k",)))
+
+        assert await SharedStateRepository().add("k", True) is True
+
+        sql = compile_sql(session.execute.call_args.args[0])
+        assert "INSERT INTO shared_state" in sql
+        assert "ON CONFLICT (key) DO UPDATE" in sql
+        assert "WHERE shared_state.expires_at <=" in sql
+        assert "RETURNING shared_state.key" in sql
+        session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_add_reports_taken_key(self, session):
+        session.execute.return_value = MagicMock(first=MagicMock(return_value=None))
+
+        assert await SharedStateRepository().add("k", True) is False
+
+    @pytest.mark.asyncio
+    async def test_get_skips_expired(self, session):
+        session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        assert await SharedStateRepository().get("k") is None
+
+        sql = compile_sql(session.execute.call_args.args[0])
+        assert "shared_state.expires_at IS NULL OR shared_state.expires_at >" in sql
+
+    @pytest.mark.asyncio
+    async def test_take_prefix_deletes_and_skips_expired(self, session):
+        past = datetime.now(timezone.utc) - timedelta(minutes=1)
+        rows = [MagicMock(value={"n": 1}, expires_at=None), MagicMock(value={"n": 2}, expires_at=past)]
+        session.execute.return_value = MagicMock(all=MagicMock(return_value=rows))
+
+        assert await SharedStateRepository().take_prefix("fanout:") == [{"n": 1}]
+
+        sql = compile_sql(session.execute.call_args.args[0])
+        assert "DELETE FROM shared_state" in sql
+        assert "RETURNING shared_state.value, shared_state.expires_at" in sql
+        session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_prefix_reads_alive_keys(self, session):
+        rows = [MagicMock(key="fanout:1", value={"n": 1})]
+        session.execute.return_value = MagicMock(all=MagicMock(return_value=rows))
+
+        assert await SharedStateRepository().get_prefix("fanout:") == {"fanout:1": {"n": 1}}
+
+        sql = compile_sql(session.execute.call_args.args[0])
+        assert "shared_state.key LIKE" in sql
+        assert "shared_state.expires_at IS NULL OR shared_state.expires_at >" in sql
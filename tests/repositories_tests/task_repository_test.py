@@ -22,6 +22,8 @@ class DummyTask:
         self.is_active = is_active
         self.created_at = datetime.utcnow()
         self.created_by = "creator"
+        self.deadline = None
+        self.priority = 1
 
     @staticmethod
     def from_model(model):
@@ -38,11 +40,18 @@ repo.Task = DummyTask  # безопасно мокируем Task (не TaskMode
 
 # ---------- Fake DB session & results ----------
 class FakeResult:
-    def __init__(self, one=None, many=None, rowcount=0):
+    def __init__(self, one=None, many=None, rowcount=0, row=None):
         self._one = one
         self._many = many or []
+        self._row = row
         self.rowcount = rowcount
 
+    def one(self):
+        return self._row
+
+    def first(self):
+        return self._row
+
     def scalar_one_or_none(self):
         return self._one
 
@@ -56,9 +65,12 @@ class FakeResult:
 class FakeSession:
     def __init__(self, result):
         self.result = result
+        self.added = []
+        self.statements = []
 
-    async def execute(self, *_):
+    async def execute(self, stmt, *_):
         # игнорируем stmt, возвращаем заранее подготовленный результат
+        self.statements.append(stmt)
         return self.result
 
     async def commit(self):
@@ -67,8 +79,8 @@ class FakeSession:
     async def refresh(self, *_):
         pass
 
-    def add(self, *_):
-        pass
+    def add(self, obj):
+        self.added.append(obj)
 
 
 class FakeDB:
@@ -96,6 +108,20 @@ class StubStmt:
     def order_by(self, *args, **kwargs):
         return self
 
+    def options(self, *args, **kwargs):
+        return self
+
+    def from_select(self, names, source):
+        self._values = {"columns": names, "source": source}
+        return self
+
+    def on_conflict_do_nothing(self, *args, **kwargs):
+        self.on_conflict = kwargs
+        return self
+
+    def returning(self, *args):
+        return self
+
     def values(self, *args, **kwargs):
         self._values = kwargs
         return self
@@ -111,6 +137,7 @@ def fake_sqlalchemy(monkeypatch):
     monkeypatch.setattr(repo, "select", lambda *args, **kwargs: StubStmt("select"))
     monkeypatch.setattr(repo, "update", lambda *args, **kwargs: StubStmt("update"))
     monkeypatch.setattr(repo, "delete", lambda *args, **kwargs: StubStmt("delete"))
+    monkeypatch.setattr(repo, "insert", lambda *args, **kwargs: StubStmt("insert"))
 
 
 # ---------- Тесты ----------
@@ -187,23 +214,125 @@ async def test_get_all(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_get_active_by_assignee_and_completed(monkeypatch):
-    # первый активен и не завершён для user
-    t1 = DummyTask(telegram_id="a", assigned_to="all", completed_by=[])
-    # второй — назначен user и уже завершён
-    t2 = DummyTask(telegram_id="b", assigned_to="user", completed_by=["user"])
-    # третий — назначен user и не завершён
-    t3 = DummyTask(telegram_id="c", assigned_to="user", completed_by=[])
-    session = FakeSession(FakeResult(many=[t1, t2, t3]))
+    # фильтрация по отметкам идёт в SQL, репозиторий отдаёт строки как есть
+    t1 = DummyTask(telegram_id="a", assigned_to="all")
+    t3 = DummyTask(telegram_id="c", assigned_to="user")
+    session = FakeSession(FakeResult(many=[t1, t3]))
     monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
 
     r = repo.TaskRepository()
     active = await r.get_active_by_assignee("user")
+    assert [t.telegram_id for t in active] == ["a", "c"]
+
+    t2 = DummyTask(telegram_id="b", assigned_to="user", completed_by=["user"])
+    session.result = FakeResult(many=[t2])
     completed = await r.get_completed_by_assignee("user")
+    assert [t.telegram_id for t in completed] == ["b"]
 
-    # активные: t1 (all and not completed) and t3 (assigned user and not completed)
-    assert any(t.telegram_id == "a" for t in active)
-    assert any(t.telegram_id == "c" for t in active)
-    # completed: t2
-    assert any(t.telegram_id == "b" for t in completed)
 
+@pytest.mark.asyncio
+async def test_get_statistics_from_aggregates(monkeypatch):
+    session = FakeSession(FakeResult(row=(10, 4, 3)))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
+
+    stats = await repo.TaskRepository().get_statistics("creator")
+
+    assert stats == {
+        "total_tasks": 10,
+        "completed_tasks": 4,
+        "not_completed_tasks": 6,
+        "personal_tasks": 7,
+        "group_tasks": 3,
+        "completion_rate": 40.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_statistics_empty(monkeypatch):
+    session = FakeSession(FakeResult(row=(0, 0, 0)))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
+
+    stats = await repo.TaskRepository().get_statistics()
+
+    assert stats["total_tasks"] == 0
+    assert stats["completion_rate"] == 0
+
+
+@pytest.mark.asyncio
+async def test_mark_completed_first_time(monkeypatch):
+    session = FakeSession(FakeResult(row=(7,)))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
+
+    assert await repo.TaskRepository().mark_completed("tg", "42") is True
+
+    # одна вставка с ON CONFLICT DO NOTHING, без предварительного SELECT
+    assert len(session.statements) == 1
+    stmt = session.statements[0]
+    assert stmt.kind == "insert"
+    assert stmt._values["columns"] == ["task_id", "volunteer_id", "completed_at"]
+    assert stmt.on_conflict == {"index_elements": ["task_id", "volunteer_id"]}
+
+
+@pytest.mark.asyncio
+async def test_mark_completed_repeated_or_missing_task(monkeypatch):
+    # конфликт по ключу или отсутствие задачи: RETURNING ничего не вернул
+    session = FakeSession(FakeResult(row=None))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
+
+    assert await repo.TaskRepository().mark_completed("tg", "42") is False
+
+
+@pytest.fixture
+def stub_board_stmt(monkeypatch):
+    # сам запрос проверяется компиляцией, здесь — сборка результата
+    monkeypatch.setattr(repo.TaskRepository, "_board_stmt", lambda self, **kwargs: StubStmt("board"))
+
+
+def board_row(task_id, volunteer_id, completed, assigned_to="all", name=None):
+    from types import SimpleNamespace
+    return SimpleNamespace(
+        telegram_id=task_id, title=f"Задача {task_id}", description="desc", assigned_to=assigned_to,
+        created_at=datetime(2025, 1, 1), assignee_name=None, done=1, assigned=2,
+        total_tasks=2, total_volunteers=2,
+        volunteer_id=volunteer_id, full_name=name or f"Волонтёр {volunteer_id}", completed=completed,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_board_collects_matrix(monkeypatch, stub_board_stmt):
+    rows = [
+        board_row("t1", "1", True),
+        board_row("t1", "2", False),
+        board_row("t2", "1", False, assigned_to="2"),
+        board_row("t2", "2", True, assigned_to="2"),
+    ]
+    session = FakeSession(FakeResult(many=rows))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
+
+    board = await repo.TaskRepository().get_board("creator", task_limit=5, volunteer_limit=10)
+
+    assert [task["telegram_id"] for task in board["tasks"]] == ["t1", "t2"]
+    assert board["volunteers"] == [("1", "Волонтёр 1"), ("2", "Волонтёр 2")]
+    assert board["completed"] == {("t1", "1"), ("t2", "2")}
+    assert (board["total_tasks"], board["total_volunteers"]) == (2, 2)
+    # одна выборка на всю страницу доски
+    assert len(session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_board_without_volunteers(monkeypatch, stub_board_stmt):
+    session = FakeSession(FakeResult(many=[board_row("t1", None, False)]))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
+
+    board = await repo.TaskRepository().get_board("creator", volunteer_limit=0)
+
+    assert len(board["tasks"]) == 1
+    assert board["volunteers"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_task_card_not_found(monkeypatch, stub_board_stmt):
+    session = FakeSession(FakeResult(many=[]))
+    monkeypatch.setattr(repo, "get_db", lambda: FakeDB(session))
 
+    assert await repo.TaskRepository().get_task_card("missing") is None
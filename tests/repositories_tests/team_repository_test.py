@@ -2,7 +2,9 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.engine.result import ScalarResult
+from sqlalchemy.exc import IntegrityError
 
+from repositories import team_repository
 from repositories.team_repository import TeamRepository
 from models.team import Team
 from models.user import User, UserRole
@@ -58,3 +60,91 @@ class TestTeamRepository:
 
             assert result is True
 
+
+    @pytest.mark.asyncio
+    async def test_get_team_details_single_query(self, repo, mock_session, mock_team):
+        with patch('repositories.team_repository.get_db', return_value=mock_session):
+            mock_result = MagicMock()
+            mock_result.scalar_one_or_none = MagicMock(return_value=mock_team)
+            mock_session.execute = AsyncMock(return_value=mock_result)
+            mock_session.__aenter__.return_value = mock_session
+
+            result = await repo.get_team_details(captain_id=1)
+
+            assert result is mock_team
+            mock_session.execute.assert_called_once()
+            stmt = mock_session.execute.call_args[0][0]
+            assert len(stmt._with_options) == 3
+
+    @pytest.mark.asyncio
+    async def test_add_member_atomic_respects_size_cap(self, repo, mock_session, mock_team):
+        with patch('repositories.team_repository.get_db', return_value=mock_session):
+            mock_result = MagicMock()
+            mock_result.scalar_one_or_none = MagicMock(return_value=mock_team)
+            mock_session.execute = AsyncMock(return_value=mock_result)
+            mock_session.scalar = AsyncMock(return_value=5)
+            mock_session.begin = MagicMock(return_value=AsyncMock())
+            mock_session.__aenter__.return_value = mock_session
+
+            status, team = await repo.add_member_atomic(2, 1, max_members=5)
+
+            assert status == "team_full"
+            assert team is mock_team
+            # только SELECT ... FOR UPDATE, без UPDATE пользователя
+            mock_session.execute.assert_called_once()
+            stmt = mock_session.execute.call_args[0][0]
+            assert stmt._for_update_arg is not None
+
+    @pytest.mark.asyncio
+    async def test_add_member_atomic_user_already_in_team(self, repo, mock_session, mock_team):
+        with patch('repositories.team_repository.get_db', return_value=mock_session):
+            select_result = MagicMock()
+            select_result.scalar_one_or_none = MagicMock(return_value=mock_team)
+            update_result = MagicMock(rowcount=0)
+            mock_session.execute = AsyncMock(side_effect=[select_result, update_result])
+            mock_session.scalar = AsyncMock(return_value=2)
+            mock_session.begin = MagicMock(return_value=AsyncMock())
+            mock_session.__aenter__.return_value = mock_session
+
+            status, _ = await repo.add_member_atomic(2, 1)
+
+            assert status == "in_team"
+            assert mock_session.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_create_team_atomic_maps_name_race_to_name_taken(self, repo, mock_session):
+        captain = MagicMock(id=1, team_id=None, role=team_repository.UserRole.PARTICIPANT)
+        with patch('repositories.team_repository.get_db', return_value=mock_session):
+            captain_result = MagicMock()
+            captain_result.scalar_one_or_none = MagicMock(return_value=captain)
+            existing_result = MagicMock()
+            existing_result.first = MagicMock(return_value=None)
+            mock_session.execute = AsyncMock(side_effect=[captain_result, existing_result])
+            # проверка прошла, но команду с тем же названием успели создать параллельно
+            mock_session.flush = AsyncMock(side_effect=IntegrityError(
+                "INSERT", {}, Exception('duplicate key value violates unique constraint "uq_teams_name"')
+            ))
+            mock_session.add = MagicMock()
+            mock_session.begin = MagicMock(return_value=AsyncMock())
+            mock_session.__aenter__.return_value = mock_session
+
+            status, team = await repo.create_team_atomic(1, "Test Team")
+
+            assert (status, team) == ("name_taken", None)
+
+    @pytest.mark.asyncio
+    async def test_create_team_atomic_reraises_other_integrity_errors(self, repo, mock_session):
+        captain = MagicMock(id=1, team_id=None, role=team_repository.UserRole.PARTICIPANT)
+        with patch('repositories.team_repository.get_db', return_value=mock_session):
+            captain_result = MagicMock()
+            captain_result.scalar_one_or_none = MagicMock(return_value=captain)
+            existing_result = MagicMock()
+            existing_result.first = MagicMock(return_value=None)
+            mock_session.execute = AsyncMock(side_effect=[captain_result, existing_result])
+            mock_session.flush = AsyncMock(side_effect=IntegrityError("INSERT", {}, Exception("fk violation")))
+            mock_session.add = MagicMock()
+            mock_session.begin = MagicMock(return_value=AsyncMock())
+            mock_session.__aenter__.return_value = mock_session
+
+            with pytest.raises(IntegrityError):
+                await repo.create_team_atomic(1, "Test Team")
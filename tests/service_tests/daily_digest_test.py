@@ -0,0 +1,85 @@
+import pytest
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+from bot.services.daily_digest import DailyDigestScheduler, digest_text
+
+
+def event(title, start, end, location=""):
+    return {"title": title, "start_time_local": start, "end_time_local": end, "location": location}
+
+
+SNAPSHOT = [
+    event("Ужин", datetime(2025, 12, 15, 19, 0), datetime(2025, 12, 15, 20, 0)),
+    event("Открытие", datetime(2025, 12, 15, 10, 0), datetime(2025, 12, 15, 11, 0), "Главный зал"),
+    event("Питчи", datetime(2025, 12, 16, 12, 0), datetime(2025, 12, 16, 13, 0)),
+]
+
+
+def recipient(user_id, role="participant", tz="UTC+3", hour=9, sent_on=None):
+    return Mock(id=user_id, telegram_id=str(100 + user_id), role=role, timezone=tz,
+                digest_hour=hour, digest_sent_on=sent_on)
+
+
+@pytest.fixture
+def notification_service():
+    with patch('bot.services.daily_digest.NotificationService') as MockNotificationService:
+        service = MockNotificationService.return_value
+        service.mark_digest_sent = AsyncMock()
+        yield service
+
+
+@pytest.fixture
+def schedule_service():
+    with patch('bot.services.daily_digest.ScheduleService') as MockScheduleService:
+        service = MockScheduleService.return_value
+        service.get_schedule_snapshot = AsyncMock(return_value=SNAPSHOT)
+        yield service
+
+
+class TestDigestText:
+
+    def test_only_events_of_the_day_in_order(self):
+        text = digest_text(SNAPSHOT, date(2025, 12, 15), "UTC+3")
+
+        assert text.startswith("📰 <b>Расписание на 15.12</b>")
+        assert text.index("Открытие") < text.index("Ужин")
+        assert "10:00–11:00 <b>Открытие</b>" in text and "📍 Главный зал" in text
+        assert "Питчи" not in text
+
+    def test_empty_day(self):
+        assert digest_text(SNAPSHOT, date(2025, 12, 17), "UTC+3") is None
+
+
+class TestDailyDigestScheduler:
+
+    @pytest.mark.asyncio
+    async def test_sends_one_batch_at_local_hour(self, notification_service, schedule_service):
+        # 06:00 UTC — 09:00 в UTC+3 и 11:00 в UTC+5
+        notification_service.get_digest_recipients = AsyncMock(return_value=[
+            recipient(1),
+            recipient(2),
+            recipient(3, tz="UTC+5"),
+            recipient(4, sent_on=date(2025, 12, 15)),
+        ])
+        sender = Mock(send_many=AsyncMock(return_value=2))
+
+        sent = await DailyDigestScheduler().tick(sender, datetime(2025, 12, 15, 6, 0, tzinfo=timezone.utc))
+
+        assert sent == 2
+        schedule_service.get_schedule_snapshot.assert_called_once_with("participant", "UTC+3")
+        messages = sender.send_many.call_args[0][0]
+        assert [chat_id for chat_id, _ in messages] == [101, 102]
+        assert messages[0][1] is messages[1][1]
+        notification_service.mark_digest_sent.assert_called_once_with([1, 2], date(2025, 12, 15))
+
+    @pytest.mark.asyncio
+    async def test_nothing_due(self, notification_service, schedule_service):
+        notification_service.get_digest_recipients = AsyncMock(return_value=[recipient(1, hour=8)])
+        sender = Mock(send_many=AsyncMock())
+
+        sent = await DailyDigestScheduler().tick(sender, datetime(2025, 12, 15, 6, 0, tzinfo=timezone.utc))
+
+        assert sent == 0
+        sender.send_many.assert_not_called()
+        notification_service.mark_digest_sent.assert_not_called()
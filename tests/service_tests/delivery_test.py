@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError
+
+from services.delivery import DeliveryReport, undeliverable_reason
+
+
+def forbidden(message):
+    return TelegramForbiddenError(method=Mock(), message=message)
+
+
+class TestUndeliverableReason:
+
+    def test_blocked_and_deactivated(self):
+        assert undeliverable_reason(forbidden("Forbidden: bot was blocked by the user")) == "blocked"
+        assert undeliverable_reason(forbidden("Forbidden: user is deactivated")) == "deactivated"
+
+    def test_chat_not_found(self):
+        error = TelegramBadRequest(method=Mock(), message="Bad Request: chat not found")
+
+        assert undeliverable_reason(error) == "chat_not_found"
+
+    def test_temporary_errors(self):
+        assert undeliverable_reason(TelegramBadRequest(method=Mock(), message="Bad Request: message is too long")) is None
+        assert undeliverable_reason(TelegramNetworkError(method=Mock(), message="timeout")) is None
+
+
+class TestDeliveryReport:
+
+    @pytest.mark.asyncio
+    async def test_marks_undeliverable_once_after_fan_out(self):
+        report = DeliveryReport()
+        report.success()
+        report.failure(2, forbidden("Forbidden: bot was blocked by the user"))
+        report.failure(3, TelegramNetworkError(method=Mock(), message="timeout"))
+        report.failure(4, TelegramBadRequest(method=Mock(), message="Bad Request: chat not found"))
+
+        with patch('services.delivery.UserService') as MockUserService:
+            MockUserService.return_value.mark_undeliverable = AsyncMock()
+            await report.save()
+
+        MockUserService.return_value.mark_undeliverable.assert_called_once_with(
+            {2: "blocked", 4: "chat_not_found"}
+        )
+        assert (report.delivered, report.failed) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_save(self):
+        report = DeliveryReport()
+        report.success()
+
+        with patch('services.delivery.UserService') as MockUserService:
+            await report.save()
+
+        MockUserService.assert_not_called()
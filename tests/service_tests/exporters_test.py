@@ -0,0 +1,130 @@
+import csv
+import enum
+import io
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+from types import SimpleNamespace
+
+from bot.services.exporters import (
+    UserExporter, CsvUserExporter, XlsxUserExporter, SheetsUserExporter, TaskBoardCsvExporter, get_exporter
+)
+
+
+COLUMNS = ["id", "full_name", "role", "created_at"]
+
+
+class Role(str, enum.Enum):
+    VOLUNTEER = "volunteer"
+
+
+@pytest.fixture
+def user_service():
+    """Фикстура: сервис, отдающий строки как серверный курсор"""
+    rows = [
+        (i, f"Пользователь {i}", Role.VOLUNTEER, datetime(2025, 1, 1, 12, 0))
+        for i in range(1, 1001)
+    ]
+
+    async def iter_rows(columns, batch_size):
+        for row in rows:
+            yield row
+
+    service = MagicMock()
+    service.iter_rows = MagicMock(side_effect=iter_rows)
+    return service
+
+
+@pytest.fixture(autouse=True)
+def fixed_columns():
+    with patch.object(UserExporter, 'columns', staticmethod(lambda: COLUMNS)):
+        yield
+
+
+class TestExporters:
+
+    def test_get_exporter(self):
+        assert isinstance(get_exporter("csv"), CsvUserExporter)
+        assert isinstance(get_exporter("xlsx"), XlsxUserExporter)
+        assert isinstance(get_exporter("sheets"), SheetsUserExporter)
+        assert get_exporter("pdf") is None
+
+    def test_base_exporter_is_abstract(self, user_service):
+        with pytest.raises(TypeError):
+            UserExporter(user_service)
+
+    @pytest.mark.asyncio
+    async def test_csv_export(self, user_service):
+        result = await CsvUserExporter(user_service).export("users")
+
+        rows = list(csv.reader(io.StringIO(result["content"].decode("utf-8-sig"))))
+        assert result["filename"] == "users.csv"
+        assert result["rows"] == 1000
+        assert rows[0] == COLUMNS
+        assert rows[1] == ["1", "Пользователь 1", "volunteer", "2025-01-01T12:00:00"]
+        user_service.iter_rows.assert_called_once_with(COLUMNS, 1000)
+
+    @pytest.mark.asyncio
+    async def test_xlsx_export(self, user_service):
+        openpyxl = pytest.importorskip("openpyxl")
+
+        result = await XlsxUserExporter(user_service).export("users")
+
+        sheet = openpyxl.load_workbook(io.BytesIO(result["content"])).active
+        assert result["filename"] == "users.xlsx"
+        assert sheet.max_row == 1001
+        assert [cell.value for cell in sheet[2]] == [1, "Пользователь 1", "volunteer", "2025-01-01T12:00:00"]
+
+
+def board_cell(task_id, volunteer_id, completed, assigned_to="all"):
+    return SimpleNamespace(
+        telegram_id=task_id, title=f"Задача {task_id}", assigned_to=assigned_to,
+        assignee_name=None if assigned_to == "all" else "Волонтёр 2",
+        done=1, assigned=2 if assigned_to == "all" else 1,
+        volunteer_id=volunteer_id, full_name=f"Волонтёр {volunteer_id}", completed=completed,
+    )
+
+
+class TestTaskBoardCsvExporter:
+
+    @pytest.mark.asyncio
+    async def test_pivots_cells_into_matrix(self):
+        cells = [
+            board_cell("t1", "1", True),
+            board_cell("t1", "2", False),
+            board_cell("t2", "1", False, assigned_to="2"),
+            board_cell("t2", "2", True, assigned_to="2"),
+        ]
+
+        async def iter_board_rows(creator_id, batch_size):
+            for cell in cells:
+                yield cell
+
+        service = MagicMock()
+        service.iter_board_rows = MagicMock(side_effect=iter_board_rows)
+
+        result = await TaskBoardCsvExporter(service).export("42", "tasks")
+
+        rows = list(csv.reader(io.StringIO(result["content"].decode("utf-8-sig"))))
+        assert result["filename"] == "tasks.csv"
+        assert result["rows"] == 2
+        assert rows == [
+            ["Задача", "Назначена", "Выполнено", "Волонтёр 1", "Волонтёр 2"],
+            ["Задача t1", "Всем", "1/2", "выполнено", "не выполнено"],
+            ["Задача t2", "Волонтёр 2", "1/1", "", "выполнено"],
+        ]
+        service.iter_board_rows.assert_called_once_with("42", 1000)
+
+    @pytest.mark.asyncio
+    async def test_empty_board(self):
+        async def iter_board_rows(creator_id, batch_size):
+            return
+            yield
+
+        service = MagicMock()
+        service.iter_board_rows = MagicMock(side_effect=iter_board_rows)
+
+        result = await TaskBoardCsvExporter(service).export("42", "tasks")
+
+        assert result["rows"] == 0
+        assert result["content"].decode("utf-8-sig").strip() == "Задача,Назначена,Выполнено"
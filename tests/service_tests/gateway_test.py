@@ -0,0 +1,127 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.methods import GetUpdates, SendMessage
+
+from bot.services.gateway import BULK, OutboundGateway, TokenBucket, bulk_priority, _priority
+
+
+class TestTokenBucket:
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        assert bucket.take() == 0
+        assert bucket.take() == 0
+        assert 0 < bucket.take() <= 0.1
+
+    def test_reserve_is_left_for_interactive(self):
+        bucket = TokenBucket(rate=10, capacity=3)
+
+        assert bucket.take(reserve=2) == 0
+        assert bucket.take(reserve=2) > 0
+        assert bucket.take() == 0
+
+
+class TestOutboundGateway:
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_and_retries(self):
+        gateway = OutboundGateway(rate=1000)
+        method = SendMessage(chat_id=1, text="hi")
+        make_request = AsyncMock(side_effect=[
+            TelegramRetryAfter(method=method, message="Flood", retry_after=2),
+            "ok",
+        ])
+
+        with patch("bot.services.gateway.asyncio.sleep", new=AsyncMock()) as sleep:
+            result = await gateway(make_request, MagicMock(), method)
+
+        assert result == "ok"
+        assert make_request.call_count == 2
+        assert any(1.5 < call.args[0] <= 2 for call in sleep.call_args_list)
+        metrics = gateway.metrics_snapshot()["sendMessage"]
+        assert metrics["calls"] == 2
+        assert metrics["retry_after"] == 1
+        assert metrics["errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_are_counted_and_raised(self):
+        gateway = OutboundGateway(rate=1000)
+        method = SendMessage(chat_id=1, text="hi")
+        make_request = AsyncMock(side_effect=TelegramBadRequest(method=method, message="Bad Request"))
+
+        with pytest.raises(TelegramBadRequest):
+            await gateway(make_request, MagicMock(), method)
+
+        assert gateway.metrics_snapshot()["sendMessage"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_updates_bypasses_limits(self):
+        gateway = OutboundGateway(rate=1000)
+        make_request = AsyncMock(return_value=[])
+
+        await gateway(make_request, MagicMock(), GetUpdates())
+
+        assert gateway.metrics == {}
+
+    @pytest.mark.asyncio
+    async def test_per_chat_limit(self):
+        gateway = OutboundGateway(rate=1000)
+        make_request = AsyncMock(return_value="ok")
+
+        with patch("bot.services.gateway.PRIVATE_CHAT_RATE", 20):
+            started = time.monotonic()
+            for _ in range(4):
+                await gateway(make_request, MagicMock(), SendMessage(chat_id=5, text="x"))
+
+        # три сообщения подряд, четвёртое ждёт около 1/20 секунды
+        assert 0.04 < time.monotonic() - started < 0.5
+
+    @pytest.mark.asyncio
+    async def test_per_chat_limit_holds_for_concurrent_requests(self):
+        gateway = OutboundGateway(rate=1000)
+        sent = []
+
+        async def make_request(bot, method):
+            sent.append(time.monotonic())
+
+        with patch("bot.services.gateway.PRIVATE_CHAT_RATE", 20):
+            started = time.monotonic()
+            await asyncio.gather(*[
+                gateway(make_request, MagicMock(), SendMessage(chat_id=12345, text="x")) for _ in range(10)
+            ])
+
+        # 3 сразу, остальные 7 — не быстрее 20 в секунду
+        assert max(sent) - started >= 7 / 20 - 0.02
+
+    @pytest.mark.asyncio
+    async def test_interactive_goes_before_bulk(self):
+        gateway = OutboundGateway(rate=20, reserve=0)
+        gateway.global_bucket.tokens = 0
+        order = []
+
+        async def make_request(bot, method):
+            order.append(method.text)
+
+        async def send(text, chat_id, bulk):
+            if bulk:
+                with bulk_priority():
+                    await gateway(make_request, MagicMock(), SendMessage(chat_id=chat_id, text=text))
+            else:
+                await gateway(make_request, MagicMock(), SendMessage(chat_id=chat_id, text=text))
+
+        bulk = [asyncio.create_task(send(f"bulk{i}", i, True)) for i in range(3)]
+        await asyncio.sleep(0)
+        reply = asyncio.create_task(send("reply", 100, False))
+        await asyncio.gather(*bulk, reply)
+
+        assert order.index("reply") <= 1
+
+    def test_bulk_priority_is_scoped(self):
+        with bulk_priority():
+            assert _priority.get() == BULK
+        assert _priority.get() != BULK
@@ -0,0 +1,200 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.services.lifecycle import Lifecycle
+from bot.services.sender import RateLimitedSender, resume_fanouts
+from services.fanout_jobs import FANOUT_PREFIX, POLL_FANOUT_PREFIX, FanoutJobStore
+
+
+@pytest.fixture
+def lifecycle():
+    lifecycle = Lifecycle(timeout=1)
+    with patch("bot.services.sender.lifecycle", lifecycle):
+        yield lifecycle
+
+
+@pytest.fixture
+def fanout_jobs():
+    with patch("bot.services.sender.fanout_jobs") as jobs:
+        jobs.checkpoint = AsyncMock(return_value=True)
+        jobs.checkpoint_poll = AsyncMock(return_value=True)
+        jobs.take_all = AsyncMock(return_value=[])
+        jobs.take_polls = AsyncMock(return_value=[])
+        yield jobs
+
+
+@pytest.fixture(autouse=True)
+def no_db():
+    with patch("bot.services.sender.DeliveryReport.save", new=AsyncMock()):
+        yield
+
+
+def make_sender(bot):
+    return RateLimitedSender(bot)
+
+
+class TestLifecycle:
+
+    @pytest.mark.asyncio
+    async def test_no_new_tasks_after_stop(self):
+        lifecycle = Lifecycle()
+        lifecycle.request_stop()
+
+        assert lifecycle.spawn(asyncio.sleep(10)) is None
+
+    @pytest.mark.asyncio
+    async def test_shutdown_waits_jobs_then_cancels_loops_then_cleans_up(self):
+        lifecycle = Lifecycle(timeout=1)
+        order = []
+
+        async def fanout():
+            with lifecycle.job():
+                await lifecycle.stopping.wait()
+                order.append("fanout")
+
+        async def loop():
+            try:
+                await asyncio.sleep(100)
+            except asyncio.CancelledError:
+                order.append("loop")
+                raise
+
+        async def flush():
+            order.append("flush")
+
+        lifecycle.spawn(loop())
+        asyncio.create_task(fanout())
+        lifecycle.on_cleanup("flush", flush)
+        await asyncio.sleep(0)
+
+        await lifecycle.shutdown()
+
+        assert order == ["fanout", "loop", "flush"]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_is_bounded(self):
+        lifecycle = Lifecycle(timeout=0.05)
+        closed = AsyncMock()
+
+        async def stuck():
+            await asyncio.sleep(100)
+
+        with patch("bot.services.lifecycle.MIN_STEP_TIMEOUT", 0.01):
+            lifecycle.on_cleanup("stuck", stuck)
+            lifecycle.on_cleanup("close", closed)
+            await asyncio.wait_for(lifecycle.shutdown(), timeout=1)
+
+        closed.assert_awaited_once()
+
+
+class TestFanoutCheckpoint:
+
+    @pytest.mark.asyncio
+    async def test_stop_mid_fanout_saves_rest(self, lifecycle, fanout_jobs):
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=lambda **kwargs: lifecycle.request_stop())
+
+        delivered = await make_sender(bot).send_many([(1, "a"), (2, "b"), (3, "c")])
+
+        assert delivered == 1
+        fanout_jobs.checkpoint.assert_awaited_once_with([(2, "b"), (3, "c")])
+
+    @pytest.mark.asyncio
+    async def test_fanout_after_stop_is_deferred(self, lifecycle, fanout_jobs):
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+        lifecycle.request_stop()
+
+        assert await make_sender(bot).send_many([(1, "a")]) == 0
+
+        bot.send_message.assert_not_called()
+        fanout_jobs.checkpoint.assert_awaited_once_with([(1, "a")])
+
+    @pytest.mark.asyncio
+    async def test_cancelled_fanout_saves_rest(self, lifecycle, fanout_jobs):
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=[None, asyncio.CancelledError()])
+
+        with pytest.raises(asyncio.CancelledError):
+            await make_sender(bot).send_many([(1, "a"), (2, "b"), (3, "c")])
+
+        fanout_jobs.checkpoint.assert_awaited_once_with([(2, "b"), (3, "c")])
+        assert lifecycle.active_jobs == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_sends_saved_rest(self, lifecycle, fanout_jobs):
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+        fanout_jobs.take_all = AsyncMock(return_value=[[(2, "b"), (3, "c")]])
+
+        assert await resume_fanouts(bot) == 2
+        assert bot.send_message.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_mid_poll_fanout_saves_rest(self, lifecycle, fanout_jobs):
+        bot = MagicMock()
+
+        async def send_poll(**kwargs):
+            lifecycle.request_stop()
+            return MagicMock()
+
+        bot.send_poll = AsyncMock(side_effect=send_poll)
+        poll = MagicMock(id=7, question="Q?", options=["a", "b"])
+
+        with patch("bot.services.sender.PollService") as MockPollService:
+            MockPollService.return_value.create_poll_message = AsyncMock()
+            sent, failed = await make_sender(bot).send_poll_many(poll, [(1, 101), (2, 102), (3, 103)])
+
+        assert (sent, failed) == (1, 0)
+        MockPollService.return_value.create_poll_message.assert_awaited_once()
+        fanout_jobs.checkpoint_poll.assert_awaited_once_with(7, [(2, 102), (3, 103)])
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_closed_polls(self, lifecycle, fanout_jobs):
+        bot = MagicMock()
+        bot.send_poll = AsyncMock()
+        fanout_jobs.take_polls = AsyncMock(return_value=[(7, [(2, 102)]), (8, [(3, 103)])])
+        polls = {7: MagicMock(id=7, is_active=True), 8: MagicMock(id=8, is_active=False)}
+
+        with patch("bot.services.sender.PollService") as MockPollService:
+            MockPollService.return_value.get_poll = AsyncMock(side_effect=polls.get)
+            MockPollService.return_value.create_poll_message = AsyncMock()
+            assert await resume_fanouts(bot) == 1
+
+        assert bot.send_poll.call_args.kwargs["chat_id"] == 102
+
+
+class TestFanoutJobStore:
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self):
+        repo = AsyncMock()
+        store = FanoutJobStore(repo)
+
+        await store.checkpoint([(1, "a"), (2, "b")])
+
+        key, value, expires_at = repo.set.call_args.args
+        assert key.startswith(FANOUT_PREFIX)
+        repo.take_prefix.return_value = [value]
+        assert await store.take_all() == [[(1, "a"), (2, "b")]]
+        repo.take_prefix.assert_awaited_once_with(FANOUT_PREFIX)
+
+    @pytest.mark.asyncio
+    async def test_poll_round_trip(self):
+        repo = AsyncMock()
+        store = FanoutJobStore(repo)
+
+        await store.checkpoint_poll(7, [(1, 101), (2, 102)])
+
+        key, value, expires_at = repo.set.call_args.args
+        assert key.startswith(POLL_FANOUT_PREFIX)
+        repo.take_prefix.return_value = [value]
+        assert await store.take_polls() == [(7, [(1, 101), (2, 102)])]
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_failure_is_reported(self):
+        repo = AsyncMock()
+        repo.set.side_effect = RuntimeError("db down")
+
+        assert await FanoutJobStore(repo).checkpoint([(1, "a")]) is False
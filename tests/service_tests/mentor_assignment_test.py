@@ -0,0 +1,100 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from services.mentor_assignment import assign_mentors
+from services.team_service import TeamService
+
+
+def team(team_id, timezone="UTC+3", name=None):
+    return SimpleNamespace(id=team_id, name=name or f"Team {team_id}", timezone=timezone, telegram_id=1000 + team_id)
+
+
+def mentor(mentor_id, timezone="UTC+3", load=0):
+    return SimpleNamespace(id=mentor_id, full_name=f"Mentor {mentor_id}", timezone=timezone, telegram_id=2000 + mentor_id, load=load)
+
+
+class TestAssignMentors:
+
+    def test_minimizes_max_load(self):
+        teams = [team(i) for i in range(1, 8)]
+        mentors = [mentor(1), mentor(2), mentor(3)]
+
+        assignment = assign_mentors(teams, mentors, {1: 0, 2: 0, 3: 0})
+
+        loads = [list(assignment.values()).count(m.id) for m in mentors]
+        assert len(assignment) == 7
+        assert max(loads) == 3
+        assert min(loads) == 2
+
+    def test_accounts_for_existing_load(self):
+        teams = [team(1), team(2)]
+        mentors = [mentor(1), mentor(2)]
+
+        assignment = assign_mentors(teams, mentors, {1: 3, 2: 0})
+
+        assert set(assignment.values()) == {2}
+
+    def test_prefers_timezone_overlap(self):
+        teams = [team(1, "UTC+10"), team(2, "UTC+2")]
+        mentors = [mentor(1, "UTC+2"), mentor(2, "UTC+9")]
+
+        assignment = assign_mentors(teams, mentors, {})
+
+        assert assignment == {1: 2, 2: 1}
+
+    def test_iana_timezones_are_resolved(self):
+        teams = [team(1, "Asia/Vladivostok"), team(2, "Europe/Moscow")]
+        mentors = [mentor(1, "UTC+3"), mentor(2, "Asia/Tokyo")]
+
+        assignment = assign_mentors(teams, mentors, {})
+
+        assert assignment == {1: 2, 2: 1}
+
+    def test_timezone_does_not_override_load_bound(self):
+        teams = [team(i, "UTC+3") for i in range(1, 11)]
+        mentors = [mentor(1, "UTC+3"), mentor(2, "UTC+10")]
+
+        assignment = assign_mentors(teams, mentors, {})
+
+        loads = [list(assignment.values()).count(m.id) for m in mentors]
+        assert loads == [5, 5]
+
+    def test_load_bound_counts_existing_teams(self):
+        teams = [team(i, "UTC+3") for i in range(1, 5)]
+        mentors = [mentor(1, "UTC+3"), mentor(2, "UTC+10")]
+
+        assignment = assign_mentors(teams, mentors, {1: 0, 2: 2})
+
+        # предел 3: ментору 1 — три команды, ментору 2 — одна сверх двух своих
+        assert list(assignment.values()).count(1) == 3
+        assert list(assignment.values()).count(2) == 1
+
+    def test_falls_back_when_no_overlap(self):
+        assignment = assign_mentors([team(1, "UTC-8")], [mentor(1, "UTC+10")], {})
+
+        assert assignment == {1: 1}
+
+    def test_no_mentors(self):
+        assert assign_mentors([team(1)], [], {}) == {}
+
+
+class TestAutoAssignMentors:
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_single_bulk_update(self):
+        team_repo = AsyncMock()
+        team_repo.get_mentor_assignment_snapshot.return_value = (
+            [team(1), team(2)], [mentor(5), mentor(6)]
+        )
+        # команда 2 успела получить ментора после снимка
+        team_repo.bulk_assign_mentors.return_value = [1]
+
+        assigned = await TeamService(team_repo, AsyncMock()).auto_assign_mentors()
+
+        team_repo.get_mentor_assignment_snapshot.assert_called_once()
+        team_repo.bulk_assign_mentors.assert_called_once()
+        assignment = team_repo.bulk_assign_mentors.call_args[0][0]
+        assert set(assignment) == {1, 2}
+        assert len(set(assignment.values())) == 2
+        assert [(t.id, m.id) for t, m in assigned] == [(1, assignment[1])]
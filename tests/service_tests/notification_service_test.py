@@ -93,19 +93,19 @@ class TestShouldSendNotification:
     async def test_should_send_notification_true(self, notification_service, mock_notification_repository):
         mock_settings = Mock()
         mock_settings.is_enabled_for_type.return_value = True
-        mock_notification_repository.get_or_create_settings.return_value = mock_settings
+        mock_notification_repository.get_settings.return_value = mock_settings
 
         result = await notification_service.should_send_notification(123, NotificationType.NEW_EVENT)
 
         assert result is True
-        mock_notification_repository.get_or_create_settings.assert_called_once_with(123)
+        mock_notification_repository.get_settings.assert_called_once_with(123)
         mock_settings.is_enabled_for_type.assert_called_once_with(NotificationType.NEW_EVENT)
 
     @pytest.mark.asyncio
     async def test_should_send_notification_false(self, notification_service, mock_notification_repository):
         mock_settings = Mock()
         mock_settings.is_enabled_for_type.return_value = False
-        mock_notification_repository.get_or_create_settings.return_value = mock_settings
+        mock_notification_repository.get_settings.return_value = mock_settings
 
         result = await notification_service.should_send_notification(123, NotificationType.NEW_EVENT)
 
@@ -150,29 +150,92 @@ class TestIsReminderSent:
 
 class TestGetUsersForNotification:
     @pytest.mark.asyncio
-    async def test_get_users_for_notification_filtered(self, notification_service):
+    async def test_get_users_for_notification_filtered(self, notification_service, mock_notification_repository):
         user1 = Mock(id=123)
         user2 = Mock(id=456)
         user3 = Mock(id=789)
+        mock_notification_repository.filter_user_ids.return_value = [789, 123]
+
+        result = await notification_service.get_users_for_notification(
+            notification_type=NotificationType.NEW_EVENT,
+            users=[user1, user2, user3]
+        )
 
-        with patch.object(notification_service, 'should_send_notification') as mock_should_send:
-            mock_should_send.side_effect = lambda user_id, notification_type: user_id in [123, 789]
+        assert [user.id for user in result] == [123, 789]
+        mock_notification_repository.filter_user_ids.assert_called_once_with(
+            NotificationType.NEW_EVENT, [123, 456, 789]
+        )
+        mock_notification_repository.get_or_create_settings.assert_not_called()
 
-            result = await notification_service.get_users_for_notification(
-                notification_type=NotificationType.NEW_EVENT,
-                users=[user1, user2, user3]
-            )
+    @pytest.mark.asyncio
+    async def test_get_users_for_notification_empty(self, notification_service, mock_notification_repository):
+        mock_notification_repository.filter_user_ids.return_value = []
+
+        result = await notification_service.get_users_for_notification(
+            notification_type=NotificationType.NEW_EVENT,
+            users=[Mock(id=123), Mock(id=456)]
+        )
 
-            assert len(result) == 2
-            assert result[0].id == 123
-            assert result[1].id == 789
+        assert result == []
 
+
+class TestGetAudience:
     @pytest.mark.asyncio
-    async def test_get_users_for_notification_empty(self, notification_service):
-        with patch.object(notification_service, 'should_send_notification', return_value=False):
-            result = await notification_service.get_users_for_notification(
-                notification_type=NotificationType.NEW_EVENT,
-                users=[Mock(id=123), Mock(id=456)]
-            )
-
-            assert result == []
\ No newline at end of file
+    async def test_get_audience(self, notification_service, mock_notification_repository):
+        mock_notification_repository.get_audience.return_value = [111, 222]
+
+        result = await notification_service.get_audience(NotificationType.EVENT_UPDATED, ["mentor"])
+
+        assert result == [111, 222]
+        mock_notification_repository.get_audience.assert_called_once_with(NotificationType.EVENT_UPDATED, ["mentor"])
+
+
+class TestDefaultSettings:
+    @pytest.mark.asyncio
+    async def test_get_settings_does_not_create(self, notification_service, mock_notification_repository):
+        from models.notification_settings import DEFAULT_NOTIFICATION_SETTINGS
+        mock_notification_repository.get_settings.return_value = DEFAULT_NOTIFICATION_SETTINGS
+
+        result = await notification_service.get_settings(123)
+
+        assert result is DEFAULT_NOTIFICATION_SETTINGS
+        mock_notification_repository.get_or_create_settings.assert_not_called()
+
+    def test_defaults_are_immutable(self):
+        import dataclasses
+        from models.notification_settings import DEFAULT_NOTIFICATION_SETTINGS
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            DEFAULT_NOTIFICATION_SETTINGS.enabled = False
+        assert DEFAULT_NOTIFICATION_SETTINGS.is_enabled_for_type(NotificationType.NEW_EVENT) is True
+
+
+class TestDailyDigest:
+    @pytest.mark.asyncio
+    async def test_toggle_digest(self, notification_service, mock_notification_repository):
+        mock_settings = Mock()
+        mock_notification_repository.toggle_digest.return_value = mock_settings
+
+        result = await notification_service.toggle_digest(123)
+
+        assert result == mock_settings
+        mock_notification_repository.toggle_digest.assert_called_once_with(123)
+
+    @pytest.mark.asyncio
+    async def test_set_digest_hour(self, notification_service, mock_notification_repository):
+        await notification_service.set_digest_hour(123, 8)
+
+        mock_notification_repository.set_digest_hour.assert_called_once_with(123, 8)
+
+    def test_digest_replaces_instant_notifications(self):
+        from models.notification_settings import NotificationSettings
+
+        settings = NotificationSettings(
+            user_id=1, enabled=True, new_event_enabled=True, event_updated_enabled=True,
+            event_cancelled_enabled=True, digest_enabled=True
+        )
+
+        assert settings.is_enabled_for_type(NotificationType.DAILY_DIGEST) is True
+        assert settings.is_enabled_for_type(NotificationType.NEW_EVENT) is False
+        assert settings.is_enabled_for_type(NotificationType.SCHEDULE_REMINDER) is False
+        assert settings.is_enabled_for_type(NotificationType.EVENT_CANCELLED) is True
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from services.schedule_service import ScheduleService
 
 
@@ -72,8 +72,10 @@ class TestGetEventsForRole:
     @pytest.mark.asyncio
     async def test_get_events_for_role_success(self, schedule_service, mock_schedule_repository):
         mock_event = Mock()
-        mock_event.start_time = datetime.now()
-        mock_event.end_time = datetime.now() + timedelta(hours=2)
+        mock_event.start_time = datetime(2025, 1, 15, 10, 0)
+        mock_event.end_time = datetime(2025, 1, 15, 12, 0)
+        mock_event.start_utc = datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
+        mock_event.end_utc = datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc)
         mock_event.creator_timezone = "UTC+3"
         mock_event.to_dict.return_value = {"title": "Test Event"}
         mock_schedule_repository.get_events_for_role.return_value = [mock_event]
@@ -86,6 +88,8 @@ class TestGetEventsForRole:
 
         assert len(result) == 1
         assert result[0]["title"] == "Test Event"
+        assert result[0]["start_time_local"] == datetime(2025, 1, 15, 10, 0)
+        assert result[0]["end_time_local"] == datetime(2025, 1, 15, 12, 0)
 
 
 class TestGetEventById:
@@ -0,0 +1,149 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from services.profile_matching import ProfileMatchingIndex, tokenize
+from services.shared_state import MemoryStateBackend
+from services.user_service import UserService
+
+
+PROFILES = [
+    (1, "Backend разработчик: Python, FastAPI, PostgreSQL"),
+    (2, "ML-инженер, Python, PyTorch, компьютерное зрение"),
+    (3, "Дизайнер интерфейсов, Figma, UX-исследования"),
+    (4, "Frontend: React, TypeScript, немного Figma"),
+]
+
+
+@pytest.fixture
+def index():
+    """Фикстура: индекс, построенный по набору анкет"""
+    profile_index = ProfileMatchingIndex()
+    profile_index.build(PROFILES)
+    return profile_index
+
+
+class TestTokenize:
+
+    def test_normalizes_skills_and_stems_russian(self):
+        tokens = tokenize("Пишу бэкенд и бэкенды на Python, C++ и node.js.")
+
+        assert "python" in tokens
+        assert "c++" in tokens
+        assert "node.js" in tokens
+        assert tokens.count("бэкенд") == 2
+        assert "и" not in tokens
+
+    def test_empty_text(self):
+        assert tokenize(None) == []
+        assert tokenize("   ") == []
+
+
+class TestProfileMatchingIndex:
+
+    def test_top_k_ranks_by_shared_skills(self, index):
+        result = index.top_k("Ищу бэкендера на Python и PostgreSQL", k=2)
+
+        assert [user_id for user_id, _ in result] == [1, 2]
+        assert 0 < result[1][1] < result[0][1] <= 1
+
+    def test_exclude_and_unknown_terms(self, index):
+        assert index.top_k("Python", k=5, exclude={1, 2}) == []
+        assert index.top_k("Haskell Erlang", k=5) == []
+
+    def test_incremental_update_and_remove(self, index):
+        index.update(3, "Rust, системное программирование")
+        assert [user_id for user_id, _ in index.top_k("Figma", k=5)] == [4]
+        assert index.top_k("Rust", k=5)[0][0] == 3
+
+        index.remove(3)
+        assert index.top_k("Rust", k=5) == []
+        assert len(index) == 3
+
+    def test_update_recomputes_only_changed_row(self, index):
+        index.top_k("Python", k=1)
+        other_vector = index._vectors[1]
+
+        with patch.object(index, '_vectorize', wraps=index._vectorize) as vectorize:
+            index.update(3, "Rust, Figma")
+
+        # один вектор для анкеты 3, остальные анкеты не пересчитываются
+        assert vectorize.call_count == 1
+        assert index._vectors[1] is other_vector
+        assert index.top_k("Rust", k=1)[0][0] == 3
+
+    def test_many_updates_refresh_all_vectors(self, index):
+        index.top_k("Python", k=1)
+
+        with patch('services.profile_matching.IDF_REFRESH_MIN', 1):
+            index.update(3, "Rust")
+            index.update(4, "Go")
+
+        assert not index._vectors_ready
+        assert index.top_k("Go", k=1)[0][0] == 4
+
+    def test_complementary_prefers_new_skills_over_duplicates(self):
+        index = ProfileMatchingIndex()
+        index.build(PROFILES + [(5, "Backend: Python, FastAPI, PostgreSQL, Docker")])
+
+        result = index.top_complementary(PROFILES[0][1], k=5, exclude={1})
+
+        # ML-инженер дополняет бэкендера лучше почти полного двойника,
+        # анкеты без общих навыков не подходят вовсе
+        assert [user_id for user_id, _ in result] == [2, 5]
+        assert result[0][1] > result[1][1]
+
+
+class TestGetMatchingProfiles:
+
+    @pytest.mark.asyncio
+    async def test_builds_index_once_and_filters_inactive(self):
+        repo = AsyncMock()
+        repo.get_profile_texts.return_value = PROFILES
+        # анкета 2 уже неактивна и не возвращается репозиторием
+        repo.get_active_profiles_by_ids.side_effect = lambda ids: [Mock(id=i) for i in ids if i != 2]
+        service = UserService(repo)
+
+        with patch('services.user_service.profile_index', ProfileMatchingIndex()):
+            first = await service.get_matching_profiles(99, "Python backend", limit=1)
+            await service.get_matching_profiles(99, "Python backend", limit=1)
+
+        repo.get_profile_texts.assert_called_once()
+        assert [profile.id for profile, _ in first] == [1]
+
+    @pytest.mark.asyncio
+    async def test_update_profile_refreshes_index(self):
+        repo = AsyncMock()
+        repo.update_profile.return_value = True
+        fresh_index = ProfileMatchingIndex()
+        fresh_index.build(PROFILES)
+        service = UserService(repo)
+
+        with patch('services.user_service.profile_index', fresh_index):
+            await service.update_user_profile(3, "Go, Kubernetes")
+
+        assert fresh_index.top_k("Kubernetes", k=1)[0][0] == 3
+
+    @pytest.mark.asyncio
+    async def test_edit_on_other_worker_triggers_rebuild(self):
+        backend = MemoryStateBackend()
+        backend.shared = True
+        repo = AsyncMock()
+        repo.update_profile.return_value = True
+        repo.get_profile_texts.return_value = PROFILES
+        repo.get_active_profiles_by_ids.side_effect = lambda ids: [Mock(id=i) for i in ids]
+        # два воркера: у каждого свой индекс, версия анкет — в общем хранилище
+        this_worker, other_worker = ProfileMatchingIndex(backend), ProfileMatchingIndex(backend)
+        service = UserService(repo)
+
+        with patch('services.user_service.profile_index', this_worker):
+            await service.get_matching_profiles(99, "Python backend")
+        with patch('services.user_service.profile_index', other_worker):
+            await service.update_user_profile(3, "Go, Kubernetes")
+
+        repo.get_profile_texts.return_value = PROFILES[:2] + [(3, "Go, Kubernetes")]
+        with patch('services.user_service.profile_index', this_worker), \
+                patch('services.profile_matching.SHARED_SYNC_INTERVAL', 0):
+            matches = await service.get_matching_profiles(99, "Kubernetes")
+
+        assert repo.get_profile_texts.call_count == 2
+        assert [profile.id for profile, _ in matches] == [3]
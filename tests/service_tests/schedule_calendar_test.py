@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime, timezone
+
+from services.schedule_calendar import ScheduleSnapshotCache, render_ics
+from services.schedule_import import parse_ics
+
+
+EVENT = {
+    "id": 7,
+    "title": "Питчи; финал",
+    "description": "Порядок выступлений, " + "очень длинное описание " * 5,
+    "location": "Главный зал",
+    "visibility": ["participant", "mentor"],
+    "start_utc": datetime(2025, 12, 16, 12, 0, tzinfo=timezone.utc),
+    "end_utc": datetime(2025, 12, 16, 13, 30, tzinfo=timezone.utc),
+    "updated_at": datetime(2025, 12, 1, 9, 0),
+}
+
+
+class TestRenderIcs:
+
+    def test_renders_utc_times_and_timezone_hint(self):
+        content = render_ics([EVENT], "UTC+5").decode("utf-8")
+
+        assert content.startswith("BEGIN:VCALENDAR\r\n")
+        assert "X-WR-TIMEZONE:Etc/GMT-5\r\n" in content
+        assert "UID:event-7@hackathon-bot\r\n" in content
+        assert "DTSTART:20251216T120000Z\r\n" in content
+        assert "DTSTAMP:20251201T090000Z\r\n" in content
+        assert "SUMMARY:Питчи\\; финал\r\n" in content
+        assert all(len(line.encode("utf-8")) <= 75 for line in content.split("\r\n"))
+
+    def test_round_trips_through_importer(self):
+        content = render_ics([EVENT], "UTC+3").decode("utf-8")
+
+        events, errors = parse_ics(content, "UTC+3")
+
+        assert errors == []
+        [(_, event)] = events
+        assert event["title"] == EVENT["title"]
+        assert event["description"] == EVENT["description"].strip()
+        assert event["start_utc"] == EVENT["start_utc"]
+        assert event["end_utc"] == EVENT["end_utc"]
+        assert event["visibility"] == ["participant", "mentor"]
+
+
+class TestScheduleSnapshotCache:
+
+    @pytest.mark.asyncio
+    async def test_builds_once_until_invalidated(self):
+        cache = ScheduleSnapshotCache()
+        calls = []
+
+        async def build():
+            calls.append(1)
+            return len(calls)
+
+        assert await cache.get("key", build) == 1
+        assert await cache.get("key", build) == 1
+        cache.invalidate()
+        assert await cache.get("key", build) == 2
+
+    @pytest.mark.asyncio
+    async def test_does_not_store_snapshot_built_during_change(self):
+        cache = ScheduleSnapshotCache()
+
+        async def build():
+            cache.invalidate()
+            return "stale"
+
+        assert await cache.get("key", build) == "stale"
+        assert cache.peek("key") is None
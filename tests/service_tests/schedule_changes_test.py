@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.services.schedule_changes import ScheduleChangeNotifier
+from services.shared_state import MemoryStateBackend
+
+
+@pytest.fixture
+def service():
+    with patch('bot.services.schedule_changes.ScheduleService') as MockScheduleService:
+        service = MockScheduleService.return_value
+        service.build_change_messages = AsyncMock(return_value=[(1, "text"), (2, "text")])
+        yield service
+
+
+@pytest.fixture
+def sender():
+    with patch('bot.services.schedule_changes.RateLimitedSender') as MockSender:
+        sender = MockSender.return_value
+        sender.send_many = AsyncMock(return_value=2)
+        yield sender
+
+
+def notifier(**kwargs):
+    return ScheduleChangeNotifier(backend=MemoryStateBackend(), **kwargs)
+
+
+class TestScheduleChangeNotifier:
+
+    @pytest.mark.asyncio
+    async def test_merges_quick_edits_into_one_message(self, service, sender):
+        changes = notifier(window=0.05)
+        bot = MagicMock()
+
+        await changes.add(1, {"title": "Новое"})
+        await asyncio.sleep(0.02)
+        await changes.add(1, {"start_time": "10:00"})
+        await changes.add(1, {"location": "Зал"})
+        assert await changes.flush_due(bot) == 0
+
+        await asyncio.sleep(0.06)
+        await changes.flush_due(bot)
+
+        service.build_change_messages.assert_called_once_with(
+            1, {"title": "Новое", "start_time": "10:00", "location": "Зал"}
+        )
+        sender.send_many.assert_called_once_with([(1, "text"), (2, "text")])
+        assert await changes.pending() == {}
+
+    @pytest.mark.asyncio
+    async def test_edits_from_other_workers_are_merged(self, service, sender):
+        # два воркера с общим хранилищем: правки одного события уходят одним сообщением
+        backend = MemoryStateBackend()
+        first = ScheduleChangeNotifier(window=0.01, backend=backend)
+        second = ScheduleChangeNotifier(window=0.01, backend=backend)
+
+        await first.add(1, {"title": "A"})
+        await second.add(1, {"location": "Зал"})
+        await asyncio.sleep(0.02)
+        await first.flush_due(MagicMock())
+        await second.flush_due(MagicMock())
+
+        service.build_change_messages.assert_called_once_with(1, {"title": "A", "location": "Зал"})
+
+    @pytest.mark.asyncio
+    async def test_events_are_sent_separately(self, service, sender):
+        changes = notifier(window=0.01)
+
+        await changes.add(1, {"title": "A"})
+        await changes.add(2, {"title": "B"})
+        await asyncio.sleep(0.02)
+        await changes.flush_due(MagicMock())
+
+        assert service.build_change_messages.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_max_delay_caps_debounce(self, service, sender):
+        changes = notifier(window=0.05, max_delay=0.08)
+        bot = MagicMock()
+
+        for _ in range(6):
+            await changes.add(1, {"title": "A"})
+            await changes.flush_due(bot)
+            await asyncio.sleep(0.02)
+
+        service.build_change_messages.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_discard_drops_pending_changes(self, service, sender):
+        changes = notifier(window=0.01)
+
+        await changes.add(1, {"title": "A"})
+        await changes.discard(1)
+        await asyncio.sleep(0.02)
+        await changes.flush_due(MagicMock())
+
+        service.build_change_messages.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_all_sends_immediately(self, service, sender):
+        changes = notifier(window=60)
+
+        await changes.add(1, {"title": "A"})
+        await changes.flush_all(MagicMock())
+
+        service.build_change_messages.assert_called_once_with(1, {"title": "A"})
+        assert await changes.pending() == {}
+
+    @pytest.mark.asyncio
+    async def test_flush_all_leaves_shared_changes_to_leader(self, service, sender):
+        backend = MemoryStateBackend()
+        backend.shared = True
+        changes = ScheduleChangeNotifier(window=60, backend=backend)
+
+        await changes.add(1, {"title": "A"})
+        await changes.flush_all(MagicMock())
+
+        service.build_change_messages.assert_not_called()
+        assert list(await changes.pending()) == [1]
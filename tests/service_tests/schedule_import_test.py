@@ -0,0 +1,86 @@
+import pytest
+from datetime import datetime, timezone
+
+from services.schedule_import import ScheduleImportError, parse_schedule_file
+
+
+CSV = (
+    "title;start;duration;location;visibility\n"
+    "Открытие;15.12.2025 10:00;60;Главный зал;all\n"
+    "Чекпоинт;15.12.2025 18:00;30;;participant mentor\n"
+)
+
+ICS = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Питчи\\, финал\r\n"
+    "DTSTART:20251216T120000Z\r\n"
+    "DURATION:PT1H30M\r\n"
+    "DESCRIPTION:Первая строка\\nвторая стро\r\n"
+    " ка\r\n"
+    "CATEGORIES:PARTICIPANT,ORGANIZER\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Ужин\r\n"
+    "DTSTART;TZID=Europe/Moscow:20251216T190000\r\n"
+    "DTEND;TZID=Europe/Moscow:20251216T200000\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+class TestParseScheduleFile:
+
+    def test_csv_in_creator_timezone(self):
+        events = parse_schedule_file(CSV.encode("utf-8-sig"), "schedule.csv", "UTC+5")
+
+        assert len(events) == 2
+        assert events[0]["title"] == "Открытие"
+        assert events[0]["start_time"] == datetime(2025, 12, 15, 10, 0)
+        assert events[0]["start_utc"] == datetime(2025, 12, 15, 5, 0, tzinfo=timezone.utc)
+        assert events[0]["end_utc"] == datetime(2025, 12, 15, 6, 0, tzinfo=timezone.utc)
+        assert events[0]["location"] == "Главный зал"
+        assert events[0]["visibility"] == ["all"]
+        assert events[1]["visibility"] == ["participant", "mentor"]
+
+    def test_ics(self):
+        events = parse_schedule_file(ICS.encode(), "calendar.ics", "UTC+3")
+
+        assert [event["title"] for event in events] == ["Питчи, финал", "Ужин"]
+        assert events[0]["start_utc"] == datetime(2025, 12, 16, 12, 0, tzinfo=timezone.utc)
+        assert events[0]["end_utc"] == datetime(2025, 12, 16, 13, 30, tzinfo=timezone.utc)
+        assert events[0]["start_time"] == datetime(2025, 12, 16, 15, 0)
+        assert events[0]["description"] == "Первая строка\nвторая строка"
+        assert events[0]["visibility"] == ["participant", "organizer"]
+        assert events[1]["start_utc"] == datetime(2025, 12, 16, 16, 0, tzinfo=timezone.utc)
+
+    def test_collects_all_errors(self):
+        content = (
+            "title,start,duration,visibility\n"
+            ",15.12.2025 10:00,60,\n"
+            "Ок,15.12.2025 10:00,60,\n"
+            "Дата,завтра,60,\n"
+            "Роль,15.12.2025 12:00,60,admins\n"
+            "Ок,15.12.2025 10:00,30,\n"
+        ).encode()
+
+        with pytest.raises(ScheduleImportError) as error:
+            parse_schedule_file(content, "schedule.csv", "UTC+3")
+
+        assert error.value.errors == [
+            "Строка 2: не указано название",
+            "Строка 4: неверная дата «завтра», ожидается ДД.ММ.ГГГГ ЧЧ:ММ",
+            "Строка 5: неизвестные роли: admins",
+            "Строка 6: повторяет событие из строки 3",
+        ]
+
+    def test_missing_columns(self):
+        with pytest.raises(ScheduleImportError) as error:
+            parse_schedule_file(b"title,location\n", "schedule.csv", "UTC+3")
+
+        assert error.value.errors == ["Нет колонок: start, duration или end"]
+
+    def test_unsupported_extension(self):
+        with pytest.raises(ScheduleImportError):
+            parse_schedule_file(CSV.encode(), "schedule.xlsx", "UTC+3")
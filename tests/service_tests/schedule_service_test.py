@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from services.schedule_service import ScheduleService
 from models.schedule import Event, EventChangeType
 from models.user import UserRole
@@ -97,8 +97,10 @@ class TestGetEventsForRole:
     @pytest.mark.asyncio
     async def test_get_events_for_role_success(self, schedule_service, mock_schedule_repository):
         mock_event = Mock()
-        mock_event.start_time = datetime.now()
-        mock_event.end_time = datetime.now() + timedelta(hours=2)
+        mock_event.start_time = datetime(2025, 1, 15, 10, 0)
+        mock_event.end_time = datetime(2025, 1, 15, 12, 0)
+        mock_event.start_utc = datetime(2025, 1, 15, 7, 0, tzinfo=timezone.utc)
+        mock_event.end_utc = datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc)
         mock_event.creator_timezone = "UTC+3"
         mock_event.to_dict.return_value = {"title": "Test Event"}
 
@@ -112,6 +114,8 @@ class TestGetEventsForRole:
 
         assert len(result) == 1
         assert result[0]["title"] == "Test Event"
+        assert result[0]["start_time_local"] == datetime(2025, 1, 15, 10, 0)
+        assert result[0]["end_time_local"] == datetime(2025, 1, 15, 12, 0)
         mock_schedule_repository.get_events_for_role.assert_called_once_with("participant", "UTC+3", True)
 
 
@@ -160,6 +164,24 @@ class TestUpdateEvent:
                                                                       description="Updated Description")
         mock_schedule_repository.get_event_by_id.assert_called_once_with(1)
 
+    # Тест: при переносе времени пересчитываются UTC-копии в поясе создателя
+    @pytest.mark.asyncio
+    async def test_update_event_recomputes_utc(self, schedule_service, mock_schedule_repository):
+        mock_schedule_repository.update_event.return_value = True
+
+        mock_event = Mock()
+        mock_event.creator_timezone = "UTC+5"
+        mock_schedule_repository.get_event_by_id.return_value = mock_event
+
+        result = await schedule_service.update_event(event_id=1, start_time=datetime(2025, 1, 15, 10, 0))
+
+        assert result is True
+        mock_schedule_repository.update_event.assert_called_once_with(
+            1,
+            start_time=datetime(2025, 1, 15, 10, 0),
+            start_utc=datetime(2025, 1, 15, 5, 0, tzinfo=timezone.utc)
+        )
+
     # Тест для обновления несуществующего события
     @pytest.mark.asyncio
     async def test_update_event_not_found(self, schedule_service, mock_schedule_repository):
@@ -346,6 +368,8 @@ class TestGetUpcomingEventsForRole:
         mock_event = Mock()
         mock_event.start_time = datetime.now() + timedelta(hours=1)
         mock_event.end_time = datetime.now() + timedelta(hours=3)
+        mock_event.start_utc = datetime.now(timezone.utc) + timedelta(hours=1)
+        mock_event.end_utc = datetime.now(timezone.utc) + timedelta(hours=3)
         mock_event.creator_timezone = "UTC+3"
         mock_event.to_dict.return_value = {"title": "Upcoming Event"}
 
@@ -386,3 +410,119 @@ class TestConvertTimeForUser:
         assert result == event_time + timedelta(hours=2)
 
 
+
+
+class TestImportEvents:
+    # Тест: импорт передаёт в репозиторий одну пачку с поясом и автором
+    @pytest.mark.asyncio
+    async def test_import_events_bulk(self, schedule_service, mock_schedule_repository, mock_user_repository):
+        mock_user_repository.get_by_telegram_id.return_value = Mock(id=7)
+        mock_schedule_repository.create_events_bulk.return_value = ["created"]
+
+        result = await schedule_service.import_events([{"title": "A"}, {"title": "B"}], "123", "UTC+5")
+
+        assert result == ["created"]
+        mock_schedule_repository.create_events_bulk.assert_called_once_with(
+            [{"title": "A", "creator_timezone": "UTC+5"}, {"title": "B", "creator_timezone": "UTC+5"}],
+            changed_by=7
+        )
+
+    # Тест: одна сводка на пользователя, только видимые ему события
+    @pytest.mark.asyncio
+    async def test_build_import_digests(self, schedule_service):
+        events = [
+            Mock(title="Открытие", visibility=["all"],
+                 start_utc=datetime(2025, 12, 15, 7, 0, tzinfo=timezone.utc)),
+            Mock(title="Менторская сессия", visibility=["mentor"],
+                 start_utc=datetime(2025, 12, 15, 9, 0, tzinfo=timezone.utc)),
+            Mock(title="Штаб", visibility=["organizer"],
+                 start_utc=datetime(2025, 12, 15, 10, 0, tzinfo=timezone.utc)),
+        ]
+        users = [
+            Mock(telegram_id="1", role="participant", timezone="UTC+3"),
+            Mock(telegram_id="2", role="mentor", timezone="UTC+5"),
+            Mock(telegram_id="3", role="volunteer", timezone=None),
+        ]
+
+        with patch('services.schedule_service.NotificationService') as MockNotificationService:
+            MockNotificationService.return_value.get_audience = AsyncMock(return_value=users)
+            messages = await schedule_service.build_import_digests(events)
+
+        assert [chat_id for chat_id, _ in messages] == [1, 2, 3]
+        participant, mentor, volunteer = (text for _, text in messages)
+        assert "событий: 1" in participant and "15.12 10:00 — Открытие" in participant
+        assert "Менторская сессия" not in participant
+        assert "событий: 2" in mentor and "15.12 14:00 — Менторская сессия" in mentor
+        assert "Штаб" not in mentor
+        assert participant == volunteer
+
+
+class TestChangeMessages:
+    # Тест: правки передаются накопителю вместо немедленной рассылки
+    @pytest.mark.asyncio
+    async def test_update_uses_change_notifier(self, schedule_service, mock_schedule_repository):
+        notifier = AsyncMock()
+        mock_schedule_repository.get_event_by_id.return_value = Mock(title="Old Title")
+        mock_schedule_repository.update_event.return_value = True
+
+        with patch.object(ScheduleService, 'change_notifier', notifier), \
+                patch.object(schedule_service, '_notify_event_updated') as mock_notify:
+            result = await schedule_service.update_event_with_notification(event_id=1, bot=Mock(), title="New")
+
+        assert result is True
+        notifier.add.assert_awaited_once_with(1, {"title": "New"})
+        mock_notify.assert_not_called()
+
+    # Тест: одно сообщение на пользователя, текст собирается один раз на пояс
+    @pytest.mark.asyncio
+    async def test_build_change_messages(self, schedule_service, mock_schedule_repository):
+        event = Mock(is_active=True, visibility=["participant"])
+        event.to_dict.return_value = {
+            "title": "Питчи", "visibility": ["participant"], "location": "Зал",
+            "start_utc": datetime(2025, 12, 15, 7, 0, tzinfo=timezone.utc),
+            "end_utc": datetime(2025, 12, 15, 8, 0, tzinfo=timezone.utc),
+        }
+        mock_schedule_repository.get_event_by_id.return_value = event
+        users = [
+            Mock(id=1, telegram_id="1", role="participant", timezone="UTC+3"),
+            Mock(id=2, telegram_id="2", role="mentor", timezone="UTC+3"),
+            Mock(id=3, telegram_id="3", role="participant", timezone="UTC+5"),
+            Mock(id=4, telegram_id="4", role="participant", timezone="UTC+3"),
+        ]
+
+        # пользователь 4 выключил уведомления об изменениях и в аудиторию не попал
+        with patch('services.schedule_service.NotificationService') as MockNotificationService:
+            MockNotificationService.return_value.get_audience = AsyncMock(return_value=users[:3])
+            messages = await schedule_service.build_change_messages(
+                1, {"title": "Питчи", "start_time": datetime(2025, 12, 15, 10, 0), "location": "Зал"}
+            )
+
+        assert [chat_id for chat_id, _ in messages] == [1, 3]
+        first, second = (text for _, text in messages)
+        assert first.startswith("✏️ <b>Изменение в расписании</b>")
+        assert "Название: Питчи, Время начала, Место проведения" in first
+        assert "15.12 10:00" in first and "15.12 12:00" in second
+
+
+class TestNotifyDelivery:
+    # Тест: уведомление об отмене уходит одной рассылкой через подключённый sender
+    @pytest.mark.asyncio
+    async def test_cancel_goes_through_sender(self, schedule_service):
+        users = [
+            Mock(telegram_id="1", role="participant", timezone="UTC+3"),
+            Mock(telegram_id="2", role="mentor", timezone="UTC+3"),
+        ]
+        sender = Mock()
+        sender.return_value.send_many = AsyncMock(return_value=1)
+        bot = Mock(send_message=AsyncMock())
+        event_data = {"title": "Питчи", "visibility": ["participant"], "start_time": datetime(2025, 12, 15, 10, 0)}
+
+        with patch.object(ScheduleService, 'sender', sender), \
+                patch.object(schedule_service, '_recipients', new=AsyncMock(return_value=users)):
+            await schedule_service._notify_event_cancelled(bot, event_data)
+
+        sender.assert_called_once_with(bot)
+        (messages,), _ = sender.return_value.send_many.call_args
+        assert [chat_id for chat_id, _ in messages] == [1]
+        assert "Питчи" in messages[0][1]
+        bot.send_message.assert_not_called()
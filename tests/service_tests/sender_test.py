@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+from bot.services.sender import RateLimitedSender
+
+
+class TestRateLimitedSender:
+
+    @pytest.mark.asyncio
+    async def test_send_many_counts_delivered(self):
+        bot = AsyncMock()
+        bot.send_message.side_effect = [None, Exception("chat not found"), None]
+
+        sent = await RateLimitedSender(bot).send_many([(1, "a"), (2, "b"), (3, "c")])
+
+        assert sent == 2
+        assert bot.send_message.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_left_to_gateway(self):
+        bot = AsyncMock()
+        bot.send_message.side_effect = TelegramRetryAfter(method=AsyncMock(), message="Flood", retry_after=3)
+
+        with patch("bot.services.sender.asyncio.sleep", new=AsyncMock()) as sleep:
+            assert await RateLimitedSender(bot).send(1, "text") is False
+
+        # повторы после 429 делает шлюз; сюда ошибка доходит, когда они исчерпаны
+        sleep.assert_not_called()
+        assert bot.send_message.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_blocked_users_are_marked_undeliverable(self):
+        bot = AsyncMock()
+        bot.send_message.side_effect = [
+            None,
+            TelegramForbiddenError(method=AsyncMock(), message="Forbidden: bot was blocked by the user"),
+        ]
+
+        with patch("services.delivery.UserService") as MockUserService:
+            MockUserService.return_value.mark_undeliverable = AsyncMock()
+            sent = await RateLimitedSender(bot).send_many([(1, "a"), (2, "b")])
+
+        assert sent == 1
+        MockUserService.return_value.mark_undeliverable.assert_called_once_with({2: "blocked"})
@@ -0,0 +1,135 @@
+import pytest
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from aiogram.fsm.storage.base import StorageKey
+
+from bot.services.fsm_storage import SharedStateStorage
+from bot.services.leader import LeaderElection, lock_key
+from services.schedule_calendar import ScheduleSnapshotCache
+from services.shared_state import MemoryStateBackend, PostgresStateBackend, from_json, to_json
+
+
+class SharedMemoryBackend(MemoryStateBackend):
+    """Память, которую несколько «воркеров» в тесте считают общей"""
+
+    shared = True
+
+
+class TestMemoryStateBackend:
+
+    @pytest.mark.asyncio
+    async def test_add_only_once(self):
+        backend = MemoryStateBackend()
+
+        assert await backend.add("reminder:1") is True
+        assert await backend.add("reminder:1") is False
+
+        await backend.delete("reminder:1")
+        assert await backend.add("reminder:1") is True
+
+    @pytest.mark.asyncio
+    async def test_ttl_expires(self):
+        backend = MemoryStateBackend()
+        await backend.set("k", {"a": 1}, ttl=10)
+
+        with patch("services.shared_state.time.monotonic", return_value=10 ** 9):
+            assert await backend.get("k") is None
+            assert await backend.add("k") is True
+
+    @pytest.mark.asyncio
+    async def test_take_by_prefix_once(self):
+        backend = MemoryStateBackend()
+        await backend.set("change:1:a", 1)
+        await backend.set("change:1:b", 2)
+        await backend.set("change:12:c", 3)
+
+        assert await backend.items("change:1:") == {"change:1:a": 1, "change:1:b": 2}
+        assert sorted(await backend.take("change:1:")) == [1, 2]
+        assert await backend.take("change:1:") == []
+        assert await backend.items("change:") == {"change:12:c": 3}
+
+
+class TestPostgresStateBackend:
+
+    def test_json_round_trip_keeps_dates(self):
+        value = {"start_time": datetime(2026, 5, 1, 10, 0), "day": date(2026, 5, 1), "ids": (1, 2)}
+
+        assert from_json(to_json(value)) == {**value, "ids": [1, 2]}
+
+    @pytest.mark.asyncio
+    async def test_set_encodes_value_and_expiry(self):
+        repo = AsyncMock()
+        backend = PostgresStateBackend(repo)
+
+        await backend.set("k", {"at": datetime(2026, 5, 1)}, ttl=60)
+
+        key, value, expires_at = repo.set.call_args.args
+        assert key == "k"
+        assert value == {"at": {"__datetime__": "2026-05-01T00:00:00"}}
+        assert expires_at > datetime.now(timezone.utc)
+
+
+class TestSharedStateStorage:
+
+    @pytest.mark.asyncio
+    async def test_state_and_data_visible_to_other_worker(self):
+        backend = MemoryStateBackend()
+        key = StorageKey(bot_id=1, chat_id=10, user_id=10)
+        start = datetime(2026, 5, 1, 10, 0)
+
+        await SharedStateStorage(backend).set_state(key, "ScheduleStates:waiting_for_duration")
+        await SharedStateStorage(backend).set_data(key, {"start_time": start})
+
+        other = SharedStateStorage(backend)
+        assert await other.get_state(key) == "ScheduleStates:waiting_for_duration"
+        assert await other.get_data(key) == {"start_time": start}
+
+    @pytest.mark.asyncio
+    async def test_clear_removes_keys(self):
+        backend = MemoryStateBackend()
+        storage = SharedStateStorage(backend)
+        key = StorageKey(bot_id=1, chat_id=10, user_id=10)
+        await storage.set_state(key, "S:one")
+        await storage.set_data(key, {"a": 1})
+
+        await storage.set_state(key, None)
+        await storage.set_data(key, {})
+
+        assert backend._values == {}
+
+
+class TestLeaderElection:
+
+    def test_lock_key_is_stable_bigint(self):
+        assert lock_key("schedule_reminders") == lock_key("schedule_reminders")
+        assert lock_key("schedule_reminders") != lock_key("daily_digest")
+        assert -2 ** 63 <= lock_key("daily_digest") < 2 ** 63
+
+    @pytest.mark.asyncio
+    async def test_single_worker_runs_job_without_lock(self):
+        job = AsyncMock()
+        election = LeaderElection("poll_expiry", enabled=False)
+
+        with patch("bot.services.leader.engine") as engine:
+            await election.run(job)
+
+        job.assert_awaited_once()
+        engine.connect.assert_not_called()
+
+
+class TestSharedScheduleVersion:
+
+    @pytest.mark.asyncio
+    async def test_change_on_one_worker_resets_other(self):
+        backend = SharedMemoryBackend()
+        first, second = ScheduleSnapshotCache(backend), ScheduleSnapshotCache(backend)
+        build = AsyncMock(side_effect=["old", "new"])
+
+        assert await second.get("events", build) == "old"
+        await first.invalidate_everywhere()
+
+        # до следующей сверки второй воркер отдаёт прежний снимок
+        assert await second.get("events", build) == "old"
+        second._synced_at = 0.0
+        assert await second.get("events", build) == "new"
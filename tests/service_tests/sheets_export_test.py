@@ -0,0 +1,61 @@
+import enum
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime
+from types import SimpleNamespace
+
+from bot.services.fake_sheets import FakeSheetsClient
+from bot.services.utils import parse_users_to_sheet, build_user_rows
+
+
+COLUMNS = ["id", "telegram_id", "full_name", "role"]
+
+
+class Role(str, enum.Enum):
+    PARTICIPANT = "participant"
+
+
+def make_user(i):
+    user = MagicMock()
+    user.id = i
+    user.telegram_id = 1000 + i
+    user.full_name = f"User {i}"
+    user.role = Role.PARTICIPANT
+    return user
+
+
+@pytest.fixture
+def user_model():
+    """Мок модели User с фиксированным набором колонок"""
+    columns = [SimpleNamespace(name=name) for name in COLUMNS]
+    return SimpleNamespace(__table__=SimpleNamespace(columns=columns))
+
+
+class TestSheetsExport:
+
+    def test_build_user_rows_converts_values(self):
+        user = make_user(1)
+        user.created = datetime(2025, 1, 2, 3, 4)
+        rows = build_user_rows([user], ["id", "role", "created"])
+
+        assert rows == [[1, "participant", "2025-01-02T03:04:00"]]
+
+    @pytest.mark.asyncio
+    @patch('bot.services.utils.UserService')
+    async def test_export_batches_requests(self, MockUserService, user_model):
+        users = [make_user(i) for i in range(250)]
+        MockUserService.return_value.get_all = AsyncMock(return_value=users)
+        client = FakeSheetsClient()
+
+        with patch('bot.services.utils.User', user_model):
+            url = await parse_users_to_sheet("users-test", client=client, batch_size=100)
+
+        sheet = next(iter(client.spreadsheets.values()))
+        values = sheet.sheet1.get_all_values()
+        assert url == sheet.url
+        assert sheet.title == "users-test"
+        assert len(values) == 251
+        assert values[0] == COLUMNS
+        assert values[-1] == [249, 1249, "User 249", "participant"]
+        # open + title + share + clear + resize + 3 пачки
+        assert client.request_count == 8
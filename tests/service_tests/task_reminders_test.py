@@ -0,0 +1,133 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from bot.services.task_reminders import (
+    TaskReminderScheduler, build_reminder_messages, reminder_time
+)
+from services.shared_state import MemoryStateBackend
+
+
+NOW = datetime(2025, 12, 15, 12, 0)
+HOUR = timedelta(hours=1)
+
+
+def due_row(task_id, telegram_id, stage, deadline, priority=1, timezone="UTC+3"):
+    return SimpleNamespace(
+        id=task_id, title=f"Задача {task_id}", deadline=deadline, priority=priority,
+        reminder_stage=stage, telegram_id=telegram_id, timezone=timezone,
+    )
+
+
+@pytest.fixture
+def task_service():
+    service = AsyncMock()
+    service.get_deadline_schedule.return_value = []
+    service.claim_due_reminders.return_value = []
+    return service
+
+
+class TestReminderTime:
+
+    def test_upcoming_then_overdue(self):
+        deadline = NOW + 3 * HOUR
+        assert reminder_time(deadline, 0, HOUR) == NOW + 2 * HOUR
+        assert reminder_time(deadline, 1, HOUR) == deadline
+
+
+class TestBuildReminderMessages:
+
+    def test_one_message_per_volunteer(self):
+        rows = [
+            due_row(1, 100, 1, NOW + HOUR),
+            due_row(2, 100, 2, NOW - HOUR, priority=2),
+            due_row(1, 200, 1, NOW + HOUR, timezone="UTC+5"),
+        ]
+
+        messages = dict(build_reminder_messages(rows))
+
+        assert set(messages) == {100, 200}
+        assert "Дедлайн прошёл" in messages[100] and "Скоро дедлайн" in messages[100]
+        assert "🔴 Задача 2 — до 15.12 14:00" in messages[100]
+        # дедлайн показывается в поясе получателя
+        assert "Задача 1 — до 15.12 18:00" in messages[200]
+        assert "Дедлайн прошёл" not in messages[200]
+
+
+class TestTaskReminderScheduler:
+
+    @pytest.mark.asyncio
+    async def test_refresh_builds_heap_and_delay(self, task_service):
+        task_service.get_deadline_schedule.return_value = [
+            (1, NOW + 5 * HOUR, 0),
+            (2, NOW + 2 * HOUR, 1),
+        ]
+        scheduler = TaskReminderScheduler(task_service, remind_before=HOUR, refresh_interval=86400)
+
+        await scheduler.refresh()
+
+        assert not scheduler.is_due(NOW)
+        assert scheduler.next_delay(NOW) == 2 * 3600
+        assert scheduler.is_due(NOW + 2 * HOUR)
+
+    @pytest.mark.asyncio
+    async def test_next_delay_capped_by_refresh_interval(self, task_service):
+        scheduler = TaskReminderScheduler(task_service, refresh_interval=60)
+        assert scheduler.next_delay(NOW) == 60
+
+    @pytest.mark.asyncio
+    async def test_tick_claims_once_and_sends_batch(self, task_service):
+        task_service.get_deadline_schedule.return_value = [(1, NOW + HOUR / 2, 0)]
+        task_service.claim_due_reminders.return_value = [
+            due_row(1, 100, 1, NOW + HOUR / 2),
+            due_row(1, 200, 1, NOW + HOUR / 2),
+        ]
+        sender = AsyncMock()
+        sender.send_many.return_value = 2
+        scheduler = TaskReminderScheduler(task_service, remind_before=HOUR)
+        await scheduler.refresh()
+
+        sent = await scheduler.tick(sender, NOW)
+
+        assert sent == 2
+        task_service.claim_due_reminders.assert_awaited_once_with(NOW, HOUR, 200)
+        messages = sender.send_many.await_args.args[0]
+        assert [chat_id for chat_id, _ in messages] == [100, 200]
+        assert not scheduler.is_due(NOW)
+
+    @pytest.mark.asyncio
+    async def test_tick_without_recipients_sends_nothing(self, task_service):
+        sender = AsyncMock()
+        scheduler = TaskReminderScheduler(task_service)
+
+        assert await scheduler.tick(sender, NOW) == 0
+        sender.send_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_tick_schedules_deadline_without_refresh(self, task_service):
+        task_service.get_deadline_schedule.return_value = [(1, NOW + HOUR / 2, 0)]
+        task_service.claim_due_reminders.return_value = [due_row(1, 100, 1, NOW + HOUR / 2)]
+        scheduler = TaskReminderScheduler(task_service, remind_before=HOUR, refresh_interval=300)
+        await scheduler.refresh(NOW)
+
+        await scheduler.tick(AsyncMock(), NOW)
+
+        # следующее напоминание — в момент дедлайна, без повторного запроса расписания
+        assert scheduler.next_delay(NOW) == 300
+        assert scheduler.is_due(NOW + HOUR / 2)
+        assert not scheduler.needs_refresh(NOW + timedelta(seconds=299))
+        assert scheduler.needs_refresh(NOW + timedelta(seconds=300))
+        task_service.get_deadline_schedule.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_wake_reaches_leader_through_shared_state(self, task_service):
+        backend = MemoryStateBackend()
+        leader = TaskReminderScheduler(task_service, backend=backend)
+        other_worker = TaskReminderScheduler(task_service, backend=backend)
+
+        assert await leader._changed() is False
+        await other_worker.wake()
+
+        assert await leader._changed() is True
+        assert await leader._changed() is False
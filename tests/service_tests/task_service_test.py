@@ -445,3 +445,20 @@ class TestGetTasksForBroadcast:
 
 
 
+
+
+class TestTaskBoard:
+    # Тест перевода номеров страниц в смещения доски
+    @pytest.mark.asyncio
+    async def test_get_task_board_offsets(self, task_service, mock_task_repository):
+        board = {"tasks": [], "volunteers": [], "completed": set(), "total_tasks": 0, "total_volunteers": 0}
+        mock_task_repository.get_board.return_value = board
+
+        result = await task_service.get_task_board(
+            "organizer456", task_page=2, tasks_per_page=5, volunteer_page=1, volunteers_per_page=15
+        )
+
+        assert result is board
+        mock_task_repository.get_board.assert_called_once_with(
+            "organizer456", task_offset=10, task_limit=5, volunteer_offset=15, volunteer_limit=15
+        )
@@ -0,0 +1,121 @@
+import random
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from services.team_formation import (
+    form_teams, extract_skills, team_sizes, _Candidate, _improve
+)
+from services.team_service import TeamService
+
+
+PROFILES = [
+    "Python backend, FastAPI, PostgreSQL",
+    "Frontend: React и TypeScript",
+    "ML-инженер, PyTorch",
+    "Дизайнер интерфейсов, Figma",
+    "Android, Kotlin",
+    "Просто хочу участвовать",
+]
+
+
+def make_participant(i, timezone="UTC+3", profile_text=None):
+    return SimpleNamespace(
+        id=i,
+        full_name=f"Участник {i}",
+        timezone=timezone,
+        profile_text=profile_text if profile_text is not None else PROFILES[i % len(PROFILES)],
+        team_id=None
+    )
+
+
+class TestHelpers:
+
+    def test_extract_skills(self):
+        assert extract_skills("Бэкенд на Python, немного React") == ["backend", "frontend"]
+        assert extract_skills("") == ["other"]
+
+    @pytest.mark.parametrize("count, expected", [
+        (2, []), (3, [3]), (6, [3, 3]), (7, [4, 3]), (11, [4, 4, 3]), (16, [4, 4, 4, 4]),
+    ])
+    def test_team_sizes(self, count, expected):
+        assert team_sizes(count) == expected
+
+
+class TestFormTeams:
+
+    def test_sizes_and_coverage(self):
+        participants = [make_participant(i) for i in range(23)]
+
+        teams = form_teams(participants)
+
+        assert all(3 <= len(team) <= 5 for team in teams)
+        placed = [user.id for team in teams for user in team]
+        assert sorted(placed) == list(range(23))
+
+    def test_skills_are_spread(self):
+        # 4 бэкендера и 4 дизайнера должны разойтись по двум командам поровну
+        participants = (
+            [make_participant(i, profile_text="Python backend") for i in range(4)]
+            + [make_participant(i, profile_text="Дизайн, Figma") for i in range(4, 8)]
+        )
+
+        teams = form_teams(participants)
+
+        for team in teams:
+            skills = [extract_skills(user.profile_text)[0] for user in team]
+            assert skills.count("backend") == 2
+            assert skills.count("design") == 2
+
+    def test_close_timezones_grouped(self):
+        participants = (
+            [make_participant(i, timezone="UTC+2") for i in range(5)]
+            + [make_participant(i, timezone="UTC+10") for i in range(5, 10)]
+        )
+
+        teams = form_teams(participants, block_teams=1)
+
+        for team in teams:
+            assert len({user.timezone for user in team}) == 1
+
+    def test_local_search_removes_duplicates(self):
+        left = [_Candidate(make_participant(i, profile_text="Python backend")) for i in range(2)]
+        right = [_Candidate(make_participant(i, profile_text="Figma дизайн")) for i in range(2, 4)]
+
+        assert _improve([left, right]) is True
+        assert {member.primary for member in left} == {"backend", "design"}
+        assert {member.primary for member in right} == {"backend", "design"}
+
+    def test_5000_participants_under_a_second(self):
+        rng = random.Random(42)
+        zones = ["UTC+2", "UTC+3", "UTC+5", "UTC+7", "UTC+10"]
+        participants = [
+            make_participant(i, timezone=rng.choice(zones), profile_text=rng.choice(PROFILES))
+            for i in range(5000)
+        ]
+
+        started = time.perf_counter()
+        teams = form_teams(participants)
+        elapsed = time.perf_counter() - started
+
+        assert sum(len(team) for team in teams) == 5000
+        assert elapsed < 1.0
+
+
+class TestAutoFormTeams:
+
+    @pytest.mark.asyncio
+    async def test_creates_teams_in_one_bulk_call(self):
+        team_repo, user_repo = AsyncMock(), AsyncMock()
+        participants = [make_participant(i) for i in range(9)]
+        user_repo.get_users_looking_for_team.return_value = participants
+        team_repo.bulk_create_teams.return_value = ([SimpleNamespace(id=1), SimpleNamespace(id=2)], 9)
+
+        teams, left = await TeamService(team_repo, user_repo).auto_form_teams()
+
+        assert len(teams) == 2
+        assert left == 0
+        team_repo.bulk_create_teams.assert_called_once()
+        groups = team_repo.bulk_create_teams.call_args[0][0]
+        assert sorted(len(group) for group in groups) == [4, 5]
@@ -52,111 +52,51 @@ def sample_user_data():
 class TestCreateTeam:
     # Тест для успешного создания команды
     @pytest.mark.asyncio
-    async def test_create_team_success(self, team_service, mock_team_repository, mock_user_repository):
-        # Создаем мок пользователя (капитана)
-        mock_captain = Mock(spec=User)
-        mock_captain.id = 123
-        mock_captain.role = UserRole.PARTICIPANT
-
-        mock_user_repository.get_by_id.return_value = mock_captain
-        mock_team_repository.is_user_in_team.return_value = False
-        mock_team_repository.is_user_captain.return_value = False
-        mock_team_repository.get_team_by_name.return_value = None
-
-        # Используем патч чтобы не создавать реальный объект Team
-        with patch('services.team_service.Team') as MockTeam:
-            mock_team_instance = Mock()
-            mock_team_instance.id = 1
-            mock_team_instance.name = "Test Team"
-            MockTeam.return_value = mock_team_instance
-            mock_team_repository.create_team.return_value = mock_team_instance
-
-            success, team, message = await team_service.create_team(
-                captain_id=123,
-                name="Test Team"
-            )
-
-            assert success is True
-            assert team == mock_team_instance
-            assert "создана" in message
-
-            mock_user_repository.get_by_id.assert_called_once_with(123)
-            mock_team_repository.is_user_in_team.assert_called_once_with(123)
-            mock_team_repository.is_user_captain.assert_called_once_with(123)
-            mock_team_repository.get_team_by_name.assert_called_once_with("Test Team")
-
-    # Тест для создания команды с несуществующим пользователем
-    @pytest.mark.asyncio
-    async def test_create_team_user_not_found(self, team_service, mock_user_repository):
-        # Настраиваем мок
-        mock_user_repository.get_by_id.return_value = None
+    async def test_create_team_success(self, team_service, mock_team_repository):
+        mock_team = Mock()
+        mock_team.id = 1
+        mock_team.name = "Test Team"
+        mock_team_repository.create_team_atomic.return_value = ("ok", mock_team)
 
         success, team, message = await team_service.create_team(
-            captain_id=999,
+            captain_id=123,
             name="Test Team"
         )
 
-        assert success is False
-        assert team is None
-        assert "не найден" in message
+        assert success is True
+        assert team == mock_team
+        assert "создана" in message
 
-        mock_user_repository.get_by_id.assert_called_once_with(999)
+        # проверки и запись — одно обращение к репозиторию
+        mock_team_repository.create_team_atomic.assert_called_once_with(123, "Test Team")
 
-    # Тест для создания команды пользователем не участником
+    # Тесты для отказов: код результата превращается в сообщение
     @pytest.mark.asyncio
-    async def test_create_team_user_not_participant(self, team_service, mock_user_repository):
-        # Создаем мок пользователя с ролью не PARTICIPANT
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.role = UserRole.ORGANIZER
-
-        mock_user_repository.get_by_id.return_value = mock_user
+    @pytest.mark.parametrize("status, expected", [
+        ("user_not_found", "не найден"),
+        ("not_participant", "Только участники"),
+        ("in_team", "уже состоите в команде"),
+        ("already_captain", "уже являетесь капитаном"),
+        ("name_taken", "уже существует"),
+    ])
+    async def test_create_team_rejected(self, team_service, mock_team_repository, status, expected):
+        mock_team_repository.create_team_atomic.return_value = (status, None)
 
         success, team, message = await team_service.create_team(123, "Test Team")
 
         assert success is False
         assert team is None
-        assert "Только участники" in message
+        assert expected in message
 
-    # Тест для создания команды когда пользователь уже в команде
+    # Тест для ошибки БД при создании
     @pytest.mark.asyncio
-    async def test_create_team_user_already_in_team(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.role = UserRole.PARTICIPANT
-
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.is_user_in_team.return_value = True
+    async def test_create_team_db_error(self, team_service, mock_team_repository):
+        mock_team_repository.create_team_atomic.side_effect = RuntimeError("deadlock")
 
         success, team, message = await team_service.create_team(123, "Test Team")
 
         assert success is False
-        assert team is None
-        assert "уже состоите в команде" in message
-
-    # Тест для создания команды с существующим названием
-    @pytest.mark.asyncio
-    async def test_create_team_name_exists(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.role = UserRole.PARTICIPANT
-
-        # Создаем мок существующей команды
-        mock_existing_team = Mock()
-        mock_existing_team.name = "Test Team"
-
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.is_user_in_team.return_value = False
-        mock_team_repository.is_user_captain.return_value = False
-        mock_team_repository.get_team_by_name.return_value = mock_existing_team
-
-        success, team, message = await team_service.create_team(123, "Test Team")
-
-        assert success is False
-        assert team is None
-        assert "уже существует" in message
+        assert "deadlock" in message
 
 
 class TestGetTeamById:
@@ -460,177 +400,112 @@ class TestGetTeamsWithoutMentor:
 class TestLeaveTeam:
     # Тест для успешного выхода из команды
     @pytest.mark.asyncio
-    async def test_leave_team_success(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя в команде
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.team_id = 1
-
-        # Создаем мок команды
+    async def test_leave_team_success(self, team_service, mock_team_repository):
         mock_team = Mock()
-        mock_team.id = 1
         mock_team.name = "Test Team"
-        mock_team.captain_id = 456
-
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.get_team_by_id.return_value = mock_team
-        mock_team_repository.remove_user_from_team.return_value = True
+        mock_team_repository.remove_member_atomic.return_value = ("ok", mock_team)
 
         success, message = await team_service.leave_team(123)
 
         assert success is True
         assert "покинули команду" in message
         assert "Test Team" in message
-
-        mock_user_repository.get_by_id.assert_called_once_with(123)
-        mock_team_repository.get_team_by_id.assert_called_once_with(1)
-        mock_team_repository.remove_user_from_team.assert_called_once_with(123)
+        mock_team_repository.remove_member_atomic.assert_called_once_with(123)
 
     # Тест для выхода капитана из команды
     @pytest.mark.asyncio
-    async def test_leave_team_captain_cannot_leave(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя (капитана)
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.team_id = 1
-
-        # Создаем мок команды где пользователь капитан
-        mock_team = Mock()
-        mock_team.id = 1
-        mock_team.name = "Test Team"
-        mock_team.captain_id = 123  # Тот же пользователь - капитан
+    async def test_leave_team_captain_cannot_leave(self, team_service, mock_team_repository):
+        mock_team_repository.remove_member_atomic.return_value = ("captain", Mock())
 
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.get_team_by_id.return_value = mock_team
-
-        # Вызываем метод
         success, message = await team_service.leave_team(123)
 
-        # Проверяем результат
         assert success is False
         assert "Капитан не может" in message
 
-        # remove_user_from_team не должен вызываться
-        mock_team_repository.remove_user_from_team.assert_not_called()
-
-    # Тест для выхода когда команда не найдена
+    # Тест для выхода, когда пользователь не в команде
     @pytest.mark.asyncio
-    async def test_leave_team_team_not_found(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя в команде
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.team_id = 1
-
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.get_team_by_id.return_value = None
+    async def test_leave_team_not_in_team(self, team_service, mock_team_repository):
+        mock_team_repository.remove_member_atomic.return_value = ("not_in_team", None)
 
-        # Вызываем метод
         success, message = await team_service.leave_team(123)
 
-        # Проверяем результат
         assert success is False
-        assert "не найдена" in message
-
-        # remove_user_from_team не должен вызываться
-        mock_team_repository.remove_user_from_team.assert_not_called()
+        assert "не состоите в команде" in message
 
 
 class TestJoinTeam:
     # Тест для успешного присоединения к команде
     @pytest.mark.asyncio
-    async def test_join_team_success(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя без команды
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.team_id = None
-
-        # Создаем мок команды
+    async def test_join_team_success(self, team_service, mock_team_repository):
         mock_team = Mock()
-        mock_team.id = 1
         mock_team.name = "Test Team"
+        mock_team_repository.add_member_atomic.return_value = ("ok", mock_team)
 
-        # Настраиваем моки
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.get_team_by_id.return_value = mock_team
-        mock_team_repository.add_user_to_team.return_value = True
-
-        # Вызываем метод
         success, message = await team_service.join_team(123, 1)
 
-        # Проверяем результат
         assert success is True
         assert "в команде" in message
         assert "Test Team" in message
-
-        # Проверяем вызовы
-        mock_user_repository.get_by_id.assert_called_once_with(123)
-        mock_team_repository.get_team_by_id.assert_called_once_with(1)
-        mock_team_repository.add_user_to_team.assert_called_once_with(123, 1)
-
-    # Тест для присоединения когда пользователь уже в команде
+        mock_team_repository.add_member_atomic.assert_called_once_with(123, 1, 5)
 
     # Тест для присоединения к несуществующей команде
     @pytest.mark.asyncio
-    async def test_join_team_team_not_found(self, team_service, mock_user_repository, mock_team_repository):
-        # Создаем мок пользователя без команды
-        mock_user = Mock()
-        mock_user.id = 123
-        mock_user.team_id = None
-
-        mock_user_repository.get_by_id.return_value = mock_user
-        mock_team_repository.get_team_by_id.return_value = None
+    async def test_join_team_team_not_found(self, team_service, mock_team_repository):
+        mock_team_repository.add_member_atomic.return_value = ("team_not_found", None)
 
-        # Вызываем метод
         success, message = await team_service.join_team(123, 999)
 
-        # Проверяем результат
         assert success is False
         assert "не найдена" in message
 
-        # add_user_to_team не должен вызываться
-        mock_team_repository.add_user_to_team.assert_not_called()
+    # Тест для присоединения к заполненной команде
+    @pytest.mark.asyncio
+    async def test_join_team_full(self, team_service, mock_team_repository):
+        mock_team = Mock()
+        mock_team.name = "Test Team"
+        mock_team_repository.add_member_atomic.return_value = ("team_full", mock_team)
+
+        success, message = await team_service.join_team(123, 1)
+
+        assert success is False
+        assert "уже 5 участников" in message
+
+    # Тест для присоединения, когда пользователь уже в команде
+    @pytest.mark.asyncio
+    async def test_join_team_already_in_team(self, team_service, mock_team_repository):
+        mock_team_repository.add_member_atomic.return_value = ("in_team", Mock())
+
+        success, message = await team_service.join_team(123, 1)
+
+        assert success is False
+        assert "уже состоите в команде" in message
 
 
 class TestDissolveTeam:
     # Тест для успешного роспуска команды
     @pytest.mark.asyncio
     async def test_dissolve_team_success(self, team_service, mock_team_repository):
-        # Создаем мок команды
         mock_team = Mock()
-        mock_team.id = 1
         mock_team.name = "Test Team"
+        mock_team_repository.dissolve_team_atomic.return_value = ("ok", mock_team)
 
-        mock_team_repository.get_team_by_captain.return_value = mock_team
-        mock_team_repository.delete_team.return_value = True
-
-        # Вызываем метод
         success, message = await team_service.dissolve_team(123)
 
-        # Проверяем результат
         assert success is True
         assert "распущена" in message
         assert "Test Team" in message
-
-        # Проверяем вызовы
-        mock_team_repository.get_team_by_captain.assert_called_once_with(123)
-        mock_team_repository.delete_team.assert_called_once_with(1)
+        mock_team_repository.dissolve_team_atomic.assert_called_once_with(123)
 
     # Тест для роспуска когда пользователь не капитан
     @pytest.mark.asyncio
     async def test_dissolve_team_user_not_captain(self, team_service, mock_team_repository):
-        # Настраиваем мок чтобы команда не была найдена
-        mock_team_repository.get_team_by_captain.return_value = None
+        mock_team_repository.dissolve_team_atomic.return_value = ("not_captain", None)
 
-        # Вызываем метод
         success, message = await team_service.dissolve_team(999)
 
-        # Проверяем результат
         assert success is False
         assert "не являетесь капитаном" in message
 
-        # delete_team не должен вызываться
-        mock_team_repository.delete_team.assert_not_called()
-
 
 class TestIsUserCaptain:
     # Тест для проверки является ли пользователь капитаном
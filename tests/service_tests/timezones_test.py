@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+from services.timezones import convert, get_zone, to_local, to_local_many, to_utc, utc_offset_hours
+
+
+class TestTimezones:
+
+    def test_fixed_offset_round_trip(self):
+        local = datetime(2025, 1, 15, 10, 0)
+
+        utc = to_utc(local, "UTC+5")
+
+        assert utc == datetime(2025, 1, 15, 5, 0, tzinfo=timezone.utc)
+        assert to_local(utc, "UTC+5") == local
+
+    def test_naive_moment_is_treated_as_utc(self):
+        assert to_local(datetime(2025, 1, 15, 5, 0), "UTC-3") == datetime(2025, 1, 15, 2, 0)
+
+    def test_iana_zone_accounts_for_dst(self):
+        winter = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+        summer = datetime(2025, 7, 15, 12, 0, tzinfo=timezone.utc)
+
+        assert to_local_many([winter, summer], "Europe/Berlin") == [
+            datetime(2025, 1, 15, 13, 0),
+            datetime(2025, 7, 15, 14, 0),
+        ]
+
+    def test_utc_offset_hours(self):
+        winter = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+        summer = datetime(2025, 7, 15, 12, 0, tzinfo=timezone.utc)
+
+        assert utc_offset_hours("UTC-5", winter) == -5
+        assert utc_offset_hours("Asia/Novosibirsk", winter) == 7
+        assert utc_offset_hours("Europe/Berlin", winter) == 1
+        assert utc_offset_hours("Europe/Berlin", summer) == 2
+        assert utc_offset_hours(None, winter) == 3
+
+    def test_to_local_many_fixed_offset(self):
+        moments = [datetime(2025, 1, 15, hour, 0, tzinfo=timezone.utc) for hour in (0, 21)]
+
+        assert to_local_many(moments, "UTC+3") == [datetime(2025, 1, 15, 3, 0), datetime(2025, 1, 16, 0, 0)]
+
+    def test_convert_between_zones(self):
+        assert convert(datetime(2025, 1, 15, 10, 0), "UTC+3", "UTC+10") == datetime(2025, 1, 15, 17, 0)
+
+    def test_unknown_zone_falls_back_to_default(self, caplog):
+        get_zone.cache_clear()
+
+        assert get_zone("Mars/Olympus") is get_zone("UTC+3")
+        assert get_zone(None) is get_zone("UTC+3")
+        assert "Mars/Olympus" in caplog.text
+
+    def test_zone_is_cached(self):
+        assert get_zone("UTC+7") is get_zone("UTC+7")
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime
 from services.user_service import UserService
+import services.user_service as user_service_module
 from models.user import User, UserRole
 
 
@@ -318,3 +319,110 @@ class TestUserServiceIntegration:
             assert retrieved_user == created_user
             assert retrieved_user.telegram_id == 123456789
 
+
+
+class TestGetUsersPage:
+    # Первая страница: назад нельзя, вперёд можно, если репозиторий вернул limit + 1
+    @pytest.mark.asyncio
+    async def test_first_page_has_next(self, user_service, mock_user_repository):
+        users = [Mock(id=i) for i in range(1, 4)]
+        mock_user_repository.get_page.return_value = users
+
+        page, has_prev, has_next = await user_service.get_users_page(limit=2)
+
+        assert [u.id for u in page] == [1, 2]
+        assert has_prev is False
+        assert has_next is True
+        mock_user_repository.get_page.assert_called_once_with(
+            after_id=None, limit=2, role=None, timezone=None
+        )
+
+    # Последняя страница: вперёд нельзя
+    @pytest.mark.asyncio
+    async def test_last_page(self, user_service, mock_user_repository):
+        mock_user_repository.get_page.return_value = [Mock(id=5)]
+
+        page, has_prev, has_next = await user_service.get_users_page(cursor=4, limit=2, timezone="UTC+5")
+
+        assert [u.id for u in page] == [5]
+        assert has_prev is True
+        assert has_next is False
+        mock_user_repository.get_page.assert_called_once_with(
+            after_id=4, limit=2, role=None, timezone="UTC+5"
+        )
+
+    # Шаг назад: лишняя строка в начале значит, что есть ещё более ранняя страница
+    @pytest.mark.asyncio
+    async def test_backward_page(self, user_service, mock_user_repository):
+        mock_user_repository.get_page.return_value = [Mock(id=i) for i in range(1, 4)]
+
+        page, has_prev, has_next = await user_service.get_users_page(cursor=4, backward=True, limit=2)
+
+        assert [u.id for u in page] == [2, 3]
+        assert has_prev is True
+        assert has_next is True
+        mock_user_repository.get_page.assert_called_once_with(
+            before_id=4, limit=2, role=None, timezone=None
+        )
+
+
+class TestRandomActiveProfiles:
+
+    @pytest.fixture(autouse=True)
+    def clear_decks(self):
+        user_service_module._profile_decks.clear()
+        yield
+        user_service_module._profile_decks.clear()
+
+    @staticmethod
+    def _by_ids(ids):
+        return [Mock(id=i) for i in ids]
+
+    # Колода собирается одним запросом id, дальше анкеты идут без повторов
+    @pytest.mark.asyncio
+    async def test_deck_has_no_repeats_until_exhausted(self, user_service, mock_user_repository):
+        mock_user_repository.get_active_profile_ids.return_value = list(range(1, 13))
+        mock_user_repository.get_active_profiles_by_ids.side_effect = self._by_ids
+
+        seen = []
+        for _ in range(2):
+            page = await user_service.get_random_active_profiles(limit=5, exclude_user_id=100)
+            assert len(page) == 5
+            seen.extend(p.id for p in page)
+
+        assert len(set(seen)) == 10
+        mock_user_repository.get_active_profile_ids.assert_called_once_with(100)
+
+    # После исчерпания колода пересобирается, а анкеты страницы не дублируются
+    @pytest.mark.asyncio
+    async def test_deck_rebuilt_when_exhausted(self, user_service, mock_user_repository):
+        mock_user_repository.get_active_profile_ids.side_effect = lambda _: [1, 2, 3]
+        mock_user_repository.get_active_profiles_by_ids.side_effect = self._by_ids
+
+        first = await user_service.get_random_active_profiles(limit=2, exclude_user_id=100)
+        second = await user_service.get_random_active_profiles(limit=2, exclude_user_id=100)
+
+        assert len({p.id for p in first}) == 2
+        assert len({p.id for p in second}) == 2
+        assert mock_user_repository.get_active_profile_ids.call_count == 2
+
+    # Нет анкет — пустой список без бесконечных пересборок
+    @pytest.mark.asyncio
+    async def test_empty_deck(self, user_service, mock_user_repository):
+        mock_user_repository.get_active_profile_ids.return_value = []
+
+        assert await user_service.get_random_active_profiles(limit=5, exclude_user_id=1) == []
+        mock_user_repository.get_active_profiles_by_ids.assert_not_called()
+
+    # Устаревшая колода собирается заново
+    @pytest.mark.asyncio
+    async def test_deck_expires(self, user_service, mock_user_repository):
+        mock_user_repository.get_active_profile_ids.side_effect = lambda _: [1, 2, 3, 4]
+        mock_user_repository.get_active_profiles_by_ids.side_effect = self._by_ids
+
+        await user_service.get_random_active_profiles(limit=1, exclude_user_id=7)
+        created, ids = user_service_module._profile_decks[7]
+        user_service_module._profile_decks[7] = (created - user_service_module.PROFILE_DECK_TTL - 1, ids)
+        await user_service.get_random_active_profiles(limit=1, exclude_user_id=7)
+
+        assert mock_user_repository.get_active_profile_ids.call_count == 2